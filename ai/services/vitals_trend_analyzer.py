@@ -77,13 +77,15 @@ class VitalsTrendAnalyzer:
                 )
 
                 if cached and "vista_responses" in cached:
-                    # Merge PG data with cached Vista responses
+                    # Merge PG data with cached Vista responses (memoized;
+                    # shared with the vitals page, which merges the same window)
                     from app.services.realtime_overlay import merge_vitals_data
-                    pg_vitals = get_patient_vitals(self.patient_icn, limit=500)
-                    all_vitals, merge_stats = merge_vitals_data(
-                        pg_vitals,
-                        cached["vista_responses"],
-                        self.patient_icn
+                    from app.services.merged_view_cache import merged_view_cache
+                    all_vitals, merge_stats = merged_view_cache.get_or_merge(
+                        self.patient_icn, "vitals", ("vitals",), cached["vista_responses"],
+                        load_pg=lambda: get_patient_vitals(self.patient_icn, limit=500),
+                        merge=merge_vitals_data,
+                        variant=(500,)
                     )
                     data_source = f"PostgreSQL + Vista ({', '.join(cached.get('sites', []))})"
                     logger.info(
@@ -9,20 +9,16 @@
 
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 import bcrypt
 import logging
-from config import DATABASE_URL, AUTH_CONFIG
+from config import AUTH_CONFIG
+from app.db.engines import primary_engine
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Writes and read-after-write paths always use the primary
+engine = primary_engine
 
 
 # ---------------------------------------------------------------------
@@ -7,19 +7,16 @@
 # ---------------------------------------------------------------------
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.pagination import decode_cursor
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
 def get_patient_encounters(
@@ -27,17 +24,23 @@ def get_patient_encounters(
     limit: Optional[int] = 100,
     offset: Optional[int] = 0,
     active_only: Optional[bool] = False,
-    recent_only: Optional[bool] = False
+    recent_only: Optional[bool] = False,
+    cursor: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Get all encounters for a patient by ICN.
 
+    Results can be paged with a keyset cursor on (admit_datetime,
+    encounter_id) instead of offset; see app.db.pagination.build_page()
+    for producing the next cursor.
+
     Args:
         icn: Integrated Care Number
         limit: Maximum number of encounters to return (default 100)
         offset: Number of encounters to skip (for pagination, default 0)
         active_only: If True, return only active admissions (default False)
         recent_only: If True, return only recent encounters (last 30 days, default False)
+        cursor: Keyset cursor from a previous page (overrides offset)
 
     Returns:
         List of dictionaries with encounter data
@@ -49,6 +52,17 @@ def get_patient_encounters(
     if recent_only:
         where_clauses.append("is_recent = TRUE")
 
+    # Keyset pagination on (admit_datetime, encounter_id)
+    params = {"icn": icn, "limit": limit, "offset": offset}
+    cursor_values = decode_cursor(cursor)
+    if cursor_values:
+        where_clauses.append(
+            "(admit_datetime, encounter_id) < (CAST(:cursor_datetime AS TIMESTAMP), :cursor_id)"
+        )
+        params["cursor_datetime"] = cursor_values[0]
+        params["cursor_id"] = cursor_values[1]
+        params["offset"] = 0
+
     where_clause = " AND ".join(where_clauses)
 
     query = text(f"""
@@ -86,17 +100,14 @@ def get_patient_encounters(
             last_updated
         FROM clinical.patient_encounters
         WHERE {where_clause}
-        ORDER BY admit_datetime DESC
+        ORDER BY admit_datetime DESC, encounter_id DESC
         LIMIT :limit
         OFFSET :offset
     """)
 
     try:
         with engine.connect() as conn:
-            results = conn.execute(
-                query,
-                {"icn": icn, "limit": limit, "offset": offset}
-            ).fetchall()
+            results = conn.execute(query, params).fetchall()
 
             encounters = []
             for row in results:
@@ -290,6 +301,10 @@ def get_encounter_counts(icn: str) -> Dict[str, int]:
     Returns:
         Dictionary with encounter statistics
     """
+    summary = get_summary_counts(icn, "encounters")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             COUNT(*) as total_encounters,
@@ -0,0 +1,240 @@
+# ---------------------------------------------------------------------
+# app/db/engines.py
+# ---------------------------------------------------------------------
+# Primary / Read-Replica Engine Routing
+#  - primary_engine: writes and read-after-write paths (auth sessions
+#    and audit logs, patient tasks)
+#  - read_engine: read-only query functions (clinical domains, patient
+#    search, serving-data versions). Uses the replica when one is
+#    configured, reachable and within the replication lag limit, and
+#    the primary otherwise
+#  - A replica statement that fails with a connection-level error is
+#    re-run on the primary (reads only, so retrying is safe), and the
+#    replica is skipped for retry_seconds
+# ---------------------------------------------------------------------
+# Usage (query modules):
+#   from app.db.engines import read_engine as engine
+#
+#   with engine.connect() as conn:
+#       rows = conn.execute(query, params).fetchall()
+# ---------------------------------------------------------------------
+
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.pool import NullPool
+from config import DATABASE_URL, DATABASE_ROUTING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Replica lag in seconds; 0 when the replica has replayed all WAL it has
+# received (an idle primary would otherwise look like growing lag)
+_LAG_SQL = text("""
+    SELECT
+        pg_is_in_recovery(),
+        CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+""")
+
+
+class _FallbackConnection:
+    """
+    Connection wrapper for reads routed to the replica.
+
+    Statements run on the replica connection; if one fails with a
+    connection-level error, the replica is marked down and the statement
+    (and the rest of the block) runs on a primary connection instead.
+    Everything other than execute() is delegated to the active connection.
+    """
+
+    def __init__(self, router: "ReadReplicaRouter", conn: Connection):
+        self._router = router
+        self._conn = conn
+        self._on_replica = True
+
+    def execute(self, statement: Any, *args, **kwargs):
+        if not self._on_replica:
+            return self._conn.execute(statement, *args, **kwargs)
+        try:
+            return self._conn.execute(statement, *args, **kwargs)
+        except DBAPIError as e:
+            if not (isinstance(e, OperationalError) or e.connection_invalidated):
+                raise
+            self._router.mark_replica_down(e)
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = self._router.primary.connect()
+            self._on_replica = False
+            return self._conn.execute(statement, *args, **kwargs)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __enter__(self) -> "_FallbackConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._conn.close()
+
+
+class ReadReplicaRouter:
+    """
+    Engine-like router for read-only queries.
+
+    connect() returns a replica connection while the replica is healthy
+    and its lag is below max_lag_seconds, otherwise a primary
+    connection. begin() always uses the primary, so a write can never
+    reach the replica through this object.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replica: Optional[Engine] = None,
+        max_lag_seconds: float = 30.0,
+        lag_check_seconds: float = 5.0,
+        retry_seconds: float = 30.0,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.retry_seconds = retry_seconds
+
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._lag_checked_at = float("-inf")
+        self._lag_ok = False
+        self.last_lag: Optional[float] = None
+
+        # Counters for monitoring
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    # -----------------------------------------------------------------
+    # Replica health
+    # -----------------------------------------------------------------
+
+    def mark_replica_down(self, error: Exception) -> None:
+        """Skip the replica for retry_seconds after a connection error."""
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_seconds
+            self._lag_checked_at = float("-inf")
+            self.fallbacks += 1
+        logger.warning(f"Read replica unavailable, routing reads to primary for {self.retry_seconds:.0f}s: {error}")
+
+    def _check_lag(self) -> bool:
+        """Query replica lag; False if it is not a standby or too far behind."""
+        try:
+            with self.replica.connect() as conn:
+                in_recovery, lag = conn.execute(_LAG_SQL).fetchone()
+        except Exception as e:
+            self.mark_replica_down(e)
+            return False
+
+        self.last_lag = float(lag or 0)
+        if not in_recovery:
+            # Two independent instances (e.g., both loaded by ETL): no lag to measure
+            return True
+        if self.last_lag > self.max_lag_seconds:
+            logger.warning(
+                f"Read replica lag {self.last_lag:.1f}s exceeds {self.max_lag_seconds:.0f}s, "
+                f"routing reads to primary"
+            )
+            return False
+        return True
+
+    def replica_usable(self) -> bool:
+        """Whether reads should go to the replica right now."""
+        if self.replica is None:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            if now < self._down_until:
+                return False
+            if now - self._lag_checked_at < self.lag_check_seconds:
+                return self._lag_ok
+
+        lag_ok = self._check_lag()
+        with self._lock:
+            self._lag_ok = lag_ok
+            self._lag_checked_at = time.monotonic()
+        return lag_ok
+
+    # -----------------------------------------------------------------
+    # Engine-like API
+    # -----------------------------------------------------------------
+
+    def connect(self):
+        """Open a read connection (replica when usable, else primary)."""
+        if self.replica_usable():
+            try:
+                conn = self.replica.connect()
+                self.replica_reads += 1
+                return _FallbackConnection(self, conn)
+            except Exception as e:
+                self.mark_replica_down(e)
+
+        self.primary_reads += 1
+        return self.primary.connect()
+
+    def begin(self):
+        """Open a transaction on the primary (writes never use the replica)."""
+        return self.primary.begin()
+
+    def stats(self) -> dict:
+        """Return routing counters for monitoring/debugging."""
+        with self._lock:
+            return {
+                "replica_configured": self.replica is not None,
+                "replica_down": time.monotonic() < self._down_until,
+                "last_lag_seconds": self.last_lag,
+                "max_lag_seconds": self.max_lag_seconds,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "fallbacks": self.fallbacks,
+            }
+
+
+# Create engines with connection pooling
+primary_engine = create_engine(
+    DATABASE_URL,
+    poolclass=NullPool,  # Simple pooling for development
+    echo=False,  # Set to True to see SQL queries in logs
+)
+
+replica_engine = None
+if DATABASE_ROUTING_CONFIG["replica_url"]:
+    replica_engine = create_engine(
+        DATABASE_ROUTING_CONFIG["replica_url"],
+        poolclass=NullPool,
+        echo=False,
+        connect_args={"connect_timeout": DATABASE_ROUTING_CONFIG["replica_connect_timeout"]},
+    )
+
+read_engine = ReadReplicaRouter(
+    primary_engine,
+    replica_engine,
+    max_lag_seconds=DATABASE_ROUTING_CONFIG["replica_max_lag_seconds"],
+    lag_check_seconds=DATABASE_ROUTING_CONFIG["replica_lag_check_seconds"],
+    retry_seconds=DATABASE_ROUTING_CONFIG["replica_retry_seconds"],
+)
+
+
+def get_routing_stats() -> dict:
+    """Return read routing statistics."""
+    return read_engine.stats()
@@ -6,20 +6,55 @@
 # This module encapsulates all SQL queries for lab results data
 # ---------------------------------------------------------------------
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from typing import Optional, List, Dict, Any, Sequence
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from datetime import datetime
+from app.db.engines import read_engine
+from app.db.pagination import decode_cursor
+from app.db.query_cache import cached_query
+from app.db.row_mapping import RowMapper, sql_float, sql_text
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+# Lab result columns, cast in SQL so rows map straight to JSON-ready dicts.
+# ORDER BY must use l.collection_datetime (the output alias is text).
+LAB_COLUMNS_SQL = ",\n            ".join([
+    "l.lab_id",
+    "l.patient_key",
+    "l.lab_chem_sid",
+    "l.lab_test_sid",
+    "l.lab_test_name",
+    "l.lab_test_code",
+    "l.loinc_code",
+    "l.panel_name",
+    "l.accession_number",
+    "l.result_value",
+    sql_float("l.result_numeric"),
+    "l.result_unit",
+    "l.abnormal_flag",
+    "l.is_abnormal",
+    "l.is_critical",
+    "l.ref_range_text",
+    sql_float("l.ref_range_low"),
+    sql_float("l.ref_range_high"),
+    sql_text("l.collection_datetime"),
+    sql_text("l.result_datetime"),
+    "l.location_id",
+    "l.collection_location",
+    "l.collection_location_type",
+    "l.specimen_type",
+    "l.sta3n",
+    "l.vista_package",
+    sql_text("l.last_updated"),
+])
+
+_lab_rows = RowMapper()
+_trend_bucket_rows = RowMapper()
 
 
 def get_recent_panels(
@@ -155,7 +190,7 @@ def get_trending_tests(
         WHERE patient_key = :icn
           AND lab_test_name = ANY(:test_names)
           AND result_numeric IS NOT NULL
-          AND collection_datetime >= CURRENT_DATE - INTERVAL ':days days'
+          AND collection_datetime >= CURRENT_DATE - make_interval(days => :days)
         ORDER BY lab_test_name ASC, collection_datetime ASC
     """)
 
@@ -194,12 +229,17 @@ def get_all_lab_results(
     abnormal_only: Optional[bool] = False,
     days: Optional[int] = None,
     sort_by: Optional[str] = "collection_datetime",
-    sort_order: Optional[str] = "desc"
+    sort_order: Optional[str] = "desc",
+    cursor: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Get all lab results for a patient with optional filters and sorting.
     Used for full lab results page with filtering capabilities.
 
+    When sorting by collection_datetime, results can be paged with a
+    keyset cursor on (collection_datetime, lab_id) instead of offset;
+    see app.db.pagination.build_page() for producing the next cursor.
+
     Args:
         icn: Integrated Care Number
         limit: Maximum number of results to return (default 100)
@@ -209,6 +249,7 @@ def get_all_lab_results(
         days: If specified, only return results from last N days
         sort_by: Column to sort by (default: collection_datetime)
         sort_order: Sort direction - asc or desc (default: desc)
+        cursor: Keyset cursor from a previous page (collection_datetime sort only)
 
     Returns:
         List of dictionaries with lab result data
@@ -224,51 +265,36 @@ def get_all_lab_results(
     if abnormal_only:
         where_clauses.append("is_abnormal = TRUE")
     if days:
-        where_clauses.append("collection_datetime >= CURRENT_DATE - INTERVAL ':days days'")
-
-    where_clause = " AND ".join(where_clauses)
+        where_clauses.append("collection_datetime >= CURRENT_DATE - make_interval(days => :days)")
 
     # Validate and build ORDER BY clause
+    # (table-qualified: the collection_datetime output column is text)
     valid_sort_columns = {
-        "collection_datetime": "collection_datetime",
-        "lab_test_name": "lab_test_name",
-        "abnormal_flag": "is_abnormal DESC, abnormal_flag"
+        "collection_datetime": "l.collection_datetime",
+        "lab_test_name": "l.lab_test_name",
+        "abnormal_flag": "l.is_abnormal DESC, l.abnormal_flag"
     }
 
-    order_column = valid_sort_columns.get(sort_by, "collection_datetime")
+    order_column = valid_sort_columns.get(sort_by, "l.collection_datetime")
     order_direction = "ASC" if sort_order.lower() == "asc" else "DESC"
-    order_clause = f"{order_column} {order_direction}"
+    order_clause = f"{order_column} {order_direction}, l.lab_id {order_direction}"
+
+    # Keyset pagination on (collection_datetime, lab_id) for date sort
+    cursor_values = decode_cursor(cursor) if order_column == "l.collection_datetime" else None
+    if cursor_values:
+        comparator = ">" if order_direction == "ASC" else "<"
+        where_clauses.append(
+            f"(collection_datetime, lab_id) {comparator} "
+            f"(CAST(:cursor_datetime AS TIMESTAMP), :cursor_id)"
+        )
+        offset = 0
+
+    where_clause = " AND ".join(where_clauses)
 
     query = text(f"""
         SELECT
-            lab_id,
-            patient_key,
-            lab_chem_sid,
-            lab_test_sid,
-            lab_test_name,
-            lab_test_code,
-            loinc_code,
-            panel_name,
-            accession_number,
-            result_value,
-            result_numeric,
-            result_unit,
-            abnormal_flag,
-            is_abnormal,
-            is_critical,
-            ref_range_text,
-            ref_range_low,
-            ref_range_high,
-            collection_datetime,
-            result_datetime,
-            location_id,
-            collection_location,
-            collection_location_type,
-            specimen_type,
-            sta3n,
-            vista_package,
-            last_updated
-        FROM clinical.patient_labs
+            {LAB_COLUMNS_SQL}
+        FROM clinical.patient_labs l
         WHERE {where_clause}
         ORDER BY {order_clause}
         LIMIT :limit
@@ -282,42 +308,11 @@ def get_all_lab_results(
                 params["panel_filter"] = panel_filter
             if days:
                 params["days"] = days
+            if cursor_values:
+                params["cursor_datetime"] = cursor_values[0]
+                params["cursor_id"] = cursor_values[1]
 
-            results = conn.execute(query, params).fetchall()
-
-            labs = []
-            for row in results:
-                labs.append({
-                    "lab_id": row[0],
-                    "patient_key": row[1],
-                    "lab_chem_sid": row[2],
-                    "lab_test_sid": row[3],
-                    "lab_test_name": row[4],
-                    "lab_test_code": row[5],
-                    "loinc_code": row[6],
-                    "panel_name": row[7],
-                    "accession_number": row[8],
-                    "result_value": row[9],
-                    "result_numeric": float(row[10]) if row[10] is not None else None,
-                    "result_unit": row[11],
-                    "abnormal_flag": row[12],
-                    "is_abnormal": row[13],
-                    "is_critical": row[14],
-                    "ref_range_text": row[15],
-                    "ref_range_low": float(row[16]) if row[16] is not None else None,
-                    "ref_range_high": float(row[17]) if row[17] is not None else None,
-                    "collection_datetime": str(row[18]) if row[18] else None,
-                    "result_datetime": str(row[19]) if row[19] else None,
-                    "location_id": row[20],
-                    "collection_location": row[21],
-                    "collection_location_type": row[22],
-                    "specimen_type": row[23],
-                    "sta3n": row[24],
-                    "vista_package": row[25],
-                    "last_updated": str(row[26]) if row[26] else None,
-                })
-
-            return labs
+            return _lab_rows.map_rows(conn.execute(query, params))
 
     except Exception as e:
         logger.error(f"Error fetching lab results for ICN {icn}: {e}")
@@ -361,7 +356,7 @@ def get_test_trend(
         FROM clinical.patient_labs
         WHERE patient_key = :icn
           AND lab_test_name = :lab_test_name
-          AND collection_datetime >= CURRENT_DATE - INTERVAL ':days days'
+          AND collection_datetime >= CURRENT_DATE - make_interval(days => :days)
         ORDER BY collection_datetime ASC
     """)
 
@@ -399,6 +394,188 @@ def get_test_trend(
         return []
 
 
+
+@cached_query("labs")
+def get_lab_trend_buckets(
+    icn: str,
+    test_names: Sequence[str],
+    bucket_days: int = 30,
+    days: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get time-bucketed trend statistics for several lab tests in one query.
+    Used for panel trend views (e.g., the labs widget), where one query
+    replaces one get_test_trend() call per test.
+
+    Args:
+        icn: Integrated Care Number
+        test_names: Lab test names (pass a tuple so results can be cached)
+        bucket_days: Bucket width in days (date_bin() needs a fixed interval,
+                     so calendar months are not supported)
+        days: Optional look-back window in days (default: full history)
+
+    Returns:
+        Dictionary keyed by test name (tests without numeric results are
+        omitted), each with "unit", "ref_range_low", "ref_range_high",
+        "count" (results in the window), "latest": {value,
+        collection_datetime, is_abnormal} and "buckets": [{bucket_start,
+        count, min, max, mean, last, abnormal_count}, ...] oldest first
+    """
+    if not test_names:
+        return {}
+
+    window_clause = ""
+    params: Dict[str, Any] = {"icn": icn, "test_names": list(test_names), "bucket_days": bucket_days}
+    if days:
+        window_clause = "AND collection_datetime >= CURRENT_DATE - make_interval(days => :days)"
+        params["days"] = days
+
+    # One pass: date_bin() assigns each result to a bucket, the aggregates
+    # give min/max/mean/last per bucket, and the window function carries
+    # the unit and reference range of each test's most recent result
+    query = text(f"""
+        WITH bucketed AS (
+            SELECT
+                lab_test_name,
+                date_bin(make_interval(days => :bucket_days), collection_datetime, TIMESTAMP '2000-01-01') AS bucket_start,
+                collection_datetime,
+                result_numeric,
+                result_unit,
+                ref_range_low,
+                ref_range_high,
+                is_abnormal
+            FROM clinical.patient_labs
+            WHERE patient_key = :icn
+              AND lab_test_name = ANY(:test_names)
+              AND result_numeric IS NOT NULL
+              {window_clause}
+        )
+        SELECT
+            lab_test_name,
+            bucket_start::text AS bucket_start,
+            COUNT(*) AS result_count,
+            MIN(result_numeric)::float8 AS min_value,
+            MAX(result_numeric)::float8 AS max_value,
+            AVG(result_numeric)::float8 AS mean_value,
+            (ARRAY_AGG(result_numeric ORDER BY collection_datetime DESC))[1]::float8 AS last_value,
+            MAX(collection_datetime)::text AS last_datetime,
+            (ARRAY_AGG(is_abnormal ORDER BY collection_datetime DESC))[1] AS last_abnormal,
+            COUNT(*) FILTER (WHERE is_abnormal) AS abnormal_count,
+            FIRST_VALUE((ARRAY_AGG(result_unit ORDER BY collection_datetime DESC))[1]) OVER latest AS unit,
+            FIRST_VALUE((ARRAY_AGG(ref_range_low ORDER BY collection_datetime DESC))[1]::float8) OVER latest AS ref_range_low,
+            FIRST_VALUE((ARRAY_AGG(ref_range_high ORDER BY collection_datetime DESC))[1]::float8) OVER latest AS ref_range_high
+        FROM bucketed
+        GROUP BY lab_test_name, bucket_start
+        WINDOW latest AS (PARTITION BY lab_test_name ORDER BY bucket_start DESC)
+        ORDER BY lab_test_name ASC, bucket_start ASC
+    """)
+
+    try:
+        with engine.connect() as conn:
+            rows = _trend_bucket_rows.map_rows(conn.execute(query, params))
+
+        trends: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            trend = trends.get(row["lab_test_name"])
+            if trend is None:
+                trend = trends[row["lab_test_name"]] = {
+                    "unit": row["unit"],
+                    "ref_range_low": row["ref_range_low"],
+                    "ref_range_high": row["ref_range_high"],
+                    "count": 0,
+                    "latest": None,
+                    "buckets": [],
+                }
+
+            trend["buckets"].append({
+                "bucket_start": row["bucket_start"],
+                "count": row["result_count"],
+                "min": row["min_value"],
+                "max": row["max_value"],
+                "mean": row["mean_value"],
+                "last": row["last_value"],
+                "abnormal_count": row["abnormal_count"],
+            })
+            trend["count"] += row["result_count"]
+            # Buckets are oldest first, so the last one seen holds the latest result
+            trend["latest"] = {
+                "value": row["last_value"],
+                "collection_datetime": row["last_datetime"],
+                "is_abnormal": bool(row["last_abnormal"]),
+            }
+
+        return trends
+
+    except Exception as e:
+        logger.error(f"Error fetching lab trend buckets for ICN {icn}: {e}")
+        return {}
+
+
+def get_lab_trend_points(
+    icn: str,
+    lab_test_name: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Get every numeric result of one lab test as parallel columns, for
+    server-side downsampling of trend charts.
+
+    Args:
+        icn: Integrated Care Number
+        lab_test_name: Name of the lab test (e.g., "Glucose")
+        start: Optional window start (inclusive)
+        end: Optional window end (inclusive)
+
+    Returns:
+        Dictionary with "t" (epoch milliseconds, oldest first) and
+        "result_numeric" lists, plus the latest "unit",
+        "ref_range_low" and "ref_range_high"
+    """
+    where_clauses = ["patient_key = :icn", "lab_test_name = :lab_test_name", "result_numeric IS NOT NULL"]
+    params: Dict[str, Any] = {"icn": icn, "lab_test_name": lab_test_name}
+    if start:
+        where_clauses.append("collection_datetime >= :start")
+        params["start"] = start
+    if end:
+        where_clauses.append("collection_datetime <= :end")
+        params["end"] = end
+
+    query = text(f"""
+        SELECT
+            EXTRACT(EPOCH FROM collection_datetime)::float8 * 1000 AS t,
+            result_numeric::float8,
+            result_unit,
+            ref_range_low::float8,
+            ref_range_high::float8
+        FROM clinical.patient_labs
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY collection_datetime ASC
+    """)
+
+    empty = {"t": [], "result_numeric": [], "unit": None, "ref_range_low": None, "ref_range_high": None}
+
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        if not rows:
+            return empty
+
+        latest = rows[-1]
+        return {
+            "t": [row[0] for row in rows],
+            "result_numeric": [row[1] for row in rows],
+            "unit": latest[2],
+            "ref_range_low": latest[3],
+            "ref_range_high": latest[4],
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching lab trend points for ICN {icn}, test {lab_test_name}: {e}")
+        return empty
+
+@cached_query(("labs", "patient_summary_labs"))
 def get_lab_counts(icn: str) -> Dict[str, int]:
     """
     Get counts of lab results by panel for a patient.
@@ -410,6 +587,10 @@ def get_lab_counts(icn: str) -> Dict[str, int]:
     Returns:
         Dictionary with panel names as keys and counts as values
     """
+    summary = get_summary_counts(icn, "labs")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             COALESCE(panel_name, 'Individual Tests') as panel_category,
@@ -7,23 +7,175 @@
 # This module encapsulates all SQL queries for medications data
 # ---------------------------------------------------------------------
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from typing import Optional, List, Dict, Any, Sequence
+from sqlalchemy import text
 from datetime import datetime, timedelta
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.query_cache import cached_lookup, cached_query
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+
+# Outpatient (RxOut) columns, in _map_outpatient_row() order
+OUTPATIENT_COLUMNS_SQL = ",\n            ".join([
+    "medication_outpatient_id",
+    "patient_icn",
+    "rx_outpat_id",
+    "prescription_number",
+    "drug_name_local",
+    "drug_name_national",
+    "generic_name",
+    "drug_strength",
+    "drug_unit",
+    "dosage_form",
+    "drug_class",
+    "dea_schedule",
+    "issue_date",
+    "rx_status",
+    "rx_status_computed",
+    "quantity_ordered",
+    "days_supply",
+    "refills_allowed",
+    "refills_remaining",
+    "latest_fill_date",
+    "latest_fill_status",
+    "expiration_date",
+    "discontinued_date",
+    "discontinue_reason",
+    "is_controlled_substance",
+    "is_active",
+    "days_until_expiration",
+    "provider_name",
+    "pharmacy_name",
+    "facility_name",
+    "cmop_indicator",
+    "mail_indicator",
+    "sig",
+    "sig_route",
+    "sig_schedule",
+])
+
+# Inpatient (BCMA) columns, in _map_inpatient_row() order
+INPATIENT_COLUMNS_SQL = ",\n            ".join([
+    "medication_inpatient_id",
+    "patient_icn",
+    "bcma_log_id",
+    "order_number",
+    "drug_name_local",
+    "drug_name_national",
+    "generic_name",
+    "drug_strength",
+    "drug_unit",
+    "dosage_form",
+    "drug_class",
+    "dea_schedule",
+    "action_type",
+    "action_status",
+    "action_datetime",
+    "scheduled_datetime",
+    "dosage_ordered",
+    "dosage_given",
+    "route",
+    "schedule",
+    "administration_variance",
+    "variance_type",
+    "variance_reason",
+    "is_iv_medication",
+    "iv_type",
+    "infusion_rate",
+    "is_controlled_substance",
+    "administered_by",
+    "ordering_provider",
+    "ward_name",
+    "facility_name",
+])
+
+
+def _map_outpatient_row(row) -> Dict[str, Any]:
+    """Map an OUTPATIENT_COLUMNS_SQL row to the unified medication dict."""
+    return {
+        "medication_id": f"rxout_{row[0]}",  # Prefix for uniqueness
+        "type": "outpatient",
+        "patient_icn": row[1],
+        "source_id": row[2],  # rx_outpat_id
+        "prescription_number": row[3],
+        "drug_name_local": row[4],
+        "drug_name_national": row[5],
+        "generic_name": row[6],
+        "drug_strength": row[7],
+        "drug_unit": row[8],
+        "dosage_form": row[9],
+        "drug_class": row[10],
+        "dea_schedule": row[11],
+        "date": str(row[12]) if row[12] else None,  # issue_date
+        "status": row[14],  # rx_status_computed
+        "status_original": row[13],  # rx_status
+        "quantity_ordered": float(row[15]) if row[15] is not None else None,
+        "days_supply": row[16],
+        "refills_allowed": row[17],
+        "refills_remaining": row[18],
+        "latest_fill_date": str(row[19]) if row[19] else None,
+        "latest_fill_status": row[20],
+        "expiration_date": str(row[21]) if row[21] else None,
+        "discontinued_date": str(row[22]) if row[22] else None,
+        "discontinue_reason": row[23],
+        "is_controlled_substance": row[24],
+        "is_active": row[25],
+        "days_until_expiration": row[26],
+        "provider_name": row[27],
+        "pharmacy_name": row[28],
+        "facility_name": row[29],
+        "cmop_indicator": row[30],
+        "mail_indicator": row[31],
+        "sig": row[32],
+        "sig_route": row[33],
+        "sig_schedule": row[34],
+    }
 
 
+def _map_inpatient_row(row) -> Dict[str, Any]:
+    """Map an INPATIENT_COLUMNS_SQL row to the unified medication dict."""
+    return {
+        "medication_id": f"bcma_{row[0]}",  # Prefix for uniqueness
+        "type": "inpatient",
+        "patient_icn": row[1],
+        "source_id": row[2],  # bcma_log_id
+        "order_number": row[3],
+        "drug_name_local": row[4],
+        "drug_name_national": row[5],
+        "generic_name": row[6],
+        "drug_strength": row[7],
+        "drug_unit": row[8],
+        "dosage_form": row[9],
+        "drug_class": row[10],
+        "dea_schedule": row[11],
+        "action_type": row[12],
+        "action_status": row[13],
+        "date": str(row[14]) if row[14] else None,  # action_datetime
+        "scheduled_datetime": str(row[15]) if row[15] else None,
+        "dosage_ordered": row[16],
+        "dosage_given": row[17],
+        "route": row[18],
+        "schedule": row[19],
+        "administration_variance": row[20],
+        "variance_type": row[21],
+        "variance_reason": row[22],
+        "is_iv_medication": row[23],
+        "iv_type": row[24],
+        "infusion_rate": row[25],
+        "is_controlled_substance": row[26],
+        "administered_by": row[27],
+        "ordering_provider": row[28],
+        "ward_name": row[29],
+        "facility_name": row[30],
+    }
+
+
+@cached_query(("medications_outpatient", "medications_inpatient"))
 def get_patient_medications(
     icn: str,
     limit: Optional[int] = 100,
@@ -91,41 +243,7 @@ def _get_outpatient_medications(
 
     query = text(f"""
         SELECT
-            medication_outpatient_id,
-            patient_icn,
-            rx_outpat_id,
-            prescription_number,
-            drug_name_local,
-            drug_name_national,
-            generic_name,
-            drug_strength,
-            drug_unit,
-            dosage_form,
-            drug_class,
-            dea_schedule,
-            issue_date,
-            rx_status,
-            rx_status_computed,
-            quantity_ordered,
-            days_supply,
-            refills_allowed,
-            refills_remaining,
-            latest_fill_date,
-            latest_fill_status,
-            expiration_date,
-            discontinued_date,
-            discontinue_reason,
-            is_controlled_substance,
-            is_active,
-            days_until_expiration,
-            provider_name,
-            pharmacy_name,
-            facility_name,
-            cmop_indicator,
-            mail_indicator,
-            sig,
-            sig_route,
-            sig_schedule
+            {OUTPATIENT_COLUMNS_SQL}
         FROM clinical.patient_medications_outpatient
         WHERE {where_clause}
         ORDER BY issue_date DESC
@@ -145,44 +263,7 @@ def _get_outpatient_medications(
 
             medications = []
             for row in results:
-                medications.append({
-                    "medication_id": f"rxout_{row[0]}",  # Prefix for uniqueness
-                    "type": "outpatient",
-                    "patient_icn": row[1],
-                    "source_id": row[2],  # rx_outpat_id
-                    "prescription_number": row[3],
-                    "drug_name_local": row[4],
-                    "drug_name_national": row[5],
-                    "generic_name": row[6],
-                    "drug_strength": row[7],
-                    "drug_unit": row[8],
-                    "dosage_form": row[9],
-                    "drug_class": row[10],
-                    "dea_schedule": row[11],
-                    "date": str(row[12]) if row[12] else None,  # issue_date
-                    "status": row[14],  # rx_status_computed
-                    "status_original": row[13],  # rx_status
-                    "quantity_ordered": float(row[15]) if row[15] is not None else None,
-                    "days_supply": row[16],
-                    "refills_allowed": row[17],
-                    "refills_remaining": row[18],
-                    "latest_fill_date": str(row[19]) if row[19] else None,
-                    "latest_fill_status": row[20],
-                    "expiration_date": str(row[21]) if row[21] else None,
-                    "discontinued_date": str(row[22]) if row[22] else None,
-                    "discontinue_reason": row[23],
-                    "is_controlled_substance": row[24],
-                    "is_active": row[25],
-                    "days_until_expiration": row[26],
-                    "provider_name": row[27],
-                    "pharmacy_name": row[28],
-                    "facility_name": row[29],
-                    "cmop_indicator": row[30],
-                    "mail_indicator": row[31],
-                    "sig": row[32],
-                    "sig_route": row[33],
-                    "sig_schedule": row[34],
-                })
+                medications.append(_map_outpatient_row(row))
 
             return medications
 
@@ -212,37 +293,7 @@ def _get_inpatient_medications(
 
     query = text(f"""
         SELECT
-            medication_inpatient_id,
-            patient_icn,
-            bcma_log_id,
-            order_number,
-            drug_name_local,
-            drug_name_national,
-            generic_name,
-            drug_strength,
-            drug_unit,
-            dosage_form,
-            drug_class,
-            dea_schedule,
-            action_type,
-            action_status,
-            action_datetime,
-            scheduled_datetime,
-            dosage_ordered,
-            dosage_given,
-            route,
-            schedule,
-            administration_variance,
-            variance_type,
-            variance_reason,
-            is_iv_medication,
-            iv_type,
-            infusion_rate,
-            is_controlled_substance,
-            administered_by,
-            ordering_provider,
-            ward_name,
-            facility_name
+            {INPATIENT_COLUMNS_SQL}
         FROM clinical.patient_medications_inpatient
         WHERE {where_clause}
         ORDER BY action_datetime DESC
@@ -260,40 +311,7 @@ def _get_inpatient_medications(
 
             medications = []
             for row in results:
-                medications.append({
-                    "medication_id": f"bcma_{row[0]}",  # Prefix for uniqueness
-                    "type": "inpatient",
-                    "patient_icn": row[1],
-                    "source_id": row[2],  # bcma_log_id
-                    "order_number": row[3],
-                    "drug_name_local": row[4],
-                    "drug_name_national": row[5],
-                    "generic_name": row[6],
-                    "drug_strength": row[7],
-                    "drug_unit": row[8],
-                    "dosage_form": row[9],
-                    "drug_class": row[10],
-                    "dea_schedule": row[11],
-                    "action_type": row[12],
-                    "action_status": row[13],
-                    "date": str(row[14]) if row[14] else None,  # action_datetime
-                    "scheduled_datetime": str(row[15]) if row[15] else None,
-                    "dosage_ordered": row[16],
-                    "dosage_given": row[17],
-                    "route": row[18],
-                    "schedule": row[19],
-                    "administration_variance": row[20],
-                    "variance_type": row[21],
-                    "variance_reason": row[22],
-                    "is_iv_medication": row[23],
-                    "iv_type": row[24],
-                    "infusion_rate": row[25],
-                    "is_controlled_substance": row[26],
-                    "administered_by": row[27],
-                    "ordering_provider": row[28],
-                    "ward_name": row[29],
-                    "facility_name": row[30],
-                })
+                medications.append(_map_inpatient_row(row))
 
             return medications
 
@@ -302,6 +320,75 @@ def _get_inpatient_medications(
         return []
 
 
+def parse_medication_id(medication_id: str) -> Optional[tuple]:
+    """
+    Split a medication_id ("rxout_123" / "bcma_456") into (type, primary key).
+
+    Returns:
+        ("outpatient" | "inpatient", int) or None if the format is invalid
+    """
+    prefix, _, key = medication_id.partition("_")
+    med_type = {"rxout": "outpatient", "bcma": "inpatient"}.get(prefix)
+    if med_type is None or not key.isdigit():
+        return None
+    return med_type, int(key)
+
+
+@cached_lookup(("medications_outpatient", "medications_inpatient"))
+def get_medication_details(icn: str, medication_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get full details for specific medications by primary key.
+
+    At most one indexed query per table, however many ids are requested;
+    used for detail modals and to prefetch the rows visible on a list page.
+
+    Args:
+        icn: Integrated Care Number
+        medication_ids: Medication identifiers (e.g., "rxout_123", "bcma_456")
+
+    Returns:
+        Dictionary keyed by medication_id (unknown or invalid ids omitted)
+    """
+    keys = {"outpatient": [], "inpatient": []}
+    for medication_id in medication_ids:
+        parsed = parse_medication_id(medication_id)
+        if parsed:
+            keys[parsed[0]].append(parsed[1])
+
+    queries = [
+        ("outpatient", _map_outpatient_row, text(f"""
+            SELECT
+                {OUTPATIENT_COLUMNS_SQL}
+            FROM clinical.patient_medications_outpatient
+            WHERE medication_outpatient_id = ANY(:ids)
+              AND patient_icn = :icn
+        """)),
+        ("inpatient", _map_inpatient_row, text(f"""
+            SELECT
+                {INPATIENT_COLUMNS_SQL}
+            FROM clinical.patient_medications_inpatient
+            WHERE medication_inpatient_id = ANY(:ids)
+              AND patient_icn = :icn
+        """)),
+    ]
+
+    try:
+        details = {}
+        with engine.connect() as conn:
+            for med_type, map_row, query in queries:
+                if not keys[med_type]:
+                    continue
+                for row in conn.execute(query, {"ids": keys[med_type], "icn": icn}).fetchall():
+                    medication = map_row(row)
+                    details[medication["medication_id"]] = medication
+
+        return details
+
+    except Exception as e:
+        logger.error(f"Error fetching medication details for ICN {icn}: {e}")
+        return {}
+
+
 def get_recent_medications(icn: str, limit: int = 8) -> Dict[str, List[Dict[str, Any]]]:
     """
     Get recent medications for dashboard widget.
@@ -5,12 +5,15 @@
 # ---------------------------------------------------------------------
 
 from typing import Optional, Dict, Any
-from sqlalchemy import create_engine, text
-from config import DATABASE_URL
+from sqlalchemy import text
 import logging
+from app.db.engines import read_engine
 
 logger = logging.getLogger(__name__)
 
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
 
 def get_patient_military_history(icn: str) -> Optional[Dict[str, Any]]:
     """
@@ -36,8 +39,6 @@ def get_patient_military_history(icn: str) -> Optional[Dict[str, Any]]:
             'camp_lejeune_flag': 'N',
         }
     """
-    engine = create_engine(DATABASE_URL)
-
     query = text("""
         SELECT
             patient_key,
@@ -6,20 +6,19 @@
 # This module encapsulates all SQL queries for clinical notes data
 # ---------------------------------------------------------------------
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from typing import Optional, List, Dict, Any, Sequence
+import html
+import re
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.query_cache import cached_lookup, cached_query
+from app.db.pagination import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
 def get_recent_notes(
@@ -240,12 +239,19 @@ def get_all_notes(
     sort_by: str = 'reference_datetime',
     sort_order: str = 'desc',
     limit: int = 20,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Get all clinical notes for a patient with filtering, sorting, and pagination.
     Used for full notes page view.
 
+    When sorting by reference_datetime, pages can be walked with keyset
+    (cursor) pagination on (reference_datetime, note_id): pass the
+    pagination["next_cursor"] of the previous page as cursor. The cursor
+    also carries its page number (offset is always 0 on cursor pages).
+    Other sort columns fall back to LIMIT/OFFSET.
+
     Args:
         icn: Integrated Care Number (patient_key)
         note_class: Filter by document class ('all', 'Progress Notes', 'Consults', etc.)
@@ -255,14 +261,15 @@ def get_all_notes(
         sort_by: Column to sort by ('reference_datetime', 'document_class', 'author_name')
         sort_order: Sort order ('asc' or 'desc')
         limit: Number of notes per page
-        offset: Pagination offset
+        offset: Pagination offset (ignored when cursor is given)
+        cursor: Keyset cursor from a previous page (reference_datetime sort only)
 
     Returns:
         Dictionary with notes list and pagination info
     """
     # Build WHERE clause with filters
     where_conditions = ["patient_key = :icn"]
-    params = {"icn": icn, "limit": limit, "offset": offset}
+    params = {"icn": icn}
 
     if note_class != 'all':
         where_conditions.append("document_class = :note_class")
@@ -281,7 +288,8 @@ def get_all_notes(
         where_conditions.append("status = :status")
         params["status"] = status
 
-    where_clause = " AND ".join(where_conditions)
+    filter_clause = " AND ".join(where_conditions)
+    filter_params = dict(params)
 
     # Build ORDER BY clause
     sort_column_map = {
@@ -293,6 +301,29 @@ def get_all_notes(
     sort_column = sort_column_map.get(sort_by, 'reference_datetime')
     order_direction = 'ASC' if sort_order == 'asc' else 'DESC'
 
+    # Keyset pagination on (reference_datetime, note_id) for date sort
+    keyset = sort_column == 'reference_datetime'
+    cursor_values = decode_cursor(cursor, size=3) if keyset else None
+    current_page = (offset // limit) + 1
+    if cursor_values:
+        comparator = '>' if order_direction == 'ASC' else '<'
+        where_conditions.append(
+            f"(reference_datetime, note_id) {comparator} "
+            f"(CAST(:cursor_datetime AS TIMESTAMP), :cursor_id)"
+        )
+        params["cursor_datetime"] = cursor_values[0]
+        params["cursor_id"] = cursor_values[1]
+        offset = 0
+        # Cursor pages follow page 1
+        page_number = cursor_values[2]
+        current_page = page_number if isinstance(page_number, int) and page_number > 1 else 2
+
+    where_clause = " AND ".join(where_conditions)
+
+    # Fetch one extra row to detect whether another page exists
+    params["limit"] = limit + 1
+    params["offset"] = offset
+
     # Query for notes with filters
     query = text(f"""
         SELECT
@@ -314,22 +345,15 @@ def get_all_notes(
             note_age_category
         FROM clinical.patient_clinical_notes
         WHERE {where_clause}
-        ORDER BY {sort_column} {order_direction}
+        ORDER BY {sort_column} {order_direction}, note_id {order_direction}
         LIMIT :limit OFFSET :offset
     """)
 
-    # Query for total count (without pagination)
-    count_query = text(f"""
-        SELECT COUNT(*)
-        FROM clinical.patient_clinical_notes
-        WHERE {where_clause}
-    """)
-
     try:
-        with engine.connect() as conn:
-            # Get total count for pagination
-            total_count = conn.execute(count_query, {k: v for k, v in params.items() if k not in ['limit', 'offset']}).scalar()
+        # Total count is cached per filter set until the next notes load
+        total_count = _count_notes(filter_clause, tuple(sorted(filter_params.items())))
 
+        with engine.connect() as conn:
             # Get notes page
             results = conn.execute(query, params).fetchall()
 
@@ -354,9 +378,15 @@ def get_all_notes(
                     "note_age_category": row[15]
                 })
 
+            has_more = len(notes) > limit
+            notes = notes[:limit]
+            next_cursor = None
+            if keyset and has_more:
+                last = notes[-1]
+                next_cursor = encode_cursor(last["reference_datetime"], last["note_id"], current_page + 1)
+
             # Calculate pagination info
             total_pages = (total_count + limit - 1) // limit if total_count > 0 else 1
-            current_page = (offset // limit) + 1
 
             result = {
                 "notes": notes,
@@ -365,8 +395,10 @@ def get_all_notes(
                     "total_pages": total_pages,
                     "current_page": current_page,
                     "per_page": limit,
-                    "has_next": current_page < total_pages,
-                    "has_prev": current_page > 1
+                    "has_next": has_more,
+                    "has_prev": current_page > 1,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor
                 }
             }
 
@@ -381,88 +413,138 @@ def get_all_notes(
         raise
 
 
-def get_note_detail(icn: str, note_id: int) -> Optional[Dict[str, Any]]:
+@cached_query("clinical_notes")
+def _count_notes(filter_clause: str, filter_params: tuple) -> int:
     """
-    Get full clinical note details including complete document text.
-    Used for expandable row display.
+    Count notes matching a filter set (total for pagination display).
+
+    Args:
+        filter_clause: SQL WHERE clause built by get_all_notes (no cursor condition)
+        filter_params: Bind parameters for the clause as a sorted tuple of items
+
+    Returns:
+        Number of matching notes
+    """
+    count_query = text(f"""
+        SELECT COUNT(*)
+        FROM clinical.patient_clinical_notes
+        WHERE {filter_clause}
+    """)
+
+    with engine.connect() as conn:
+        return conn.execute(count_query, dict(filter_params)).scalar()
+
+
+# Full note columns (including document_text), in _map_note_detail_row() order
+NOTE_DETAIL_COLUMNS_SQL = ",\n            ".join([
+    "note_id",
+    "tiu_document_sid",
+    "document_title",
+    "document_class",
+    "vha_standard_title",
+    "reference_datetime",
+    "entry_datetime",
+    "status",
+    "author_name",
+    "author_sid",
+    "cosigner_name",
+    "cosigner_sid",
+    "visit_sid",
+    "facility_name",
+    "sta3n",
+    "document_text",
+    "text_length",
+    "text_preview",
+    "days_since_note",
+    "note_age_category",
+    "tiu_document_ien",
+    "source_system",
+])
+
+
+def _map_note_detail_row(row) -> Dict[str, Any]:
+    """Map a NOTE_DETAIL_COLUMNS_SQL row to a note detail dict."""
+    return {
+        "note_id": row[0],
+        "tiu_document_sid": row[1],
+        "document_title": row[2],
+        "document_class": row[3],
+        "vha_standard_title": row[4],
+        "reference_datetime": str(row[5]) if row[5] else None,
+        "entry_datetime": str(row[6]) if row[6] else None,
+        "status": row[7],
+        "author_name": row[8],
+        "author_sid": row[9],
+        "cosigner_name": row[10],
+        "cosigner_sid": row[11],
+        "visit_sid": row[12],
+        "facility_name": row[13],
+        "sta3n": row[14],
+        "document_text": row[15],
+        "text_length": row[16],
+        "text_preview": row[17],
+        "days_since_note": row[18],
+        "note_age_category": row[19],
+        "tiu_document_ien": row[20],
+        "source_system": row[21],
+    }
+
+
+@cached_lookup("clinical_notes")
+def get_note_details(icn: str, note_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Get full clinical notes by ID, including complete document text.
+    One indexed query for all ids; used to prefetch the notes visible on
+    the notes page so expanding a row is a cache hit.
 
     Args:
         icn: Integrated Care Number (patient_key)
-        note_id: Note ID (primary key)
+        note_ids: Note IDs (primary keys)
 
     Returns:
-        Dictionary with complete note data, or None if not found
+        Dictionary keyed by note_id (unknown ids omitted)
     """
-    query = text("""
+    query = text(f"""
         SELECT
-            note_id,
-            tiu_document_sid,
-            document_title,
-            document_class,
-            vha_standard_title,
-            reference_datetime,
-            entry_datetime,
-            status,
-            author_name,
-            author_sid,
-            cosigner_name,
-            cosigner_sid,
-            visit_sid,
-            facility_name,
-            sta3n,
-            document_text,
-            text_length,
-            text_preview,
-            days_since_note,
-            note_age_category,
-            tiu_document_ien,
-            source_system
+            {NOTE_DETAIL_COLUMNS_SQL}
         FROM clinical.patient_clinical_notes
         WHERE patient_key = :icn
-          AND note_id = :note_id
+          AND note_id = ANY(:note_ids)
     """)
 
     try:
         with engine.connect() as conn:
-            result = conn.execute(query, {"icn": icn, "note_id": note_id}).fetchone()
-
-            if not result:
-                logger.warning(f"Note {note_id} not found for patient {icn}")
-                return None
-
-            note = {
-                "note_id": result[0],
-                "tiu_document_sid": result[1],
-                "document_title": result[2],
-                "document_class": result[3],
-                "vha_standard_title": result[4],
-                "reference_datetime": str(result[5]) if result[5] else None,
-                "entry_datetime": str(result[6]) if result[6] else None,
-                "status": result[7],
-                "author_name": result[8],
-                "author_sid": result[9],
-                "cosigner_name": result[10],
-                "cosigner_sid": result[11],
-                "visit_sid": result[12],
-                "facility_name": result[13],
-                "sta3n": result[14],
-                "document_text": result[15],
-                "text_length": result[16],
-                "text_preview": result[17],
-                "days_since_note": result[18],
-                "note_age_category": result[19],
-                "tiu_document_ien": result[20],
-                "source_system": result[21]
-            }
+            rows = conn.execute(query, {"icn": icn, "note_ids": list(note_ids)}).fetchall()
 
-            logger.info(f"Retrieved full note {note_id} for patient {icn}")
-            return note
+        logger.info(f"Retrieved {len(rows)} full notes for patient {icn}")
+        return {row[0]: _map_note_detail_row(row) for row in rows}
 
     except Exception as e:
-        logger.error(f"Error retrieving note {note_id} for {icn}: {e}")
+        logger.error(f"Error retrieving notes {list(note_ids)} for {icn}: {e}")
         raise
 
 
+def get_note_detail(icn: str, note_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get full clinical note details including complete document text.
+    Used for expandable row display.
+
+    Args:
+        icn: Integrated Care Number (patient_key)
+        note_id: Note ID (primary key)
+
+    Returns:
+        Dictionary with complete note data, or None if not found
+    """
+    note = get_note_details(icn, [note_id]).get(note_id)
+
+    if not note:
+        logger.warning(f"Note {note_id} not found for patient {icn}")
+        return None
+
+    return note
+
+
 def get_note_authors(icn: str) -> List[str]:
     """
     Get list of unique note authors for a patient.
@@ -494,3 +576,119 @@ def get_note_authors(icn: str) -> List[str]:
     except Exception as e:
         logger.error(f"Error retrieving authors for {icn}: {e}")
         raise
+
+
+# Sentinel markers for ts_headline; the snippet is HTML-escaped before
+# they are swapped for <mark> tags, so note text can never inject markup
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_STOP = "\x03"
+_HIGHLIGHT_PAIR = re.compile(f"{_HIGHLIGHT_START}([^{_HIGHLIGHT_START}{_HIGHLIGHT_STOP}]*){_HIGHLIGHT_STOP}")
+
+
+def _highlight_snippet(raw: Optional[str]) -> Optional[str]:
+    """Escape a ts_headline fragment and convert sentinel pairs to <mark> tags (stray sentinels are dropped)."""
+    if not raw:
+        return None
+    marked = _HIGHLIGHT_PAIR.sub(r"<mark>\1</mark>", html.escape(raw))
+    return marked.replace(_HIGHLIGHT_START, "").replace(_HIGHLIGHT_STOP, "")
+
+
+def search_notes(
+    icn: str,
+    query_text: str,
+    limit: int = 20,
+    note_class: str = 'all'
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search across a patient's clinical notes.
+    Uses the GIN-indexed search_vector column populated at ETL load time.
+
+    Accepts web-search syntax (e.g., CHF exacerbation, "last echo",
+    chest pain -trauma). Results are ranked by relevance (title matches
+    weigh more than narrative text), then by most recent note.
+
+    Args:
+        icn: Integrated Care Number (patient_key)
+        query_text: Search terms entered by the user
+        limit: Maximum number of results (default 20)
+        note_class: Optional document class filter ('all' for every class)
+
+    Returns:
+        List of note dictionaries with rank and highlighted snippet_html
+    """
+    if not query_text or not query_text.strip():
+        return []
+
+    where_conditions = ["patient_key = :icn", "search_vector @@ q.tsq"]
+    params = {"icn": icn, "query_text": query_text.strip(), "limit": limit}
+
+    if note_class != 'all':
+        where_conditions.append("document_class = :note_class")
+        params["note_class"] = note_class
+
+    where_clause = " AND ".join(where_conditions)
+
+    # Rank and limit in the inner query so ts_headline (which re-parses
+    # the full note text) only runs on the rows actually returned
+    query = text(f"""
+        SELECT
+            ranked.note_id,
+            ranked.document_title,
+            ranked.document_class,
+            ranked.reference_datetime,
+            ranked.status,
+            ranked.author_name,
+            ranked.facility_name,
+            ranked.rank,
+            ts_headline(
+                'english',
+                coalesce(ranked.document_text, ''),
+                ranked.tsq,
+                'StartSel=' || chr(2) || ', StopSel=' || chr(3) ||
+                ', MaxFragments=2, MaxWords=25, MinWords=8, FragmentDelimiter=" ... "'
+            ) AS snippet
+        FROM (
+            SELECT
+                n.note_id,
+                n.document_title,
+                n.document_class,
+                n.reference_datetime,
+                n.status,
+                n.author_name,
+                n.facility_name,
+                n.document_text,
+                q.tsq,
+                ts_rank_cd(n.search_vector, q.tsq) AS rank
+            FROM clinical.patient_clinical_notes n,
+                 websearch_to_tsquery('english', :query_text) AS q(tsq)
+            WHERE {where_clause}
+            ORDER BY rank DESC, n.reference_datetime DESC
+            LIMIT :limit
+        ) ranked
+        ORDER BY ranked.rank DESC, ranked.reference_datetime DESC
+    """)
+
+    try:
+        with engine.connect() as conn:
+            results = conn.execute(query, params).fetchall()
+
+            notes = []
+            for row in results:
+                notes.append({
+                    "note_id": row[0],
+                    "document_title": row[1],
+                    "document_class": row[2],
+                    "reference_datetime": str(row[3]) if row[3] else None,
+                    "status": row[4],
+                    "author_name": row[5],
+                    "facility_name": row[6],
+                    "rank": float(row[7]) if row[7] is not None else 0.0,
+                    "snippet_html": _highlight_snippet(row[8]),
+                })
+
+            logger.info(f"Notes search for patient {icn} ('{query_text}'): {len(notes)} matches")
+            return notes
+
+    except Exception as e:
+        logger.error(f"Error searching notes for {icn}: {e}")
+        raise
@@ -0,0 +1,87 @@
+# ---------------------------------------------------------------------
+# app/db/pagination.py
+# ---------------------------------------------------------------------
+# Keyset (Cursor) Pagination Helpers
+# Shared helpers for "load more" style pagination over per-patient
+# tables that are read newest-first.
+#  - Pages are keyed on the sort columns plus the primary key, e.g.
+#    (reference_datetime, note_id), instead of LIMIT/OFFSET, so page N
+#    costs the same as page 1 on the (patient_key, datetime DESC) indexes
+#  - Cursors are opaque URL-safe strings: base64 of the JSON key values
+#    of the last row on the previous page
+# ---------------------------------------------------------------------
+
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        *values: Sort column values followed by the row id (tiebreaker),
+                 e.g. encode_cursor("2024-12-01 09:30:00", 1234)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int = 2) -> Optional[List[Any]]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Args:
+        cursor: Cursor string from a previous page (may be None/empty)
+        size: Expected number of key values
+
+    Returns:
+        List of key values, or None if missing or malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size or None in values:
+            raise ValueError(f"expected {size} non-null key values")
+        return values
+    except Exception as e:
+        logger.warning(f"Ignoring invalid pagination cursor '{cursor}': {e}")
+        return None
+
+
+def build_page(
+    rows: List[Dict[str, Any]],
+    limit: int,
+    *keys: str
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trim a limit+1 result set to one page and compute the next cursor.
+
+    Queries fetch one extra row so we know whether another page exists
+    without running a COUNT(*).
+
+    Args:
+        rows: Rows fetched with LIMIT limit + 1
+        limit: Page size requested by the caller
+        *keys: Dict keys of the sort columns and id, in cursor order
+               (e.g., "reference_datetime", "note_id")
+
+    Returns:
+        (page_rows, next_cursor) - next_cursor is None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(*(last[k] for k in keys))
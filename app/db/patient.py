@@ -7,21 +7,19 @@
 # ---------------------------------------------------------------------
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.query_cache import cached_query
+from app.db.patient_search import typeahead_search
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,          # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
+@cached_query("patient")
 def get_patient_demographics(icn: str) -> Optional[Dict[str, Any]]:
     """
     Get patient demographics by ICN.
@@ -109,7 +107,12 @@ def search_patients(
     limit: int = 20
 ) -> List[Dict[str, Any]]:
     """
-    Search for patients.
+    Search for patients (patient picker typeahead).
+
+    Name searches match name prefixes in either order ("smith jo",
+    "john smith") and the last-initial + SSN last-4 format ("S1234"),
+    falling back to trigram similarity for typos. Results are ranked
+    exact > prefix > fuzzy. See app/db/patient_search.py.
 
     Args:
         query: Search query string
@@ -120,38 +123,8 @@ def search_patients(
         List of patient dictionaries
     """
     try:
-        if search_type == "name":
-            sql_query = text("""
-                SELECT
-                    icn,
-                    name_display,
-                    dob,
-                    age,
-                    sex,
-                    ssn_last4,
-                    primary_station
-                FROM clinical.patient_demographics
-                WHERE name_last ILIKE :query OR name_first ILIKE :query
-                ORDER BY name_last, name_first
-                LIMIT :limit
-            """)
-            params = {"query": f"%{query}%", "limit": limit}
-
-        elif search_type == "icn":
-            sql_query = text("""
-                SELECT
-                    icn,
-                    name_display,
-                    dob,
-                    age,
-                    sex,
-                    ssn_last4,
-                    primary_station
-                FROM clinical.patient_demographics
-                WHERE icn = :query
-                LIMIT :limit
-            """)
-            params = {"query": query, "limit": limit}
+        if search_type in ("name", "icn"):
+            return typeahead_search(query, search_type=search_type, limit=limit)
 
         elif search_type == "edipi":
             # EDIPI not yet implemented in database
@@ -163,22 +136,6 @@ def search_patients(
             logger.warning(f"Unknown search type: {search_type}")
             return []
 
-        with engine.connect() as conn:
-            results = conn.execute(sql_query, params).fetchall()
-
-            return [
-                {
-                    "icn": row[0],
-                    "name_display": row[1],
-                    "dob": str(row[2]) if row[2] else None,
-                    "age": row[3],
-                    "sex": row[4],
-                    "ssn_last4": row[5],
-                    "station": row[6],
-                }
-                for row in results
-            ]
-
     except Exception as e:
         logger.error(f"Error searching patients: {e}")
         return []
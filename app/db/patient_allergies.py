@@ -6,22 +6,20 @@
 # tables in PostgreSQL
 # ---------------------------------------------------------------------
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from typing import Optional, List, Dict, Any, Sequence
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.query_cache import cached_lookup, cached_query
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
+@cached_query("allergies")
 def get_patient_allergies(patient_icn: str) -> List[Dict[str, Any]]:
     """
     Get all allergies for a patient by ICN.
@@ -181,91 +179,116 @@ def get_critical_allergies(patient_icn: str, limit: int = 6) -> List[Dict[str, A
         return []
 
 
-def get_allergy_details(allergy_sid: int, patient_icn: str) -> Optional[Dict[str, Any]]:
+# Allergy detail columns, in _map_allergy_detail_row() order
+ALLERGY_DETAIL_COLUMNS_SQL = ",\n            ".join([
+    "allergy_sid",
+    "patient_key",
+    "allergen_local",
+    "allergen_standardized",
+    "allergen_type",
+    "severity",
+    "severity_rank",
+    "reactions",
+    "reaction_count",
+    "origination_date",
+    "observed_date",
+    "historical_or_observed",
+    "originating_site",
+    "originating_site_name",
+    "comment",
+    "verification_status",
+    "is_drug_allergy",
+    "is_active",
+    "originating_staff",
+    "source_system",
+    "last_updated",
+])
+
+
+def _map_allergy_detail_row(row) -> Dict[str, Any]:
+    """Map an ALLERGY_DETAIL_COLUMNS_SQL row to an allergy detail dict."""
+    return {
+        "allergy_sid": row[0],
+        "patient_key": row[1],
+        "allergen_local": row[2],
+        "allergen_standardized": row[3],
+        "allergen_name": row[3],  # Alias for PatientContextBuilder compatibility
+        "allergen_type": row[4],
+        "severity": row[5],
+        "severity_rank": row[6],
+        "reactions": row[7],
+        "reaction_count": row[8],
+        "origination_date": row[9].isoformat() if row[9] else None,
+        "observed_date": row[10].isoformat() if row[10] else None,
+        "historical_or_observed": row[11],
+        "originating_site": row[12],
+        "originating_site_name": row[13],
+        "comment": row[14],
+        "verification_status": row[15],
+        "is_drug_allergy": row[16],
+        "is_active": row[17],
+        "originating_staff": row[18],
+        "source_system": row[19],
+        "last_updated": row[20].isoformat() if row[20] else None,
+    }
+
+
+@cached_lookup("allergies")
+def get_allergy_details_batch(patient_icn: str, allergy_sids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
     """
-    Get detailed information for a specific allergy.
-
-    Includes full details including comment field (may be large).
+    Get detailed information for several allergies (one indexed query).
+    Used to prefetch the allergies visible on a list page.
 
     Args:
-        allergy_sid: Allergy SID (surrogate ID)
         patient_icn: Patient ICN (for security validation)
+        allergy_sids: Allergy SIDs
 
     Returns:
-        Allergy dictionary with all details, or None if not found
+        Dictionary keyed by allergy_sid (unknown SIDs omitted)
     """
-    query = text("""
+    query = text(f"""
         SELECT
-            allergy_sid,
-            patient_key,
-            allergen_local,
-            allergen_standardized,
-            allergen_type,
-            severity,
-            severity_rank,
-            reactions,
-            reaction_count,
-            origination_date,
-            observed_date,
-            historical_or_observed,
-            originating_site,
-            originating_site_name,
-            comment,
-            verification_status,
-            is_drug_allergy,
-            is_active,
-            originating_staff,
-            source_system,
-            last_updated
+            {ALLERGY_DETAIL_COLUMNS_SQL}
         FROM clinical.patient_allergies
-        WHERE allergy_sid = :allergy_sid
+        WHERE allergy_sid = ANY(:allergy_sids)
           AND patient_key = :patient_icn
     """)
 
     try:
         with engine.connect() as conn:
-            result = conn.execute(query, {
-                "allergy_sid": allergy_sid,
+            rows = conn.execute(query, {
+                "allergy_sids": list(allergy_sids),
                 "patient_icn": patient_icn
-            })
-            row = result.fetchone()
+            }).fetchall()
 
-            if not row:
-                logger.warning(f"Allergy {allergy_sid} not found for patient {patient_icn}")
-                return None
-
-            allergy = {
-                "allergy_sid": row[0],
-                "patient_key": row[1],
-                "allergen_local": row[2],
-                "allergen_standardized": row[3],
-                "allergen_name": row[3],  # Alias for PatientContextBuilder compatibility
-                "allergen_type": row[4],
-                "severity": row[5],
-                "severity_rank": row[6],
-                "reactions": row[7],
-                "reaction_count": row[8],
-                "origination_date": row[9].isoformat() if row[9] else None,
-                "observed_date": row[10].isoformat() if row[10] else None,
-                "historical_or_observed": row[11],
-                "originating_site": row[12],
-                "originating_site_name": row[13],
-                "comment": row[14],
-                "verification_status": row[15],
-                "is_drug_allergy": row[16],
-                "is_active": row[17],
-                "originating_staff": row[18],
-                "source_system": row[19],
-                "last_updated": row[20].isoformat() if row[20] else None,
-            }
-
-            logger.info(f"Retrieved allergy details for {allergy_sid}")
-            return allergy
+        return {row[0]: _map_allergy_detail_row(row) for row in rows}
 
     except Exception as e:
-        logger.error(f"Error fetching allergy details for SID {allergy_sid}: {e}")
+        logger.error(f"Error fetching allergy details for ICN {patient_icn}: {e}")
+        return {}
+
+
+def get_allergy_details(allergy_sid: int, patient_icn: str) -> Optional[Dict[str, Any]]:
+    """
+    Get detailed information for a specific allergy.
+
+    Includes full details including comment field (may be large).
+
+    Args:
+        allergy_sid: Allergy SID (surrogate ID)
+        patient_icn: Patient ICN (for security validation)
+
+    Returns:
+        Allergy dictionary with all details, or None if not found
+    """
+    allergy = get_allergy_details_batch(patient_icn, [allergy_sid]).get(allergy_sid)
+
+    if not allergy:
+        logger.warning(f"Allergy {allergy_sid} not found for patient {patient_icn}")
         return None
 
+    return allergy
+
 
 def get_allergy_count(patient_icn: str) -> Dict[str, int]:
     """
@@ -277,6 +300,10 @@ def get_allergy_count(patient_icn: str) -> Dict[str, int]:
     Returns:
         Dictionary with total, drug, food, environmental, and severe counts
     """
+    summary = get_summary_counts(patient_icn, "allergies")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             COUNT(*) as total,
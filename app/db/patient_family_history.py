@@ -8,19 +8,15 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
 import logging
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
 def get_patient_family_history(
@@ -237,6 +233,9 @@ def get_family_history_counts(icn: str) -> Dict[str, Any]:
     Returns:
         Dictionary with counts and recentness fields.
     """
+    summary = get_summary_counts(icn, "family_history")
+    if summary is not None:
+        return summary
 
     query = text("""
         SELECT
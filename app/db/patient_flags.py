@@ -7,19 +7,15 @@
 # ---------------------------------------------------------------------
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
 def get_patient_flags(patient_icn: str) -> List[Dict[str, Any]]:
@@ -108,6 +104,10 @@ def get_flag_count(patient_icn: str) -> Dict[str, int]:
     Returns:
         Dictionary with total, national, local, and overdue counts
     """
+    summary = get_summary_counts(patient_icn, "flags")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             COUNT(*) as total,
@@ -7,20 +7,16 @@
 # ---------------------------------------------------------------------
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 from datetime import datetime, timedelta
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
 
 
 def get_patient_immunizations(
@@ -186,6 +182,10 @@ def get_immunization_counts(icn: str) -> Dict[str, int]:
     Returns:
         Dictionary with counts by category
     """
+    summary = get_summary_counts(icn, "immunizations")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             COUNT(*) as total,
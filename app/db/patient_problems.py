@@ -5,20 +5,72 @@
 # Provides functions to query patient_problems table in PostgreSQL
 # ---------------------------------------------------------------------
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from typing import Optional, List, Dict, Any, Sequence
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import read_engine
+from app.db.query_cache import cached_lookup
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+
+# Problem columns, in _map_problem_row() order
+PROBLEM_COLUMNS_SQL = ",\n            ".join([
+    "problem_id",
+    "patient_key",
+    "patient_icn",
+    "icd10_code",
+    "icd10_description",
+    "icd10_category",
+    "snomed_code",
+    "snomed_description",
+    "diagnosis_description",
+    "problem_status",
+    "onset_date",
+    "recorded_date",
+    "last_modified_date",
+    "resolved_date",
+    "service_connected",
+    "acute_condition",
+    "chronic_condition",
+    "provider_name",
+    "clinic_location",
+    "icd10_charlson_condition",
+    "source_ehr",
+    "source_system",
+])
+
+
+def _map_problem_row(row) -> Dict[str, Any]:
+    """Map a PROBLEM_COLUMNS_SQL row to a problem dict."""
+    return {
+        "problem_id": row[0],
+        "patient_key": row[1],
+        "patient_icn": row[2],
+        "icd10_code": row[3],
+        "icd10_description": row[4],
+        "icd10_category": row[5],
+        "snomed_code": row[6],
+        "snomed_description": row[7],
+        "problem_text": row[8],  # diagnosis_description
+        "problem_status": row[9],
+        "onset_date": row[10].isoformat() if row[10] else None,
+        "recorded_date": row[11].isoformat() if row[11] else None,
+        "modified_date": row[12].isoformat() if row[12] else None,
+        "resolved_date": row[13].isoformat() if row[13] else None,
+        "service_connected": row[14],
+        "is_acute": row[15],
+        "is_chronic": row[16],
+        "provider_name": row[17],
+        "clinic_location": row[18],
+        "charlson_condition": row[19],
+        "source_ehr": row[20],
+        "source_system": row[21],
+    }
 
 
 def get_patient_problems(
@@ -62,28 +114,7 @@ def get_patient_problems(
 
     query = text(f"""
         SELECT
-            problem_id,
-            patient_key,
-            patient_icn,
-            icd10_code,
-            icd10_description,
-            icd10_category,
-            snomed_code,
-            snomed_description,
-            diagnosis_description,
-            problem_status,
-            onset_date,
-            recorded_date,
-            last_modified_date,
-            resolved_date,
-            service_connected,
-            acute_condition,
-            chronic_condition,
-            provider_name,
-            clinic_location,
-            icd10_charlson_condition,
-            source_ehr,
-            source_system
+            {PROBLEM_COLUMNS_SQL}
         FROM clinical.patient_problems
         WHERE {where_sql}
         ORDER BY
@@ -103,30 +134,7 @@ def get_patient_problems(
 
             problems = []
             for row in rows:
-                problems.append({
-                    "problem_id": row[0],
-                    "patient_key": row[1],
-                    "patient_icn": row[2],
-                    "icd10_code": row[3],
-                    "icd10_description": row[4],
-                    "icd10_category": row[5],
-                    "snomed_code": row[6],
-                    "snomed_description": row[7],
-                    "problem_text": row[8],  # diagnosis_description
-                    "problem_status": row[9],
-                    "onset_date": row[10].isoformat() if row[10] else None,
-                    "recorded_date": row[11].isoformat() if row[11] else None,
-                    "modified_date": row[12].isoformat() if row[12] else None,
-                    "resolved_date": row[13].isoformat() if row[13] else None,
-                    "service_connected": row[14],
-                    "is_acute": row[15],
-                    "is_chronic": row[16],
-                    "provider_name": row[17],
-                    "clinic_location": row[18],
-                    "charlson_condition": row[19],
-                    "source_ehr": row[20],
-                    "source_system": row[21],
-                })
+                problems.append(_map_problem_row(row))
 
             logger.info(f"Retrieved {len(problems)} problems for patient {patient_icn} (status={status}, category={category}, sc_only={service_connected_only})")
             return problems
@@ -136,6 +144,41 @@ def get_patient_problems(
         return []
 
 
+@cached_lookup("problems")
+def get_problem_details(patient_icn: str, problem_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Get specific problems by primary key (one indexed query).
+    Used for the problem detail modal and to prefetch visible list rows.
+
+    Args:
+        patient_icn: Patient ICN (for security validation)
+        problem_ids: Problem IDs (primary keys)
+
+    Returns:
+        Dictionary keyed by problem_id (unknown ids omitted)
+    """
+    query = text(f"""
+        SELECT
+            {PROBLEM_COLUMNS_SQL}
+        FROM clinical.patient_problems
+        WHERE problem_id = ANY(:problem_ids)
+          AND patient_key = :patient_icn
+    """)
+
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(query, {
+                "problem_ids": list(problem_ids),
+                "patient_icn": patient_icn
+            }).fetchall()
+
+        return {row[0]: _map_problem_row(row) for row in rows}
+
+    except Exception as e:
+        logger.error(f"Error fetching problem details for ICN {patient_icn}: {e}")
+        return {}
+
+
 def get_problems_summary(patient_icn: str, limit: int = 8) -> Dict[str, Any]:
     """
     Get problems summary for dashboard widget display.
@@ -412,6 +455,10 @@ def get_chronic_conditions_summary(patient_icn: str) -> Dict[str, bool]:
     Returns:
         Dictionary mapping condition name to boolean
     """
+    summary = get_summary_counts(patient_icn, "problems")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             BOOL_OR(has_chf) as has_chf,
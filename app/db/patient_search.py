@@ -0,0 +1,323 @@
+# ---------------------------------------------------------------------
+# app/db/patient_search.py
+# ---------------------------------------------------------------------
+# Patient Search (Typeahead) Subsystem
+# Backs search_patients() in app/db/patient.py with two tiers:
+#  1. In-memory prefix index over normalized names, ICN and the
+#     last-initial + SSN last-4 lookup (VistA style, e.g. "S1234"),
+#     rebuilt when the "patient" serving data version changes
+#  2. PostgreSQL fallback using the prefix (text_pattern_ops) and
+#     pg_trgm GIN expression indexes created by the patient load step
+# Results are ranked: exact > prefix > fuzzy (trigram), then by name.
+# ---------------------------------------------------------------------
+# Index DDL: db/ddl/patient_demographics.sql (and etl/load_postgres_patient.py)
+# ---------------------------------------------------------------------
+
+import bisect
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from config import PATIENT_SEARCH_CONFIG
+from app.db.engines import read_engine
+from app.db.query_cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+# Rank buckets (lower is better)
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_FUZZY = 2
+
+# "S1234" style lookup: last-name initial + last four of SSN
+_INITIAL_LAST4 = re.compile(r"^([a-z])(\d{4})$")
+
+
+def _normalized_sql(expression: str) -> str:
+    """SQL equivalent of normalize_name() (lowercase, punctuation runs to one space, trimmed)."""
+    return f"btrim(regexp_replace(lower({expression}), '[^a-z0-9]+', ' ', 'g'))"
+
+
+# Must match the indexed expressions in patient_demographics.sql (and
+# etl/load_postgres_patient.py); normalized like the in-memory index keys
+_NAME_KEY_SQL = _normalized_sql("name_last || ' ' || coalesce(name_first, '')")
+_NAME_KEY_REVERSED_SQL = _normalized_sql("coalesce(name_first, '') || ' ' || name_last")
+_LAST_NAME_KEY_SQL = _normalized_sql("name_last")
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Normalize a name or query: lowercase, punctuation to spaces, single-spaced."""
+    if not value:
+        return ""
+    cleaned = re.sub(r"[^a-z0-9 ]+", " ", value.lower())
+    return " ".join(cleaned.split())
+
+
+def _row_to_patient(row) -> Dict[str, Any]:
+    """Map a search result row to the search_patients() dict shape."""
+    return {
+        "icn": row[0],
+        "name_display": row[1],
+        "dob": str(row[2]) if row[2] else None,
+        "age": row[3],
+        "sex": row[4],
+        "ssn_last4": row[5],
+        "station": row[6],
+    }
+
+
+class PatientPrefixIndex:
+    """
+    Sorted-key prefix index over all patients, for keystroke-level typeahead.
+
+    Each patient contributes several normalized keys ("smith john",
+    "john smith", icn, "s1234"). A prefix query is a bisect into the sorted
+    key list followed by a short forward scan.
+    """
+
+    def __init__(self, max_patients: int = 500000):
+        self.max_patients = max_patients
+        self._keys: List[Tuple[str, int]] = []
+        self._patients: List[Dict[str, Any]] = []
+        self._sort_names: List[Tuple[str, str]] = []
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._too_large = False
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._keys) and not self._too_large
+
+    def build(self, rows: List[tuple], version: Optional[int]) -> None:
+        """Build the index from (icn, name_display, dob, age, sex, ssn_last4, station, name_last, name_first) rows."""
+        keys: List[Tuple[str, int]] = []
+        patients: List[Dict[str, Any]] = []
+        sort_names: List[Tuple[str, str]] = []
+
+        for idx, row in enumerate(rows):
+            patients.append(_row_to_patient(row))
+            last = normalize_name(row[7])
+            first = normalize_name(row[8])
+            sort_names.append((last, first))
+
+            keys.append((f"{last} {first}".strip(), idx))
+            if first:
+                keys.append((f"{first} {last}".strip(), idx))
+            if row[0]:
+                keys.append((row[0].lower(), idx))
+            if last and row[5]:
+                keys.append((f"{last[0]}{row[5]}", idx))
+
+        keys.sort()
+
+        with self._lock:
+            self._keys = keys
+            self._patients = patients
+            self._sort_names = sort_names
+            self._version = version
+            self._too_large = False
+
+        logger.info(f"Patient search index built: {len(patients)} patients, {len(keys)} keys (version {version})")
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Prefix search; returns ranked patient dicts."""
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+
+        with self._lock:
+            keys = self._keys
+            patients = self._patients
+            sort_names = self._sort_names
+
+        best: Dict[int, int] = {}
+        pos = bisect.bisect_left(keys, (prefix,))
+        # Scan enough matching keys to rank, without walking a huge range
+        scan_cap = max(limit * 20, 200)
+        while pos < len(keys) and len(best) < scan_cap:
+            key, idx = keys[pos]
+            if not key.startswith(prefix):
+                break
+            rank = RANK_EXACT if key == prefix or key.split(" ")[0] == prefix else RANK_PREFIX
+            if rank < best.get(idx, RANK_FUZZY + 1):
+                best[idx] = rank
+            pos += 1
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], sort_names[item[0]]))
+        return [dict(patients[idx]) for idx, _ in ranked[:limit]]
+
+    def is_current(self, version: Optional[int]) -> bool:
+        return self.ready and self._version == version
+
+    def is_too_large(self, version: Optional[int]) -> bool:
+        return self._too_large and self._version == version
+
+    def mark_too_large(self, version: Optional[int]) -> None:
+        with self._lock:
+            self._keys = []
+            self._patients = []
+            self._sort_names = []
+            self._version = version
+            self._too_large = True
+
+
+# Process-wide index instance
+patient_index = PatientPrefixIndex(max_patients=PATIENT_SEARCH_CONFIG["index_max_patients"])
+_rebuild_lock = threading.Lock()
+
+
+def _load_index_rows() -> Optional[List[tuple]]:
+    """Read all patients for the in-memory index (None if over the size cap)."""
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM clinical.patient_demographics")).scalar()
+        if total > patient_index.max_patients:
+            return None
+        return conn.execute(text("""
+            SELECT icn, name_display, dob, age, sex, ssn_last4, primary_station, name_last, name_first
+            FROM clinical.patient_demographics
+        """)).fetchall()
+
+
+def get_patient_index() -> Optional[PatientPrefixIndex]:
+    """
+    Return the in-memory index if enabled and current, rebuilding it after
+    a patient load. Returns None when the SQL path should be used.
+    """
+    if not PATIENT_SEARCH_CONFIG["index_enabled"]:
+        return None
+
+    versions = query_cache.get_versions()
+    if versions is None:
+        return None
+
+    version = versions.get("patient", 0)
+    if patient_index.is_current(version):
+        return patient_index
+    if patient_index.is_too_large(version):
+        return None
+
+    # One thread rebuilds; others keep using SQL until it is ready
+    if not _rebuild_lock.acquire(blocking=False):
+        return patient_index if patient_index.ready else None
+    try:
+        if not patient_index.is_current(version):
+            rows = _load_index_rows()
+            if rows is None:
+                logger.info("Patient search index disabled: patient count exceeds index_max_patients")
+                patient_index.mark_too_large(version)
+                return None
+            patient_index.build(rows, version)
+        return patient_index
+    except Exception as e:
+        logger.warning(f"Patient search index unavailable, using SQL search: {e}")
+        return None
+    finally:
+        _rebuild_lock.release()
+
+
+def search_patients_by_name_sql(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Ranked name search in PostgreSQL.
+
+    Prefix matches use the text_pattern_ops expression indexes; fuzzy
+    matches (typos, partial fragments) use the pg_trgm GIN index.
+    """
+    normalized = normalize_name(query)
+    if not normalized:
+        return []
+
+    sql_query = text(f"""
+        SELECT
+            icn,
+            name_display,
+            dob,
+            age,
+            sex,
+            ssn_last4,
+            primary_station,
+            CASE
+                WHEN {_NAME_KEY_SQL} = :q OR {_LAST_NAME_KEY_SQL} = :q THEN {RANK_EXACT}
+                WHEN {_NAME_KEY_SQL} LIKE :prefix OR {_NAME_KEY_REVERSED_SQL} LIKE :prefix THEN {RANK_PREFIX}
+                ELSE {RANK_FUZZY}
+            END AS match_rank,
+            similarity({_NAME_KEY_SQL}, :q) AS score
+        FROM clinical.patient_demographics
+        WHERE {_NAME_KEY_SQL} LIKE :prefix
+           OR {_NAME_KEY_REVERSED_SQL} LIKE :prefix
+           OR {_NAME_KEY_SQL} % :q
+        ORDER BY match_rank, score DESC, name_last, name_first
+        LIMIT :limit
+    """)
+    params = {"q": normalized, "prefix": f"{normalized}%", "limit": limit}
+
+    with engine.connect() as conn:
+        return [_row_to_patient(row) for row in conn.execute(sql_query, params).fetchall()]
+
+
+def search_patients_by_initial_last4_sql(initial: str, last4: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """Last-initial + SSN last-4 lookup (e.g., "S1234") using the ssn_last4 index."""
+    sql_query = text("""
+        SELECT icn, name_display, dob, age, sex, ssn_last4, primary_station
+        FROM clinical.patient_demographics
+        WHERE ssn_last4 = :last4
+          AND lower(left(name_last, 1)) = :initial
+        ORDER BY name_last, name_first
+        LIMIT :limit
+    """)
+
+    with engine.connect() as conn:
+        rows = conn.execute(sql_query, {"last4": last4, "initial": initial, "limit": limit}).fetchall()
+        return [_row_to_patient(row) for row in rows]
+
+
+def search_patients_by_icn_sql(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """ICN prefix search using the icn varchar_pattern_ops index."""
+    sql_query = text("""
+        SELECT icn, name_display, dob, age, sex, ssn_last4, primary_station
+        FROM clinical.patient_demographics
+        WHERE icn LIKE :prefix
+        ORDER BY icn
+        LIMIT :limit
+    """)
+
+    with engine.connect() as conn:
+        rows = conn.execute(sql_query, {"prefix": f"{query.strip().upper()}%", "limit": limit}).fetchall()
+        return [_row_to_patient(row) for row in rows]
+
+
+def typeahead_search(query: str, search_type: str = "name", limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Search patients for the patient picker.
+
+    Args:
+        query: Text typed so far
+        search_type: 'name' (names and "S1234" lookups) or 'icn' (ICN prefix)
+        limit: Maximum number of results
+
+    Returns:
+        Ranked list of patient dictionaries
+    """
+    normalized = normalize_name(query)
+    if not normalized:
+        return []
+
+    index = get_patient_index()
+    if index is not None:
+        if search_type == "icn":
+            results = index.search(normalized, limit=limit * 5)
+            return [p for p in results if (p["icn"] or "").lower().startswith(normalized)][:limit]
+        return index.search(normalized, limit=limit)
+
+    if search_type == "icn":
+        return search_patients_by_icn_sql(query, limit=limit)
+
+    match = _INITIAL_LAST4.match(normalized)
+    if match:
+        return search_patients_by_initial_last4_sql(match.group(1), match.group(2), limit=limit)
+
+    return search_patients_by_name_sql(query, limit=limit)
@@ -0,0 +1,164 @@
+# ---------------------------------------------------------------------
+# app/db/patient_summary.py
+# ---------------------------------------------------------------------
+# Precomputed Patient Summary (Widget Counts)
+# Single primary-key lookup into clinical.patient_summary, used by the
+# *_counts / *_summary functions behind dashboard widgets and badges.
+#  - Columns are rebuilt per domain by the ETL load step
+#    (etl/patient_summary.py); task columns are trigger-maintained
+#  - A domain's columns are only used once its
+#    "patient_summary_<domain>" serving version exists; otherwise (and
+#    on any error) callers fall back to their live aggregate query
+# ---------------------------------------------------------------------
+# Table DDL: db/ddl/create_patient_summary_table.sql
+# ---------------------------------------------------------------------
+
+import logging
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from app.db.engines import primary_engine, read_engine
+from app.db.query_cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+CHRONIC_CONDITIONS = (
+    "has_chf", "has_cad", "has_afib", "has_hypertension", "has_copd",
+    "has_asthma", "has_diabetes", "has_hyperlipidemia", "has_ckd",
+    "has_depression", "has_ptsd", "has_anxiety", "has_cancer",
+    "has_osteoarthritis", "has_back_pain",
+)
+
+
+def summary_domain_ready(domain: str) -> bool:
+    """True once the ETL has built the summary columns for a domain."""
+    versions = query_cache.get_versions()
+    return bool(versions and versions.get(f"patient_summary_{domain}"))
+
+
+def _fetch_summary_row(icn: str, source=None) -> Optional[Dict[str, Any]]:
+    """Primary-key lookup of one patient's summary row (None if absent)."""
+    query = text("""
+        SELECT *, CURRENT_DATE AS today
+        FROM clinical.patient_summary
+        WHERE patient_key = :icn
+    """)
+
+    with (source or engine).connect() as conn:
+        row = conn.execute(query, {"icn": icn}).mappings().fetchone()
+        return dict(row) if row else None
+
+
+def map_summary_domain(row: Optional[Dict[str, Any]], domain: str) -> Any:
+    """
+    Shape one domain's summary columns like the matching live query.
+
+    A missing row means the patient has no data in any summarized domain,
+    so every count is zero.
+    """
+    row = row or {}
+
+    def count(column: str) -> int:
+        return int(row.get(column) or 0)
+
+    if domain == "labs":
+        panels = row.get("lab_panel_counts") or {}
+        return dict(sorted(panels.items(), key=lambda item: item[1], reverse=True))
+
+    if domain == "encounters":
+        return {
+            "total_encounters": count("encounter_total"),
+            "active_admissions": count("encounter_active_admissions"),
+            "recent_encounters": count("encounter_recent"),
+            "extended_stays": count("encounter_extended_stays"),
+            "facility_count": count("encounter_facility_count"),
+        }
+
+    if domain == "immunizations":
+        return {
+            "total": count("immunization_total"),
+            "annual": count("immunization_annual"),
+            "covid": count("immunization_covid"),
+            "incomplete": count("immunization_incomplete"),
+            "with_reactions": count("immunization_with_reactions"),
+            "recent_2y": count("immunization_recent_2y"),
+        }
+
+    if domain == "family_history":
+        last_recorded = row.get("family_history_last_recorded")
+        return {
+            "total": count("family_history_total"),
+            "active": count("family_history_active"),
+            "first_degree": count("family_history_first_degree"),
+            "first_degree_high_risk": count("family_history_first_degree_high_risk"),
+            "distinct_conditions": count("family_history_distinct_conditions"),
+            "recent_2y": count("family_history_recent_2y"),
+            "last_recorded_datetime": last_recorded.isoformat() if last_recorded else None,
+        }
+
+    if domain == "allergies":
+        return {
+            "total": count("allergy_total"),
+            "drug": count("allergy_drug"),
+            "food": count("allergy_food"),
+            "environmental": count("allergy_environmental"),
+            "severe": count("allergy_severe"),
+        }
+
+    if domain == "flags":
+        return {
+            "total": count("flag_total"),
+            "national": count("flag_national"),
+            "local": count("flag_local"),
+            "overdue": count("flag_overdue"),
+        }
+
+    if domain == "tasks":
+        # completed_today is only meaningful on the day it was computed;
+        # any completion since then would have re-run the trigger
+        today = row.get("today") or date.today()
+        completed_today = count("task_completed_today") if row.get("task_summary_date") == today else 0
+        return {
+            "todo_count": count("task_todo"),
+            "in_progress_count": count("task_in_progress"),
+            "completed_today_count": completed_today,
+            "ai_generated_count": count("task_ai_generated_active"),
+        }
+
+    if domain == "problems":
+        return {name: bool(row.get(name)) for name in CHRONIC_CONDITIONS}
+
+    raise ValueError(f"Unknown patient summary domain '{domain}'")
+
+
+def get_summary_counts(icn: str, domain: str) -> Optional[Any]:
+    """
+    Get one domain's precomputed counts for a patient.
+
+    Args:
+        icn: Integrated Care Number
+        domain: Summary domain ("labs", "encounters", "immunizations",
+                "family_history", "allergies", "flags", "tasks", "problems")
+
+    Returns:
+        Counts shaped like the domain's live *_counts function, or None
+        if the summary is not built or unavailable (caller should fall
+        back to its aggregate query)
+    """
+    if not summary_domain_ready(domain):
+        return None
+
+    # Task columns change with every task write (trigger-maintained), so
+    # they are read from the primary to show the user's own changes
+    source = primary_engine if domain == "tasks" else engine
+
+    try:
+        return map_summary_domain(_fetch_summary_row(icn, source), domain)
+
+    except Exception as e:
+        logger.warning(f"Patient summary unavailable for ICN {icn} ({domain}), using live counts: {e}")
+        return None
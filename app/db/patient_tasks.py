@@ -6,19 +6,25 @@
 # ---------------------------------------------------------------------
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from app.db.engines import primary_engine
+from app.db.pagination import decode_cursor
+from app.db.patient_summary import get_summary_counts
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Writes and read-after-write paths always use the primary
+engine = primary_engine
+
+# Priority sort order (HIGH > MEDIUM > LOW), shared by ORDER BY and keyset cursors
+PRIORITY_RANK = {"HIGH": 1, "MEDIUM": 2, "LOW": 3}
+PRIORITY_RANK_SQL = """
+            CASE priority
+                WHEN 'HIGH' THEN 1
+                WHEN 'MEDIUM' THEN 2
+                WHEN 'LOW' THEN 3
+            END"""
 
 
 def get_patient_tasks(
@@ -26,7 +32,8 @@ def get_patient_tasks(
     status: Optional[str] = None,
     created_by_user_id: Optional[str] = None,
     priority: Optional[str] = None,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Get all tasks for a patient by ICN with optional filtering.
@@ -35,12 +42,17 @@ def get_patient_tasks(
     1. Priority (HIGH > MEDIUM > LOW)
     2. Most recent created_at first
 
+    Results can be paged with a keyset cursor on (priority, created_at,
+    task_id); see app.db.pagination.build_page() for producing the next
+    cursor.
+
     Args:
         patient_icn: Patient ICN (Integrated Care Number)
         status: Filter by status ('active' for TODO+IN_PROGRESS, 'TODO', 'IN_PROGRESS', 'COMPLETED', or None for all)
         created_by_user_id: Filter by creator user_id (UUID string or None for all)
         priority: Filter by priority ('HIGH', 'MEDIUM', 'LOW', or None for all)
         limit: Maximum number of tasks to return (None for all)
+        cursor: Keyset cursor from a previous page
 
     Returns:
         List of task dictionaries with all task details
@@ -65,10 +77,25 @@ def get_patient_tasks(
         where_clauses.append("priority = :priority")
         params["priority"] = priority
 
+    # Keyset pagination: priority rank ascending, then (created_at, task_id) descending
+    cursor_values = decode_cursor(cursor, size=3)
+    if cursor_values and cursor_values[0] in PRIORITY_RANK:
+        where_clauses.append(f"""
+            ({PRIORITY_RANK_SQL} > :cursor_rank
+             OR ({PRIORITY_RANK_SQL} = :cursor_rank
+                 AND (created_at, task_id) < (CAST(:cursor_created_at AS TIMESTAMPTZ), :cursor_id)))
+        """)
+        params["cursor_rank"] = PRIORITY_RANK[cursor_values[0]]
+        params["cursor_created_at"] = cursor_values[1]
+        params["cursor_id"] = cursor_values[2]
+
     where_sql = " AND ".join(where_clauses)
 
     # Build LIMIT clause
-    limit_sql = f"LIMIT {limit}" if limit else ""
+    limit_sql = ""
+    if limit:
+        limit_sql = "LIMIT :limit"
+        params["limit"] = int(limit)
 
     query = text(f"""
         SELECT
@@ -89,13 +116,9 @@ def get_patient_tasks(
             completed_at
         FROM clinical.patient_tasks
         WHERE {where_sql}
-        ORDER BY
-            CASE priority
-                WHEN 'HIGH' THEN 1
-                WHEN 'MEDIUM' THEN 2
-                WHEN 'LOW' THEN 3
-            END,
-            created_at DESC
+        ORDER BY {PRIORITY_RANK_SQL},
+            created_at DESC,
+            task_id DESC
         {limit_sql}
     """)
 
@@ -473,6 +496,10 @@ def get_task_summary(patient_icn: str) -> Dict[str, int]:
         - completed_today_count: Number of tasks completed today
         - ai_generated_count: Number of active AI-generated tasks
     """
+    summary = get_summary_counts(patient_icn, "tasks")
+    if summary is not None:
+        return summary
+
     query = text("""
         SELECT
             COUNT(*) FILTER (WHERE status = 'TODO') AS todo_count,
@@ -516,6 +543,37 @@ def get_task_summary(patient_icn: str) -> Dict[str, int]:
         }
 
 
+def get_task_write_stamp(patient_icn: str) -> Optional[str]:
+    """
+    Get a stamp that changes whenever a patient's tasks are written.
+
+    Used by conditional GET (ETag) handling for task endpoints and the
+    tasks widget. Creates and edits move MAX(updated_at) (trigger
+    maintained); deletes change the row count.
+
+    Args:
+        patient_icn: Patient ICN
+
+    Returns:
+        Stamp string (e.g., "3:2026-01-19T14:05:11.123456+00:00"), or
+        None on error (caller should skip caching)
+    """
+    query = text("""
+        SELECT COUNT(*), MAX(updated_at)
+        FROM clinical.patient_tasks
+        WHERE patient_key = :patient_icn
+    """)
+
+    try:
+        with engine.connect() as conn:
+            count, last_updated = conn.execute(query, {"patient_icn": patient_icn}).fetchone()
+            return f"{count}:{last_updated.isoformat() if last_updated else ''}"
+
+    except Exception as e:
+        logger.error(f"Error fetching task write stamp for patient {patient_icn}: {e}")
+        return None
+
+
 def get_tasks_by_user(
     user_id: str,
     status: Optional[str] = None,
@@ -545,7 +603,11 @@ def get_tasks_by_user(
             params["status"] = status
 
     where_sql = " AND ".join(where_clauses)
-    limit_sql = f"LIMIT {limit}" if limit else ""
+
+    limit_sql = ""
+    if limit:
+        limit_sql = "LIMIT :limit"
+        params["limit"] = int(limit)
 
     query = text(f"""
         SELECT
@@ -566,13 +628,9 @@ def get_tasks_by_user(
             completed_at
         FROM clinical.patient_tasks
         WHERE {where_sql}
-        ORDER BY
-            CASE priority
-                WHEN 'HIGH' THEN 1
-                WHEN 'MEDIUM' THEN 2
-                WHEN 'LOW' THEN 3
-            END,
-            created_at DESC
+        ORDER BY {PRIORITY_RANK_SQL},
+            created_at DESC,
+            task_id DESC
         {limit_sql}
     """)
 
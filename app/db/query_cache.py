@@ -0,0 +1,366 @@
+# ---------------------------------------------------------------------
+# app/db/query_cache.py
+# ---------------------------------------------------------------------
+# Read-Through Query Result Cache
+# In-process LRU cache for per-patient PostgreSQL query results.
+#  - Entries are keyed by (function, args, serving-data version)
+#  - Versions come from clinical.serving_data_version, which each
+#    etl/load_*.py script bumps after reloading its table
+#  - Historical (T-1) data is therefore served from memory until the
+#    next ETL load, after which the affected domain is invalidated
+#  - Bounded by entry count and approximate result size (bytes)
+# ---------------------------------------------------------------------
+# Usage:
+#   from app.db.query_cache import cached_query
+#
+#   @cached_query("vitals")
+#   def get_recent_vitals(icn: str) -> Dict[str, Any]:
+#       ...
+#
+#   @cached_lookup("problems")
+#   def get_problem_details(icn: str, problem_ids: Sequence[int]) -> Dict[int, Dict]:
+#       ...  # one query for the ids not already cached
+# ---------------------------------------------------------------------
+
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from sqlalchemy import text
+from config import QUERY_CACHE_CONFIG
+from app.db.engines import read_engine
+
+logger = logging.getLogger(__name__)
+
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate in-memory size (bytes) of a query result."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _estimate_size(k) + _estimate_size(v)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += _estimate_size(item)
+    return size
+
+
+def _copy_result(value: Any) -> Any:
+    """
+    Copy the container structure of a cached result.
+
+    Callers (e.g., the real-time overlay merge) annotate the row dicts
+    they receive, so every caller gets its own dicts and lists. Leaf
+    values (str, int, float, None) are immutable and shared.
+    """
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    return value
+
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache of query results, invalidated by domain version.
+
+    Sync route handlers run in the FastAPI threadpool, so all access to
+    the entry table is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        max_bytes: int = 64 * 1024 * 1024,
+        version_check_seconds: float = 30.0,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version_check_seconds = version_check_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[tuple, Tuple[Any, int, Tuple[str, ...]]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self._versions: Optional[Dict[str, int]] = None
+        self._versions_checked_at = 0.0
+        self._loaded_at: Dict[str, datetime] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    # -----------------------------------------------------------------
+    # Serving-data versions
+    # -----------------------------------------------------------------
+
+    def _load_versions(self) -> Optional[Dict[str, int]]:
+        """Read current domain versions from PostgreSQL (None if unavailable)."""
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    text("SELECT domain, version, loaded_at FROM clinical.serving_data_version")
+                ).fetchall()
+            self._loaded_at = {row[0]: row[2] for row in rows if row[2] is not None}
+            return {row[0]: int(row[1]) for row in rows}
+        except Exception as e:
+            logger.warning(f"Query cache bypassed, serving data versions unavailable: {e}")
+            return None
+
+    def get_versions(self) -> Optional[Dict[str, int]]:
+        """
+        Return current domain versions, re-reading at most every
+        version_check_seconds. Domains whose version changed are purged.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._versions_checked_at < self.version_check_seconds:
+                return self._versions
+
+        versions = self._load_versions()
+
+        with self._lock:
+            previous = self._versions
+            self._versions = versions
+            self._versions_checked_at = now
+
+            if versions is None:
+                self._clear_locked()
+            elif previous is not None:
+                changed = {
+                    d for d in set(previous) | set(versions)
+                    if previous.get(d) != versions.get(d)
+                }
+                if changed:
+                    logger.info(f"Serving data reloaded for {sorted(changed)}, invalidating cached results")
+                    self._purge_domains_locked(changed)
+
+        return versions
+
+    def last_loaded_at(self, domains: Iterable[str]) -> Optional[datetime]:
+        """Most recent ETL load time across domains (None if unknown)."""
+        loaded = [self._loaded_at[d] for d in domains if d in self._loaded_at]
+        return max(loaded) if loaded else None
+
+    # -----------------------------------------------------------------
+    # Entry management (caller holds self._lock)
+    # -----------------------------------------------------------------
+
+    def _remove_locked(self, key: tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _purge_domains_locked(self, domains: set) -> None:
+        stale = [k for k, (_, _, d) in self._entries.items() if domains.intersection(d)]
+        for key in stale:
+            self._remove_locked(key)
+
+    def _clear_locked(self) -> None:
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def _evict_locked(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove_locked(oldest)
+            self.evictions += 1
+
+    # -----------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------
+
+    def get(self, key: tuple) -> Tuple[bool, Any]:
+        """Return (found, value-copy) for a cache key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[0]
+        return True, _copy_result(value)
+
+    def record_bypass(self) -> None:
+        """Count a lookup that skipped the cache (no versions or unhashable key)."""
+        with self._lock:
+            self.bypasses += 1
+
+    def put(self, key: tuple, value: Any, domains: Tuple[str, ...]) -> None:
+        """Store a copy of a query result under the given key."""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        stored = _copy_result(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (stored, size, domains)
+            self._total_bytes += size
+            self._evict_locked()
+
+    def clear(self) -> None:
+        """Drop all cached results and force a version re-check."""
+        with self._lock:
+            self._clear_locked()
+            self._versions = None
+            self._versions_checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring/debugging."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bypasses": self.bypasses,
+                "versions": dict(self._versions) if self._versions else {},
+            }
+
+
+# Process-wide cache instance
+query_cache = QueryResultCache(
+    max_entries=QUERY_CACHE_CONFIG["max_entries"],
+    max_bytes=QUERY_CACHE_CONFIG["max_bytes"],
+    version_check_seconds=QUERY_CACHE_CONFIG["version_check_seconds"],
+    enabled=QUERY_CACHE_CONFIG["enabled"],
+)
+
+
+def cached_query(domains: Union[str, Tuple[str, ...]]) -> Callable:
+    """
+    Decorator: read-through cache for a query function.
+
+    Args:
+        domains: Serving domain (or tuple of domains) the query reads from.
+                 A version bump for any of them invalidates the result.
+
+    Empty results ([], {}, None) are not cached, since the query layer
+    also returns those on database errors.
+    """
+    if isinstance(domains, str):
+        domains = (domains,)
+
+    def decorator(func: Callable) -> Callable:
+        func_key = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not query_cache.enabled:
+                return func(*args, **kwargs)
+
+            versions = query_cache.get_versions()
+            if versions is None:
+                query_cache.record_bypass()
+                return func(*args, **kwargs)
+
+            key = (
+                func_key,
+                args,
+                tuple(sorted(kwargs.items())),
+                tuple(versions.get(d, 0) for d in domains),
+            )
+            try:
+                hash(key)
+            except TypeError:
+                query_cache.record_bypass()
+                return func(*args, **kwargs)
+
+            found, value = query_cache.get(key)
+            if found:
+                return value
+
+            result = func(*args, **kwargs)
+            if result:
+                query_cache.put(key, result, domains)
+            return result
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def cached_lookup(domains: Union[str, Tuple[str, ...]]) -> Callable:
+    """
+    Decorator: per-row read-through cache for batched point lookups.
+
+    The wrapped function takes (icn, ids) and returns {id: row} for the
+    ids it found. Each row is cached on its own, so prefetching the rows
+    visible on a list page in one query makes each later single-row
+    lookup (e.g., opening a detail modal) a cache hit. Only ids missing
+    from the cache are passed to the wrapped function.
+
+    Args:
+        domains: Serving domain (or tuple of domains) the lookup reads from
+    """
+    if isinstance(domains, str):
+        domains = (domains,)
+
+    def decorator(func: Callable) -> Callable:
+        func_key = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(icn: str, ids: Iterable[Any]) -> Dict[Any, Any]:
+            ids = list(dict.fromkeys(ids))
+            if not ids:
+                return {}
+            if not query_cache.enabled:
+                return func(icn, ids)
+
+            versions = query_cache.get_versions()
+            if versions is None:
+                query_cache.record_bypass()
+                return func(icn, ids)
+
+            version_key = tuple(versions.get(d, 0) for d in domains)
+            rows: Dict[Any, Any] = {}
+            missing = []
+            for row_id in ids:
+                found, value = query_cache.get((func_key, icn, row_id, version_key))
+                if found:
+                    rows[row_id] = value
+                else:
+                    missing.append(row_id)
+
+            if missing:
+                fetched = func(icn, missing)
+                for row_id, row in fetched.items():
+                    query_cache.put((func_key, icn, row_id, version_key), row, domains)
+                rows.update(fetched)
+
+            return rows
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return query cache statistics."""
+    return query_cache.stats()
+
+
+def clear_query_cache() -> None:
+    """Clear all cached query results."""
+    query_cache.clear()
@@ -0,0 +1,102 @@
+# ---------------------------------------------------------------------
+# app/db/row_mapping.py
+# ---------------------------------------------------------------------
+# Column-Name-Driven Row Mapping
+# Shared replacement for hand-written positional tuple -> dict loops.
+#  - Keys come from the result's column names (SELECT aliases), so the
+#    SELECT list is the single source of truth for the dict shape
+#  - Type conversion is planned once per result column, not per field:
+#    columns without a converter are copied with dict(zip(...)) only
+#  - Prefer casting in SQL (sql_text / sql_float) so psycopg2 already
+#    returns JSON-ready str/float values and no Python pass is needed
+# ---------------------------------------------------------------------
+# Usage:
+#   from app.db.row_mapping import RowMapper, sql_text, sql_float
+#
+#   query = text(f"SELECT vital_id, {sql_text('taken_datetime')}, ...")
+#   vitals = RowMapper().map_rows(conn.execute(query, params))
+# ---------------------------------------------------------------------
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Converter = Callable[[Any], Any]
+
+
+def sql_text(column: str, alias: Optional[str] = None) -> str:
+    """
+    SELECT expression returning a column as text under its own name.
+
+    TIMESTAMP::text matches str(datetime) ("2024-12-01 09:30:00").
+    Callers must table-qualify the column in ORDER BY, since an
+    unqualified name there resolves to the (text) output alias.
+    """
+    return f"{column}::text AS {alias or column.split('.')[-1]}"
+
+
+def sql_float(column: str, alias: Optional[str] = None) -> str:
+    """SELECT expression returning a NUMERIC column as float8 (Python float)."""
+    return f"{column}::float8 AS {alias or column.split('.')[-1]}"
+
+
+class RowMapper:
+    """
+    Maps SQLAlchemy result rows to dicts keyed by column name.
+
+    Args:
+        converters: Optional {column_name: callable} applied to non-NULL
+                    values of those columns (e.g., {"numeric_value": float})
+    """
+
+    def __init__(self, converters: Optional[Dict[str, Converter]] = None):
+        self.converters = dict(converters or {})
+        self._plans: Dict[Tuple[str, ...], List[Tuple[str, Converter]]] = {}
+        self._lock = threading.Lock()
+
+    def _plan(self, keys: Tuple[str, ...]) -> List[Tuple[str, Converter]]:
+        """Converters applicable to this column list (computed once per shape)."""
+        plan = self._plans.get(keys)
+        if plan is None:
+            plan = [(key, self.converters[key]) for key in keys if key in self.converters]
+            with self._lock:
+                self._plans[keys] = plan
+        return plan
+
+    def map_all(self, keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Map already-fetched rows with the given column names."""
+        keys = tuple(keys)
+        plan = self._plan(keys)
+
+        if not plan:
+            return [dict(zip(keys, row)) for row in rows]
+
+        mapped = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            for key, convert in plan:
+                value = item[key]
+                if value is not None:
+                    item[key] = convert(value)
+            mapped.append(item)
+        return mapped
+
+    def map_rows(self, result) -> List[Dict[str, Any]]:
+        """Fetch and map every row of a SQLAlchemy CursorResult."""
+        return self.map_all(result.keys(), result.fetchall())
+
+    def iter_rows(self, result, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Map rows lazily, batch_size at a time (for stream_results cursors).
+
+        Only one batch of rows is held in memory at once.
+        """
+        keys = tuple(result.keys())
+        for rows in result.partitions(batch_size):
+            yield from self.map_all(keys, rows)
+
+    def map_one(self, result) -> Optional[Dict[str, Any]]:
+        """Fetch and map a single row (None if the result is empty)."""
+        row = result.fetchone()
+        if row is None:
+            return None
+        return self.map_all(result.keys(), [row])[0]
@@ -6,20 +6,46 @@
 # This module encapsulates all SQL queries for vital signs data
 # ---------------------------------------------------------------------
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from typing import Optional, Iterator, List, Dict, Any
+from sqlalchemy import text
 import logging
-from config import DATABASE_URL
+from datetime import datetime
+from app.db.engines import read_engine
+from app.db.query_cache import cached_query
+from app.db.row_mapping import RowMapper, sql_float, sql_text
 
 logger = logging.getLogger(__name__)
 
-# Create engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Simple pooling for development
-    echo=False,  # Set to True to see SQL queries in logs
-)
+# Read-only queries: replica when configured and healthy, else primary
+engine = read_engine
+
+# Vital sign columns, cast in SQL so rows map straight to JSON-ready dicts.
+# ORDER BY must use v.taken_datetime (the output alias is text).
+VITAL_COLUMNS_SQL = ",\n            ".join([
+    "v.vital_id",
+    "v.patient_key",
+    "v.vital_sign_id",
+    "v.vital_type",
+    "v.vital_abbr",
+    sql_text("v.taken_datetime"),
+    sql_text("v.entered_datetime"),
+    "v.result_value",
+    sql_float("v.numeric_value"),
+    "v.systolic",
+    "v.diastolic",
+    sql_float("v.metric_value"),
+    "v.unit_of_measure",
+    "v.qualifiers",  # Already JSONB
+    "v.location_id",
+    "v.location_name",
+    "v.location_type",
+    "v.entered_by",
+    "v.abnormal_flag",
+    sql_float("v.bmi"),
+    "v.data_source",
+])
+
+_vital_rows = RowMapper()
 
 
 def get_patient_vitals(
@@ -39,36 +65,16 @@ def get_patient_vitals(
         List of dictionaries with vital signs data
     """
     # Build query with optional vital_type filter
-    where_clause = "WHERE patient_key = :icn"
+    where_clause = "WHERE v.patient_key = :icn"
     if vital_type:
-        where_clause += " AND vital_type = :vital_type"
+        where_clause += " AND v.vital_type = :vital_type"
 
     query = text(f"""
         SELECT
-            vital_id,
-            patient_key,
-            vital_sign_id,
-            vital_type,
-            vital_abbr,
-            taken_datetime,
-            entered_datetime,
-            result_value,
-            numeric_value,
-            systolic,
-            diastolic,
-            metric_value,
-            unit_of_measure,
-            qualifiers,
-            location_id,
-            location_name,
-            location_type,
-            entered_by,
-            abnormal_flag,
-            bmi,
-            data_source
-        FROM clinical.patient_vitals
+            {VITAL_COLUMNS_SQL}
+        FROM clinical.patient_vitals v
         {where_clause}
-        ORDER BY taken_datetime DESC
+        ORDER BY v.taken_datetime DESC
         LIMIT :limit
     """)
 
@@ -78,41 +84,144 @@ def get_patient_vitals(
             if vital_type:
                 params["vital_type"] = vital_type
 
-            results = conn.execute(query, params).fetchall()
-
-            vitals = []
-            for row in results:
-                vitals.append({
-                    "vital_id": row[0],
-                    "patient_key": row[1],
-                    "vital_sign_id": row[2],
-                    "vital_type": row[3],
-                    "vital_abbr": row[4],
-                    "taken_datetime": str(row[5]) if row[5] else None,
-                    "entered_datetime": str(row[6]) if row[6] else None,
-                    "result_value": row[7],
-                    "numeric_value": float(row[8]) if row[8] is not None else None,
-                    "systolic": row[9],
-                    "diastolic": row[10],
-                    "metric_value": float(row[11]) if row[11] is not None else None,
-                    "unit_of_measure": row[12],
-                    "qualifiers": row[13],  # Already JSONB
-                    "location_id": row[14],
-                    "location_name": row[15],
-                    "location_type": row[16],
-                    "entered_by": row[17],
-                    "abnormal_flag": row[18],
-                    "bmi": float(row[19]) if row[19] is not None else None,
-                    "data_source": row[20],
-                })
-
-            return vitals
+            return _vital_rows.map_rows(conn.execute(query, params))
 
     except Exception as e:
         logger.error(f"Error fetching vitals for ICN {icn}: {e}")
         return []
 
 
+_ABNORMAL_RANK_SQL = """CASE v.abnormal_flag
+                WHEN 'CRITICAL' THEN 4 WHEN 'HIGH' THEN 3 WHEN 'LOW' THEN 2 WHEN 'NORMAL' THEN 1 ELSE 0
+            END"""
+
+# data_source sort options on the vitals page (VistA first / Cerner first / calculated first)
+_DATA_SOURCE_RANKS = {
+    "asc": ("CDWWork", "CDWWork2", "CALCULATED"),
+    "cerner": ("CDWWork2", "CDWWork", "CALCULATED"),
+    "desc": ("CALCULATED", "CDWWork", "CDWWork2"),
+}
+
+
+def _vitals_page_order(sort_by: str, sort_order: str) -> str:
+    """
+    ORDER BY clause matching the vitals page's sort options.
+
+    Ties keep the newest-first order the page has always used.
+    """
+    direction = "DESC" if sort_order == "desc" else "ASC"
+
+    if sort_by == "vital_type":
+        expression = f"v.vital_type {direction} NULLS {'LAST' if direction == 'DESC' else 'FIRST'}"
+    elif sort_by == "abnormal_flag":
+        expression = f"{_ABNORMAL_RANK_SQL} {direction}"
+    elif sort_by == "data_source":
+        ranks = _DATA_SOURCE_RANKS.get(sort_order, _DATA_SOURCE_RANKS["desc"])
+        whens = " ".join(f"WHEN '{source}' THEN {rank}" for rank, source in enumerate(ranks, start=1))
+        expression = f"CASE v.data_source {whens} ELSE 99 END ASC"
+    else:
+        return f"v.taken_datetime {direction}"
+
+    return f"{expression}, v.taken_datetime DESC"
+
+
+def _vitals_page_filter(vital_type: Optional[str]) -> str:
+    return "WHERE v.vital_type = :vital_type" if vital_type else ""
+
+
+def get_vitals_page_counts(icn: str, limit: int = 500, vital_type: Optional[str] = None) -> Dict[str, int]:
+    """
+    Count vitals per type among the newest `limit` rows (the vitals page window).
+
+    Args:
+        icn: Integrated Care Number
+        limit: Page window size (newest vitals of all types)
+        vital_type: Optional filter by vital type, applied within the window
+
+    Returns:
+        Dictionary with vital_abbr as keys and counts as values, most
+        recently measured type first
+    """
+    query = text(f"""
+        WITH page AS (
+            SELECT v.vital_abbr, v.vital_type, v.taken_datetime
+            FROM clinical.patient_vitals v
+            WHERE v.patient_key = :icn
+            ORDER BY v.taken_datetime DESC
+            LIMIT :limit
+        )
+        SELECT v.vital_abbr, COUNT(*)
+        FROM page v
+        {_vitals_page_filter(vital_type)}
+        GROUP BY v.vital_abbr
+        ORDER BY MAX(v.taken_datetime) DESC
+    """)
+
+    try:
+        with engine.connect() as conn:
+            params = {"icn": icn, "limit": limit, "vital_type": vital_type}
+            return {row[0]: row[1] for row in conn.execute(query, params) if row[0]}
+
+    except Exception as e:
+        logger.error(f"Error fetching vitals page counts for ICN {icn}: {e}")
+        return {}
+
+
+def stream_vitals_page(
+    icn: str,
+    limit: int = 500,
+    vital_type: Optional[str] = None,
+    sort_by: str = "taken_datetime",
+    sort_order: str = "desc",
+    batch_size: int = 200
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the vitals page rows through a server-side cursor.
+
+    Rows are fetched batch_size at a time while the page template renders,
+    so memory per request stays bounded however long the history is.
+    The connection is held until the generator is exhausted or closed.
+
+    Args:
+        icn: Integrated Care Number
+        limit: Page window size (newest vitals of all types)
+        vital_type: Optional filter by vital type, applied within the window
+        sort_by: taken_datetime, vital_type, abnormal_flag or data_source
+        sort_order: asc, desc or cerner (data_source only)
+
+    Yields:
+        Vital sign dictionaries (same shape as get_patient_vitals)
+    """
+    query = text(f"""
+        WITH page AS (
+            SELECT *
+            FROM clinical.patient_vitals v
+            WHERE v.patient_key = :icn
+            ORDER BY v.taken_datetime DESC
+            LIMIT :limit
+        )
+        SELECT
+            {VITAL_COLUMNS_SQL}
+        FROM page v
+        {_vitals_page_filter(vital_type)}
+        ORDER BY {_vitals_page_order(sort_by, sort_order)}
+    """)
+
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(
+                query,
+                {"icn": icn, "limit": limit, "vital_type": vital_type},
+                execution_options={"stream_results": True, "max_row_buffer": batch_size},
+            )
+            yield from _vital_rows.iter_rows(result, batch_size)
+
+    except Exception as e:
+        # Headers are already sent; the page ends with the rows rendered so far
+        logger.error(f"Error streaming vitals for ICN {icn}: {e}")
+
+
+@cached_query("vitals")
 def get_recent_vitals(icn: str) -> Dict[str, Any]:
     """
     Get the most recent vital sign measurement per vital type for a patient.
@@ -124,66 +233,18 @@ def get_recent_vitals(icn: str) -> Dict[str, Any]:
     Returns:
         Dictionary with vital_abbr as keys and vital data as values
     """
-    query = text("""
-        SELECT DISTINCT ON (vital_abbr)
-            vital_id,
-            patient_key,
-            vital_sign_id,
-            vital_type,
-            vital_abbr,
-            taken_datetime,
-            entered_datetime,
-            result_value,
-            numeric_value,
-            systolic,
-            diastolic,
-            metric_value,
-            unit_of_measure,
-            qualifiers,
-            location_id,
-            location_name,
-            location_type,
-            entered_by,
-            abnormal_flag,
-            bmi,
-            data_source
-        FROM clinical.patient_vitals
-        WHERE patient_key = :icn
-        ORDER BY vital_abbr, taken_datetime DESC
+    query = text(f"""
+        SELECT DISTINCT ON (v.vital_abbr)
+            {VITAL_COLUMNS_SQL}
+        FROM clinical.patient_vitals v
+        WHERE v.patient_key = :icn
+        ORDER BY v.vital_abbr, v.taken_datetime DESC
     """)
 
     try:
         with engine.connect() as conn:
-            results = conn.execute(query, {"icn": icn}).fetchall()
-
-            recent_vitals = {}
-            for row in results:
-                vital_abbr = row[4]
-                recent_vitals[vital_abbr] = {
-                    "vital_id": row[0],
-                    "patient_key": row[1],
-                    "vital_sign_id": row[2],
-                    "vital_type": row[3],
-                    "vital_abbr": vital_abbr,
-                    "taken_datetime": str(row[5]) if row[5] else None,
-                    "entered_datetime": str(row[6]) if row[6] else None,
-                    "result_value": row[7],
-                    "numeric_value": float(row[8]) if row[8] is not None else None,
-                    "systolic": row[9],
-                    "diastolic": row[10],
-                    "metric_value": float(row[11]) if row[11] is not None else None,
-                    "unit_of_measure": row[12],
-                    "qualifiers": row[13],  # Already JSONB
-                    "location_id": row[14],
-                    "location_name": row[15],
-                    "location_type": row[16],
-                    "entered_by": row[17],
-                    "abnormal_flag": row[18],
-                    "bmi": float(row[19]) if row[19] is not None else None,
-                    "data_source": row[20],
-                }
-
-            return recent_vitals
+            vitals = _vital_rows.map_rows(conn.execute(query, {"icn": icn}))
+            return {vital["vital_abbr"]: vital for vital in vitals}
 
     except Exception as e:
         logger.error(f"Error fetching recent vitals for ICN {icn}: {e}")
@@ -207,76 +268,93 @@ def get_vital_type_history(
     Returns:
         List of dictionaries with vital measurements sorted by date (oldest first)
     """
-    query = text("""
+    query = text(f"""
         SELECT
-            vital_id,
-            patient_key,
-            vital_sign_id,
-            vital_type,
-            vital_abbr,
-            taken_datetime,
-            entered_datetime,
-            result_value,
-            numeric_value,
-            systolic,
-            diastolic,
-            metric_value,
-            unit_of_measure,
-            qualifiers,
-            location_id,
-            location_name,
-            location_type,
-            entered_by,
-            abnormal_flag,
-            bmi,
-            data_source
-        FROM clinical.patient_vitals
-        WHERE patient_key = :icn
-          AND vital_type = :vital_type
-        ORDER BY taken_datetime ASC
+            {VITAL_COLUMNS_SQL}
+        FROM clinical.patient_vitals v
+        WHERE v.patient_key = :icn
+          AND v.vital_type = :vital_type
+        ORDER BY v.taken_datetime ASC
         LIMIT :limit
     """)
 
     try:
         with engine.connect() as conn:
-            results = conn.execute(
+            result = conn.execute(
                 query,
                 {"icn": icn, "vital_type": vital_type, "limit": limit}
-            ).fetchall()
-
-            history = []
-            for row in results:
-                history.append({
-                    "vital_id": row[0],
-                    "patient_key": row[1],
-                    "vital_sign_id": row[2],
-                    "vital_type": row[3],
-                    "vital_abbr": row[4],
-                    "taken_datetime": str(row[5]) if row[5] else None,
-                    "entered_datetime": str(row[6]) if row[6] else None,
-                    "result_value": row[7],
-                    "numeric_value": float(row[8]) if row[8] is not None else None,
-                    "systolic": row[9],
-                    "diastolic": row[10],
-                    "metric_value": float(row[11]) if row[11] is not None else None,
-                    "unit_of_measure": row[12],
-                    "qualifiers": row[13],  # Already JSONB
-                    "location_id": row[14],
-                    "location_name": row[15],
-                    "location_type": row[16],
-                    "entered_by": row[17],
-                    "abnormal_flag": row[18],
-                    "bmi": float(row[19]) if row[19] is not None else None,
-                    "data_source": row[20],
-                })
-
-            return history
+            )
+            return _vital_rows.map_rows(result)
 
     except Exception as e:
         logger.error(f"Error fetching vital type history for ICN {icn}, type {vital_type}: {e}")
         return []
 
 
+def get_vital_trend_points(
+    icn: str,
+    vital_type: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Get every measurement of one vital type as parallel columns, for
+    server-side downsampling of trend charts.
+
+    Args:
+        icn: Integrated Care Number
+        vital_type: Vital type (e.g., "BLOOD PRESSURE", "WEIGHT")
+        start: Optional window start (inclusive)
+        end: Optional window end (inclusive)
+
+    Returns:
+        Dictionary with "t" (epoch milliseconds, oldest first),
+        "numeric_value", "systolic", "diastolic" lists and "unit"
+    """
+    where_clauses = ["patient_key = :icn", "vital_type = :vital_type"]
+    params: Dict[str, Any] = {"icn": icn, "vital_type": vital_type}
+    if start:
+        where_clauses.append("taken_datetime >= :start")
+        params["start"] = start
+    if end:
+        where_clauses.append("taken_datetime <= :end")
+        params["end"] = end
+
+    query = text(f"""
+        SELECT
+            EXTRACT(EPOCH FROM taken_datetime)::float8 * 1000 AS t,
+            numeric_value::float8,
+            systolic::float8,
+            diastolic::float8,
+            unit_of_measure
+        FROM clinical.patient_vitals
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY taken_datetime ASC
+    """)
+
+    empty = {"t": [], "numeric_value": [], "systolic": [], "diastolic": [], "unit": None}
+
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        if not rows:
+            return empty
+
+        t, numeric_value, systolic, diastolic, units = (list(column) for column in zip(*rows))
+        return {
+            "t": t,
+            "numeric_value": numeric_value,
+            "systolic": systolic,
+            "diastolic": diastolic,
+            "unit": next((u for u in reversed(units) if u), None),
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching vital trend points for ICN {icn}, type {vital_type}: {e}")
+        return empty
+
+
 def get_vital_counts(icn: str) -> Dict[str, int]:
     """
     Get count of vitals per type for a patient.
@@ -15,6 +15,7 @@
 #   CTRL + C
 # -----------------------------------------------------------
 
+import asyncio
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -38,6 +39,7 @@ from config import (
     SESSION_SECRET_KEY,
     SESSION_COOKIE_MAX_AGE,
     LANGGRAPH_CHECKPOINT_URL,
+    HTTP_CACHE_CONFIG,
 )
 
 # Import routers
@@ -60,6 +62,7 @@ from app.routes import (
 
 # Import middleware
 from app.middleware.auth import AuthMiddleware
+from app.middleware.conditional import ConditionalGetMiddleware
 
 # -----------------------------------------------------------
 # Lifespan handler for startup/shutdown tasks
@@ -79,6 +82,8 @@ async def lifespan(app: FastAPI):
 
     Shutdown:
     - Close checkpointer connection pool
+    - Stop the live task updates listener
+    - Close the VistA client's per-site connection pools
     """
     logger = logging.getLogger(__name__)
 
@@ -153,6 +158,16 @@ async def lifespan(app: FastAPI):
         logger.error("   - AI insights feature will NOT be available")
         app.state.insight_agent = None
 
+    # Compile dashboard widget templates up front (fragment cache)
+    from app.services.fragment_cache import precompile_templates
+    compiled = precompile_templates()
+    logger.info(f"✅ Precompiled {compiled} dashboard widget templates")
+
+    # Index the patient registry up front (VistA site selection)
+    from app.services.patient_registry import get_patient_registry
+    registry = await asyncio.to_thread(get_patient_registry)
+    logger.info(f"✅ Indexed patient registry: {len(registry)} patients")
+
     logger.info("=" * 60)
     logger.info("med-z1 application startup complete")
     logger.info("=" * 60)
@@ -179,6 +194,18 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"❌ Error during checkpointer cleanup: {e}")
 
+    # Stop the live task updates listener (LISTEN connection)
+    from app.services.task_events import task_event_hub
+    task_event_hub.stop()
+
+    # Cancel background VistA prefetches before closing their connections
+    from app.services.vista_prefetch import vista_prefetcher
+    await vista_prefetcher.stop()
+
+    # Close the VistA client's per-site connection pools
+    from app.services.vista_client import close_vista_client
+    await close_vista_client()
+
     logger.info("=" * 60)
     logger.info("med-z1 application shutdown complete")
     logger.info("=" * 60)
@@ -190,6 +217,15 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="med-z1", lifespan=lifespan)
 
+# Add conditional GET middleware (ETag / 304 for patient APIs and widgets)
+# Added first so it runs innermost: after auth has validated the session
+# and set request.state.user, and before any route queries or renders
+app.add_middleware(
+    ConditionalGetMiddleware,
+    enabled=HTTP_CACHE_CONFIG["enabled"],
+    max_age_seconds=HTTP_CACHE_CONFIG["max_age_seconds"],
+)
+
 # Add session middleware for Vista data caching
 # Session middleware must be added BEFORE auth middleware (executed AFTER in request flow)
 # This enables Vista cache storage in user sessions across page navigation
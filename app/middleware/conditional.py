@@ -0,0 +1,210 @@
+# ---------------------------------------------------------------------
+# app/middleware/conditional.py
+# ---------------------------------------------------------------------
+# Conditional GET Middleware (ETag / Last-Modified / 304)
+# Patient JSON APIs (/api/patient/{icn}/...) and dashboard widget
+# fragments (/api/patient/dashboard/widget/..., /api/dashboard/widget/...)
+# only change when:
+#  - an ETL load bumps the domain's serving data version, or
+#  - a task for the patient is created, edited or deleted
+# The ETag is derived from exactly those inputs, so a matching
+# If-None-Match is answered with 304 before the route runs (no query,
+# no template render). Tags also roll over every max_age_seconds so
+# date-relative content and transient error states are not pinned.
+# ---------------------------------------------------------------------
+# Runs inside AuthMiddleware (only authenticated requests get a 304) and
+# uses request.state.user, so one browser shared by two users never
+# reuses the other user's cached fragment.
+# ---------------------------------------------------------------------
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.db.patient_tasks import get_task_write_stamp
+from app.db.query_cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+# URL resource segment -> serving data domains it reads.
+# "patient_summary_<domain>" versions are added automatically when present.
+RESOURCE_DOMAINS: Dict[str, Tuple[str, ...]] = {
+    "vitals": ("vitals",),
+    "labs": ("labs",),
+    "medications": ("medications_outpatient", "medications_inpatient"),
+    "notes": ("clinical_notes",),
+    "encounters": ("encounters",),
+    "immunizations": ("immunizations",),
+    "history": ("family_history",),
+    "problems": ("problems",),
+    "allergies": ("allergies",),
+    "flags": ("flags",),
+    "demographics": ("patient",),
+    "tasks": (),  # Writeable: tagged by the per-patient task write stamp
+}
+
+# Resources whose content also depends on patient_tasks writes
+TASK_RESOURCES = {"tasks"}
+
+API_PREFIX = "/api/patient/"
+WIDGET_PREFIXES = ("/api/patient/dashboard/widget/", "/api/dashboard/widget/")
+
+
+def resolve_resource(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Map a request path to (resource, icn) if it is cacheable.
+
+    Args:
+        path: Request URL path
+
+    Returns:
+        Tuple of (resource, icn), e.g. ("vitals", "ICN100001"), or None for
+        paths that are not patient data reads (search, current patient,
+        task modals, VistA refresh, event streams)
+    """
+    for prefix in WIDGET_PREFIXES:
+        if path.startswith(prefix):
+            parts = path[len(prefix):].split("/")
+            if len(parts) == 2 and parts[0] in RESOURCE_DOMAINS and parts[1]:
+                return parts[0], parts[1]
+            return None
+
+    if not path.startswith(API_PREFIX):
+        return None
+
+    parts = path[len(API_PREFIX):].split("/")
+    if len(parts) < 2 or not parts[0] or parts[1] not in RESOURCE_DOMAINS:
+        return None
+    if parts[-1] == "events":
+        return None  # Server-Sent Events streams
+    return parts[1], parts[0]
+
+
+def build_etag(parts: Sequence[object]) -> str:
+    """Build a weak ETag from the values a response depends on."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag.
+
+    Args:
+        if_none_match: Raw header value (may list several tags, or "*")
+        etag: Current ETag
+
+    Returns:
+        True if the client's cached copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    current = opaque(etag)
+    return any(opaque(tag) == current for tag in if_none_match.split(","))
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """
+    ETag / Last-Modified validation for patient data reads.
+
+    Only GET requests that resolve_resource() recognizes are handled;
+    everything else passes straight through. If a domain has no serving
+    data version (versions unavailable, or the domain was never loaded
+    by the ETL) no tag is issued, since there is nothing to invalidate it.
+    """
+
+    def __init__(self, app, enabled: bool = True, max_age_seconds: int = 300):
+        super().__init__(app)
+        self.enabled = enabled
+        self.max_age_seconds = max(1, max_age_seconds)
+
+    def _validators(self, request: Request, resource: str, icn: str) -> Optional[Tuple[str, Optional[datetime]]]:
+        """
+        Compute (etag, last_modified) for a resource (blocking; run in threadpool).
+
+        Returns:
+            Tuple of (etag, last_modified) or None if the response should
+            not be tagged
+        """
+        versions = query_cache.get_versions()
+        if versions is None:
+            return None
+
+        domains = RESOURCE_DOMAINS[resource]
+        if any(d not in versions for d in domains):
+            return None
+
+        summary_domains = [f"patient_summary_{d}" for d in domains + tuple(TASK_RESOURCES & {resource})]
+        parts = [resource, icn]
+        parts += [f"{d}={versions[d]}" for d in domains]
+        parts += [f"{d}={versions[d]}" for d in summary_domains if d in versions]
+
+        if resource in TASK_RESOURCES:
+            stamp = get_task_write_stamp(icn)
+            if stamp is None:
+                return None
+            parts.append(f"tasks={stamp}")
+
+        user = getattr(request.state, "user", None) or {}
+        parts.append(user.get("user_id", ""))
+        parts.append(int(time.time() // self.max_age_seconds))
+
+        # Last-Modified is only meaningful for ETL-loaded (read-only) data
+        last_modified = None
+        if resource not in TASK_RESOURCES:
+            last_modified = query_cache.last_loaded_at(domains)
+            if last_modified is not None:
+                if last_modified.tzinfo is None:
+                    last_modified = last_modified.replace(tzinfo=timezone.utc)
+                last_modified = last_modified.astimezone(timezone.utc)
+
+        return build_etag(parts), last_modified
+
+    async def dispatch(self, request: Request, call_next):
+        if not self.enabled or request.method != "GET":
+            return await call_next(request)
+
+        resolved = resolve_resource(request.url.path)
+        if resolved is None:
+            return await call_next(request)
+
+        resource, icn = resolved
+        try:
+            validators = await run_in_threadpool(self._validators, request, resource, icn)
+        except Exception as e:
+            logger.warning(f"Conditional GET skipped for {request.url.path}: {e}")
+            validators = None
+
+        if validators is None:
+            return await call_next(request)
+
+        etag, last_modified = validators
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        # Last-Modified is informational; validation uses the ETag only,
+        # since it also covers the user and the max-age rollover
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            logger.debug(f"304 Not Modified: {request.url.path}")
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+        return response
@@ -15,6 +15,7 @@ from app.utils.ccow_client import ccow_client
 from app.utils.template_context import get_base_context
 from app.db.patient import get_patient_demographics
 from app.db.patient_flags import get_patient_flags
+from app.services.fragment_cache import cached_fragment
 
 router = APIRouter(tags=["dashboard"])
 templates = Jinja2Templates(directory="app/templates")
@@ -79,6 +80,7 @@ async def get_dashboard_alternate(request: Request):
 # ============================================
 
 @router.get("/api/dashboard/widget/demographics/{patient_icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/demographics_widget.html", "patient", icn_param="patient_icn")
 async def get_demographics_widget(request: Request, patient_icn: str):
     """
     Demographics widget endpoint.
@@ -123,6 +125,7 @@ async def get_demographics_widget(request: Request, patient_icn: str):
 
 
 @router.get("/api/dashboard/widget/flags/{patient_icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/flags_widget.html", "flags", icn_param="patient_icn")
 async def get_flags_widget(request: Request, patient_icn: str):
     """
     Patient Flags widget endpoint.
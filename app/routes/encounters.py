@@ -22,10 +22,13 @@ from app.db.encounters import (
     get_encounter_by_id
 )
 from app.db.patient import get_patient_demographics
+from app.db.pagination import build_page
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
 
 # API router for encounters endpoints
-router = APIRouter(prefix="/api/patient", tags=["encounters"])
+router = APIRouter(prefix="/api/patient", tags=["encounters"], default_response_class=FastJSONResponse)
 
 # Page router for full encounters pages (no prefix for flexibility)
 page_router = APIRouter(tags=["encounters-pages"])
@@ -40,7 +43,8 @@ async def get_patient_encounters_endpoint(
     limit: Optional[int] = Query(100, ge=1, le=500),
     offset: Optional[int] = Query(0, ge=0),
     active_only: Optional[bool] = Query(False),
-    recent_only: Optional[bool] = Query(False)
+    recent_only: Optional[bool] = Query(False),
+    cursor: Optional[str] = None
 ):
     """
     Get all encounters for a patient.
@@ -51,6 +55,8 @@ async def get_patient_encounters_endpoint(
         offset: Number of encounters to skip (for pagination, default 0)
         active_only: If True, return only active admissions
         recent_only: If True, return only recent encounters (last 30 days)
+        cursor: next_cursor from the previous response (replaces offset for
+                constant-time paging through long histories)
 
     Returns:
         JSON with list of encounters
@@ -58,11 +64,13 @@ async def get_patient_encounters_endpoint(
     try:
         encounters = get_patient_encounters(
             icn,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
             active_only=active_only,
-            recent_only=recent_only
+            recent_only=recent_only,
+            cursor=cursor
         )
+        encounters, next_cursor = build_page(encounters, limit, "admit_datetime", "encounter_id")
         counts = get_encounter_counts(icn)
 
         return {
@@ -70,6 +78,7 @@ async def get_patient_encounters_endpoint(
             "count": len(encounters),
             "offset": offset,
             "limit": limit,
+            "next_cursor": next_cursor,
             "total_encounters": counts["total_encounters"],
             "encounters": encounters,
             "counts": counts
@@ -139,6 +148,7 @@ async def get_active_admissions_endpoint(icn: str):
 
 
 @router.get("/dashboard/widget/encounters/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/encounters_widget.html", "encounters")
 async def get_encounters_widget(request: Request, icn: str):
     """
     Render encounters widget HTML partial for dashboard.
@@ -352,9 +362,9 @@ async def get_encounters_realtime(
             patient = {"icn": icn, "name_display": "Unknown Patient"}
 
         # Fetch real-time data from VistA
-        from app.services.vista_client import VistaClient
+        from app.services.vista_client import get_vista_client
 
-        vista_client = VistaClient()
+        vista_client = get_vista_client()
 
         # Get target sites for encounters (3 sites per domain policy)
         target_sites = vista_client.get_target_sites(icn, domain="encounters")
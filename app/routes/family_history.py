@@ -21,9 +21,11 @@ from app.db.patient_family_history import (
 )
 from app.utils.ccow_client import ccow_client
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
 
 # API router for family-history endpoints
-router = APIRouter(prefix="/api/patient", tags=["family-history"])
+router = APIRouter(prefix="/api/patient", tags=["family-history"], default_response_class=FastJSONResponse)
 
 # Page router for full history pages (no prefix for flexibility)
 page_router = APIRouter(tags=["family-history-pages"])
@@ -89,6 +91,7 @@ async def get_recent_family_history_endpoint(
 
 
 @router.get("/dashboard/widget/history/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/family_history_widget.html", "family_history")
 async def get_family_history_widget(request: Request, icn: str):
     """Render Family History widget HTML for the dashboard."""
     try:
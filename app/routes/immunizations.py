@@ -20,9 +20,11 @@ from app.db.patient_immunizations import (
 )
 from app.db.patient import get_patient_demographics
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
 
 # API router for immunizations endpoints
-router = APIRouter(prefix="/api/patient", tags=["immunizations"])
+router = APIRouter(prefix="/api/patient", tags=["immunizations"], default_response_class=FastJSONResponse)
 
 # Page router for full immunizations pages (no prefix for flexibility)
 page_router = APIRouter(tags=["immunizations-pages"])
@@ -116,6 +118,7 @@ async def get_recent_immunizations_endpoint(icn: str):
 
 
 @router.get("/dashboard/widget/immunizations/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/immunizations_widget.html", "immunizations")
 async def get_immunizations_widget(request: Request, icn: str):
     """
     Get immunizations widget HTML for dashboard (HTMX partial).
@@ -17,13 +17,19 @@ from app.db.labs import (
     get_trending_tests,
     get_all_lab_results,
     get_test_trend,
+    get_lab_trend_buckets,
+    get_lab_trend_points,
     get_lab_counts
 )
 from app.db.patient import get_patient_demographics
+from app.db.pagination import build_page
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.services.downsample import build_trend_payload, parse_window_bound
+from app.services.fragment_cache import cached_fragment
 
 # API router for labs endpoints
-router = APIRouter(prefix="/api/patient", tags=["labs"])
+router = APIRouter(prefix="/api/patient", tags=["labs"], default_response_class=FastJSONResponse)
 
 # Page router for full labs pages (no prefix for flexibility)
 page_router = APIRouter(tags=["labs-pages"])
@@ -31,6 +37,9 @@ page_router = APIRouter(tags=["labs-pages"])
 templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
+# Rows per "Load more" page on the full labs page
+LABS_PAGE_SIZE = 100
+
 
 # ============================================
 # API Endpoints (JSON responses)
@@ -43,7 +52,8 @@ async def get_patient_labs_endpoint(
     offset: Optional[int] = Query(0, ge=0),
     panel_filter: Optional[str] = None,
     abnormal_only: Optional[bool] = False,
-    days: Optional[int] = None
+    days: Optional[int] = None,
+    cursor: Optional[str] = None
 ):
     """
     Get all lab results for a patient with optional filters.
@@ -55,6 +65,8 @@ async def get_patient_labs_endpoint(
         panel_filter: Filter by panel name (e.g., "BMP", "CBC")
         abnormal_only: If True, return only abnormal results (default False)
         days: If specified, only return results from last N days
+        cursor: next_cursor from the previous response (replaces offset for
+                constant-time paging through long histories)
 
     Returns:
         JSON with list of lab results
@@ -62,23 +74,27 @@ async def get_patient_labs_endpoint(
     try:
         labs = get_all_lab_results(
             icn,
-            limit=limit,
+            limit=limit + 1,
             offset=offset,
             panel_filter=panel_filter,
             abnormal_only=abnormal_only,
-            days=days
+            days=days,
+            cursor=cursor
         )
+        labs, next_cursor = build_page(labs, limit, "collection_datetime", "lab_id")
 
-        return {
+        # Rows are already JSON-ready; skip FastAPI's jsonable_encoder pass
+        return FastJSONResponse({
             "patient_icn": icn,
             "count": len(labs),
+            "next_cursor": next_cursor,
             "filters": {
                 "panel": panel_filter,
                 "abnormal_only": abnormal_only,
                 "days": days
             },
             "labs": labs
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error fetching labs for {icn}: {e}")
@@ -155,6 +171,46 @@ async def get_trending_tests_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/labs/trends")
+async def get_lab_trend_buckets_endpoint(
+    icn: str,
+    test_names: str = Query(..., min_length=1),
+    bucket_days: int = Query(30, ge=1, le=365),
+    days: Optional[int] = Query(None, ge=1, le=36500)
+):
+    """
+    Get time-bucketed trend statistics for several lab tests.
+    One query for a whole panel (min/max/mean/last per bucket per test).
+
+    Args:
+        icn: Integrated Care Number
+        test_names: Comma-separated list of test names (up to 50)
+        bucket_days: Bucket width in days (default 30)
+        days: Optional look-back window in days (default: full history)
+
+    Returns:
+        JSON with bucketed trends keyed by test name
+    """
+    test_list = tuple(dict.fromkeys(name.strip() for name in test_names.split(",") if name.strip()))
+    if not test_list or len(test_list) > 50:
+        raise HTTPException(status_code=400, detail="test_names must list 1 to 50 tests")
+
+    try:
+        trends = get_lab_trend_buckets(icn, test_list, bucket_days=bucket_days, days=days)
+
+        return {
+            "patient_icn": icn,
+            "bucket_days": bucket_days,
+            "days": days,
+            "test_count": len(trends),
+            "trends": trends
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching lab trend buckets for {icn}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{icn}/labs/trend/{test_name}")
 async def get_test_trend_endpoint(
     icn: str,
@@ -189,11 +245,68 @@ async def get_test_trend_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/labs/{lab_test_name}/trend")
+async def get_lab_trend_chart_endpoint(
+    icn: str,
+    lab_test_name: str,
+    width: int = Query(600, ge=10, le=4000),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    method: str = Query("lttb", regex="^(lttb|minmax)$")
+):
+    """
+    Get a downsampled trend series for charting a single lab test.
+
+    Returns about one point per pixel of chart width over the requested
+    window (default: full history). Charts refetch with start/end on zoom.
+
+    Args:
+        icn: Integrated Care Number
+        lab_test_name: Name of the lab test (e.g., "Glucose")
+        width: Chart width in pixels (target number of points)
+        start: Optional window start (ISO date or datetime)
+        end: Optional window end (ISO date or datetime)
+        method: "lttb" (default) or "minmax" bucketing
+
+    Returns:
+        Columnar JSON: "t" (epoch ms) and series.value, plus unit and
+        reference range
+    """
+    try:
+        window_start = parse_window_bound(start)
+        window_end = parse_window_bound(end, end=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be ISO dates or datetimes")
+
+    try:
+        points = get_lab_trend_points(icn, lab_test_name, start=window_start, end=window_end)
+
+        payload = build_trend_payload(points["t"], {"value": points["result_numeric"]}, width, method)
+        payload.update({
+            "patient_icn": icn,
+            "test_name": lab_test_name,
+            "unit": points["unit"],
+            "ref_range_low": points["ref_range_low"],
+            "ref_range_high": points["ref_range_high"],
+            "start": start,
+            "end": end,
+        })
+        return FastJSONResponse(payload)
+
+    except Exception as e:
+        logger.error(f"Error fetching lab trend chart for {icn}, test {lab_test_name}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ============================================
 # Widget Endpoint (HTML partial)
 # ============================================
 
+# Tests summarized in the widget's trending section (tuple: cache key)
+WIDGET_TREND_TESTS = ("Glucose", "Creatinine", "Hemoglobin")
+
 @router.get("/dashboard/widget/labs/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/labs_widget.html", "labs")
 async def get_labs_widget(request: Request, icn: str):
     """
     Render labs widget HTML partial for dashboard.
@@ -209,9 +322,8 @@ async def get_labs_widget(request: Request, icn: str):
         # Get recent panels (3 for 3x1 widget layout)
         panels = get_recent_panels(icn, limit=3)
 
-        # Get trending data for sparklines (key tests)
-        trending_tests = ["Glucose", "Creatinine", "Hemoglobin"]
-        trending = get_trending_tests(icn, test_names=trending_tests, days=90)
+        # Trend summaries for the key tests, one query for all of them
+        trending = get_lab_trend_buckets(icn, WIDGET_TREND_TESTS, bucket_days=7, days=90)
 
         return templates.TemplateResponse(
             "partials/labs_widget.html",
@@ -301,16 +413,19 @@ async def get_labs_page(
                 )
             )
 
-        # Get all lab results with filters and sorting
+        # Get first page of lab results with filters and sorting
         labs = get_all_lab_results(
             icn,
-            limit=100,
+            limit=LABS_PAGE_SIZE + 1,
             panel_filter=panel_filter,
             abnormal_only=abnormal_only,
             days=days,
             sort_by=sort_by,
             sort_order=sort_order
         )
+        labs, next_cursor = build_page(labs, LABS_PAGE_SIZE, "collection_datetime", "lab_id")
+        if sort_by != "collection_datetime":
+            next_cursor = None
 
         # Get panel counts for filter pills
         counts = get_lab_counts(icn)
@@ -327,6 +442,7 @@ async def get_labs_page(
                 request,
                 patient=patient,
                 labs=labs,
+                next_cursor=next_cursor,
                 counts=counts,
                 total_count=total_count,
                 abnormal_count=abnormal_count,
@@ -349,3 +465,52 @@ async def get_labs_page(
                 patient=None
             )
         )
+
+
+@page_router.get("/patient/{icn}/labs/rows", response_class=HTMLResponse)
+async def get_labs_rows_partial(
+    request: Request,
+    icn: str,
+    cursor: str,
+    panel_filter: Optional[str] = None,
+    abnormal_only: Optional[bool] = False,
+    days: Optional[int] = None,
+    sort_order: Optional[str] = Query("desc", regex="^(asc|desc)$")
+):
+    """
+    Get the next page of lab result rows for the labs page "Load more" button.
+    Returns HTMX-compatible table rows plus the next "Load more" row.
+
+    Args:
+        icn: Integrated Care Number
+        cursor: Keyset cursor from the previous page
+        panel_filter, abnormal_only, days, sort_order: Active filters
+
+    Returns:
+        HTML partial with lab result table rows
+    """
+    labs = get_all_lab_results(
+        icn,
+        limit=LABS_PAGE_SIZE + 1,
+        panel_filter=panel_filter,
+        abnormal_only=abnormal_only,
+        days=days,
+        sort_by="collection_datetime",
+        sort_order=sort_order,
+        cursor=cursor
+    )
+    labs, next_cursor = build_page(labs, LABS_PAGE_SIZE, "collection_datetime", "lab_id")
+
+    return templates.TemplateResponse(
+        "partials/labs_table_rows.html",
+        {
+            "request": request,
+            "patient": {"icn": icn},
+            "labs": labs,
+            "next_cursor": next_cursor,
+            "panel_filter": panel_filter,
+            "abnormal_only": abnormal_only,
+            "days": days,
+            "sort_order": sort_order
+        }
+    )
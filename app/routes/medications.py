@@ -17,13 +17,18 @@ from datetime import datetime
 from app.db.medications import (
     get_patient_medications,
     get_recent_medications,
-    get_medication_counts
+    get_medication_details,
+    get_medication_counts,
+    parse_medication_id
 )
 from app.db.patient import get_patient_demographics
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
+from config import VISTA_CONFIG
 
 # API router for medications endpoints
-router = APIRouter(prefix="/api/patient", tags=["medications"])
+router = APIRouter(prefix="/api/patient", tags=["medications"], default_response_class=FastJSONResponse)
 
 # Page router for full medications pages (no prefix for flexibility)
 page_router = APIRouter(tags=["medications-pages"])
@@ -111,6 +116,39 @@ async def get_recent_medications_endpoint(icn: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/medications/details")
+async def get_medication_details_batch_endpoint(
+    icn: str,
+    ids: str = Query(..., min_length=1)
+):
+    """
+    Get full details for several medications in one request.
+    List pages call this for their visible rows, so opening a detail
+    modal afterwards is a cache hit.
+
+    Args:
+        icn: Integrated Care Number
+        ids: Comma-separated medication identifiers (up to 100)
+
+    Returns:
+        JSON with medication details keyed by medication_id
+    """
+    medication_ids = [m.strip() for m in ids.split(",") if m.strip()][:100]
+
+    try:
+        details = get_medication_details(icn, medication_ids)
+
+        return {
+            "patient_icn": icn,
+            "count": len(details),
+            "medications": details
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching medication details batch for {icn}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{icn}/medications/{medication_id}/details")
 async def get_medication_details_endpoint(icn: str, medication_id: str):
     """
@@ -124,21 +162,12 @@ async def get_medication_details_endpoint(icn: str, medication_id: str):
     Returns:
         JSON with full medication details
     """
-    try:
-        # Parse medication_id to determine type and ID
-        if medication_id.startswith("rxout_"):
-            med_type = "outpatient"
-            # For now, get all outpatient meds and filter
-            # In production, would optimize with direct query
-            all_meds = get_patient_medications(icn, medication_type="outpatient", limit=500)
-        elif medication_id.startswith("bcma_"):
-            med_type = "inpatient"
-            all_meds = get_patient_medications(icn, medication_type="inpatient", limit=500)
-        else:
-            raise HTTPException(status_code=400, detail="Invalid medication_id format")
+    if parse_medication_id(medication_id) is None:
+        raise HTTPException(status_code=400, detail="Invalid medication_id format")
 
-        # Find the specific medication
-        medication = next((m for m in all_meds if m["medication_id"] == medication_id), None)
+    try:
+        # Indexed point lookup (or a cache hit after a list-page prefetch)
+        medication = get_medication_details(icn, [medication_id]).get(medication_id)
 
         if not medication:
             raise HTTPException(status_code=404, detail="Medication not found")
@@ -156,6 +185,7 @@ async def get_medication_details_endpoint(icn: str, medication_id: str):
 
 
 @router.get("/dashboard/widget/medications/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/medications_widget.html", ("medications_outpatient", "medications_inpatient"))
 async def get_medications_widget(request: Request, icn: str):
     """
     Render medications widget HTML partial for dashboard.
@@ -300,18 +330,22 @@ async def get_medications_page(
             # Vista data cached - merge with PostgreSQL for consistent filtering
             logger.info(f"Using cached Vista data for medications filtering (age: {cached_vista.get('timestamp')})")
 
-            # Fetch PostgreSQL data (all types, all statuses, all time)
-            pg_medications = get_patient_medications(
-                icn,
-                limit=500,
-                medication_type=None,  # Get both types for merge
-                status=None,  # Get all statuses for merge
-                days=3650  # Get all historical data
-            )
-
-            # Merge with cached Vista responses
+            # Merge PostgreSQL data (all types, all statuses, all time) with
+            # cached Vista responses; repeat views reuse the memoized merge
+            from app.services.merged_view_cache import merged_view_cache
             vista_responses = cached_vista.get("vista_responses", {})
-            medications, _ = merge_medications_data(pg_medications, vista_responses, icn)
+            medications, _ = merged_view_cache.get_or_merge(
+                icn, "medications", ("medications_outpatient", "medications_inpatient"), vista_responses,
+                load_pg=lambda: get_patient_medications(
+                    icn,
+                    limit=500,
+                    medication_type=None,  # Get both types for merge
+                    status=None,  # Get all statuses for merge
+                    days=3650  # Get all historical data
+                ),
+                merge=merge_medications_data,
+                variant=(500, 3650)
+            )
 
             # Get counts from merged data
             all_outpatient = [m for m in medications if m.get("type") == "outpatient"]
@@ -424,6 +458,136 @@ async def get_medications_page(
         )
 
 
+def _build_medications_realtime_context(
+    request: Request,
+    patient: dict,
+    pg_medications: list,
+    vista_results: dict,
+    target_sites: list,
+    medication_type: str,
+    status: Optional[str],
+    date_range: str,
+    sort_by: str
+) -> tuple:
+    """
+    Merge PostgreSQL history with VistA responses and build the refresh area context.
+
+    Shared by the realtime refresh endpoint and its progressive stream,
+    which calls it again as each site's response arrives.
+
+    Args:
+        patient: Patient demographics
+        pg_medications: Historical medications from PostgreSQL (all types and statuses)
+        vista_results: Successful VistA responses (site -> RPC response string)
+        target_sites: Sites queried
+        medication_type: Filter by type ('outpatient', 'inpatient', 'all')
+        status: Filter by status (outpatient medications)
+        date_range: Date range filter ('30', '90', '180', '365', 'all')
+        sort_by: Combined sort field and order ('date_desc', 'date_asc', 'drug_name', 'type')
+
+    Returns:
+        (template context for partials/medications_refresh_area.html, merge_stats)
+    """
+    from app.services.realtime_overlay import merge_medications_data
+
+    # Merge PostgreSQL + Vista data
+    medications, merge_stats = merge_medications_data(pg_medications, vista_results, patient["icn"])
+
+    # Recalculate counts from ALL merged data (before any filtering)
+    all_merged_medications = medications.copy()
+    all_outpatient = [m for m in all_merged_medications if m.get("type") == "outpatient"]
+    all_inpatient = [m for m in all_merged_medications if m.get("type") == "inpatient"]
+
+    counts = {
+        "outpatient_total": len(all_outpatient),
+        "inpatient_total": len(all_inpatient),
+        "outpatient_active": len([m for m in all_outpatient if m.get("status") == "ACTIVE"]),
+        "outpatient_controlled": len([m for m in all_outpatient if m.get("controlled_substance")]),
+        "inpatient_controlled": len([m for m in all_inpatient if m.get("controlled_substance")])
+    }
+
+    # Parse combined sort_by parameter
+    if sort_by == "date_desc":
+        sort_field, sort_order = "date", "desc"
+    elif sort_by == "date_asc":
+        sort_field, sort_order = "date", "asc"
+    elif sort_by == "drug_name":
+        sort_field, sort_order = "drug_name", "asc"
+    elif sort_by == "type":
+        sort_field, sort_order = "type", "asc"
+    else:
+        sort_field, sort_order = "date", "desc"
+
+    # Convert date_range to days
+    days_map = {"30": 30, "90": 90, "180": 180, "365": 365, "all": 3650}
+    days_filter = days_map.get(date_range, 3650)
+
+    # Apply filters AFTER merge and counts calculation
+    # Auto-reset status when medication_type is inpatient
+    if medication_type == "inpatient":
+        status = None
+    elif status == "all":
+        status = None
+
+    # Apply filters
+    if medication_type != "all":
+        medications = [m for m in medications if m.get("type") == medication_type]
+
+    # Apply status filter only to outpatient medications (inpatient uses different status field)
+    if status:
+        medications = [m for m in medications if m.get("type") == "inpatient" or m.get("status") == status]
+
+    # Apply date range filter (based on date or issue_date field)
+    if days_filter < 3650:
+        from datetime import timedelta
+        cutoff_date = (datetime.now() - timedelta(days=days_filter)).strftime("%Y-%m-%d")
+        medications = [m for m in medications if (m.get("date") or m.get("issue_date") or "")[:10] >= cutoff_date]
+
+    # Sort medications (same logic as initial page load)
+    reverse = (sort_order == "desc")
+
+    if sort_field == "date":
+        medications = sorted(medications, key=lambda m: m.get("date") or m.get("issue_date") or "", reverse=reverse)
+    elif sort_field == "drug_name":
+        medications = sorted(medications, key=lambda m: m.get("drug_name_local") or m.get("drug_name") or "", reverse=reverse)
+    elif sort_field == "type":
+        medications = sorted(medications, key=lambda m: m.get("type") or "", reverse=reverse)
+
+    # Calculate data freshness (today's date after VistA refresh)
+    now = datetime.now()
+    data_current_through = now.strftime("%b %d, %Y")
+    last_updated = now.strftime("%I:%M %p")
+
+    # Calculate Vista success rate
+    successful_sites = len(vista_results)
+    total_sites_attempted = len(target_sites)
+    vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
+
+    context = get_base_context(
+        request,
+        patient=patient,
+        medications=medications,
+        counts=counts,
+        medication_type_filter=medication_type,
+        status_filter=status,
+        days_filter=days_filter,
+        date_range_filter=date_range,
+        sort_by=sort_field,
+        sort_order=sort_order,
+        total_count=len(medications),
+        active_page="medications",
+        # Real-time refresh metadata
+        vista_refreshed=True,
+        vista_sites_queried=target_sites,
+        vista_sites_successful=list(vista_results.keys()),
+        vista_success_rate=vista_success_rate,
+        data_current_through=data_current_through,
+        last_updated=last_updated,
+        merge_stats=merge_stats
+    )
+    return context, merge_stats
+
+
 @page_router.get("/patient/{icn}/medications/realtime", response_class=HTMLResponse)
 async def get_medications_realtime(
     request: Request,
@@ -431,7 +595,8 @@ async def get_medications_realtime(
     medication_type: Optional[str] = Query("all", regex="^(outpatient|inpatient|all)$"),
     status: Optional[str] = Query("all"),
     date_range: Optional[str] = Query("all"),
-    sort_by: Optional[str] = Query("date_desc", regex="^(date_desc|date_asc|drug_name|type)$")
+    sort_by: Optional[str] = Query("date_desc", regex="^(date_desc|date_asc|drug_name|type)$"),
+    handoff: Optional[str] = Query(None)
 ):
     """
     VistA real-time refresh endpoint for medications.
@@ -459,29 +624,47 @@ async def get_medications_realtime(
             patient = {"icn": icn, "name_display": "Unknown Patient"}
 
         # Fetch real-time data from VistA
-        from app.services.vista_client import VistaClient
-        from app.services.realtime_overlay import merge_medications_data
+        from app.services.vista_client import get_vista_client
 
-        vista_client = VistaClient()
+        vista_client = get_vista_client()
 
         # Get target sites for medications (limit 3 sites per domain policy)
         target_sites = vista_client.get_target_sites(icn, domain="medications")
         logger.info(f"Querying {len(target_sites)} VistA sites for medications: {target_sites}")
 
-        # Call ORWPS COVER RPC at all target sites
-        vista_results_raw = await vista_client.call_rpc_multi_site(
-            sites=target_sites,
-            rpc_name="ORWPS COVER",
-            params=[icn]
-        )
+        from app.services.vista_cache import VistaSessionCache
+        from app.services.realtime_overlay import append_vista_deltas
+        from app.services.realtime_stream import refresh_handoff
+
+        # Follow-up to a progressive refresh: reuse the stream's results
+        handed_off = refresh_handoff.take(handoff, "ORWPS COVER", [icn])
+        if handed_off:
+            vista_results = handed_off["vista_results"]
+            refreshed_at = handed_off["refreshed_at"]
+            logger.info(f"Using progressive refresh results for {icn} ({len(vista_results)} sites)")
+        else:
+            # Sites refreshed earlier this session only need records since then
+            cached = VistaSessionCache.get_cached_data(request, icn, "medications")
+            since = VistaSessionCache.get_delta_since(cached, target_sites)
+            refreshed_at = datetime.now().isoformat()
+
+            # Call ORWPS COVER RPC at all target sites
+            vista_results_raw = await vista_client.call_rpc_multi_site(
+                sites=target_sites,
+                rpc_name="ORWPS COVER",
+                params=[icn],
+                since=since
+            )
 
-        # Extract successful responses (site -> response string)
-        vista_results = {}
-        for site, response in vista_results_raw.items():
-            if response.get("success"):
-                vista_results[site] = response.get("response", "")
-            else:
-                logger.warning(f"Vista RPC failed at site {site}: {response.get('error')}")
+            # Extract successful responses (site -> response string)
+            vista_results = {}
+            for site, response in vista_results_raw.items():
+                if response.get("success"):
+                    vista_results[site] = response.get("response", "")
+                else:
+                    logger.warning(f"Vista RPC failed at site {site}: {response.get('error')}")
+            if since:
+                vista_results = append_vista_deltas(vista_results, cached["vista_responses"], since)
 
         # Get historical data from PostgreSQL (T-1 and earlier)
         # Get all types for merge, filter after
@@ -493,12 +676,13 @@ async def get_medications_realtime(
             days=3650  # Get all historical data
         )
 
-        # Merge PostgreSQL + Vista data
-        medications, merge_stats = merge_medications_data(pg_medications, vista_results, icn)
+        # Merge PostgreSQL + Vista data, then count, filter and sort
+        context, merge_stats = _build_medications_realtime_context(
+            request, patient, pg_medications, vista_results, target_sites,
+            medication_type, status, date_range, sort_by
+        )
 
         # Cache Vista RPC responses (NOT merged data) to avoid cookie size limit
-        from app.services.vista_cache import VistaSessionCache
-
         # Store raw Vista responses (small - just strings), not merged data
         VistaSessionCache.set_cached_data(
             request=request,
@@ -506,7 +690,8 @@ async def get_medications_realtime(
             domain="medications",
             vista_responses=vista_results,  # Raw RPC response strings
             sites=list(vista_results.keys()),
-            stats=merge_stats
+            stats=merge_stats,
+            refreshed_at=refreshed_at
         )
 
         logger.info(
@@ -514,108 +699,14 @@ async def get_medications_realtime(
             f"({merge_stats['pg_count']} PG + {merge_stats['vista_count']} Vista) - Vista responses cached in session"
         )
 
-        # Recalculate counts from ALL merged data (before any filtering)
-        all_merged_medications = medications.copy()
-        all_outpatient = [m for m in all_merged_medications if m.get("type") == "outpatient"]
-        all_inpatient = [m for m in all_merged_medications if m.get("type") == "inpatient"]
-
-        counts = {
-            "outpatient_total": len(all_outpatient),
-            "inpatient_total": len(all_inpatient),
-            "outpatient_active": len([m for m in all_outpatient if m.get("status") == "ACTIVE"]),
-            "outpatient_controlled": len([m for m in all_outpatient if m.get("controlled_substance")]),
-            "inpatient_controlled": len([m for m in all_inpatient if m.get("controlled_substance")])
-        }
-
-        # Parse combined sort_by parameter
-        if sort_by == "date_desc":
-            sort_field, sort_order = "date", "desc"
-        elif sort_by == "date_asc":
-            sort_field, sort_order = "date", "asc"
-        elif sort_by == "drug_name":
-            sort_field, sort_order = "drug_name", "asc"
-        elif sort_by == "type":
-            sort_field, sort_order = "type", "asc"
-        else:
-            sort_field, sort_order = "date", "desc"
-
-        # Convert date_range to days
-        days_map = {"30": 30, "90": 90, "180": 180, "365": 365, "all": 3650}
-        days_filter = days_map.get(date_range, 3650)
-
-        # Apply filters AFTER merge and counts calculation
-        # Auto-reset status when medication_type is inpatient
-        if medication_type == "inpatient":
-            status = None
-        elif status == "all":
-            status = None
-
-        # Apply filters
-        if medication_type != "all":
-            medications = [m for m in medications if m.get("type") == medication_type]
-
-        # Apply status filter only to outpatient medications (inpatient uses different status field)
-        if status:
-            medications = [m for m in medications if m.get("type") == "inpatient" or m.get("status") == status]
-
-        # Apply date range filter (based on date or issue_date field)
-        if days_filter < 3650:
-            from datetime import timedelta
-            cutoff_date = (datetime.now() - timedelta(days=days_filter)).strftime("%Y-%m-%d")
-            medications = [m for m in medications if (m.get("date") or m.get("issue_date") or "")[:10] >= cutoff_date]
-
-        # Sort medications (same logic as initial page load)
-        reverse = (sort_order == "desc")
-
-        if sort_field == "date":
-            medications = sorted(medications, key=lambda m: m.get("date") or m.get("issue_date") or "", reverse=reverse)
-        elif sort_field == "drug_name":
-            medications = sorted(medications, key=lambda m: m.get("drug_name_local") or m.get("drug_name") or "", reverse=reverse)
-        elif sort_field == "type":
-            medications = sorted(medications, key=lambda m: m.get("type") or "", reverse=reverse)
-
-        # Calculate data freshness (today's date after VistA refresh)
-        now = datetime.now()
-        data_current_through = now.strftime("%b %d, %Y")
-        last_updated = now.strftime("%I:%M %p")
-
-        # Calculate Vista success rate
-        successful_sites = len(vista_results)
-        total_sites_attempted = len(target_sites)
-        vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
-
         logger.info(
-            f"VistA refresh complete for medications {icn}: {len(medications)} medications "
-            f"({vista_success_rate} successful)"
+            f"VistA refresh complete for medications {icn}: {context['total_count']} medications "
+            f"({context['vista_success_rate']} successful)"
         )
 
         # Return only the content portion (for HTMX outerHTML swap)
         # Note: This returns the refresh area + out-of-band freshness update
-        return templates.TemplateResponse(
-            "partials/medications_refresh_area.html",
-            get_base_context(
-                request,
-                patient=patient,
-                medications=medications,
-                counts=counts,
-                medication_type_filter=medication_type,
-                status_filter=status,
-                days_filter=days_filter,
-                date_range_filter=date_range,
-                sort_by=sort_field,
-                sort_order=sort_order,
-                total_count=len(medications),
-                active_page="medications",
-                # Real-time refresh metadata
-                vista_refreshed=True,
-                vista_sites_queried=target_sites,
-                vista_sites_successful=list(vista_results.keys()),
-                vista_success_rate=vista_success_rate,
-                data_current_through=data_current_through,
-                last_updated=last_updated,
-                merge_stats=merge_stats
-            )
-        )
+        return templates.TemplateResponse("partials/medications_refresh_area.html", context)
 
     except Exception as e:
         logger.error(f"Error during Vista realtime refresh for medications: {e}", exc_info=True)
@@ -631,3 +722,48 @@ async def get_medications_realtime(
                 active_page="medications"
             )
         )
+
+
+@page_router.get("/patient/{icn}/medications/realtime/stream")
+async def stream_medications_realtime(
+    request: Request,
+    icn: str,
+    medication_type: Optional[str] = Query("all", regex="^(outpatient|inpatient|all)$"),
+    status: Optional[str] = Query("all"),
+    date_range: Optional[str] = Query("all"),
+    sort_by: Optional[str] = Query("date_desc", regex="^(date_desc|date_asc|drug_name|type)$")
+):
+    """
+    Progressive VistA real-time refresh for medications (Server-Sent Events).
+
+    Same parameters and partial as get_medications_realtime(), but
+    PostgreSQL history is sent first and the refresh area is re-rendered
+    as each site answers (see app/services/realtime_stream.py).
+
+    Returns:
+        text/event-stream response of "swap" events, then "done"
+    """
+    if not VISTA_CONFIG["streaming"]:
+        raise HTTPException(status_code=404, detail="Progressive VistA refresh is disabled")
+
+    from app.services.vista_client import get_vista_client
+    from app.services.realtime_stream import stream_realtime_refresh
+    from app.services.vista_cache import VistaSessionCache
+
+    patient = get_patient_demographics(icn) or {"icn": icn, "name_display": "Unknown Patient"}
+    target_sites = get_vista_client().get_target_sites(icn, domain="medications")
+    cached = VistaSessionCache.get_cached_data(request, icn, "medications")
+    since = VistaSessionCache.get_delta_since(cached, target_sites)
+    pg_medications = get_patient_medications(icn, limit=500, medication_type=None, status=None, days=3650)
+
+    def build_context(vista_results: dict) -> dict:
+        return _build_medications_realtime_context(
+            request, patient, pg_medications, vista_results, target_sites,
+            medication_type, status, date_range, sort_by
+        )[0]
+
+    return stream_realtime_refresh(
+        request, templates, "partials/medications_refresh_area.html",
+        target_sites, "ORWPS COVER", [icn], build_context,
+        since=since, cached_responses=cached["vista_responses"] if since else None
+    )
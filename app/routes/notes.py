@@ -17,13 +17,17 @@ from app.db.notes import (
     get_notes_summary,
     get_all_notes,
     get_note_detail,
-    get_note_authors
+    get_note_details,
+    get_note_authors,
+    search_notes
 )
 from app.db.patient import get_patient_demographics
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
 
 # API router for notes endpoints
-router = APIRouter(prefix="/api/patient", tags=["notes"])
+router = APIRouter(prefix="/api/patient", tags=["notes"], default_response_class=FastJSONResponse)
 
 # Page router for full notes pages (no prefix for flexibility)
 page_router = APIRouter(tags=["notes-pages"])
@@ -42,7 +46,8 @@ async def get_patient_notes_endpoint(
     sort_by: Optional[str] = Query('reference_datetime'),
     sort_order: Optional[str] = Query('desc'),
     page: Optional[int] = Query(1, ge=1),
-    per_page: Optional[int] = Query(20, ge=1, le=100)
+    per_page: Optional[int] = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
 ):
     """
     Get all clinical notes for a patient with filtering, sorting, and pagination.
@@ -57,6 +62,8 @@ async def get_patient_notes_endpoint(
         sort_order: Sort order ('asc' or 'desc')
         page: Page number (1-based)
         per_page: Notes per page (1-100, default 20)
+        cursor: pagination.next_cursor from the previous response (date sort only,
+                replaces page for constant-time paging through long histories)
 
     Returns:
         JSON with list of clinical notes and pagination info
@@ -82,7 +89,8 @@ async def get_patient_notes_endpoint(
             sort_by=sort_by,
             sort_order=sort_order,
             limit=per_page,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
 
         return {
@@ -132,6 +140,76 @@ async def get_recent_notes_endpoint(icn: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/notes/search")
+async def search_notes_endpoint(
+    icn: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    note_class: Optional[str] = Query('all'),
+    limit: Optional[int] = Query(20, ge=1, le=100)
+):
+    """
+    Full-text search across a patient's clinical notes.
+
+    Args:
+        icn: Integrated Care Number
+        q: Search terms (web-search syntax, e.g. CHF exacerbation, "last echo")
+        note_class: Optional document class filter
+        limit: Maximum number of results (1-100, default 20)
+
+    Returns:
+        JSON with ranked matching notes and highlighted snippets
+    """
+    try:
+        results = search_notes(icn, q, limit=limit, note_class=note_class)
+
+        return {
+            "patient_icn": icn,
+            "query": q,
+            "count": len(results),
+            "results": results
+        }
+
+    except Exception as e:
+        logger.error(f"Error searching notes for {icn}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{icn}/notes/details")
+async def get_note_details_batch_endpoint(
+    icn: str,
+    ids: str = Query(..., min_length=1)
+):
+    """
+    Get several full clinical notes in one request.
+    The notes page calls this for its visible rows, so expanding a row
+    afterwards is a cache hit.
+
+    Args:
+        icn: Integrated Care Number
+        ids: Comma-separated note IDs (up to 50)
+
+    Returns:
+        JSON with complete notes keyed by note_id
+    """
+    try:
+        note_ids = [int(n) for n in ids.split(",") if n.strip()][:50]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+
+    try:
+        notes = get_note_details(icn, note_ids)
+
+        return {
+            "patient_icn": icn,
+            "count": len(notes),
+            "notes": notes
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching note details batch for {icn}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{icn}/notes/{note_id}")
 async def get_note_detail_endpoint(icn: str, note_id: int):
     """
@@ -189,6 +267,7 @@ async def get_note_authors_endpoint(icn: str):
 
 
 @router.get("/dashboard/widget/notes/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/notes_widget.html", "clinical_notes")
 async def get_notes_widget(request: Request, icn: str):
     """
     Render clinical notes widget HTML partial for dashboard.
@@ -361,6 +440,7 @@ async def get_notes_page(
                 page=result["pagination"]["current_page"],
                 total_pages=result["pagination"]["total_pages"],
                 per_page=per_page,
+                next_cursor=result["pagination"]["next_cursor"],
                 active_page="notes"
             )
         )
@@ -378,6 +458,114 @@ async def get_notes_page(
         )
 
 
+@page_router.get("/patient/{icn}/notes/search", response_class=HTMLResponse)
+async def get_notes_search_partial(
+    request: Request,
+    icn: str,
+    q: Optional[str] = Query('', max_length=200)
+):
+    """
+    Get notes search results HTML partial for the notes page search box.
+
+    Args:
+        icn: Patient ICN
+        q: Search terms (empty clears the results panel)
+
+    Returns:
+        HTML partial with ranked search results
+    """
+    try:
+        results = search_notes(icn, q) if q and q.strip() else []
+
+        return templates.TemplateResponse(
+            "partials/notes_search_results.html",
+            {
+                "request": request,
+                "icn": icn,
+                "query": (q or '').strip(),
+                "results": results
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error searching notes for {icn}: {e}")
+        return HTMLResponse(
+            content=f"<div class='error'>Error searching notes: {str(e)}</div>",
+            status_code=500
+        )
+
+
+@page_router.get("/patient/{icn}/notes/rows", response_class=HTMLResponse)
+async def get_notes_rows_partial(
+    request: Request,
+    icn: str,
+    cursor: str,
+    note_class: Optional[str] = Query('all'),
+    date_range: Union[int, str, None] = Query(None),
+    author: Optional[str] = None,
+    status: Optional[str] = Query('all'),
+    sort_order: Optional[str] = Query('desc'),
+    per_page: Optional[int] = Query(20, ge=1, le=100)
+):
+    """
+    Get the next page of note rows for the notes page "Load more" button.
+    Returns HTMX-compatible HTML rows plus the next "Load more" button.
+
+    Args:
+        icn: Patient ICN
+        cursor: Keyset cursor from the previous page
+        note_class, date_range, author, status, sort_order: Active filters
+        per_page: Notes per page
+
+    Returns:
+        HTML partial with note rows
+    """
+    try:
+        if date_range == '' or date_range == 'all':
+            date_range = None
+        elif isinstance(date_range, str):
+            try:
+                date_range = int(date_range)
+            except ValueError:
+                date_range = None
+
+        result = get_all_notes(
+            icn=icn,
+            note_class=note_class,
+            date_range=date_range,
+            author=author,
+            status=status,
+            sort_by='reference_datetime',
+            sort_order=sort_order,
+            limit=per_page,
+            cursor=cursor
+        )
+
+        return templates.TemplateResponse(
+            "partials/notes_table_rows.html",
+            {
+                "request": request,
+                "patient": {"icn": icn},
+                "notes": result["notes"],
+                "next_cursor": result["pagination"]["next_cursor"],
+                "note_class_filter": note_class,
+                "date_range_filter": date_range,
+                "author_filter": author,
+                "status_filter": status,
+                "sort_by": 'reference_datetime',
+                "sort_order": sort_order,
+                "per_page": per_page
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error loading more notes for {icn}: {e}")
+        return HTMLResponse(
+            content=f"<div class='error'>Error loading notes: {str(e)}</div>",
+            status_code=500
+        )
+
+
 @page_router.get("/patient/{icn}/notes/{note_id}/detail", response_class=HTMLResponse)
 async def get_note_detail_partial(request: Request, icn: str, note_id: int):
     """
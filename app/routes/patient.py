@@ -6,9 +6,10 @@
 # Returns HTML partials for HTMX swapping and JSON for API consumers.
 # ---------------------------------------------------------------------
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from typing import Optional
 import logging
 
 from app.utils.ccow_client import ccow_client
@@ -24,14 +25,43 @@ from app.db.patient_allergies import (
     get_patient_allergies,
     get_critical_allergies,
     get_allergy_details,
+    get_allergy_details_batch,
     get_allergy_count
 )
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
+from app.services.vista_prefetch import vista_prefetcher
+from config import VISTA_CONFIG
 
-router = APIRouter(prefix="/api/patient", tags=["patient"])
+router = APIRouter(prefix="/api/patient", tags=["patient"], default_response_class=FastJSONResponse)
 page_router = APIRouter(tags=["patient-pages"])  # For allergies full page routes
 templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
+# Session key for the last patient whose VistA data was prefetched
+PREFETCHED_ICN_SESSION_KEY = "vista_prefetched_icn"
+
+
+def prefetch_on_context_change(request: Request, icn: str) -> bool:
+    """
+    Prefetch a patient's VistA data when the session's patient changes.
+
+    /api/patient/current is requested on every page load, so only a
+    patient different from the session's last prefetched one is
+    scheduled; navigation for the same patient fetches nothing.
+
+    Args:
+        request: Incoming request (session holds the last prefetched ICN)
+        icn: Patient ICN now in context
+
+    Returns:
+        True if a prefetch was started
+    """
+    if request.session.get(PREFETCHED_ICN_SESSION_KEY) == icn:
+        return False
+    request.session[PREFETCHED_ICN_SESSION_KEY] = icn
+    return vista_prefetcher.schedule(icn)
+
 
 @router.get("/current", response_class=HTMLResponse)
 async def get_current_patient(request: Request):
@@ -60,6 +90,10 @@ async def get_current_patient(request: Request):
                 {"request": request, "patient": None}
             )
 
+        # Context may have been changed by another CCOW application; warm
+        # the VistA cache (no-op if this session's patient is unchanged)
+        prefetch_on_context_change(request, patient_id)
+
         return templates.TemplateResponse(
             "partials/patient_header.html",
             {"request": request, "patient": patient}
@@ -109,6 +143,9 @@ async def set_patient_context(request: Request):
             logger.error(f"Patient {icn} not found in database")
             raise HTTPException(status_code=404, detail="Patient not found")
 
+        # Start fetching today's VistA data before the clinician asks for it
+        prefetch_on_context_change(request, icn)
+
         return templates.TemplateResponse(
             "partials/patient_header.html",
             {"request": request, "patient": patient}
@@ -129,7 +166,7 @@ async def search_patients_endpoint(
 ):
     """
     Search for patients and return results partial.
-    Called via HTMX from patient search modal (hx-trigger="keyup changed delay:500ms").
+    Called via HTMX from patient search modal (hx-trigger="keyup changed delay:150ms").
 
     Supported search types: name, icn, edipi (NOT ssn per VA policy)
     """
@@ -395,6 +432,42 @@ async def get_patient_critical_allergies_json(icn: str, limit: int = 6):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/allergies/details")
+async def get_allergy_details_batch_json(
+    icn: str,
+    ids: str = Query(..., min_length=1)
+):
+    """
+    Get detailed information for several allergies in one request.
+    The allergies page calls this for its visible cards, so later
+    single-allergy detail requests are cache hits.
+
+    Args:
+        icn: Patient ICN (for security validation)
+        ids: Comma-separated allergy SIDs (up to 100)
+
+    Returns:
+        JSON with allergy details keyed by allergy_sid
+    """
+    try:
+        allergy_sids = [int(a) for a in ids.split(",") if a.strip()][:100]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+
+    try:
+        details = get_allergy_details_batch(icn, allergy_sids)
+
+        return {
+            "patient_icn": icn,
+            "count": len(details),
+            "allergies": details
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting allergy details batch for {icn}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{icn}/allergies/{allergy_sid}/details")
 async def get_allergy_details_json(icn: str, allergy_sid: int):
     """
@@ -532,10 +605,168 @@ async def get_allergies_page(request: Request, icn: str):
         )
 
 
+def _parse_vista_allergies(vista_results: dict) -> list:
+    """
+    Parse ORQQAL LIST responses into allergy records.
+
+    Args:
+        vista_results: Successful VistA responses (site -> RPC response string)
+
+    Returns:
+        List of allergy dicts in the PostgreSQL record shape
+    """
+    from app.services.realtime_overlay import parse_fileman_datetime
+
+    # Map site sta3n to site names
+    site_names = {
+        "200": "ALEXANDRIA",
+        "500": "ANCHORAGE",
+        "630": "PALO_ALTO"
+    }
+
+    # Parse Vista allergies from caret-delimited format
+    vista_allergies = []
+    for site_sta3n, response_text in vista_results.items():
+        # Skip error responses
+        if response_text.startswith("-1^"):
+            logger.warning(f"Vista error from site {site_sta3n}: {response_text}")
+            continue
+
+        # Parse each line (one allergy per line)
+        # Format: AllergenName^Severity^ReactionDateTime^Reactions^AllergyType^OriginatingSite^EnteredBy
+        for line in response_text.strip().split('\n'):
+            if not line:
+                continue
+
+            fields = line.split('^')
+            if len(fields) >= 7:
+                # Convert FileMan date to ISO format (YYYY-MM-DD HH:MM:SS)
+                reaction_dt = parse_fileman_datetime(fields[2])
+                reaction_datetime_iso = reaction_dt.strftime("%Y-%m-%d %H:%M:%S") if reaction_dt else fields[2]
+
+                # Map originating site to name
+                originating_site = fields[5]
+                originating_site_name = site_names.get(originating_site, f"Site {originating_site}")
+
+                # Generate clinical comment from allergy details
+                allergen = fields[0]
+                severity = fields[1]
+                reactions = fields[3]
+                allergy_type = fields[4]
+                entered_by = fields[6]
+
+                comment = f"{severity.capitalize()} {allergy_type.lower()} allergy to {allergen}. "
+                comment += f"Patient experienced {reactions.lower().replace(',', ', ')}. "
+                comment += f"Documented by {entered_by} at {originating_site_name}. "
+                comment += "Avoid administration of this allergen and cross-reactive substances."
+
+                vista_allergies.append({
+                    "allergen_local": fields[0],  # AllergenName
+                    "allergen_standardized": fields[0],  # Same as local for Vista
+                    "allergen_type": fields[4],  # AllergyType (DRUG, FOOD, ENVIRONMENTAL)
+                    "severity": fields[1],  # Severity
+                    "reactions": fields[3],  # Comma-separated reactions
+                    "origination_date": reaction_datetime_iso,  # Converted FileMan date
+                    "originating_site": originating_site,  # Site sta3n
+                    "originating_site_name": originating_site_name,  # Site name
+                    "originating_staff": fields[6],  # EnteredBy
+                    "historical_or_observed": "OBSERVED",  # Vista data is real-time (T-0)
+                    "verification_status": "VERIFIED",  # Vista data is verified
+                    "comment": comment,  # Generated clinical comment
+                    "data_source": "VistA",
+                    "source_system": "VistA",
+                    "is_active": True
+                })
+
+    return vista_allergies
+
+
+def _build_allergies_realtime_context(
+    request: Request,
+    patient: dict,
+    pg_allergies: list,
+    vista_results: dict,
+    target_sites: list
+) -> tuple:
+    """
+    Merge PostgreSQL history with VistA responses and build the refresh area context.
+
+    Shared by the realtime refresh endpoint and its progressive stream,
+    which calls it again as each site's response arrives.
+
+    Args:
+        patient: Patient demographics
+        pg_allergies: Historical allergies from PostgreSQL
+        vista_results: Successful VistA responses (site -> RPC response string)
+        target_sites: Sites queried
+
+    Returns:
+        (template context for partials/allergies_content.html, merge_stats)
+    """
+    from datetime import datetime
+
+    vista_allergies = _parse_vista_allergies(vista_results)
+
+    # Simple merge: Combine PG + Vista (no deduplication for allergies - clinical decision)
+    # Unlike vitals/encounters, allergies from different sites may legitimately differ
+    all_allergies = pg_allergies + vista_allergies
+
+    # Separate allergies by type
+    drug_allergies = [a for a in all_allergies if a["allergen_type"] == "DRUG"]
+    food_allergies = [a for a in all_allergies if a["allergen_type"] == "FOOD"]
+    environmental_allergies = [a for a in all_allergies if a["allergen_type"] == "ENVIRONMENTAL"]
+
+    # Recalculate counts from merged data
+    counts = {
+        "total": len(all_allergies),
+        "drug": len(drug_allergies),
+        "food": len(food_allergies),
+        "environmental": len(environmental_allergies),
+        "severe": len([a for a in all_allergies if a.get("severity") == "SEVERE"])
+    }
+
+    # Calculate data freshness (today's date after VistA refresh)
+    now = datetime.now()
+    data_current_through = now.strftime("%b %d, %Y")
+    last_updated = now.strftime("%I:%M %p")
+
+    # Calculate Vista success rate
+    successful_sites = len(vista_results)
+    total_sites_attempted = len(target_sites)
+    vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
+
+    merge_stats = {
+        "total_merged": len(all_allergies),
+        "pg_count": len(pg_allergies),
+        "vista_count": len(vista_allergies)
+    }
+    context = {
+        "request": request,
+        "patient": patient,
+        "allergies": all_allergies,
+        "drug_allergies": drug_allergies,
+        "food_allergies": food_allergies,
+        "environmental_allergies": environmental_allergies,
+        "total_count": counts["total"],
+        "drug_count": counts["drug"],
+        "food_count": counts["food"],
+        "environmental_count": counts["environmental"],
+        "severe_count": counts["severe"],
+        "vista_refreshed": True,
+        "data_current_through": data_current_through,
+        "last_updated": last_updated,
+        "vista_success_rate": vista_success_rate,
+        "vista_sites": target_sites,
+        "merge_stats": merge_stats
+    }
+    return context, merge_stats
+
+
 @page_router.post("/patient/{icn}/allergies/realtime", response_class=HTMLResponse)
 async def get_allergies_realtime(
     request: Request,
-    icn: str
+    icn: str,
+    handoff: Optional[str] = Query(None)
 ):
     """
     VistA real-time refresh endpoint for allergies.
@@ -550,7 +781,6 @@ async def get_allergies_realtime(
         HTML partial containing allergies content (all sections)
     """
     try:
-        from datetime import datetime
         logger.info(f"VistA realtime refresh requested for allergies - patient {icn}")
 
         # Get patient demographics
@@ -560,162 +790,52 @@ async def get_allergies_realtime(
             patient = {"icn": icn, "name_display": "Unknown Patient"}
 
         # Fetch real-time data from VistA
-        from app.services.vista_client import VistaClient
-        from app.services.realtime_overlay import parse_fileman_datetime
+        from app.services.vista_client import get_vista_client
 
-        vista_client = VistaClient()
+        vista_client = get_vista_client()
 
         # Get target sites for allergies (3 sites per domain policy)
         target_sites = vista_client.get_target_sites(icn, domain="allergies")
         logger.info(f"Querying {len(target_sites)} VistA sites for allergies: {target_sites}")
 
-        # Call ORQQAL LIST RPC at all target sites
-        vista_results_raw = await vista_client.call_rpc_multi_site(
-            sites=target_sites,
-            rpc_name="ORQQAL LIST",
-            params=[icn]
-        )
-
-        # Extract successful responses
-        vista_results = {}
-        for site_sta3n, result in vista_results_raw.items():
-            if result.get("success") and result.get("response"):
-                vista_results[site_sta3n] = result["response"]
+        from app.services.realtime_stream import refresh_handoff
 
-        logger.info(f"Vista query complete: {len(vista_results)} successful sites")
+        # Follow-up to a progressive refresh: reuse the stream's results
+        handed_off = refresh_handoff.take(handoff, "ORQQAL LIST", [icn])
+        if handed_off:
+            vista_results = handed_off["vista_results"]
+        else:
+            # Call ORQQAL LIST RPC at all target sites
+            vista_results_raw = await vista_client.call_rpc_multi_site(
+                sites=target_sites,
+                rpc_name="ORQQAL LIST",
+                params=[icn]
+            )
 
-        # Map site sta3n to site names
-        site_names = {
-            "200": "ALEXANDRIA",
-            "500": "ANCHORAGE",
-            "630": "PALO_ALTO"
-        }
+            # Extract successful responses
+            vista_results = {}
+            for site_sta3n, result in vista_results_raw.items():
+                if result.get("success") and result.get("response"):
+                    vista_results[site_sta3n] = result["response"]
 
-        # Parse Vista allergies from caret-delimited format
-        vista_allergies = []
-        for site_sta3n, response_text in vista_results.items():
-            # Skip error responses
-            if response_text.startswith("-1^"):
-                logger.warning(f"Vista error from site {site_sta3n}: {response_text}")
-                continue
-
-            # Parse each line (one allergy per line)
-            # Format: AllergenName^Severity^ReactionDateTime^Reactions^AllergyType^OriginatingSite^EnteredBy
-            for line in response_text.strip().split('\n'):
-                if not line:
-                    continue
-
-                fields = line.split('^')
-                if len(fields) >= 7:
-                    # Convert FileMan date to ISO format (YYYY-MM-DD HH:MM:SS)
-                    reaction_dt = parse_fileman_datetime(fields[2])
-                    reaction_datetime_iso = reaction_dt.strftime("%Y-%m-%d %H:%M:%S") if reaction_dt else fields[2]
-
-                    # Map originating site to name
-                    originating_site = fields[5]
-                    originating_site_name = site_names.get(originating_site, f"Site {originating_site}")
-
-                    # Generate clinical comment from allergy details
-                    allergen = fields[0]
-                    severity = fields[1]
-                    reactions = fields[3]
-                    allergy_type = fields[4]
-                    entered_by = fields[6]
-
-                    comment = f"{severity.capitalize()} {allergy_type.lower()} allergy to {allergen}. "
-                    comment += f"Patient experienced {reactions.lower().replace(',', ', ')}. "
-                    comment += f"Documented by {entered_by} at {originating_site_name}. "
-                    comment += "Avoid administration of this allergen and cross-reactive substances."
-
-                    vista_allergies.append({
-                        "allergen_local": fields[0],  # AllergenName
-                        "allergen_standardized": fields[0],  # Same as local for Vista
-                        "allergen_type": fields[4],  # AllergyType (DRUG, FOOD, ENVIRONMENTAL)
-                        "severity": fields[1],  # Severity
-                        "reactions": fields[3],  # Comma-separated reactions
-                        "origination_date": reaction_datetime_iso,  # Converted FileMan date
-                        "originating_site": originating_site,  # Site sta3n
-                        "originating_site_name": originating_site_name,  # Site name
-                        "originating_staff": fields[6],  # EnteredBy
-                        "historical_or_observed": "OBSERVED",  # Vista data is real-time (T-0)
-                        "verification_status": "VERIFIED",  # Vista data is verified
-                        "comment": comment,  # Generated clinical comment
-                        "data_source": "VistA",
-                        "source_system": "VistA",
-                        "is_active": True
-                    })
-
-        logger.info(f"Parsed {len(vista_allergies)} allergies from Vista")
+        logger.info(f"Vista query complete: {len(vista_results)} successful sites")
 
         # Get historical data from PostgreSQL (T-1 and earlier)
         pg_allergies = get_patient_allergies(icn)
 
-        # Simple merge: Combine PG + Vista (no deduplication for allergies - clinical decision)
-        # Unlike vitals/encounters, allergies from different sites may legitimately differ
-        all_allergies = pg_allergies + vista_allergies
-
-        logger.info(
-            f"Merge complete: {len(all_allergies)} total allergies "
-            f"({len(pg_allergies)} PG + {len(vista_allergies)} Vista)"
+        # Parse Vista allergies and merge with PostgreSQL (no deduplication)
+        context, merge_stats = _build_allergies_realtime_context(
+            request, patient, pg_allergies, vista_results, target_sites
         )
 
-        # Separate allergies by type
-        drug_allergies = [a for a in all_allergies if a["allergen_type"] == "DRUG"]
-        food_allergies = [a for a in all_allergies if a["allergen_type"] == "FOOD"]
-        environmental_allergies = [a for a in all_allergies if a["allergen_type"] == "ENVIRONMENTAL"]
-
-        # Recalculate counts from merged data
-        counts = {
-            "total": len(all_allergies),
-            "drug": len(drug_allergies),
-            "food": len(food_allergies),
-            "environmental": len(environmental_allergies),
-            "severe": len([a for a in all_allergies if a.get("severity") == "SEVERE"])
-        }
-
-        # Calculate data freshness (today's date after VistA refresh)
-        now = datetime.now()
-        data_current_through = now.strftime("%b %d, %Y")
-        last_updated = now.strftime("%I:%M %p")
-
-        # Calculate Vista success rate
-        successful_sites = len(vista_results)
-        total_sites_attempted = len(target_sites)
-        vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
-
         logger.info(
-            f"VistA refresh complete for {icn}: {len(all_allergies)} allergies "
-            f"({vista_success_rate} successful)"
+            f"Merge complete: {merge_stats['total_merged']} total allergies "
+            f"({merge_stats['pg_count']} PG + {merge_stats['vista_count']} Vista)"
         )
 
         # Return the allergies content partial (for HTMX outerHTML swap)
         # Note: This returns the refresh area + out-of-band freshness update
-        return templates.TemplateResponse(
-            "partials/allergies_content.html",
-            {
-                "request": request,
-                "patient": patient,
-                "allergies": all_allergies,
-                "drug_allergies": drug_allergies,
-                "food_allergies": food_allergies,
-                "environmental_allergies": environmental_allergies,
-                "total_count": counts["total"],
-                "drug_count": counts["drug"],
-                "food_count": counts["food"],
-                "environmental_count": counts["environmental"],
-                "severe_count": counts["severe"],
-                "vista_refreshed": True,
-                "data_current_through": data_current_through,
-                "last_updated": last_updated,
-                "vista_success_rate": vista_success_rate,
-                "vista_sites": target_sites,
-                "merge_stats": {
-                    "total_merged": len(all_allergies),
-                    "pg_count": len(pg_allergies),
-                    "vista_count": len(vista_allergies)
-                }
-            }
-        )
+        return templates.TemplateResponse("partials/allergies_content.html", context)
 
     except Exception as e:
         logger.error(f"Error during VistA refresh for allergies {icn}: {e}", exc_info=True)
@@ -739,11 +859,46 @@ async def get_allergies_realtime(
         )
 
 
+@page_router.get("/patient/{icn}/allergies/realtime/stream")
+async def stream_allergies_realtime(request: Request, icn: str):
+    """
+    Progressive VistA real-time refresh for allergies (Server-Sent Events).
+
+    Same partial as get_allergies_realtime(), but PostgreSQL history is
+    sent first and the refresh area is re-rendered as each site answers
+    (see app/services/realtime_stream.py).
+
+    Args:
+        icn: Patient ICN
+
+    Returns:
+        text/event-stream response of "swap" events, then "done"
+    """
+    if not VISTA_CONFIG["streaming"]:
+        raise HTTPException(status_code=404, detail="Progressive VistA refresh is disabled")
+
+    from app.services.vista_client import get_vista_client
+    from app.services.realtime_stream import stream_realtime_refresh
+
+    patient = get_patient_demographics(icn) or {"icn": icn, "name_display": "Unknown Patient"}
+    target_sites = get_vista_client().get_target_sites(icn, domain="allergies")
+    pg_allergies = get_patient_allergies(icn)
+
+    def build_context(vista_results: dict) -> dict:
+        return _build_allergies_realtime_context(request, patient, pg_allergies, vista_results, target_sites)[0]
+
+    return stream_realtime_refresh(
+        request, templates, "partials/allergies_content.html",
+        target_sites, "ORQQAL LIST", [icn], build_context
+    )
+
+
 # =========================================================================
 # Allergies Widget Route
 # =========================================================================
 
 @router.get("/dashboard/widget/allergies/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/allergies_widget.html", "allergies")
 async def get_allergies_widget(request: Request, icn: str):
     """
     Render allergies widget HTML partial for dashboard.
@@ -11,9 +11,11 @@ from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from typing import Optional
 import logging
+from datetime import datetime
 
 from app.db.patient_problems import (
     get_patient_problems,
+    get_problem_details,
     get_problems_summary,
     get_problems_grouped_by_category,
     get_charlson_score,
@@ -23,9 +25,12 @@ from app.db.patient_problems import (
 from app.db.patient import get_patient_demographics
 from app.utils.template_context import get_base_context
 from app.utils.ccow_client import ccow_client
+from app.utils.json_response import FastJSONResponse
+from app.services.fragment_cache import cached_fragment
+from config import VISTA_CONFIG
 
 # API router for problems endpoints
-router = APIRouter(prefix="/api/patient", tags=["problems"])
+router = APIRouter(prefix="/api/patient", tags=["problems"], default_response_class=FastJSONResponse)
 
 # Page router for full problems pages (no prefix for flexibility)
 page_router = APIRouter(tags=["problems-pages"])
@@ -202,6 +207,7 @@ async def get_chronic_conditions_endpoint(icn: str):
 
 
 @router.get("/dashboard/widget/problems/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/problems_widget.html", "problems")
 async def get_problems_widget(request: Request, icn: str):
     """
     Render problems widget HTML partial for dashboard.
@@ -286,6 +292,42 @@ async def get_problems_widget(request: Request, icn: str):
         )
 
 
+@router.get("/{icn}/problems/details")
+async def get_problem_details_batch_endpoint(
+    icn: str,
+    ids: str = Query(..., min_length=1)
+):
+    """
+    Get several problems by ID in one request.
+    The problems page calls this for its visible rows, so opening a
+    detail modal afterwards is a cache hit.
+
+    Args:
+        icn: Patient ICN
+        ids: Comma-separated problem IDs (up to 100)
+
+    Returns:
+        JSON with problem details keyed by problem_id
+    """
+    try:
+        problem_ids = [int(p) for p in ids.split(",") if p.strip()][:100]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+
+    try:
+        details = get_problem_details(icn, problem_ids)
+
+        return {
+            "patient_icn": icn,
+            "count": len(details),
+            "problems": details
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching problem details batch for {icn}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{icn}/problems/{problem_id}/detail", response_class=HTMLResponse)
 async def get_problem_detail(request: Request, icn: str, problem_id: int):
     """
@@ -300,9 +342,8 @@ async def get_problem_detail(request: Request, icn: str, problem_id: int):
         HTML partial with detailed problem information
     """
     try:
-        # Get all problems for patient and find the specific one
-        problems = get_patient_problems(icn)
-        problem = next((p for p in problems if p.get("problem_id") == problem_id), None)
+        # Indexed point lookup (or a cache hit after a list-page prefetch)
+        problem = get_problem_details(icn, [problem_id]).get(problem_id)
 
         if not problem:
             return templates.TemplateResponse(
@@ -528,13 +569,147 @@ async def patient_problems_page(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _build_problems_realtime_context(
+    request: Request,
+    patient: dict,
+    pg_problems: list,
+    vista_results: dict,
+    target_sites: list,
+    status: Optional[str],
+    category: Optional[str],
+    service_connected_only: bool
+) -> tuple:
+    """
+    Merge PostgreSQL history with VistA responses and build the refresh area context.
+
+    Shared by the realtime refresh endpoint and its progressive stream,
+    which calls it again as each site's response arrives.
+
+    Args:
+        patient: Patient demographics
+        pg_problems: Historical problems from PostgreSQL (all statuses)
+        vista_results: Successful VistA responses (site -> RPC response string)
+        target_sites: Sites queried
+        status: Filter by status (Active, Inactive, Resolved, or All)
+        category: Optional filter by ICD-10 category
+        service_connected_only: If True, show only service-connected problems
+
+    Returns:
+        (template context for partials/problems_refresh_area.html, merge_stats)
+    """
+    from datetime import datetime
+    from app.services.realtime_overlay import merge_problems_data
+
+    icn = patient["icn"]
+
+    # Merge PostgreSQL + Vista data
+    problems, merge_stats = merge_problems_data(pg_problems, vista_results, icn)
+
+    # Apply filters AFTER merge
+    filtered_problems = problems
+
+    if status and status != "All":
+        filtered_problems = [p for p in filtered_problems if p.get("problem_status") == status]
+
+    if category:
+        filtered_problems = [p for p in filtered_problems if p.get("icd10_category") == category]
+
+    if service_connected_only:
+        filtered_problems = [p for p in filtered_problems if p.get("service_connected")]
+
+    # Group by category
+    grouped = {}
+    for p in filtered_problems:
+        cat = p.get("icd10_category") or "Other"
+        if cat not in grouped:
+            grouped[cat] = []
+        grouped[cat].append(p)
+
+    # Calculate summary statistics from merged data (not just PostgreSQL)
+    total_active = sum(1 for p in problems if p.get("problem_status") == "Active")
+    total_chronic = sum(1 for p in problems if p.get("is_chronic"))
+    has_chf = any("CHF" in (p.get("problem_text") or "") or "heart failure" in (p.get("problem_text") or "").lower() for p in problems if p.get("problem_status") == "Active")
+    has_copd = any("COPD" in (p.get("problem_text") or "") or p.get("icd10_code", "").startswith("J44") for p in problems if p.get("problem_status") == "Active")
+    has_ckd = any("CKD" in (p.get("problem_text") or "") or "chronic kidney" in (p.get("problem_text") or "").lower() for p in problems if p.get("problem_status") == "Active")
+    has_diabetes = any("diabetes" in (p.get("problem_text") or "").lower() or p.get("icd10_code", "").startswith(("E10", "E11")) for p in problems if p.get("problem_status") == "Active")
+    has_critical_conditions = has_chf or has_copd or has_ckd or has_diabetes
+
+    # Calculate Charlson score from merged data
+    charlson_score = sum(p.get("charlson_weight", 0) for p in problems if p.get("charlson_condition"))
+
+    # Determine risk level
+    if charlson_score == 0:
+        risk_level = "None"
+        badge_class = "badge--success"
+    elif charlson_score <= 2:
+        risk_level = "Low"
+        badge_class = "badge--success"
+    elif charlson_score <= 4:
+        risk_level = "Moderate"
+        badge_class = "badge--warning"
+    elif charlson_score <= 6:
+        risk_level = "High"
+        badge_class = "badge--warning"
+    else:
+        risk_level = "Very High"
+        badge_class = "badge--danger"
+
+    # Get all unique categories for filter dropdown
+    all_categories = sorted(set(p.get("icd10_category") or "Other" for p in problems))
+
+    # Calculate data freshness (today's date after VistA refresh)
+    now = datetime.now()
+    data_current_through = now.strftime("%b %d, %Y")
+    last_updated = now.strftime("%I:%M %p")
+
+    # Calculate Vista success rate
+    successful_sites = len(vista_results)
+    total_sites_attempted = len(target_sites)
+    vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
+
+    context = {
+        "request": request,
+        "patient": patient,
+        "icn": icn,
+        "grouped_problems": grouped,
+        "category_count": len(grouped),
+        "total_problems": sum(len(probs) for probs in grouped.values()),
+        "charlson_score": charlson_score,
+        "risk_level": risk_level,
+        "badge_class": badge_class,
+        "total_active": total_active,
+        "total_chronic": total_chronic,
+        "has_chf": has_chf,
+        "has_copd": has_copd,
+        "has_ckd": has_ckd,
+        "has_diabetes": has_diabetes,
+        "has_critical_conditions": has_critical_conditions,
+        # Filters
+        "status_filter": status or "Active",
+        "category_filter": category,
+        "service_connected_filter": service_connected_only,
+        "all_categories": all_categories,
+        # Vista metadata
+        "vista_refreshed": True,
+        "vista_cached": True,  # Just cached the data!
+        "cache_sites": list(vista_results.keys()),  # Sites we cached from
+        "data_current_through": data_current_through,
+        "last_updated": last_updated,
+        "vista_success_rate": vista_success_rate,
+        "vista_sites": target_sites,
+        "merge_stats": merge_stats,
+    }
+    return context, merge_stats
+
+
 @page_router.get("/patient/{icn}/problems/realtime", response_class=HTMLResponse)
 async def get_problems_realtime(
     request: Request,
     icn: str,
     status: Optional[str] = Query("Active", description="Filter by status"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    service_connected_only: bool = Query(False, description="Service-connected only")
+    service_connected_only: bool = Query(False, description="Service-connected only"),
+    handoff: Optional[str] = Query(None)
 ):
     """
     VistA real-time refresh endpoint for problems.
@@ -552,7 +727,6 @@ async def get_problems_realtime(
         HTML partial containing problems content (filters + grouped problems)
     """
     try:
-        from datetime import datetime
         logger.info(f"VistA realtime refresh requested for problems - {icn}")
 
         # Get patient demographics for page title
@@ -562,39 +736,58 @@ async def get_problems_realtime(
             patient = {"icn": icn, "name_display": "Unknown Patient"}
 
         # Fetch real-time data from VistA
-        from app.services.vista_client import VistaClient
-        from app.services.realtime_overlay import merge_problems_data
+        from app.services.vista_client import get_vista_client
 
-        vista_client = VistaClient()
+        vista_client = get_vista_client()
 
         # Get target sites for problems (limit per domain policy)
         target_sites = vista_client.get_target_sites(icn, domain="problems")
         logger.info(f"Querying {len(target_sites)} VistA sites for problems: {target_sites}")
 
-        # Call ORQQPL LIST RPC at all target sites
-        vista_results_raw = await vista_client.call_rpc_multi_site(
-            sites=target_sites,
-            rpc_name="ORQQPL LIST",
-            params=[icn]
-        )
+        from app.services.vista_cache import VistaSessionCache
+        from app.services.realtime_overlay import append_vista_deltas
+        from app.services.realtime_stream import refresh_handoff
+
+        # Follow-up to a progressive refresh: reuse the stream's results
+        handed_off = refresh_handoff.take(handoff, "ORQQPL LIST", [icn])
+        if handed_off:
+            vista_results = handed_off["vista_results"]
+            refreshed_at = handed_off["refreshed_at"]
+            logger.info(f"Using progressive refresh results for {icn} ({len(vista_results)} sites)")
+        else:
+            # Sites refreshed earlier this session only need records since then
+            cached = VistaSessionCache.get_cached_data(request, icn, "problems")
+            since = VistaSessionCache.get_delta_since(cached, target_sites)
+            refreshed_at = datetime.now().isoformat()
+
+            # Call ORQQPL LIST RPC at all target sites
+            vista_results_raw = await vista_client.call_rpc_multi_site(
+                sites=target_sites,
+                rpc_name="ORQQPL LIST",
+                params=[icn],
+                since=since
+            )
 
-        # Extract successful responses (site -> response string)
-        vista_results = {}
-        for site, response in vista_results_raw.items():
-            if response.get("success"):
-                vista_results[site] = response.get("response", "")
-            else:
-                logger.warning(f"Vista RPC failed at site {site}: {response.get('error')}")
+            # Extract successful responses (site -> response string)
+            vista_results = {}
+            for site, response in vista_results_raw.items():
+                if response.get("success"):
+                    vista_results[site] = response.get("response", "")
+                else:
+                    logger.warning(f"Vista RPC failed at site {site}: {response.get('error')}")
+            if since:
+                vista_results = append_vista_deltas(vista_results, cached["vista_responses"], since)
 
         # Get historical data from PostgreSQL (T-1 and earlier)
         pg_problems = get_patient_problems(icn, status=None)  # Get all for merge
 
-        # Merge PostgreSQL + Vista data
-        problems, merge_stats = merge_problems_data(pg_problems, vista_results, icn)
+        # Merge PostgreSQL + Vista data, then filter, group and score
+        context, merge_stats = _build_problems_realtime_context(
+            request, patient, pg_problems, vista_results, target_sites,
+            status, category, service_connected_only
+        )
 
         # Cache Vista RPC responses (NOT merged data) to avoid cookie size limit
-        from app.services.vista_cache import VistaSessionCache
-
         # Store raw Vista responses (small - just strings), not merged data
         VistaSessionCache.set_cached_data(
             request=request,
@@ -602,7 +795,8 @@ async def get_problems_realtime(
             domain="problems",
             vista_responses=vista_results,  # Raw RPC response strings
             sites=list(vista_results.keys()),
-            stats=merge_stats
+            stats=merge_stats,
+            refreshed_at=refreshed_at
         )
 
         logger.info(
@@ -610,112 +804,60 @@ async def get_problems_realtime(
             f"({merge_stats['pg_count']} PG + {merge_stats['vista_count']} Vista) - Vista responses cached in session"
         )
 
-        # Apply filters AFTER merge
-        filtered_problems = problems
-
-        if status and status != "All":
-            filtered_problems = [p for p in filtered_problems if p.get("problem_status") == status]
-
-        if category:
-            filtered_problems = [p for p in filtered_problems if p.get("icd10_category") == category]
-
-        if service_connected_only:
-            filtered_problems = [p for p in filtered_problems if p.get("service_connected")]
-
-        # Group by category
-        grouped = {}
-        for p in filtered_problems:
-            cat = p.get("icd10_category") or "Other"
-            if cat not in grouped:
-                grouped[cat] = []
-            grouped[cat].append(p)
-
-        # Calculate summary statistics from merged data (not just PostgreSQL)
-        total_active = sum(1 for p in problems if p.get("problem_status") == "Active")
-        total_chronic = sum(1 for p in problems if p.get("is_chronic"))
-        has_chf = any("CHF" in (p.get("problem_text") or "") or "heart failure" in (p.get("problem_text") or "").lower() for p in problems if p.get("problem_status") == "Active")
-        has_copd = any("COPD" in (p.get("problem_text") or "") or p.get("icd10_code", "").startswith("J44") for p in problems if p.get("problem_status") == "Active")
-        has_ckd = any("CKD" in (p.get("problem_text") or "") or "chronic kidney" in (p.get("problem_text") or "").lower() for p in problems if p.get("problem_status") == "Active")
-        has_diabetes = any("diabetes" in (p.get("problem_text") or "").lower() or p.get("icd10_code", "").startswith(("E10", "E11")) for p in problems if p.get("problem_status") == "Active")
-        has_critical_conditions = has_chf or has_copd or has_ckd or has_diabetes
-
-        # Calculate Charlson score from merged data
-        charlson_score = sum(p.get("charlson_weight", 0) for p in problems if p.get("charlson_condition"))
-
-        # Determine risk level
-        if charlson_score == 0:
-            risk_level = "None"
-            badge_class = "badge--success"
-        elif charlson_score <= 2:
-            risk_level = "Low"
-            badge_class = "badge--success"
-        elif charlson_score <= 4:
-            risk_level = "Moderate"
-            badge_class = "badge--warning"
-        elif charlson_score <= 6:
-            risk_level = "High"
-            badge_class = "badge--warning"
-        else:
-            risk_level = "Very High"
-            badge_class = "badge--danger"
-
-        # Get all unique categories for filter dropdown
-        all_categories = sorted(set(p.get("icd10_category") or "Other" for p in problems))
-
-        # Calculate data freshness (today's date after VistA refresh)
-        now = datetime.now()
-        data_current_through = now.strftime("%b %d, %Y")
-        last_updated = now.strftime("%I:%M %p")
-
-        # Calculate Vista success rate
-        successful_sites = len(vista_results)
-        total_sites_attempted = len(target_sites)
-        vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
-
         logger.info(
-            f"VistA refresh complete for problems {icn}: {len(problems)} problems "
-            f"({vista_success_rate} successful)"
+            f"VistA refresh complete for problems {icn}: {merge_stats['total_merged']} problems "
+            f"({context['vista_success_rate']} successful)"
         )
 
         # Return only the content portion (for HTMX outerHTML swap)
-        return templates.TemplateResponse(
-            "partials/problems_refresh_area.html",
-            {
-                "request": request,
-                "patient": patient,
-                "icn": icn,
-                "grouped_problems": grouped,
-                "category_count": len(grouped),
-                "total_problems": sum(len(probs) for probs in grouped.values()),
-                "charlson_score": charlson_score,
-                "risk_level": risk_level,
-                "badge_class": badge_class,
-                "total_active": total_active,
-                "total_chronic": total_chronic,
-                "has_chf": has_chf,
-                "has_copd": has_copd,
-                "has_ckd": has_ckd,
-                "has_diabetes": has_diabetes,
-                "has_critical_conditions": has_critical_conditions,
-                # Filters
-                "status_filter": status or "Active",
-                "category_filter": category,
-                "service_connected_filter": service_connected_only,
-                "all_categories": all_categories,
-                # Vista metadata
-                "vista_refreshed": True,
-                "vista_cached": True,  # Just cached the data!
-                "cache_sites": list(vista_results.keys()),  # Sites we cached from
-                "data_current_through": data_current_through,
-                "last_updated": last_updated,
-                "vista_success_rate": vista_success_rate,
-                "vista_sites": target_sites,
-                "merge_stats": merge_stats,
-            }
-        )
+        return templates.TemplateResponse("partials/problems_refresh_area.html", context)
 
     except Exception as e:
         logger.error(f"Error during VistA refresh for problems {icn}: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@page_router.get("/patient/{icn}/problems/realtime/stream")
+async def stream_problems_realtime(
+    request: Request,
+    icn: str,
+    status: Optional[str] = Query("Active", description="Filter by status"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    service_connected_only: bool = Query(False, description="Service-connected only")
+):
+    """
+    Progressive VistA real-time refresh for problems (Server-Sent Events).
+
+    Same parameters and partial as get_problems_realtime(), but
+    PostgreSQL history is sent first and the refresh area is re-rendered
+    as each site answers (see app/services/realtime_stream.py).
+
+    Returns:
+        text/event-stream response of "swap" events, then "done"
+    """
+    if not VISTA_CONFIG["streaming"]:
+        raise HTTPException(status_code=404, detail="Progressive VistA refresh is disabled")
+
+    from app.services.vista_client import get_vista_client
+    from app.services.realtime_stream import stream_realtime_refresh
+    from app.services.vista_cache import VistaSessionCache
+
+    patient = get_patient_demographics(icn) or {"icn": icn, "name_display": "Unknown Patient"}
+    target_sites = get_vista_client().get_target_sites(icn, domain="problems")
+    cached = VistaSessionCache.get_cached_data(request, icn, "problems")
+    since = VistaSessionCache.get_delta_since(cached, target_sites)
+    pg_problems = get_patient_problems(icn, status=None)  # Get all for merge
+
+    def build_context(vista_results: dict) -> dict:
+        return _build_problems_realtime_context(
+            request, patient, pg_problems, vista_results, target_sites,
+            status, category, service_connected_only
+        )[0]
+
+    return stream_realtime_refresh(
+        request, templates, "partials/problems_refresh_area.html",
+        target_sites, "ORQQPL LIST", [icn], build_context,
+        since=since, cached_responses=cached["vista_responses"] if since else None
+    )
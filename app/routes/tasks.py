@@ -7,9 +7,10 @@
 # ---------------------------------------------------------------------
 
 from fastapi import APIRouter, HTTPException, Request, Query, Form
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import Optional
+import asyncio
 import logging
 
 from app.db.patient_tasks import (
@@ -23,11 +24,15 @@ from app.db.patient_tasks import (
     get_task_summary
 )
 from app.db.patient import get_patient_demographics
+from app.db.pagination import build_page
 from app.utils.template_context import get_base_context
 from app.utils.ccow_client import ccow_client
+from app.utils.json_response import FastJSONResponse
+from app.services.task_events import format_sse, task_event_hub
+from config import TASK_EVENTS_CONFIG
 
 # API router for tasks endpoints
-router = APIRouter(prefix="/api/patient", tags=["tasks"])
+router = APIRouter(prefix="/api/patient", tags=["tasks"], default_response_class=FastJSONResponse)
 
 # Page router for full task pages (no prefix for flexibility)
 page_router = APIRouter(tags=["tasks-pages"])
@@ -46,7 +51,8 @@ async def get_patient_tasks_endpoint(
     status: Optional[str] = Query(None, description="Filter by status (active, TODO, IN_PROGRESS, COMPLETED)"),
     created_by: Optional[str] = Query(None, description="Filter by creator user_id"),
     priority: Optional[str] = Query(None, description="Filter by priority (HIGH, MEDIUM, LOW)"),
-    limit: Optional[int] = Query(None, ge=1, le=100, description="Max tasks to return")
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Max tasks to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous response (requires limit)")
 ):
     """
     Get all tasks for a patient with optional filtering.
@@ -57,6 +63,7 @@ async def get_patient_tasks_endpoint(
         created_by: Optional filter by creator user_id
         priority: Optional filter by priority (HIGH, MEDIUM, LOW)
         limit: Maximum number of tasks to return
+        cursor: Keyset cursor from the previous page
 
     Returns:
         JSON with list of patient tasks
@@ -67,12 +74,17 @@ async def get_patient_tasks_endpoint(
             status=status,
             created_by_user_id=created_by,
             priority=priority,
-            limit=limit
+            limit=limit + 1 if limit else None,
+            cursor=cursor
         )
+        next_cursor = None
+        if limit:
+            tasks, next_cursor = build_page(tasks, limit, "priority", "created_at", "task_id")
 
         return {
             "patient_icn": icn,
             "count": len(tasks),
+            "next_cursor": next_cursor,
             "filters": {
                 "status": status,
                 "created_by": created_by,
@@ -113,6 +125,51 @@ async def get_tasks_summary_endpoint(icn: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/tasks/events")
+async def task_events_endpoint(request: Request, icn: str):
+    """
+    Server-Sent Events stream of task changes for a patient.
+
+    Pushes a "tasks-changed" event whenever any user creates, edits,
+    completes or deletes one of the patient's tasks, so task views refresh
+    without polling. Bursts are coalesced into one event.
+
+    Args:
+        icn: Integrated Care Number
+
+    Returns:
+        text/event-stream response (kept open until the browser disconnects)
+    """
+    if not TASK_EVENTS_CONFIG["enabled"]:
+        raise HTTPException(status_code=404, detail="Live task updates are disabled")
+
+    heartbeat = TASK_EVENTS_CONFIG["heartbeat_seconds"]
+    queue = task_event_hub.subscribe(icn)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                # Coalesce a burst (e.g., bulk edits) into one refresh
+                while not queue.empty():
+                    event = queue.get_nowait()
+                yield format_sse("tasks-changed", event)
+        finally:
+            task_event_hub.unsubscribe(icn, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{icn}/tasks")
 async def create_task_endpoint(
     request: Request,
@@ -18,13 +18,21 @@ from app.db.vitals import (
     get_patient_vitals,
     get_recent_vitals,
     get_vital_type_history,
-    get_vital_counts
+    get_vital_trend_points,
+    get_vital_counts,
+    get_vitals_page_counts,
+    stream_vitals_page
 )
 from app.db.patient import get_patient_demographics
 from app.utils.template_context import get_base_context
+from app.utils.json_response import FastJSONResponse
+from app.utils.streaming import stream_template
+from app.services.downsample import build_trend_payload, parse_window_bound
+from app.services.fragment_cache import cached_fragment
+from config import VISTA_CONFIG
 
 # API router for vitals endpoints
-router = APIRouter(prefix="/api/patient", tags=["vitals"])
+router = APIRouter(prefix="/api/patient", tags=["vitals"], default_response_class=FastJSONResponse)
 
 # Page router for full vitals pages (no prefix for flexibility)
 page_router = APIRouter(tags=["vitals-pages"])
@@ -32,6 +40,9 @@ page_router = APIRouter(tags=["vitals-pages"])
 templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
+# Newest vitals (all types) shown on the full vitals page
+VITALS_PAGE_LIMIT = 500
+
 
 @router.get("/{icn}/vitals")
 async def get_patient_vitals_endpoint(
@@ -53,11 +64,12 @@ async def get_patient_vitals_endpoint(
     try:
         vitals = get_patient_vitals(icn, limit=limit, vital_type=vital_type)
 
-        return {
+        # Rows are already JSON-ready; skip FastAPI's jsonable_encoder pass
+        return FastJSONResponse({
             "patient_icn": icn,
             "count": len(vitals),
             "vitals": vitals
-        }
+        })
 
     except Exception as e:
         logger.error(f"Error fetching vitals for {icn}: {e}")
@@ -124,7 +136,65 @@ async def get_vital_history_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{icn}/vitals/{vital_type}/trend")
+async def get_vital_trend_endpoint(
+    icn: str,
+    vital_type: str,
+    width: int = Query(600, ge=10, le=4000),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    method: str = Query("lttb", regex="^(lttb|minmax)$")
+):
+    """
+    Get a downsampled trend series for charting.
+
+    Returns about one point per pixel of chart width, however many
+    measurements the patient has. Charts refetch with start/end when the
+    user zooms to a narrower window, which yields more detail.
+
+    Args:
+        icn: Integrated Care Number
+        vital_type: Vital type (e.g., "BLOOD PRESSURE", "WEIGHT")
+        width: Chart width in pixels (target number of points)
+        start: Optional window start (ISO date or datetime)
+        end: Optional window end (ISO date or datetime)
+        method: "lttb" (default) or "minmax" bucketing
+
+    Returns:
+        Columnar JSON: "t" (epoch ms) and parallel arrays under "series"
+        ("systolic"/"diastolic" for blood pressure, otherwise "value")
+    """
+    try:
+        window_start = parse_window_bound(start)
+        window_end = parse_window_bound(end, end=True)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be ISO dates or datetimes")
+
+    try:
+        points = get_vital_trend_points(icn, vital_type, start=window_start, end=window_end)
+
+        if any(v is not None for v in points["systolic"]):
+            series = {"systolic": points["systolic"], "diastolic": points["diastolic"]}
+        else:
+            series = {"value": points["numeric_value"]}
+
+        payload = build_trend_payload(points["t"], series, width, method)
+        payload.update({
+            "patient_icn": icn,
+            "vital_type": vital_type,
+            "unit": points["unit"],
+            "start": start,
+            "end": end,
+        })
+        return FastJSONResponse(payload)
+
+    except Exception as e:
+        logger.error(f"Error fetching vital trend for {icn}, type {vital_type}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/dashboard/widget/vitals/{icn}", response_class=HTMLResponse)
+@cached_fragment(templates, "partials/vitals_widget.html", "vitals")
 async def get_vitals_widget(request: Request, icn: str):
     """
     Render vitals widget HTML partial for dashboard.
@@ -234,19 +304,71 @@ async def get_vitals_page(
                 )
             )
 
-        # Get PostgreSQL vitals (limit 500 for page view)
-        vitals = get_patient_vitals(icn, limit=500, vital_type=None)  # Get all types for potential merge
-
         # Check if we have cached Vista responses to merge with PG data
         from app.services.vista_cache import VistaSessionCache
         vitals_cache = VistaSessionCache.get_cached_data(request, icn, "vitals")
 
-        if vitals_cache and "vista_responses" in vitals_cache:
-            # Merge PG data with cached Vista responses
-            from app.services.realtime_overlay import merge_vitals_data
-            logger.info(f"Merging PG data with cached Vista responses from sites: {vitals_cache.get('sites')}")
-            vitals, merge_stats = merge_vitals_data(vitals, vitals_cache["vista_responses"], icn)
-            logger.info(f"Merged: {merge_stats['total_merged']} vitals ({merge_stats['pg_count']} PG + {merge_stats['vista_count']} Vista)")
+        # Calculate data freshness
+        if vitals_cache:
+            # We have Vista data - current through today
+            now = datetime.now()
+            data_current_through = now.strftime("%b %d, %Y")
+            data_freshness_label = "today"
+        else:
+            # PostgreSQL only - current through yesterday
+            yesterday = datetime.now() - timedelta(days=1)
+            data_current_through = yesterday.strftime("%b %d, %Y")
+            data_freshness_label = "yesterday"
+
+        vista_cached = vitals_cache is not None
+
+        if not (vitals_cache and "vista_responses" in vitals_cache):
+            # PostgreSQL only: filter/sort in SQL and stream rows from a
+            # server-side cursor while the page renders
+            counts = get_vitals_page_counts(icn, limit=VITALS_PAGE_LIMIT, vital_type=vital_type)
+            total_count = sum(counts.values())
+            logger.info(f"Streaming vitals page for {icn}: {total_count} vitals, filter={vital_type}, sort={sort_by} {sort_order}")
+
+            return stream_template(
+                templates,
+                "patient_vitals.html",
+                get_base_context(
+                    request,
+                    patient=patient,
+                    vitals=stream_vitals_page(
+                        icn,
+                        limit=VITALS_PAGE_LIMIT,
+                        vital_type=vital_type,
+                        sort_by=sort_by,
+                        sort_order=sort_order
+                    ),
+                    counts=counts,
+                    vital_type_filter=vital_type,
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    total_count=total_count,
+                    active_page="vitals",
+                    data_current_through=data_current_through,
+                    data_freshness_label=data_freshness_label,
+                    vista_refreshed=False,
+                    vista_cached=vista_cached,
+                    cache_age=vitals_cache.get("timestamp") if vitals_cache else None,
+                    cache_sites=vitals_cache.get("sites") if vitals_cache else []
+                )
+            )
+
+        # Merge PostgreSQL vitals (page window, all types) with cached Vista
+        # responses; repeat views reuse the memoized merge
+        from app.services.realtime_overlay import merge_vitals_data
+        from app.services.merged_view_cache import merged_view_cache
+        logger.info(f"Merging PG data with cached Vista responses from sites: {vitals_cache.get('sites')}")
+        vitals, merge_stats = merged_view_cache.get_or_merge(
+            icn, "vitals", ("vitals",), vitals_cache["vista_responses"],
+            load_pg=lambda: get_patient_vitals(icn, limit=VITALS_PAGE_LIMIT, vital_type=None),
+            merge=merge_vitals_data,
+            variant=(VITALS_PAGE_LIMIT,)
+        )
+        logger.info(f"Merged: {merge_stats['total_merged']} vitals ({merge_stats['pg_count']} PG + {merge_stats['vista_count']} Vista)")
 
         # Apply vital_type filter AFTER merge (if specified)
         if vital_type:
@@ -285,20 +407,6 @@ async def get_vitals_page(
 
         logger.info(f"Loaded vitals page for {icn}: {len(vitals)} vitals, filter={vital_type}, sort={sort_by} {sort_order}")
 
-        # Calculate data freshness
-        if vitals_cache:
-            # We have Vista data - current through today
-            now = datetime.now()
-            data_current_through = now.strftime("%b %d, %Y")
-            data_freshness_label = "today"
-        else:
-            # PostgreSQL only - current through yesterday
-            yesterday = datetime.now() - timedelta(days=1)
-            data_current_through = yesterday.strftime("%b %d, %Y")
-            data_freshness_label = "yesterday"
-
-        vista_cached = vitals_cache is not None
-
         return templates.TemplateResponse(
             "patient_vitals.html",
             get_base_context(
@@ -333,13 +441,99 @@ async def get_vitals_page(
         )
 
 
+def _build_vitals_realtime_context(
+    request: Request,
+    patient: dict,
+    pg_vitals: list,
+    vista_results: dict,
+    target_sites: list,
+    vital_type: Optional[str],
+    sort_by: str,
+    sort_order: str
+) -> tuple:
+    """
+    Merge PostgreSQL history with VistA responses and build the refresh area context.
+
+    Shared by the realtime refresh endpoint and its progressive stream,
+    which calls it again as each site's response arrives.
+
+    Args:
+        patient: Patient demographics
+        pg_vitals: Historical vitals from PostgreSQL (all types)
+        vista_results: Successful VistA responses (site -> RPC response string)
+        target_sites: Sites queried
+        vital_type: Optional filter by vital type
+        sort_by: Column to sort by
+        sort_order: Sort order (asc or desc)
+
+    Returns:
+        (template context for partials/vitals_refresh_area.html, merge_stats)
+    """
+    from app.services.realtime_overlay import merge_vitals_data
+
+    # Merge PostgreSQL + Vista data
+    vitals, merge_stats = merge_vitals_data(pg_vitals, vista_results, patient["icn"])
+
+    # Apply vital_type filter AFTER merge (if specified)
+    if vital_type:
+        vitals = [v for v in vitals if v.get("vital_type") == vital_type]
+
+    # Recalculate counts from merged data
+    counts = {}
+    for vital in vitals:
+        abbr = vital.get("vital_abbr")
+        if abbr:
+            counts[abbr] = counts.get(abbr, 0) + 1
+
+    # Sort vitals (same logic as initial page load)
+    reverse = (sort_order == "desc")
+    if sort_by == "taken_datetime":
+        vitals = sorted(vitals, key=lambda v: v.get("taken_datetime") or "", reverse=reverse)
+    elif sort_by == "vital_type":
+        vitals = sorted(vitals, key=lambda v: v.get("vital_type") or "", reverse=reverse)
+    elif sort_by == "abnormal_flag":
+        flag_order = {"CRITICAL": 4, "HIGH": 3, "LOW": 2, "NORMAL": 1, None: 0}
+        vitals = sorted(vitals, key=lambda v: flag_order.get(v.get("abnormal_flag"), 0), reverse=reverse)
+
+    # Calculate data freshness (today's date after VistA refresh)
+    now = datetime.now()
+    data_current_through = now.strftime("%b %d, %Y")
+    last_updated = now.strftime("%I:%M %p")
+
+    # Calculate Vista success rate
+    successful_sites = len(vista_results)
+    total_sites_attempted = len(target_sites)
+    vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
+
+    context = {
+        "request": request,
+        "patient": patient,
+        "vitals": vitals,
+        "counts": counts,
+        "vital_type_filter": vital_type,
+        "sort_by": sort_by,
+        "sort_order": sort_order,
+        "total_count": len(vitals),
+        "vista_refreshed": True,
+        "vista_cached": True,  # Just cached the data!
+        "cache_sites": list(vista_results.keys()),  # Sites we cached from
+        "data_current_through": data_current_through,
+        "last_updated": last_updated,
+        "vista_success_rate": vista_success_rate,
+        "vista_sites": target_sites,
+        "merge_stats": merge_stats,
+    }
+    return context, merge_stats
+
+
 @page_router.get("/patient/{icn}/vitals/realtime", response_class=HTMLResponse)
 async def get_vitals_realtime(
     request: Request,
     icn: str,
     vital_type: Optional[str] = None,
     sort_by: Optional[str] = Query("taken_datetime", regex="^(taken_datetime|vital_type|abnormal_flag|data_source)$"),
-    sort_order: Optional[str] = Query("desc", regex="^(asc|desc|cerner)$")
+    sort_order: Optional[str] = Query("desc", regex="^(asc|desc|cerner)$"),
+    handoff: Optional[str] = Query(None)
 ):
     """
     VistA real-time refresh endpoint.
@@ -366,39 +560,57 @@ async def get_vitals_realtime(
             patient = {"icn": icn, "name_display": "Unknown Patient"}
 
         # Fetch real-time data from VistA
-        from app.services.vista_client import VistaClient
-        from app.services.realtime_overlay import merge_vitals_data
+        from app.services.vista_client import get_vista_client
 
-        vista_client = VistaClient()
+        vista_client = get_vista_client()
 
         # Get target sites for vitals (limit 2 sites per domain policy)
         target_sites = vista_client.get_target_sites(icn, domain="vitals")
         logger.info(f"Querying {len(target_sites)} VistA sites for vitals: {target_sites}")
 
-        # Call GMV LATEST VM RPC at all target sites
-        vista_results_raw = await vista_client.call_rpc_multi_site(
-            sites=target_sites,
-            rpc_name="GMV LATEST VM",
-            params=[icn]
-        )
+        from app.services.vista_cache import VistaSessionCache
+        from app.services.realtime_overlay import append_vista_deltas
+        from app.services.realtime_stream import refresh_handoff
+
+        # Follow-up to a progressive refresh: reuse the stream's results
+        handed_off = refresh_handoff.take(handoff, "GMV LATEST VM", [icn])
+        if handed_off:
+            vista_results = handed_off["vista_results"]
+            refreshed_at = handed_off["refreshed_at"]
+            logger.info(f"Using progressive refresh results for {icn} ({len(vista_results)} sites)")
+        else:
+            # Sites refreshed earlier this session only need records since then
+            cached = VistaSessionCache.get_cached_data(request, icn, "vitals")
+            since = VistaSessionCache.get_delta_since(cached, target_sites)
+            refreshed_at = datetime.now().isoformat()
+
+            # Call GMV LATEST VM RPC at all target sites
+            vista_results_raw = await vista_client.call_rpc_multi_site(
+                sites=target_sites,
+                rpc_name="GMV LATEST VM",
+                params=[icn],
+                since=since
+            )
 
-        # Extract successful responses (site -> response string)
-        vista_results = {}
-        for site, response in vista_results_raw.items():
-            if response.get("success"):
-                vista_results[site] = response.get("response", "")
-            else:
-                logger.warning(f"Vista RPC failed at site {site}: {response.get('error')}")
+            # Extract successful responses (site -> response string)
+            vista_results = {}
+            for site, response in vista_results_raw.items():
+                if response.get("success"):
+                    vista_results[site] = response.get("response", "")
+                else:
+                    logger.warning(f"Vista RPC failed at site {site}: {response.get('error')}")
+            if since:
+                vista_results = append_vista_deltas(vista_results, cached["vista_responses"], since)
 
         # Get historical data from PostgreSQL (T-1 and earlier)
         pg_vitals = get_patient_vitals(icn, limit=500, vital_type=None)  # Get all types for merge
 
-        # Merge PostgreSQL + Vista data
-        vitals, merge_stats = merge_vitals_data(pg_vitals, vista_results, icn)
+        # Merge PostgreSQL + Vista data, then filter, count and sort
+        context, merge_stats = _build_vitals_realtime_context(
+            request, patient, pg_vitals, vista_results, target_sites, vital_type, sort_by, sort_order
+        )
 
         # Cache Vista RPC responses (NOT merged data) to avoid cookie size limit
-        from app.services.vista_cache import VistaSessionCache
-
         # Store raw Vista responses (small - just strings), not merged data (large - 315+ records)
         VistaSessionCache.set_cached_data(
             request=request,
@@ -406,7 +618,8 @@ async def get_vitals_realtime(
             domain="vitals",
             vista_responses=vista_results,  # Raw RPC response strings
             sites=list(vista_results.keys()),
-            stats=merge_stats
+            stats=merge_stats,
+            refreshed_at=refreshed_at
         )
 
         logger.info(
@@ -414,65 +627,14 @@ async def get_vitals_realtime(
             f"({merge_stats['pg_count']} PG + {merge_stats['vista_count']} Vista) - Vista responses cached in session"
         )
 
-        # Apply vital_type filter AFTER merge (if specified)
-        if vital_type:
-            vitals = [v for v in vitals if v.get("vital_type") == vital_type]
-
-        # Recalculate counts from merged data
-        counts = {}
-        for vital in vitals:
-            abbr = vital.get("vital_abbr")
-            if abbr:
-                counts[abbr] = counts.get(abbr, 0) + 1
-
-        # Sort vitals (same logic as initial page load)
-        reverse = (sort_order == "desc")
-        if sort_by == "taken_datetime":
-            vitals = sorted(vitals, key=lambda v: v.get("taken_datetime") or "", reverse=reverse)
-        elif sort_by == "vital_type":
-            vitals = sorted(vitals, key=lambda v: v.get("vital_type") or "", reverse=reverse)
-        elif sort_by == "abnormal_flag":
-            flag_order = {"CRITICAL": 4, "HIGH": 3, "LOW": 2, "NORMAL": 1, None: 0}
-            vitals = sorted(vitals, key=lambda v: flag_order.get(v.get("abnormal_flag"), 0), reverse=reverse)
-
-        # Calculate data freshness (today's date after VistA refresh)
-        now = datetime.now()
-        data_current_through = now.strftime("%b %d, %Y")
-        last_updated = now.strftime("%I:%M %p")
-
-        # Calculate Vista success rate
-        successful_sites = len(vista_results)
-        total_sites_attempted = len(target_sites)
-        vista_success_rate = f"{successful_sites} of {total_sites_attempted} sites" if total_sites_attempted > 0 else "no sites"
-
         logger.info(
-            f"VistA refresh complete for {icn}: {len(vitals)} vitals "
-            f"({vista_success_rate} successful)"
+            f"VistA refresh complete for {icn}: {context['total_count']} vitals "
+            f"({context['vista_success_rate']} successful)"
         )
 
         # Return only the content portion (for HTMX outerHTML swap)
         # Note: This returns the refresh area + out-of-band freshness update
-        return templates.TemplateResponse(
-            "partials/vitals_refresh_area.html",
-            {
-                "request": request,
-                "patient": patient,
-                "vitals": vitals,
-                "counts": counts,
-                "vital_type_filter": vital_type,
-                "sort_by": sort_by,
-                "sort_order": sort_order,
-                "total_count": len(vitals),
-                "vista_refreshed": True,
-                "vista_cached": True,  # Just cached the data!
-                "cache_sites": list(vista_results.keys()),  # Sites we cached from
-                "data_current_through": data_current_through,
-                "last_updated": last_updated,
-                "vista_success_rate": vista_success_rate,
-                "vista_sites": target_sites,
-                "merge_stats": merge_stats,
-            }
-        )
+        return templates.TemplateResponse("partials/vitals_refresh_area.html", context)
 
     except Exception as e:
         logger.error(f"Error in VistA realtime refresh for {icn}: {e}")
@@ -500,3 +662,46 @@ async def get_vitals_realtime(
                 "vista_refreshed": False,
             }
         )
+
+
+@page_router.get("/patient/{icn}/vitals/realtime/stream")
+async def stream_vitals_realtime(
+    request: Request,
+    icn: str,
+    vital_type: Optional[str] = None,
+    sort_by: Optional[str] = Query("taken_datetime", regex="^(taken_datetime|vital_type|abnormal_flag|data_source)$"),
+    sort_order: Optional[str] = Query("desc", regex="^(asc|desc|cerner)$")
+):
+    """
+    Progressive VistA real-time refresh (Server-Sent Events).
+
+    Same parameters and partial as get_vitals_realtime(), but PostgreSQL
+    history is sent first and the refresh area is re-rendered as each
+    site answers (see app/services/realtime_stream.py).
+
+    Returns:
+        text/event-stream response of "swap" events, then "done"
+    """
+    if not VISTA_CONFIG["streaming"]:
+        raise HTTPException(status_code=404, detail="Progressive VistA refresh is disabled")
+
+    from app.services.vista_client import get_vista_client
+    from app.services.realtime_stream import stream_realtime_refresh
+    from app.services.vista_cache import VistaSessionCache
+
+    patient = get_patient_demographics(icn) or {"icn": icn, "name_display": "Unknown Patient"}
+    target_sites = get_vista_client().get_target_sites(icn, domain="vitals")
+    cached = VistaSessionCache.get_cached_data(request, icn, "vitals")
+    since = VistaSessionCache.get_delta_since(cached, target_sites)
+    pg_vitals = get_patient_vitals(icn, limit=500, vital_type=None)  # Get all types for merge
+
+    def build_context(vista_results: dict) -> dict:
+        return _build_vitals_realtime_context(
+            request, patient, pg_vitals, vista_results, target_sites, vital_type, sort_by, sort_order
+        )[0]
+
+    return stream_realtime_refresh(
+        request, templates, "partials/vitals_refresh_area.html",
+        target_sites, "GMV LATEST VM", [icn], build_context,
+        since=since, cached_responses=cached["vista_responses"] if since else None
+    )
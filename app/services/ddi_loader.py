@@ -21,21 +21,17 @@ import pandas as pd
 import logging
 from typing import Optional
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
 
-from config import DATABASE_URL
+from app.db.engines import read_engine
 
 logger = logging.getLogger(__name__)
 
 # Module-level cache for DDI reference data
 _ddi_cache: Optional[pd.DataFrame] = None
 
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,
-    echo=False,
-)
+# Reference data is read-only: replica when configured, else primary
+engine = read_engine
 
 
 def get_ddi_reference(force_reload: bool = False) -> pd.DataFrame:
@@ -91,7 +87,8 @@ def get_ddi_reference(force_reload: bool = False) -> pd.DataFrame:
         """)
 
         with engine.connect() as conn:
-            df_pandas = pd.read_sql_query(query, conn)
+            result = conn.execute(query)
+            df_pandas = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
 
         # Validate required columns exist
         required_columns = ['drug_1', 'drug_2', 'interaction_description']
@@ -0,0 +1,191 @@
+"""
+Trend Chart Downsampling
+
+Reduces long clinical time series (decades of inpatient vitals, years of
+lab results) to roughly one point per horizontal pixel before they are
+sent to the browser.
+
+Methods:
+- lttb: Largest-Triangle-Three-Buckets; keeps the visually significant
+  points of each series (default, best for line charts)
+- minmax: time-based buckets (one per two pixels) keeping each bucket's
+  minimum and maximum, so no spike or trough is ever dropped
+
+Payloads are columnar: a shared "t" array of epoch milliseconds plus one
+parallel value array per series, instead of one object per point.
+
+Used by the /api/patient/{icn}/vitals/{vital_type}/trend and
+/api/patient/{icn}/labs/{lab_test_name}/trend endpoints.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets point selection.
+
+    Args:
+        x: Sorted x values (e.g., epoch ms)
+        y: Values (finite)
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices of the selected points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points (first/last always kept)
+    edges = (np.floor(np.arange(threshold - 1) * ((n - 2) / (threshold - 2))) + 1).astype(np.int64)
+    edges[-1] = n - 1
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            # Average of the next bucket
+            next_end = edges[i + 2]
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            # Last bucket: anchor on the final point
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - avg_x) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y - ay))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    Min/max bucketing: split the time range into equal-width buckets and
+    keep the minimum and maximum point of each.
+
+    Returns:
+        Sorted indices of the selected points (first and last always kept)
+    """
+    n = len(x)
+    if buckets < 1 or n <= 2 * buckets:
+        return np.arange(n)
+
+    edges = np.linspace(x[0], x[-1], buckets + 1)
+    bucket = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, buckets - 1)
+
+    # Sort by (bucket, value): first row of each bucket is its min, last its max
+    order = np.lexsort((y, bucket))
+    sorted_buckets = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    return np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+
+
+def downsample_indices(t: np.ndarray, values: Dict[str, np.ndarray], width: int, method: str = "lttb") -> np.ndarray:
+    """
+    Pick the rows to keep for a multi-series chart of the given pixel width.
+
+    Each series is reduced on its own finite points; the union of the
+    selected rows is returned so every series keeps its shape (e.g.,
+    systolic and diastolic peaks on different readings).
+    """
+    keep: List[np.ndarray] = []
+    for y in values.values():
+        finite = np.flatnonzero(np.isfinite(y))
+        if len(finite) == 0:
+            continue
+        if method == "minmax":
+            local = minmax_indices(t[finite], y[finite], max(width // 2, 1))
+        else:
+            local = lttb_indices(t[finite], y[finite], width)
+        keep.append(finite[local])
+
+    if not keep:
+        return np.arange(0)
+    return np.unique(np.concatenate(keep))
+
+
+def _to_array(column: Sequence[Optional[float]]) -> np.ndarray:
+    """Nullable numeric column -> float64 array with NaN for NULL."""
+    return np.array([np.nan if v is None else v for v in column], dtype=np.float64)
+
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    """float64 array -> JSON list with None for NaN."""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def build_trend_payload(
+    t: Sequence[float],
+    series: Dict[str, Sequence[Optional[float]]],
+    width: int,
+    method: str = "lttb"
+) -> Dict[str, Any]:
+    """
+    Downsample a time series and shape it as a columnar payload.
+
+    Args:
+        t: Sorted timestamps as epoch milliseconds
+        series: {series_name: values} parallel to t (None for missing)
+        width: Chart width in pixels (target point count)
+        method: "lttb" or "minmax"
+
+    Returns:
+        {"t": [...], "series": {name: [...]}, "total_points",
+         "returned_points", "method", "width"}
+    """
+    t_arr = np.asarray(t, dtype=np.float64)
+    values = {name: _to_array(column) for name, column in series.items()}
+
+    if len(t_arr) > width:
+        idx = downsample_indices(t_arr, values, width, method)
+    else:
+        idx = np.arange(len(t_arr))
+
+    return {
+        "t": t_arr[idx].astype(np.int64).tolist(),
+        "series": {name: _to_list(v[idx]) for name, v in values.items()},
+        "total_points": int(len(t_arr)),
+        "returned_points": int(len(idx)),
+        "method": method,
+        "width": width,
+    }
+
+
+def parse_window_bound(value: Optional[str], end: bool = False) -> Optional[datetime]:
+    """
+    Parse a zoom window bound ("2024-01-01" or ISO datetime).
+
+    Args:
+        value: Bound from the query string
+        end: Parse as an inclusive window end, so a date-only value means
+            the end of that day (every reading on the end date is kept)
+
+    Raises:
+        ValueError: If the value is not an ISO date/datetime
+    """
+    if not value:
+        return None
+    if end:
+        try:
+            day = date.fromisoformat(value)
+        except ValueError:
+            pass
+        else:
+            return datetime.combine(day + timedelta(days=1), datetime.min.time()) - timedelta(microseconds=1)
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
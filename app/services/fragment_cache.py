@@ -0,0 +1,228 @@
+# ---------------------------------------------------------------------
+# app/services/fragment_cache.py
+# ---------------------------------------------------------------------
+# Rendered Fragment Cache (Dashboard Widgets)
+# In-process LRU cache of rendered widget HTML, so a hot patient's
+# dashboard is served from memory without querying or rendering.
+#  - Entries are keyed by (handler, template, patient, serving-data
+#    versions of the widget's domains and their patient_summary_*
+#    counts, query-string options)
+#  - An ETL load bumps the domain version, so stale fragments are never
+#    matched again and age out of the LRU
+#  - Entries also expire after ttl_seconds, which bounds date-relative
+#    content ("last 30 days") and widgets rendered while a query failed
+#  - Error renders (context "error") and non-200 responses are not cached
+#  - Bounded by entry count and total HTML size (bytes)
+# ---------------------------------------------------------------------
+# Usage (widget routes):
+#   @router.get("/dashboard/widget/vitals/{icn}", response_class=HTMLResponse)
+#   @cached_fragment(templates, "partials/vitals_widget.html", "vitals")
+#   async def get_vitals_widget(request: Request, icn: str):
+#       ...
+# ---------------------------------------------------------------------
+
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from fastapi.templating import Jinja2Templates
+
+from app.db.query_cache import query_cache
+from config import FRAGMENT_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU cache of rendered HTML fragments with a per-entry TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[tuple, Tuple[bytes, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypasses = 0
+
+    def _remove_locked(self, key: tuple) -> None:
+        body, _ = self._entries.pop(key)
+        self._total_bytes -= len(body)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """Return the cached HTML body for a key, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            body, expires_at = entry
+            if now >= expires_at:
+                self._remove_locked(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        """Store a rendered body, evicting least recently used entries."""
+        if len(body) > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (body, expires_at)
+            self._total_bytes += len(body)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+            ):
+                self._remove_locked(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached fragments."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring/debugging."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "bypasses": self.bypasses,
+            }
+
+
+# Process-wide cache instance
+fragment_cache = FragmentCache(
+    max_entries=FRAGMENT_CACHE_CONFIG["max_entries"],
+    max_bytes=FRAGMENT_CACHE_CONFIG["max_bytes"],
+    ttl_seconds=FRAGMENT_CACHE_CONFIG["ttl_seconds"],
+    enabled=FRAGMENT_CACHE_CONFIG["enabled"],
+)
+
+# (templates, template name) for every cached widget, compiled at startup
+_registered_templates: List[Tuple[Jinja2Templates, str]] = []
+
+
+def cached_fragment(
+    templates: Jinja2Templates,
+    template_name: str,
+    domains: Union[str, Tuple[str, ...]],
+    icn_param: str = "icn",
+) -> Callable:
+    """
+    Decorator: serve a widget route's rendered HTML from the fragment cache.
+
+    Args:
+        templates: The route module's Jinja2Templates instance
+        template_name: Partial the handler renders (part of the cache key)
+        domains: Serving domain (or tuple of domains) the widget reads.
+                 A version bump for any of them invalidates the fragment.
+        icn_param: Name of the handler's patient ICN parameter
+
+    The wrapped handler must be called with keyword arguments (FastAPI
+    does this) and return a TemplateResponse. Widgets backed by writeable
+    data (tasks) should not use this decorator.
+    """
+    if isinstance(domains, str):
+        domains = (domains,)
+
+    _registered_templates.append((templates, template_name))
+
+    def decorator(func: Callable) -> Callable:
+        func_key = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            if not fragment_cache.enabled:
+                return await func(*args, **kwargs)
+
+            versions = query_cache.get_versions()
+            if versions is None or any(d not in versions for d in domains):
+                fragment_cache.bypasses += 1
+                return await func(*args, **kwargs)
+
+            key = (
+                func_key,
+                template_name,
+                kwargs[icn_param],
+                tuple(versions[d] for d in domains),
+                tuple(versions.get(f"patient_summary_{d}") for d in domains),
+                tuple(sorted(request.query_params.multi_items())),
+            )
+
+            body = fragment_cache.get(key)
+            if body is not None:
+                return HTMLResponse(content=body)
+
+            response = await func(*args, **kwargs)
+
+            context = getattr(response, "context", None) or {}
+            if response.status_code == 200 and not context.get("error"):
+                fragment_cache.put(key, bytes(response.body))
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def precompile_templates() -> int:
+    """
+    Load and compile every cached widget's template at startup, so the
+    first dashboard render does not pay the Jinja parse/compile cost.
+
+    Returns:
+        Number of templates compiled
+    """
+    compiled = 0
+    for templates, template_name in _registered_templates:
+        try:
+            templates.get_template(template_name)
+            compiled += 1
+        except Exception as e:
+            logger.warning(f"Could not precompile template {template_name}: {e}")
+    return compiled
+
+
+def get_fragment_cache_stats() -> Dict[str, Any]:
+    """Return fragment cache statistics."""
+    return fragment_cache.stats()
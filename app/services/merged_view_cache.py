@@ -0,0 +1,172 @@
+# ---------------------------------------------------------------------
+# app/services/merged_view_cache.py
+# ---------------------------------------------------------------------
+# Merged Real-Time View Cache
+# In-process LRU memo of PostgreSQL + VistA overlay results, so pages
+# and AI tools reading a patient whose VistaSessionCache entry is warm
+# reuse the merged list instead of re-querying PostgreSQL and re-running
+# the merge on every view.
+#  - Entries are keyed by (ICN, domain, PostgreSQL query variant,
+#    serving-data versions of the domain's tables, digest of the cached
+#    VistA responses)
+#  - An ETL load bumps the serving version and a new "Refresh from
+#    VistA" changes the digest, so stale merges are never matched again
+#    and age out of the LRU
+#  - When serving versions are unavailable, every call merges afresh
+#  - Merged records are shared between callers and must not be modified
+#    (filter and sort into new lists, as the domain pages do)
+# ---------------------------------------------------------------------
+# Usage:
+#   from app.services.merged_view_cache import merged_view_cache
+#
+#   vitals, stats = merged_view_cache.get_or_merge(
+#       icn, "vitals", ("vitals",), vitals_cache["vista_responses"],
+#       load_pg=lambda: get_patient_vitals(icn, limit=500),
+#       merge=merge_vitals_data,
+#       variant=(500,),
+#   )
+# ---------------------------------------------------------------------
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.db.query_cache import query_cache
+from config import MERGED_VIEW_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MergeResult = Tuple[List[Dict[str, Any]], Dict[str, Any]]
+
+
+def vista_responses_digest(vista_responses: Dict[str, str]) -> str:
+    """Stable digest of cached VistA responses (site -> raw response)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for site in sorted(vista_responses):
+        digest.update(site.encode())
+        digest.update(b"\x00")
+        digest.update((vista_responses[site] or "").encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class MergedViewCache:
+    """
+    Thread-safe LRU memo of merged (records, stats) results.
+
+    Sync route handlers run in the FastAPI threadpool, so all access to
+    the entry table is guarded by a lock. Merges run outside the lock.
+    """
+
+    def __init__(self, max_entries: int = 500, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[tuple, MergeResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    def get_or_merge(
+        self,
+        icn: str,
+        domain: str,
+        pg_domains: Tuple[str, ...],
+        vista_responses: Dict[str, str],
+        load_pg: Callable[[], List[Dict[str, Any]]],
+        merge: Callable[[List[Dict[str, Any]], Dict[str, str], str], MergeResult],
+        variant: Tuple[Any, ...] = ()
+    ) -> MergeResult:
+        """
+        Return the merged view for a patient/domain, merging only on a miss.
+
+        Args:
+            icn: Patient ICN
+            domain: Clinical domain (e.g., "vitals")
+            pg_domains: Serving domains the PostgreSQL query reads from
+            vista_responses: Cached VistA responses (site -> raw response)
+            load_pg: Runs the PostgreSQL query (skipped on a hit)
+            merge: Overlay merge function (e.g., merge_vitals_data)
+            variant: PostgreSQL query options that change its rows (e.g., limit)
+
+        Returns:
+            Tuple of (merged records, merge stats); the list and stats are
+            the caller's own, the record dicts are shared
+        """
+        key = None
+        if self.enabled:
+            versions = query_cache.get_versions()
+            if versions is not None:
+                key = (
+                    icn,
+                    domain,
+                    variant,
+                    tuple(versions.get(d, 0) for d in pg_domains),
+                    vista_responses_digest(vista_responses),
+                )
+
+        if key is None:
+            with self._lock:
+                self.bypasses += 1
+            return merge(load_pg(), vista_responses, icn)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            logger.debug(f"Merged view cache hit for {icn}/{domain}")
+            records, stats = entry
+            return list(records), dict(stats)
+
+        records, stats = merge(load_pg(), vista_responses, icn)
+
+        with self._lock:
+            self._entries[key] = (records, stats)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return list(records), dict(stats)
+
+    def clear(self) -> None:
+        """Drop all memoized merges."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring/debugging."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "bypasses": self.bypasses,
+            }
+
+
+# Process-wide cache instance
+merged_view_cache = MergedViewCache(
+    max_entries=MERGED_VIEW_CACHE_CONFIG["max_entries"],
+    enabled=MERGED_VIEW_CACHE_CONFIG["enabled"],
+)
+
+
+def get_merged_view_cache_stats() -> Dict[str, Any]:
+    """Return merged view cache statistics."""
+    return merged_view_cache.stats()
@@ -0,0 +1,293 @@
+# ---------------------------------------------------------------------
+# app/services/patient_registry.py
+# ---------------------------------------------------------------------
+# Indexed Patient Registry (VistA site selection)
+# In-memory index of mock/shared/patient_registry.json (path from
+# PATIENT_REGISTRY_PATH) used by VistaClient.get_target_sites.
+#  - Patients are indexed by ICN, so a lookup is one dict access
+#  - Each patient's treating facilities are ranked by last_seen (most
+#    recent first) when the registry is loaded, not on every request.
+#    T-notation ("T-7") is relative to today, so T-notation facilities
+#    keep their order; a registry mixing T-notation and calendar dates
+#    is re-ranked whenever it is reloaded
+#  - The file's mtime is checked at most every reload_check_seconds; a
+#    change is re-indexed on a background thread while lookups keep
+#    using the previous index. reload() re-indexes immediately (e.g.,
+#    after a script rewrites the file)
+# ---------------------------------------------------------------------
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import PATIENT_REGISTRY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every real date (missing or unparseable last_seen)
+UNKNOWN_LAST_SEEN = datetime(1900, 1, 1)
+
+# icn -> (ranked treating facilities, ranked sta3n values)
+RegistryIndex = Dict[str, Tuple[List[Dict[str, Any]], Tuple[str, ...]]]
+
+
+def parse_last_seen(value: Optional[str], now: Optional[datetime] = None) -> datetime:
+    """
+    Parse a last_seen value: T-notation (T-0, T-7, T-30, etc.) or an ISO date.
+
+    Args:
+        value: last_seen value from the registry
+        now: Reference time for T-notation (defaults to datetime.now())
+
+    Returns:
+        Datetime for the value (UNKNOWN_LAST_SEEN if missing or unparseable)
+    """
+    if not value or not value.startswith("T-"):
+        # If not T-notation, try parsing as regular date
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return UNKNOWN_LAST_SEEN
+
+    try:
+        days_ago = int(value.split("-")[1])
+        return (now or datetime.now()) - timedelta(days=days_ago)
+    except (IndexError, ValueError) as e:
+        logger.warning(f"Failed to parse T-notation '{value}': {e}")
+        return UNKNOWN_LAST_SEEN
+
+
+def _days_since(value: Optional[str], now: datetime) -> float:
+    """Age of a last_seen value in days (the sort key; avoids a datetime per T-notation value)."""
+    if value and value.startswith("T-"):
+        try:
+            return int(value[2:])
+        except ValueError:
+            pass
+    seen = parse_last_seen(value, now)
+    if seen == UNKNOWN_LAST_SEEN:
+        return float("inf")
+    return (now - seen).total_seconds() / 86400
+
+
+def build_index(registry: Dict[str, Any]) -> RegistryIndex:
+    """
+    Index registry JSON by ICN with facilities ranked by last_seen
+    (most recent first; ties keep registry order).
+
+    Args:
+        registry: Parsed registry ({"patients": [{"icn": ..., "treating_facilities": [...]}]})
+
+    Returns:
+        Dict mapping ICN to (ranked facilities, ranked sta3n values)
+    """
+    now = datetime.now()
+    ages: Dict[Any, float] = {}  # last_seen value -> age; values repeat across patients
+
+    def age(facility: Dict[str, Any]) -> float:
+        value = facility.get("last_seen", "T-999")
+        days = ages.get(value)
+        if days is None:
+            days = ages[value] = _days_since(value, now)
+        return days
+
+    index: RegistryIndex = {}
+    for patient in registry.get("patients", []):
+        icn = patient.get("icn")
+        if not icn:
+            continue
+        ranked = patient.get("treating_facilities") or []
+        if len(ranked) > 1:
+            ranked = sorted(ranked, key=age)
+        index[icn] = (ranked, tuple([fac["sta3n"] for fac in ranked if "sta3n" in fac]))
+    return index
+
+
+class PatientRegistry:
+    """
+    ICN-indexed patient registry with mtime-driven background reload.
+
+    Lookups read the current index reference without locking; a reload
+    builds a new index and swaps it in.
+    """
+
+    def __init__(self, path: Optional[Path] = None, reload_check_seconds: float = 5.0, registry: Optional[Dict[str, Any]] = None):
+        """
+        Initialize and load the registry.
+
+        Args:
+            path: Registry JSON file
+            reload_check_seconds: Minimum interval between mtime checks (0 = never reload)
+            registry: Registry data to index instead of reading path (tests)
+        """
+        self.path = Path(path) if path else None
+        self.reload_check_seconds = reload_check_seconds
+
+        self._index: RegistryIndex = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = time.monotonic()
+        self._reload_lock = threading.Lock()
+        self._reloading = False
+
+        self.reloads = 0
+        self.lookups = 0
+        self.misses = 0
+
+        if registry is not None:
+            self._index = build_index(registry)
+        else:
+            self.reload()
+
+    # -----------------------------------------------------------------
+    # Loading
+    # -----------------------------------------------------------------
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def reload(self) -> bool:
+        """
+        Re-read and re-index the registry file now.
+
+        Returns:
+            True if the new index was loaded; on error the previous index is kept
+        """
+        if self.path is None:
+            return False
+
+        with self._reload_lock:
+            started = time.monotonic()
+            mtime = self._file_mtime()
+            try:
+                with open(self.path, "r") as f:
+                    index = build_index(json.load(f))
+            except Exception as e:
+                logger.error(f"Failed to load patient registry {self.path}: {e}")
+                return False
+
+            self._index = index
+            self._mtime = mtime
+            self.reloads += 1
+            logger.info(f"Loaded patient registry: {len(index)} patients in {time.monotonic() - started:.2f}s")
+            return True
+
+    def _background_reload(self) -> None:
+        try:
+            self.reload()
+        finally:
+            self._reloading = False
+
+    def _check_for_changes(self) -> None:
+        """Start a background reload if the file changed (rate limited)."""
+        if self.path is None or self.reload_check_seconds <= 0 or self._reloading:
+            return
+
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_check_seconds:
+            return
+        self._checked_at = now
+
+        if self._file_mtime() == self._mtime:
+            return
+
+        self._reloading = True
+        threading.Thread(target=self._background_reload, name="patient-registry-reload", daemon=True).start()
+
+    # -----------------------------------------------------------------
+    # Lookups
+    # -----------------------------------------------------------------
+
+    def get_treating_facilities(self, icn: str) -> List[Dict[str, Any]]:
+        """
+        Get a patient's treating facilities, most recently seen first.
+
+        Args:
+            icn: Patient ICN
+
+        Returns:
+            List of treating facility dictionaries (sta3n, last_seen, etc.);
+            empty if the patient is not in the registry
+        """
+        self._check_for_changes()
+        entry = self._index.get(icn)
+        return list(entry[0]) if entry else []
+
+    def get_ranked_sites(self, icn: str) -> Tuple[str, ...]:
+        """
+        Get a patient's treating sites (sta3n), most recently seen first.
+
+        Args:
+            icn: Patient ICN
+
+        Returns:
+            Tuple of sta3n values; empty if the patient is not in the registry
+        """
+        self._check_for_changes()
+        self.lookups += 1
+        entry = self._index.get(icn)
+        if entry is None:
+            self.misses += 1
+            return ()
+        return entry[1]
+
+    def get_ranked_sites_many(self, icns: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Batch form of get_ranked_sites.
+
+        Args:
+            icns: Patient ICNs
+
+        Returns:
+            Dict mapping each ICN to its ranked sta3n values (empty tuple
+            for patients not in the registry)
+        """
+        self._check_for_changes()
+        index = self._index
+        result = {icn: index[icn][1] if icn in index else () for icn in icns}
+        self.lookups += len(result)
+        self.misses += sum(1 for sites in result.values() if not sites)
+        return result
+
+    def __contains__(self, icn: str) -> bool:
+        return icn in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry counters for monitoring/debugging."""
+        return {
+            "path": str(self.path) if self.path else None,
+            "patients": len(self._index),
+            "reloads": self.reloads,
+            "reloading": self._reloading,
+            "lookups": self.lookups,
+            "misses": self.misses,
+        }
+
+
+_patient_registry: Optional[PatientRegistry] = None
+
+
+def get_patient_registry() -> PatientRegistry:
+    """Return the process-wide patient registry (loaded on first use)."""
+    global _patient_registry
+    if _patient_registry is None:
+        _patient_registry = PatientRegistry(
+            path=PATIENT_REGISTRY_CONFIG["path"],
+            reload_check_seconds=PATIENT_REGISTRY_CONFIG["reload_check_seconds"],
+        )
+    return _patient_registry
+
+
+def get_patient_registry_stats() -> Dict[str, Any]:
+    """Return patient registry statistics for monitoring/debugging."""
+    return get_patient_registry().stats()
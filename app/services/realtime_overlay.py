@@ -4,14 +4,36 @@
 # Real-Time Data Overlay Service
 # Merges historical PostgreSQL data (T-1 and earlier) with real-time
 # VistA RPC data (T-0, today) to provide unified patient vitals view.
+#  - Caret-delimited M responses are split in bulk (one pass per
+#    response); FileMan date conversions and per-value vital
+#    measurements are memoized, since the same values repeat across
+#    rows, refreshes and users
+#  - overlay_merge() is the generic engine behind every merge_*_data():
+#    VistA-preferred de-duplication on a pluggable canonical key, then a
+#    single linear merge of the two date-descending streams (PostgreSQL
+#    queries already ORDER BY date DESC)
+#  - Benchmark: scripts/benchmark_realtime_overlay.py
 # ---------------------------------------------------------------------
 
+import heapq
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Distinct FileMan strings / vital values remembered by the conversion caches
+FILEMAN_CACHE_SIZE = 8192
+VITAL_MEASURES_CACHE_SIZE = 4096
+
+# Map Vista site numbers to facility names (matching format: "(sta3n) City, State")
+VISTA_FACILITY_NAMES = {
+    "200": "(200) Alexandria, VA",
+    "500": "(500) Anchorage, AK",
+    "630": "(630) Palo Alto, CA"
+}
+
 
 def parse_fileman_datetime(fileman_str: str) -> Optional[datetime]:
     """
@@ -50,6 +72,127 @@ def parse_fileman_datetime(fileman_str: str) -> Optional[datetime]:
         return None
 
 
+def datetime_to_fileman(dt: datetime) -> str:
+    """
+    Format a datetime as FileMan date/time (YYYMMDD.HHMM, YYY = year - 1700).
+
+    Args:
+        dt: Datetime to format (e.g., datetime(2024, 12, 17, 9, 30))
+
+    Returns:
+        FileMan string (e.g., "3241217.0930")
+    """
+    return f"{dt.year - 1700:03d}{dt.month:02d}{dt.day:02d}.{dt.hour:02d}{dt.minute:02d}"
+
+
+@lru_cache(maxsize=FILEMAN_CACHE_SIZE)
+def fileman_to_iso(fileman_str: str) -> Optional[str]:
+    """
+    Convert a FileMan date/time to "YYYY-MM-DD HH:MM:SS" (memoized).
+
+    Args:
+        fileman_str: FileMan formatted date/time string (e.g., "3241217.0930")
+
+    Returns:
+        ISO-style string, or None if parsing fails
+    """
+    parsed = parse_fileman_datetime(fileman_str)
+    return parsed.strftime("%Y-%m-%d %H:%M:%S") if parsed else None
+
+
+@lru_cache(maxsize=FILEMAN_CACHE_SIZE)
+def fileman_date_to_iso(fileman_str: str) -> Optional[str]:
+    """
+    Convert a FileMan date (with or without time) to "YYYY-MM-DD" (memoized).
+
+    Args:
+        fileman_str: FileMan formatted date string (e.g., "3270106")
+
+    Returns:
+        ISO date string, or None if parsing fails
+    """
+    parsed = parse_fileman_date_only(fileman_str)
+    return parsed.strftime("%Y-%m-%d") if parsed else None
+
+
+def split_caret_records(vista_response: str, field_count: int, record_name: str) -> List[List[str]]:
+    """
+    Split a multi-line caret-delimited M response into records in one pass.
+
+    Lines without a caret are ignored; lines with the wrong number of
+    fields are logged and dropped.
+
+    Args:
+        vista_response: Raw VistA RPC response string
+        field_count: Expected number of fields per line
+        record_name: Record name for log messages (e.g., "vital")
+
+    Returns:
+        List of field lists, in response order (empty for "-1^..." errors)
+    """
+    if not vista_response or vista_response.startswith("-1^"):
+        return []
+
+    records = [line.split("^") for line in vista_response.strip().split("\n") if "^" in line]
+    valid = [fields for fields in records if len(fields) == field_count]
+
+    if len(valid) != len(records):
+        for fields in records:
+            if len(fields) != field_count:
+                logger.warning(f"Invalid Vista {record_name} format: {'^'.join(fields)}")
+
+    return valid
+
+
+def append_vista_delta(cached_response: Optional[str], delta_response: Optional[str]) -> str:
+    """
+    Add a delta ("since") response to a site's cached response.
+
+    Delta lines go first (they are newest, and the merges keep the first
+    record for each canonical key), followed by the cached lines not
+    repeated in the delta (the refresh lookback window overlaps).
+
+    Args:
+        cached_response: Site response stored by the previous refresh
+        delta_response: Response to the RPC called with "since"
+
+    Returns:
+        Combined response string
+    """
+    cached_response = cached_response or ""
+    if not delta_response or delta_response.startswith("-1^"):
+        return cached_response
+    if not cached_response or cached_response.startswith("-1^"):
+        return delta_response
+
+    delta_lines = delta_response.strip().split("\n")
+    seen = set(delta_lines)
+    return "\n".join(delta_lines + [line for line in cached_response.strip().split("\n") if line not in seen])
+
+
+def append_vista_deltas(
+    vista_results: Dict[str, str],
+    cached_responses: Dict[str, str],
+    since: Dict[str, str]
+) -> Dict[str, str]:
+    """
+    Combine a refresh's responses with the session cache, site by site.
+
+    Args:
+        vista_results: Successful responses from this refresh (site -> response)
+        cached_responses: Responses stored by the previous refresh
+        since: Sites called with a "since" parameter (site -> FileMan date/time)
+
+    Returns:
+        Full responses per site: delta sites combined with their cached
+        response, other sites unchanged
+    """
+    return {
+        site: append_vista_delta(cached_responses.get(site), response) if site in since else response
+        for site, response in vista_results.items()
+    }
+
+
 def parse_vista_vitals(vista_response: str, site_sta3n: str) -> List[Dict[str, Any]]:
     """
     Parse VistA GMV LATEST VM response into standardized vital records.
@@ -65,38 +208,17 @@ def parse_vista_vitals(vista_response: str, site_sta3n: str) -> List[Dict[str, A
         List of parsed vital dictionaries matching PostgreSQL schema
     """
     vitals = []
+    location_name = f"VistA Site {site_sta3n}"
 
-    if not vista_response or vista_response.startswith("-1^"):
-        # Error response or no vitals
-        return vitals
-
-    lines = vista_response.strip().split("\n")
-
-    for line in lines:
-        if not line or "^" not in line:
-            continue
-
-        parts = line.split("^")
-        if len(parts) != 5:
-            logger.warning(f"Invalid Vista vital format: {line}")
-            continue
-
-        vital_type, value, units, fileman_datetime, entered_by = parts
-
-        # Parse FileMan datetime to Python datetime
-        taken_dt = parse_fileman_datetime(fileman_datetime)
-        if not taken_dt:
-            logger.warning(f"Skipping vital with invalid date: {line}")
+    for vital_type, value, units, fileman_datetime, entered_by in split_caret_records(vista_response, 5, "vital"):
+        # Convert FileMan datetime (memoized)
+        taken_datetime = fileman_to_iso(fileman_datetime)
+        if not taken_datetime:
+            logger.warning(f"Skipping vital with invalid date: {vital_type}^{value}^{units}^{fileman_datetime}^{entered_by}")
             continue
 
-        # Extract vital components
-        vital_abbr = _get_vital_abbr(vital_type)
-        numeric_value = _extract_numeric_value(value, vital_type)
-        systolic = _extract_systolic(value, vital_type)
-        diastolic = _extract_diastolic(value, vital_type)
-
-        # Compute abnormal flag based on vital type and value
-        abnormal_flag = _compute_abnormal_flag(vital_abbr, numeric_value, systolic, diastolic)
+        # Extract vital components and abnormal flag (memoized per type/value)
+        vital_abbr, numeric_value, systolic, diastolic, abnormal_flag = _vital_measures(vital_type, value)
 
         # Create standardized vital record (matching PostgreSQL schema)
         vital = {
@@ -105,8 +227,8 @@ def parse_vista_vitals(vista_response: str, site_sta3n: str) -> List[Dict[str, A
             "vital_sign_id": None,
             "vital_type": vital_type,
             "vital_abbr": vital_abbr,
-            "taken_datetime": taken_dt.strftime("%Y-%m-%d %H:%M:%S"),
-            "entered_datetime": taken_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "taken_datetime": taken_datetime,
+            "entered_datetime": taken_datetime,
             "result_value": value,
             "numeric_value": numeric_value,
             "systolic": systolic,
@@ -115,7 +237,7 @@ def parse_vista_vitals(vista_response: str, site_sta3n: str) -> List[Dict[str, A
             "unit_of_measure": units,
             "qualifiers": None,
             "location_id": None,
-            "location_name": f"VistA Site {site_sta3n}",
+            "location_name": location_name,
             "location_type": "VistA",
             "entered_by": entered_by,
             "abnormal_flag": abnormal_flag,  # Computed based on clinical ranges
@@ -133,6 +255,17 @@ def parse_vista_vitals(vista_response: str, site_sta3n: str) -> List[Dict[str, A
     return vitals
 
 
+@lru_cache(maxsize=VITAL_MEASURES_CACHE_SIZE)
+def _vital_measures(vital_type: str, value: str) -> Tuple[str, Optional[float], Optional[int], Optional[int], Optional[str]]:
+    """(vital_abbr, numeric_value, systolic, diastolic, abnormal_flag) for one reading."""
+    vital_abbr = _get_vital_abbr(vital_type)
+    numeric_value = _extract_numeric_value(value, vital_type)
+    systolic = _extract_systolic(value, vital_type)
+    diastolic = _extract_diastolic(value, vital_type)
+    abnormal_flag = _compute_abnormal_flag(vital_abbr, numeric_value, systolic, diastolic)
+    return vital_abbr, numeric_value, systolic, diastolic, abnormal_flag
+
+
 def _get_vital_abbr(vital_type: str) -> str:
     """Map vital type to standard abbreviation."""
     abbr_map = {
@@ -295,6 +428,68 @@ def _compute_abnormal_flag(vital_abbr: str, numeric_value: Optional[float],
         return None
 
 
+def _descending(records: List[Dict[str, Any]], sort_value: Callable[[Dict[str, Any]], Any]) -> List[Dict[str, Any]]:
+    """Return records in descending order, sorting only if they are not already (one linear check)."""
+    for i in range(1, len(records)):
+        if sort_value(records[i - 1]) < sort_value(records[i]):
+            return sorted(records, key=sort_value, reverse=True)
+    return records
+
+
+def overlay_merge(
+    pg_records: List[Dict[str, Any]],
+    vista_records: List[Dict[str, Any]],
+    canonical_key: Callable[[Dict[str, Any]], str],
+    sort_field: str,
+    stats: Dict[str, Any],
+    record_name: str = "record"
+) -> List[Dict[str, Any]]:
+    """
+    Generic PostgreSQL + VistA overlay: de-duplicate, then merge by date.
+
+    VistA records are kept first, so they win any canonical key they
+    share with a PostgreSQL record (fresher data). Both streams are then
+    merged in one linear pass, newest first. PostgreSQL rows arrive
+    ORDER BY date DESC and VistA responses are short, so neither normally
+    needs a sort; an out-of-order stream is sorted first. Ties keep VistA
+    records ahead of PostgreSQL ones.
+
+    Args:
+        pg_records: Historical records from PostgreSQL
+        vista_records: Parsed VistA records (all sites)
+        canonical_key: Function returning a record's de-duplication key
+        sort_field: Date field to order by (ISO strings; missing sorts last)
+        stats: Merge statistics; "duplicates_removed" is incremented
+        record_name: Record name for debug logging (e.g., "vital")
+
+    Returns:
+        Merged records, sorted by sort_field descending
+    """
+    seen_keys = set()
+    kept_vista = []
+    kept_pg = []
+
+    for records, kept, label in ((vista_records, kept_vista, "Vista"), (pg_records, kept_pg, "PG")):
+        for record in records:
+            key = canonical_key(record)
+            if key not in seen_keys:
+                kept.append(record)
+                seen_keys.add(key)
+            else:
+                stats["duplicates_removed"] += 1
+                logger.debug(f"Skipped duplicate {label} {record_name}: {key}")
+
+    def sort_value(record: Dict[str, Any]) -> Any:
+        return record.get(sort_field) or ""
+
+    return list(heapq.merge(
+        _descending(kept_vista, sort_value),
+        _descending(kept_pg, sort_value),
+        key=sort_value,
+        reverse=True
+    ))
+
+
 def create_canonical_key(vital: Dict[str, Any]) -> str:
     """
     Create canonical deduplication key for a vital sign.
@@ -314,13 +509,21 @@ def create_canonical_key(vital: Dict[str, Any]) -> str:
     """
     vital_type = vital.get("vital_type", "").upper()
 
-    # Parse taken_datetime to hour precision (fuzzy matching)
+    # Reduce taken_datetime to hour precision (fuzzy matching): sliced
+    # directly from "YYYY-MM-DD HH..." strings, parsed otherwise
     taken_str = vital.get("taken_datetime", "")
-    try:
-        taken_dt = datetime.fromisoformat(taken_str.replace(" ", "T"))
-        taken_key = taken_dt.strftime("%Y%m%d%H")  # YYYYMMDDHH
-    except (ValueError, AttributeError):
-        taken_key = taken_str[:13] if taken_str else "UNKNOWN"
+    hour_key = ""
+    if isinstance(taken_str, str) and len(taken_str) >= 13 and taken_str[4] == "-" and taken_str[7] == "-" and taken_str[10] in " T":
+        hour_key = taken_str[:4] + taken_str[5:7] + taken_str[8:10] + taken_str[11:13]
+
+    if len(hour_key) == 10 and hour_key.isdigit():
+        taken_key = hour_key  # YYYYMMDDHH
+    else:
+        try:
+            taken_dt = datetime.fromisoformat(taken_str.replace(" ", "T"))
+            taken_key = taken_dt.strftime("%Y%m%d%H")  # YYYYMMDDHH
+        except (ValueError, AttributeError):
+            taken_key = taken_str[:13] if taken_str else "UNKNOWN"
 
     # Use location or source site as third component
     location = vital.get("location_name") or vital.get("source_site") or "UNKNOWN"
@@ -355,8 +558,6 @@ def merge_vitals_data(
     """
     logger.info(f"Merging vitals for {patient_icn}: {len(pg_vitals)} PG + {len(vista_vitals_by_site)} Vista sites")
 
-    merged = []
-    seen_keys = set()
     stats = {
         "pg_count": len(pg_vitals),
         "vista_count": 0,
@@ -376,17 +577,7 @@ def merge_vitals_data(
 
     stats["vista_count"] = len(all_vista_vitals)
 
-    # Add Vista vitals first (preferred for T-1+ duplicates)
-    for vital in all_vista_vitals:
-        key = create_canonical_key(vital)
-        if key not in seen_keys:
-            merged.append(vital)
-            seen_keys.add(key)
-        else:
-            stats["duplicates_removed"] += 1
-            logger.debug(f"Skipped duplicate Vista vital: {key}")
-
-    # Add PostgreSQL vitals (only if not already present)
+    # Tag PostgreSQL vitals with tracking metadata
     for vital in pg_vitals:
         # PostgreSQL vitals already have 'data_source' field from database
         # Don't overwrite it - preserve CDWWork/CDWWork2/CALCULATED values
@@ -395,16 +586,8 @@ def merge_vitals_data(
         vital["source_site"] = None
         vital["is_realtime"] = False
 
-        key = create_canonical_key(vital)
-        if key not in seen_keys:
-            merged.append(vital)
-            seen_keys.add(key)
-        else:
-            stats["duplicates_removed"] += 1
-            logger.debug(f"Skipped duplicate PG vital (Vista preferred): {key}")
-
-    # Sort by taken_datetime descending (most recent first)
-    merged.sort(key=lambda v: v.get("taken_datetime") or "", reverse=True)
+    # De-duplicate (Vista preferred for T-1+ duplicates) and merge newest first
+    merged = overlay_merge(pg_vitals, all_vista_vitals, create_canonical_key, "taken_datetime", stats, "vital")
 
     stats["total_merged"] = len(merged)
 
@@ -466,30 +649,18 @@ def parse_vista_medications(vista_response: str, site_sta3n: str) -> List[Dict[s
         List of parsed medication dictionaries matching PostgreSQL schema
     """
     medications = []
+    location_name = f"VistA Site {site_sta3n}"
+    facility_name = VISTA_FACILITY_NAMES.get(site_sta3n, location_name)
 
-    if not vista_response or vista_response.startswith("-1^"):
-        # Error response or no medications
-        return medications
-
-    lines = vista_response.strip().split("\n")
-
-    for line in lines:
-        if not line or "^" not in line:
-            continue
-
-        parts = line.split("^")
-        if len(parts) != 7:
-            logger.warning(f"Invalid Vista medication format: {line}")
-            continue
-
-        rx_number, drug_name, status, qty_days, refills_remaining, issue_date_fm, expiration_date_fm = parts
+    for fields in split_caret_records(vista_response, 7, "medication"):
+        rx_number, drug_name, status, qty_days, refills_remaining, issue_date_fm, expiration_date_fm = fields
 
-        # Parse FileMan dates
-        issue_dt = parse_fileman_datetime(issue_date_fm)
-        expiration_dt = parse_fileman_date_only(expiration_date_fm)
+        # Convert FileMan dates (memoized)
+        issue_date_str = fileman_to_iso(issue_date_fm)
+        expiration_date_str = fileman_date_to_iso(expiration_date_fm)
 
-        if not issue_dt:
-            logger.warning(f"Skipping medication with invalid issue date: {line}")
+        if not issue_date_str:
+            logger.warning(f"Skipping medication with invalid issue date: {'^'.join(fields)}")
             continue
 
         # Parse quantity/days_supply
@@ -509,17 +680,6 @@ def parse_vista_medications(vista_response: str, site_sta3n: str) -> List[Dict[s
             refills = 0
 
         # Create standardized medication record (matching PostgreSQL schema)
-        issue_date_str = issue_dt.strftime("%Y-%m-%d %H:%M:%S") if issue_dt else None
-        expiration_date_str = expiration_dt.strftime("%Y-%m-%d") if expiration_dt else None
-
-        # Map Vista site numbers to facility names (matching format: "(sta3n) City, State")
-        facility_names = {
-            "200": "(200) Alexandria, VA",
-            "500": "(500) Anchorage, AK",
-            "630": "(630) Palo Alto, CA"
-        }
-        facility_name = facility_names.get(site_sta3n, f"VistA Site {site_sta3n}")
-
         medication = {
             "medication_id": f"vista_{site_sta3n}_{rx_number}",  # Unique ID for Vista data
             "patient_key": None,  # Will be set by caller
@@ -536,7 +696,7 @@ def parse_vista_medications(vista_response: str, site_sta3n: str) -> List[Dict[s
             "date": issue_date_str,  # Template uses this for display
             "expiration_date": expiration_date_str,
             "location_id": None,
-            "location_name": f"VistA Site {site_sta3n}",
+            "location_name": location_name,
             "location_type": "VistA",
             "facility_name": facility_name,  # Facility for display column
             "provider_name": "VistA Realtime",  # Provider not available from ORWPS COVER RPC
@@ -631,8 +791,6 @@ def merge_medications_data(
     """
     logger.info(f"Merging medications for {patient_icn}: {len(pg_medications)} PG + {len(vista_medications_by_site)} Vista sites")
 
-    merged = []
-    seen_keys = set()
     stats = {
         "pg_count": len(pg_medications),
         "vista_count": 0,
@@ -652,17 +810,7 @@ def merge_medications_data(
 
     stats["vista_count"] = len(all_vista_medications)
 
-    # Add Vista medications first (preferred for T-1+ duplicates)
-    for medication in all_vista_medications:
-        key = create_canonical_medication_key(medication)
-        if key not in seen_keys:
-            merged.append(medication)
-            seen_keys.add(key)
-        else:
-            stats["duplicates_removed"] += 1
-            logger.debug(f"Skipped duplicate Vista medication: {key}")
-
-    # Add PostgreSQL medications (only if not already present)
+    # Tag PostgreSQL medications with tracking metadata
     for medication in pg_medications:
         # PostgreSQL medications already have 'data_source' field from database
         # Don't overwrite it - preserve CDWWork/CDWWork2 values
@@ -671,16 +819,8 @@ def merge_medications_data(
         medication["source_site"] = None
         medication["is_realtime"] = False
 
-        key = create_canonical_medication_key(medication)
-        if key not in seen_keys:
-            merged.append(medication)
-            seen_keys.add(key)
-        else:
-            stats["duplicates_removed"] += 1
-            logger.debug(f"Skipped duplicate PG medication (Vista preferred): {key}")
-
-    # Sort by issue_date descending (most recent first)
-    merged.sort(key=lambda m: m.get("issue_date") or "", reverse=True)
+    # De-duplicate (Vista preferred for T-1+ duplicates) and merge newest first
+    merged = overlay_merge(pg_medications, all_vista_medications, create_canonical_medication_key, "issue_date", stats, "medication")
 
     stats["total_merged"] = len(merged)
 
@@ -712,28 +852,14 @@ def parse_vista_problems(vista_response: str, site_sta3n: str) -> List[Dict[str,
     """
     problems = []
 
-    if not vista_response or vista_response.startswith("-1^"):
-        # Error response or no problems
-        return problems
-
-    lines = vista_response.strip().split("\n")
-
-    for line in lines:
-        if not line or "^" not in line:
-            continue
-
-        parts = line.split("^")
-        if len(parts) != 8:
-            logger.warning(f"Invalid Vista problem format: {line}")
-            continue
-
-        problem_ien, problem_text, icd10_code, status, onset_date_fm, service_connected, snomed_code, updated_today = parts
+    for fields in split_caret_records(vista_response, 8, "problem"):
+        problem_ien, problem_text, icd10_code, status, onset_date_fm, service_connected, snomed_code, updated_today = fields
 
-        # Parse FileMan date (date only, no time)
-        onset_dt = parse_fileman_date_only(onset_date_fm)
+        # Convert FileMan date (date only, no time; memoized)
+        onset_date = fileman_date_to_iso(onset_date_fm)
 
-        if not onset_dt:
-            logger.warning(f"Skipping problem with invalid onset date: {line}")
+        if not onset_date:
+            logger.warning(f"Skipping problem with invalid onset date: {'^'.join(fields)}")
             continue
 
         # Convert flags to boolean
@@ -752,7 +878,7 @@ def parse_vista_problems(vista_response: str, site_sta3n: str) -> List[Dict[str,
             "snomed_code": snomed_code,
             "snomed_description": None,  # Not available in Vista response
             "problem_status": status_mapped,
-            "onset_date": onset_dt.strftime("%Y-%m-%d"),
+            "onset_date": onset_date,
             "service_connected": service_connected_bool,
             "updated_today": updated_today_bool,
             "source_site": site_sta3n,
@@ -838,8 +964,6 @@ def merge_problems_data(
     """
     logger.info(f"Merging problems for {patient_icn}: {len(pg_problems)} PG + {len(vista_problems_by_site)} Vista sites")
 
-    merged = []
-    seen_keys = set()
     stats = {
         "pg_count": len(pg_problems),
         "vista_count": 0,
@@ -859,17 +983,7 @@ def merge_problems_data(
 
     stats["vista_count"] = len(all_vista_problems)
 
-    # Add Vista problems first (preferred for T-1+ duplicates)
-    for problem in all_vista_problems:
-        key = create_canonical_problem_key(problem)
-        if key not in seen_keys:
-            merged.append(problem)
-            seen_keys.add(key)
-        else:
-            stats["duplicates_removed"] += 1
-            logger.debug(f"Skipped duplicate Vista problem: {key}")
-
-    # Add PostgreSQL problems (only if not already present)
+    # Tag PostgreSQL problems with tracking metadata
     for problem in pg_problems:
         # PostgreSQL problems already have 'data_source' field from database
         # Don't overwrite it - preserve CDWWork/CDWWork2 values
@@ -878,16 +992,8 @@ def merge_problems_data(
         problem["source_site"] = None
         problem["is_realtime"] = False
 
-        key = create_canonical_problem_key(problem)
-        if key not in seen_keys:
-            merged.append(problem)
-            seen_keys.add(key)
-        else:
-            stats["duplicates_removed"] += 1
-            logger.debug(f"Skipped duplicate PG problem (Vista preferred): {key}")
-
-    # Sort by onset_date descending (most recent first)
-    merged.sort(key=lambda p: p.get("onset_date") or "", reverse=True)
+    # De-duplicate (Vista preferred for T-1+ duplicates) and merge newest first
+    merged = overlay_merge(pg_problems, all_vista_problems, create_canonical_problem_key, "onset_date", stats, "problem")
 
     stats["total_merged"] = len(merged)
 
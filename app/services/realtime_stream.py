@@ -0,0 +1,228 @@
+# ---------------------------------------------------------------------
+# app/services/realtime_stream.py
+# ---------------------------------------------------------------------
+# Progressive VistA Refresh (Server-Sent Events)
+#  - The realtime refresh endpoints (vitals, medications, allergies,
+#    problems) wait for every site; their .../realtime/stream variants
+#    render PostgreSQL history first, then re-render the refresh area
+#    as each site answers, fastest first, with per-site status badges
+#  - Each "swap" event carries HTML whose top-level elements replace the
+#    page elements with the same id (refresh area, freshness message,
+#    site status badges); see "Progressive VistA Refresh" in app.js
+#  - A stream cannot update the session cookie once it has started, so
+#    after "done" the browser repeats the regular realtime request to
+#    record the per-user VistaSessionCache entry. A stream that finished
+#    leaves its per-site results in refresh_handoff and sends the token
+#    in "done"; the follow-up passes it back (handoff=...) and renders
+#    those results instead of calling VistA again. Without a usable
+#    token (stream failed, expired, another worker) it fetches as usual
+#  - Delta refresh: sites in "since" return only new records, which are
+#    added to the session's cached response for the site
+# ---------------------------------------------------------------------
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+
+from app.services.realtime_overlay import append_vista_delta
+from app.services.task_events import format_sse
+from app.services.vista_client import STATUS_OK, get_vista_client
+
+logger = logging.getLogger(__name__)
+
+SITE_STATUS_TEMPLATE = "partials/vista_site_status.html"
+
+# How long a finished stream's results wait for the follow-up request
+HANDOFF_TTL_SECONDS = 60
+HANDOFF_MAX_ENTRIES = 1000
+
+# Badge label and style for each per-site state
+SITE_STATES = {
+    "pending": ("Loading", "badge--secondary"),
+    "ok": ("Loaded", "badge--success"),
+    "cached": ("Cached", "badge--success"),
+    "error": ("Failed", "badge--danger"),
+    "timeout": ("Timed out", "badge--warning"),
+    "circuit_open": ("Unavailable", "badge--warning"),
+}
+
+
+def site_state(result: Dict[str, Any]) -> str:
+    """Badge state for one site's RPC result (a key of SITE_STATES)."""
+    if result.get("success"):
+        return "cached" if result.get("cached") else "ok"
+    status = result.get("status")
+    if status in SITE_STATES and status != STATUS_OK:
+        return status
+    return "error"
+
+
+def site_status_badges(site_states: Dict[str, str]) -> List[Dict[str, str]]:
+    """Template rows for the site status partial, in site order."""
+    return [
+        {"site": site, "state": state, "label": SITE_STATES[state][0], "badge_class": SITE_STATES[state][1]}
+        for site, state in site_states.items()
+    ]
+
+
+class RefreshHandoff:
+    """
+    One-time tokens carrying a finished stream's results to the
+    follow-up realtime request (in-process, bounded, short-lived).
+    """
+
+    def __init__(self, ttl_seconds: float = HANDOFF_TTL_SECONDS, max_entries: int = HANDOFF_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.handoffs = 0
+        self.used = 0
+
+    def put(self, rpc_name: str, params: List[Any], payload: Dict[str, Any]) -> str:
+        """Store a stream's results; returns the token for the "done" event."""
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, (rpc_name, tuple(params)), payload)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.handoffs += 1
+        return token
+
+    def take(self, token: Optional[str], rpc_name: str, params: List[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Claim a handoff (each token works once).
+
+        Args:
+            token: handoff value from the follow-up request (may be None)
+            rpc_name, params: The follow-up's RPC call; must match the stream's
+
+        Returns:
+            {"vista_results": {site: response}, "refreshed_at": iso}, or
+            None if the token is missing, expired or for another call
+        """
+        if not token:
+            return None
+        with self._lock:
+            entry = self._entries.pop(token, None)
+            if entry is None:
+                return None
+            expires_at, key, payload = entry
+            if expires_at < time.monotonic() or key != (rpc_name, tuple(params)):
+                return None
+            self.used += 1
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        """Return handoff counters for monitoring/debugging."""
+        with self._lock:
+            return {"pending": len(self._entries), "handoffs": self.handoffs, "used": self.used}
+
+
+# Process-wide handoff store
+refresh_handoff = RefreshHandoff()
+
+
+async def iter_refresh_events(
+    request: Request,
+    templates: Jinja2Templates,
+    template_name: str,
+    sites: List[str],
+    rpc_name: str,
+    params: List[Any],
+    build_context: Callable[[Dict[str, str]], Dict[str, Any]],
+    since: Optional[Dict[str, str]] = None,
+    cached_responses: Optional[Dict[str, str]] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield SSE messages for one progressive refresh.
+
+    Args:
+        request: Incoming request (stops early if the browser disconnects)
+        templates: Jinja2Templates used to render the refresh area
+        template_name: Refresh area partial (e.g., partials/vitals_refresh_area.html)
+        sites: Target sites, in the order their badges are shown
+        rpc_name: RPC called at every site
+        params: RPC parameters
+        build_context: Builds the template context from the successful
+            responses received so far (site -> response string)
+        since: Delta refresh "since" per site (see VistaClient.call_rpc_multi_site)
+        cached_responses: Session-cached responses the deltas are added to
+    """
+    template = templates.get_template(template_name)
+    status_template = templates.get_template(SITE_STATUS_TEMPLATE)
+    site_states = {site: "pending" for site in sites}
+    vista_results: Dict[str, str] = {}
+    refreshed_at = datetime.now().isoformat()
+    handoff = None
+    since = since or {}
+    cached_responses = cached_responses or {}
+
+    def render() -> str:
+        return template.render(build_context(dict(vista_results))) + status_template.render(
+            site_status=site_status_badges(site_states)
+        )
+
+    try:
+        # PostgreSQL history first; every site still pending
+        yield format_sse("swap", {"html": render()})
+
+        async for site, result in get_vista_client().iter_rpc_multi_site(sites, rpc_name, params, since=since):
+            if await request.is_disconnected():
+                return
+
+            site_states[site] = site_state(result)
+            if result.get("success"):
+                response = result.get("response", "")
+                if site in since:
+                    response = append_vista_delta(cached_responses.get(site), response)
+                vista_results[site] = response
+            else:
+                logger.warning(f"Vista RPC failed at site {site}: {result.get('error')}")
+
+            yield format_sse("swap", {"html": render()})
+
+        handoff = refresh_handoff.put(
+            rpc_name, params, {"vista_results": dict(vista_results), "refreshed_at": refreshed_at}
+        )
+
+    except Exception as e:
+        # Headers are sent; "done" makes the browser fall back to the regular refresh
+        logger.error(f"Error streaming {rpc_name} refresh: {e}")
+
+    yield format_sse("done", {"sites": len(sites), "successful": len(vista_results), "handoff": handoff})
+
+
+def stream_realtime_refresh(
+    request: Request,
+    templates: Jinja2Templates,
+    template_name: str,
+    sites: List[str],
+    rpc_name: str,
+    params: List[Any],
+    build_context: Callable[[Dict[str, str]], Dict[str, Any]],
+    since: Optional[Dict[str, str]] = None,
+    cached_responses: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Progressive equivalent of a realtime refresh endpoint's TemplateResponse.
+
+    Returns:
+        text/event-stream response: "swap" events (PostgreSQL first, then
+        one per site as it answers) followed by one "done" event
+    """
+    return StreamingResponse(
+        iter_refresh_events(
+            request, templates, template_name, sites, rpc_name, params, build_context, since, cached_responses
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
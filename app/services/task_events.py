@@ -0,0 +1,168 @@
+# ---------------------------------------------------------------------
+# app/services/task_events.py
+# ---------------------------------------------------------------------
+# Live Task Updates (PostgreSQL LISTEN/NOTIFY -> Server-Sent Events)
+#  - A trigger on clinical.patient_tasks sends NOTIFY patient_tasks with
+#    {"patient_key", "task_id", "op"} for every insert/update/delete
+#    (db/ddl/create_patient_tasks_table.sql), delivered on commit
+#  - One listener thread per app worker holds a single LISTEN connection
+#    on the primary and fans notifications out to the browsers
+#    subscribed to that patient (GET /api/patient/{icn}/tasks/events)
+#  - The listener starts with the first subscriber and reconnects with
+#    a delay if the connection drops
+# ---------------------------------------------------------------------
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Dict, Optional, Set
+
+from app.db.engines import primary_engine
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_CHANNEL = "patient_tasks"
+
+# Per-subscriber queue bound; a browser that falls behind only needs to
+# know "something changed", so extra events are dropped
+SUBSCRIBER_QUEUE_SIZE = 20
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def parse_notification(payload: str) -> Optional[Dict[str, Any]]:
+    """Parse a patient_tasks NOTIFY payload (None if malformed)."""
+    try:
+        event = json.loads(payload)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring malformed task notification: {payload!r}")
+        return None
+    if not isinstance(event, dict) or not event.get("patient_key"):
+        return None
+    return event
+
+
+class TaskEventHub:
+    """
+    Fans task change notifications out to per-patient subscriber queues.
+
+    subscribe()/unsubscribe() run on the event loop; notifications arrive
+    on the listener thread and are handed to the loop thread-safely.
+    """
+
+    def __init__(self, engine=primary_engine, poll_seconds: float = 5.0, retry_seconds: float = 5.0):
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Counters for monitoring
+        self.notifications = 0
+        self.dropped = 0
+
+    # -----------------------------------------------------------------
+    # Subscribers (event loop)
+    # -----------------------------------------------------------------
+
+    def subscribe(self, icn: str) -> asyncio.Queue:
+        """Register a subscriber for one patient's task events."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(icn, set()).add(queue)
+        self.start()
+        return queue
+
+    def unsubscribe(self, icn: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber (idempotent)."""
+        queues = self._subscribers.get(icn)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[icn]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Put an event on every queue subscribed to its patient (loop thread)."""
+        for queue in list(self._subscribers.get(event["patient_key"], ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    # -----------------------------------------------------------------
+    # Listener (background thread)
+    # -----------------------------------------------------------------
+
+    def dispatch(self, payload: str) -> None:
+        """Handle one NOTIFY payload from the listener thread."""
+        event = parse_notification(payload)
+        if event is None:
+            return
+        self.notifications += 1
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.deliver, event)
+
+    def _listen_once(self) -> None:
+        """Hold one LISTEN connection until it fails or stop() is called."""
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {TASK_EVENTS_CHANNEL}")
+            logger.info(f"Listening for task changes on channel '{TASK_EVENTS_CHANNEL}'")
+
+            while not self._stop.is_set():
+                if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.dispatch(conn.notifies.pop(0).payload)
+        finally:
+            raw.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+            except Exception as e:
+                logger.warning(f"Task event listener disconnected, retrying in {self.retry_seconds:.0f}s: {e}")
+                self._stop.wait(self.retry_seconds)
+
+    def start(self) -> None:
+        """Start the listener thread if it is not running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="task-events-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the listener thread (returns within poll_seconds)."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """Return listener counters for monitoring/debugging."""
+        return {
+            "listening": self._thread is not None and self._thread.is_alive(),
+            "subscribers": self.subscriber_count(),
+            "notifications": self.notifications,
+            "dropped": self.dropped,
+        }
+
+
+# Process-wide hub (one LISTEN connection per worker)
+task_event_hub = TaskEventHub()
@@ -45,7 +45,7 @@ async def test_site_selection():
     icn = "ICN100001"
 
     print(f"Patient: {icn}")
-    print(f"Treating facilities: {len(vista_client._get_patient_treating_facilities(icn))}")
+    print(f"Treating facilities: {len(vista_client.registry.get_treating_facilities(icn))}")
     print()
 
     # Test each domain
@@ -62,7 +62,7 @@ async def test_site_selection():
 
     # Test patient with only one treating facility
     icn = "ICN100013"
-    facilities = vista_client._get_patient_treating_facilities(icn)
+    facilities = vista_client.registry.get_treating_facilities(icn)
 
     print(f"Patient: {icn}")
     print(f"Treating facilities: {len(facilities)}")
@@ -166,7 +166,7 @@ async def test_site_selection():
     # Test with non-existent patient
     icn = "ICN999999"
 
-    facilities = vista_client._get_patient_treating_facilities(icn)
+    facilities = vista_client.registry.get_treating_facilities(icn)
     print(f"Patient: {icn}")
     print(f"Treating facilities: {len(facilities)}")
 
@@ -184,7 +184,7 @@ async def test_site_selection():
 
     # Verify sites are sorted by last_seen descending
     icn = "ICN100001"
-    facilities = vista_client._get_patient_treating_facilities(icn)
+    facilities = vista_client.registry.get_treating_facilities(icn)
 
     print(f"Patient: {icn}")
     print(f"Treating facilities (unsorted):")
@@ -9,9 +9,12 @@
 
 import logging
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi import Request
 
+from config import VISTA_CONFIG
+from app.services.realtime_overlay import datetime_to_fileman
+
 logger = logging.getLogger(__name__)
 
 # Vista cache TTL (Time To Live) - data expires after this many minutes
@@ -143,7 +146,8 @@ class VistaSessionCache:
         domain: str,
         vista_responses: Dict[str, str],
         sites: List[str],
-        stats: Dict[str, Any]
+        stats: Dict[str, Any],
+        refreshed_at: Optional[str] = None
     ) -> None:
         """
         Store Vista RPC responses in session cache.
@@ -163,6 +167,8 @@ class VistaSessionCache:
             vista_responses: Dict of site_id -> raw RPC response string (e.g., {"200": "BP^120/80..."})
             sites: List of Vista sites that were queried (e.g., ["200", "500"])
             stats: Merge statistics dict (pg_count, vista_count, total_merged, etc.)
+            refreshed_at: When the VistA call started (ISO); the next refresh
+                asks these sites only for records entered since then
         """
         # Initialize cache structure if not present
         if "vista_cache" not in request.session:
@@ -180,6 +186,8 @@ class VistaSessionCache:
             "sites": sites,
             "stats": stats
         }
+        if refreshed_at:
+            vista_cache[patient_icn][domain]["refreshed_at"] = refreshed_at
 
         # Trigger session update (important for session middleware to persist)
         request.session["vista_cache"] = vista_cache
@@ -193,6 +201,38 @@ class VistaSessionCache:
             f"(Vista: {stats.get('vista_count', 0)} records)"
         )
 
+    @staticmethod
+    def get_delta_since(
+        cached: Optional[Dict[str, Any]],
+        sites: List[str]
+    ) -> Dict[str, str]:
+        """
+        Build the "since" parameters for a delta refresh.
+
+        Only sites with a response in the (unexpired) cache entry get a
+        "since"; the rest are refreshed in full.
+
+        Args:
+            cached: Entry from get_cached_data (None if missing or expired)
+            sites: Vista sites about to be queried
+
+        Returns:
+            Dict of site_id -> FileMan date/time (refresh start less the
+            lookback); empty when delta refresh is disabled or not possible
+        """
+        if not VISTA_CONFIG["delta_refresh"] or not cached or not cached.get("refreshed_at"):
+            return {}
+
+        try:
+            refreshed_at = datetime.fromisoformat(cached["refreshed_at"])
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid cache refreshed_at format: {e}")
+            return {}
+
+        since = datetime_to_fileman(refreshed_at - timedelta(minutes=VISTA_CONFIG["delta_lookback_minutes"]))
+        vista_responses = cached.get("vista_responses") or {}
+        return {site: since for site in sites if site in vista_responses}
+
     @staticmethod
     def clear_patient_cache(request: Request, patient_icn: str) -> None:
         """
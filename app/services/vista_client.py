@@ -3,16 +3,34 @@
 # ---------------------------------------------------------------------
 # Vista RPC Broker HTTP Client
 # Handles site selection, RPC calls, and response aggregation
+#  - One keep-alive connection pool per site (HTTP/2 when the optional
+#    h2 package is installed and the broker is served over TLS)
+#  - Per-site latency tracking drives adaptive timeouts and optional
+#    hedged requests; a per-site circuit breaker skips sites that keep
+#    failing until a trial request succeeds
+#  - Batches run under a global deadline and return partial results,
+#    each tagged with a per-site "status"
+#  - Results are shared across users through the server-side response
+#    cache, and identical concurrent calls are coalesced
+#    (app/services/vista_response_cache.py)
 # ---------------------------------------------------------------------
 
-import json
+import asyncio
 import logging
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-from datetime import datetime, timedelta
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
 import httpx
 
-from config import VISTA_SERVICE_URL
+from app.services.patient_registry import PatientRegistry, get_patient_registry
+from app.services.vista_response_cache import response_cache_key, vista_response_cache
+from config import VISTA_SERVICE_URL, VISTA_CONFIG
+
+try:
+    import h2  # noqa: F401 - enables httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -29,85 +47,158 @@ DOMAIN_SITE_LIMITS = {
 # Hard maximum sites per query (architectural firebreak)
 MAX_SITES_ABSOLUTE = 10
 
+# Maximum calls per POST /rpc/batch (matches the RPC broker's limit);
+# larger batches are split into several requests
+MAX_BATCH_CALLS = 50
+
+# Per-site result status (the "status" key of every RPC result)
+STATUS_OK = "ok"                      # Broker answered (the RPC itself may still report an error)
+STATUS_ERROR = "error"                # Connection or HTTP error
+STATUS_TIMEOUT = "timeout"            # Adaptive timeout or global deadline reached
+STATUS_CIRCUIT_OPEN = "circuit_open"  # Skipped: site is failing
+
+# Latency tracking
+LATENCY_WINDOW = 50            # Recent samples kept per site
+MIN_LATENCY_SAMPLES = 5        # Below this, use the configured timeout and never hedge
+TIMEOUT_LATENCY_MULTIPLIER = 3.0
+MIN_TIMEOUT_SECONDS = 2.0
+HEDGE_PERCENTILE = 90          # Hedge requests slower than the site's p90
+
+
+class SiteHealth:
+    """
+    Latency samples and circuit breaker state for one site.
+
+    The breaker opens after failure_threshold consecutive failures. After
+    reset_seconds it lets a single trial request through (half-open); the
+    trial's outcome closes the breaker or re-opens it.
+    """
+
+    def __init__(self, site: str, failure_threshold: int = 3, reset_seconds: float = 30.0):
+        self.site = site
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+        # Counters for monitoring
+        self.requests = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.hedged = 0
+
+    @property
+    def state(self) -> str:
+        """Breaker state: closed, open or half_open."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (claims the half-open trial)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        if self.opened_at is not None:
+            logger.info(f"Site {self.site}: circuit closed")
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"Site {self.site}: circuit opened after {self.consecutive_failures} "
+                    f"consecutive failures (retry in {self.reset_seconds:.0f}s)"
+                )
+            self.opened_at = time.monotonic()
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile in seconds (None until enough samples)."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def timeout(self, max_timeout: float) -> float:
+        """Adaptive request timeout: a multiple of p95 latency, capped at max_timeout."""
+        p95 = self.percentile(95)
+        if p95 is None:
+            return max_timeout
+        return min(max_timeout, max(MIN_TIMEOUT_SECONDS, p95 * TIMEOUT_LATENCY_MULTIPLIER))
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before sending a hedged duplicate (None: don't hedge)."""
+        return self.percentile(HEDGE_PERCENTILE)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return state and counters for monitoring/debugging."""
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "hedged": self.hedged,
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+
 
 class VistaClient:
     """
     HTTP client for Vista RPC Broker service.
 
     Handles intelligent site selection, multi-site RPC calls,
-    and response aggregation.
+    and response aggregation. Connection pools and site health live on
+    the instance, so use the shared get_vista_client() instance.
     """
 
-    def __init__(self, vista_base_url: str = None):
+    def __init__(
+        self,
+        vista_base_url: str = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        registry: Optional[PatientRegistry] = None
+    ):
         """
         Initialize Vista client.
 
         Args:
             vista_base_url: Base URL for Vista service (defaults to config)
+            transport: Optional httpx transport for every site (tests)
+            registry: Patient registry (defaults to the process-wide registry)
         """
         self.base_url = vista_base_url or VISTA_SERVICE_URL
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.timeout = float(VISTA_CONFIG["timeout"])
+        self.deadline = VISTA_CONFIG["deadline"]
+        self.hedge_enabled = VISTA_CONFIG["hedge_enabled"]
 
-        # Load patient registry for site selection
-        self.patient_registry = self._load_patient_registry()
+        self._transport = transport
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._health: Dict[str, SiteHealth] = {}
 
-    def _load_patient_registry(self) -> Dict[str, Any]:
-        """
-        Load patient registry from shared JSON file.
-
-        Returns:
-            Dictionary with patient registry data
-        """
-        registry_path = Path(__file__).parent.parent.parent / "mock" / "shared" / "patient_registry.json"
-
-        try:
-            with open(registry_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load patient registry: {e}")
-            return {"patients": []}
-
-    def _get_patient_treating_facilities(self, icn: str) -> List[Dict[str, Any]]:
-        """
-        Get treating facilities for a patient.
-
-        Args:
-            icn: Patient ICN
-
-        Returns:
-            List of treating facility dictionaries with sta3n, last_seen, etc.
-        """
-        for patient in self.patient_registry.get("patients", []):
-            if patient.get("icn") == icn:
-                return patient.get("treating_facilities", [])
-
-        logger.warning(f"Patient {icn} not found in registry")
-        return []
-
-    def _parse_t_notation(self, t_notation: str) -> datetime:
-        """
-        Parse T-notation date (T-0, T-7, T-30, etc.) to actual date.
-
-        Args:
-            t_notation: Date in T-notation format (e.g., "T-7")
-
-        Returns:
-            Datetime object representing the date
-        """
-        if not t_notation or not t_notation.startswith("T-"):
-            # If not T-notation, try parsing as regular date
-            try:
-                return datetime.fromisoformat(t_notation)
-            except:
-                # Default to very old date if unparseable
-                return datetime(1900, 1, 1)
-
-        try:
-            days_ago = int(t_notation.split("-")[1])
-            return datetime.now() - timedelta(days=days_ago)
-        except (IndexError, ValueError) as e:
-            logger.warning(f"Failed to parse T-notation '{t_notation}': {e}")
-            return datetime(1900, 1, 1)
+        # Indexed patient registry for site selection
+        self.registry = registry or get_patient_registry()
 
     def get_target_sites(
         self,
@@ -121,7 +212,7 @@ class VistaClient:
 
         Implements intelligent site selection based on:
         - Patient's treating facilities
-        - Last seen dates (sorted descending - most recent first)
+        - Last seen dates (ranked when the registry loads - most recent first)
         - Per-domain site limits
         - Hard maximum of 10 sites
 
@@ -140,20 +231,13 @@ class VistaClient:
             logger.info(f"Using user-selected sites for {icn}/{domain}: {selected}")
             return selected
 
-        # Get treating facilities from patient registry
-        treating_facilities = self._get_patient_treating_facilities(icn)
+        # Treating sites from the registry, already ranked by last_seen
+        ranked_sites = self.registry.get_ranked_sites(icn)
 
-        if not treating_facilities:
+        if not ranked_sites:
             logger.warning(f"No treating facilities found for patient {icn}")
             return []
 
-        # Sort by last_seen descending (most recent first)
-        sorted_facilities = sorted(
-            treating_facilities,
-            key=lambda x: self._parse_t_notation(x.get("last_seen", "T-999")),
-            reverse=True
-        )
-
         # Apply domain-specific limit
         limit = max_sites if max_sites is not None else DOMAIN_SITE_LIMITS.get(domain, DOMAIN_SITE_LIMITS["default"])
 
@@ -164,20 +248,196 @@ class VistaClient:
         limit = min(limit, MAX_SITES_ABSOLUTE)
 
         # Extract sta3n values
-        target_sites = [fac["sta3n"] for fac in sorted_facilities[:limit]]
+        target_sites = list(ranked_sites[:limit])
 
         logger.info(
             f"Selected {len(target_sites)} sites for {icn}/{domain}: {target_sites} "
-            f"(limit={limit}, available={len(treating_facilities)})"
+            f"(limit={limit}, available={len(ranked_sites)})"
         )
 
         return target_sites
 
+    # -----------------------------------------------------------------
+    # Per-site connection pools and health
+    # -----------------------------------------------------------------
+
+    def _site_client(self, site: str) -> httpx.AsyncClient:
+        """Get (or create) the keep-alive connection pool for a site."""
+        client = self._clients.get(site)
+        if client is None:
+            max_connections = VISTA_CONFIG["max_connections_per_site"]
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+                http2=VISTA_CONFIG["http2"] and HTTP2_AVAILABLE,
+                transport=self._transport,
+            )
+            self._clients[site] = client
+        return client
+
+    def site_health(self, site: str) -> SiteHealth:
+        """Get (or create) the health tracker for a site."""
+        health = self._health.get(site)
+        if health is None:
+            health = SiteHealth(
+                site,
+                failure_threshold=VISTA_CONFIG["breaker_failure_threshold"],
+                reset_seconds=VISTA_CONFIG["breaker_reset_seconds"],
+            )
+            self._health[site] = health
+        return health
+
+    def get_site_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get breaker state, counters and latency for every site called so far.
+
+        Returns:
+            Dictionary mapping site -> SiteHealth snapshot
+        """
+        return {site: health.snapshot() for site, health in self._health.items()}
+
+    @staticmethod
+    async def _hedged(attempt: Callable[[], Awaitable[httpx.Response]], delay: float, health: SiteHealth) -> httpx.Response:
+        """
+        Send a second, identical request if the first has not answered
+        within delay; the first successful response wins. RPC broker reads
+        are idempotent, so duplicates are safe.
+        """
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                health.hedged += 1
+                tasks.append(asyncio.ensure_future(attempt()))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _post_site(
+        self,
+        site: str,
+        path: str,
+        payload: Dict[str, Any],
+        params: Optional[Dict[str, str]] = None,
+        expires_at: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        POST to the broker on a site's pool with an adaptive timeout (and
+        hedging, if enabled), recording the outcome in the site's health.
+
+        Raises:
+            asyncio.TimeoutError, httpx.HTTPError: Request failed (5xx counts
+            as a failure; other status codes are returned)
+        """
+        health = self.site_health(site)
+        client = self._site_client(site)
+        url = f"{self.base_url}{path}"
+
+        timeout = health.timeout(self.timeout)
+        if expires_at is not None:
+            timeout = min(timeout, max(0.0, expires_at - time.monotonic()))
+
+        def attempt() -> Awaitable[httpx.Response]:
+            return client.post(url, params=params, json=payload)
+
+        hedge_delay = health.hedge_delay() if self.hedge_enabled else None
+        started = time.monotonic()
+        try:
+            if hedge_delay is not None and hedge_delay < timeout:
+                response = await asyncio.wait_for(self._hedged(attempt, hedge_delay, health), timeout)
+            else:
+                response = await asyncio.wait_for(attempt(), timeout)
+            if response.status_code >= 500:
+                response.raise_for_status()
+        except asyncio.CancelledError:
+            # Caller gave up; release a half-open trial without judging the site
+            health.trial_in_flight = False
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+
+        health.record_success(time.monotonic() - started)
+        return response
+
+    def _expires_at(self, deadline: Optional[float]) -> Optional[float]:
+        """Absolute monotonic deadline (None/0 disables it)."""
+        deadline = self.deadline if deadline is None else deadline
+        return time.monotonic() + deadline if deadline else None
+
+    # -----------------------------------------------------------------
+    # RPC calls
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def _error_result(site: str, rpc_name: str, error: str, status: str = STATUS_ERROR) -> Dict[str, Any]:
+        """Build a failed RPC result in the broker's response shape."""
+        return {
+            "success": False,
+            "response": None,
+            "error": error,
+            "site": site,
+            "rpc": rpc_name,
+            "status": status
+        }
+
+    @classmethod
+    def _failure_results(cls, site: str, calls: List[Tuple[str, str, List[Any]]], e: Exception) -> List[Dict[str, Any]]:
+        """One failed result per call, classified as timeout or error."""
+        if isinstance(e, (asyncio.TimeoutError, httpx.TimeoutException)):
+            logger.warning(f"Timed out calling {len(calls)} RPC(s) at site {site}")
+            return [cls._error_result(site, rpc_name, "Request timed out", STATUS_TIMEOUT) for _, rpc_name, _ in calls]
+
+        if isinstance(e, httpx.HTTPStatusError):
+            error = f"HTTP {e.response.status_code}: {e.response.text}"
+        else:
+            error = str(e) or type(e).__name__
+        logger.error(f"Error calling {len(calls)} RPC(s) at site {site}: {error}")
+        return [cls._error_result(site, rpc_name, error) for _, rpc_name, _ in calls]
+
+    async def _call_rpc(self, site: str, rpc_name: str, params: List[Any], expires_at: Optional[float]) -> Dict[str, Any]:
+        """Call one RPC via POST /rpc/execute (see call_rpc)."""
+        if not self.site_health(site).allow_request():
+            return self._error_result(site, rpc_name, f"Site {site} unavailable (circuit open)", STATUS_CIRCUIT_OPEN)
+
+        try:
+            response = await self._post_site(
+                site,
+                "/rpc/execute",
+                {"name": rpc_name, "params": params},
+                params={"site": site},
+                expires_at=expires_at,
+            )
+            response.raise_for_status()
+            result = response.json()
+
+            logger.debug(f"RPC {rpc_name} at site {site}: success={result.get('success')}")
+            result["status"] = STATUS_OK
+            return result
+
+        except Exception as e:
+            return self._failure_results(site, [(site, rpc_name, params)], e)[0]
+
     async def call_rpc(
         self,
         site: str,
         rpc_name: str,
-        params: List[Any]
+        params: List[Any],
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Call a single RPC at a specific site.
@@ -186,52 +446,226 @@ class VistaClient:
             site: Site station number (sta3n)
             rpc_name: RPC name (e.g., "ORWPT PTINQ")
             params: RPC parameters
+            deadline: Seconds before giving up (defaults to VISTA_DEADLINE; 0 disables)
 
         Returns:
-            Dictionary with success, response, error, site, rpc
+            Dictionary with success, response, error, site, rpc, status
         """
-        url = f"{self.base_url}/rpc/execute"
+        return await self._call_rpc(site, rpc_name, params, self._expires_at(deadline))
+
+    async def _call_site(
+        self,
+        site: str,
+        calls: List[Tuple[str, str, List[Any]]],
+        expires_at: Optional[float]
+    ) -> List[Dict[str, Any]]:
+        """Send one site's calls as a single POST /rpc/batch (see call_batch)."""
+        if expires_at is not None and expires_at <= time.monotonic():
+            return [self._error_result(site, rpc_name, "Deadline exceeded", STATUS_TIMEOUT) for _, rpc_name, _ in calls]
+
+        if not self.site_health(site).allow_request():
+            return [
+                self._error_result(site, rpc_name, f"Site {site} unavailable (circuit open)", STATUS_CIRCUIT_OPEN)
+                for _, rpc_name, _ in calls
+            ]
 
         try:
-            response = await self.client.post(
-                url,
-                params={"site": site},
-                json={
-                    "name": rpc_name,
-                    "params": params
-                }
+            response = await self._post_site(
+                site,
+                "/rpc/batch",
+                {
+                    "calls": [
+                        {"site": call_site, "name": rpc_name, "params": params}
+                        for call_site, rpc_name, params in calls
+                    ]
+                },
+                expires_at=expires_at,
             )
 
+            if response.status_code == 404:
+                # Broker predates /rpc/batch: one request per call
+                logger.warning("RPC broker has no /rpc/batch endpoint, calling RPCs individually")
+                return list(await asyncio.gather(*[
+                    self._call_rpc(call_site, rpc_name, params, expires_at)
+                    for call_site, rpc_name, params in calls
+                ]))
+
             response.raise_for_status()
-            result = response.json()
+            results = response.json()["results"]
 
-            logger.debug(f"RPC {rpc_name} at site {site}: success={result.get('success')}")
-            return result
+            if len(results) != len(calls):
+                raise ValueError(f"Batch returned {len(results)} results for {len(calls)} calls")
+
+            for result in results:
+                result["status"] = STATUS_OK
+            return results
+
+        except Exception as e:
+            return self._failure_results(site, calls, e)
+
+    async def _fetch_batch(
+        self,
+        calls: List[Tuple[str, str, List[Any]]],
+        expires_at: Optional[float]
+    ) -> List[Dict[str, Any]]:
+        """Send calls to the broker, one request per site (see call_batch)."""
+        # Group call positions by site, split at the broker's batch limit
+        positions_by_site: Dict[str, List[int]] = {}
+        for position, (site, _, _) in enumerate(calls):
+            positions_by_site.setdefault(site, []).append(position)
+
+        groups = [
+            (site, positions[i:i + MAX_BATCH_CALLS])
+            for site, positions in positions_by_site.items()
+            for i in range(0, len(positions), MAX_BATCH_CALLS)
+        ]
+
+        group_results = await asyncio.gather(*[
+            self._call_site(site, [calls[position] for position in positions], expires_at)
+            for site, positions in groups
+        ])
 
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error calling RPC {rpc_name} at site {site}: {e}")
-            return {
-                "success": False,
-                "response": None,
-                "error": f"HTTP {e.response.status_code}: {e.response.text}",
-                "site": site,
-                "rpc": rpc_name
-            }
+        results: List[Dict[str, Any]] = [None] * len(calls)
+        for (_, positions), site_results in zip(groups, group_results):
+            for position, result in zip(positions, site_results):
+                results[position] = result
+        return results
+
+    async def _await_shared(
+        self,
+        call: Tuple[str, str, List[Any]],
+        future: asyncio.Future,
+        expires_at: Optional[float]
+    ) -> Dict[str, Any]:
+        """Wait (within the deadline) for an identical request another caller is making."""
+        site, rpc_name, _ = call
+        timeout = None if expires_at is None else max(0.0, expires_at - time.monotonic())
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return self._error_result(site, rpc_name, "Request timed out", STATUS_TIMEOUT)
         except Exception as e:
-            logger.error(f"Error calling RPC {rpc_name} at site {site}: {e}")
-            return {
-                "success": False,
-                "response": None,
-                "error": str(e),
-                "site": site,
-                "rpc": rpc_name
-            }
+            return self._error_result(site, rpc_name, str(e))
+        return {**result, "coalesced": True}
+
+    async def _fetch_batch_shared(
+        self,
+        calls: List[Tuple[str, str, List[Any]]],
+        expires_at: Optional[float]
+    ) -> List[Dict[str, Any]]:
+        """
+        Serve calls from the shared response cache, join identical requests
+        already in flight, and fetch only the rest (see call_batch).
+        """
+        cache = vista_response_cache
+        keys = [response_cache_key(*call) for call in calls]
+        results: List[Dict[str, Any]] = [None] * len(calls)
+
+        leading: Dict[str, asyncio.Future] = {}  # Keys this call fetches
+        fetch_positions: List[int] = []
+        following: List[Tuple[int, asyncio.Future]] = []
+
+        for position, key in enumerate(keys):
+            if key in leading:
+                following.append((position, leading[key]))
+                continue
+
+            cached = await cache.get(key)
+            if cached is not None:
+                results[position] = {**cached, "status": STATUS_OK, "cached": True}
+                continue
+
+            future, is_leader = cache.claim(key)
+            if is_leader:
+                leading[key] = future
+                fetch_positions.append(position)
+            else:
+                following.append((position, future))
+
+        try:
+            fetched = await self._fetch_batch([calls[position] for position in fetch_positions], expires_at)
+        except BaseException as e:
+            for key, future in leading.items():
+                cache.finish(key, future, error=RuntimeError(f"Shared VistA request failed: {e!r}"))
+            raise
+
+        for position, result in zip(fetch_positions, fetched):
+            key = keys[position]
+            if result.get("success") and result.get("status") == STATUS_OK:
+                await cache.set(key, result)
+            cache.finish(key, leading[key], result=result)
+            results[position] = result
+
+        for position, future in following:
+            results[position] = await self._await_shared(calls[position], future, expires_at)
+
+        return results
+
+    async def call_batch(
+        self,
+        calls: List[Tuple[str, str, List[Any]]],
+        deadline: Optional[float] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Call several RPCs (any mix of sites and RPC names) concurrently.
+
+        Calls are first served from the shared response cache (all users,
+        VISTA_CACHE_TTL_SECONDS); identical calls already in flight are
+        joined rather than repeated. Each site's remaining calls go out as
+        one POST /rpc/batch on that site's connection pool, so a slow or
+        failing site only affects its own results. Sites still running
+        when the deadline passes are reported with status "timeout"; the
+        rest are returned as they are.
+
+        Args:
+            calls: List of (site, rpc_name, params) tuples
+            deadline: Seconds for the whole batch (defaults to VISTA_DEADLINE; 0 disables)
+            use_cache: Use the shared response cache and request coalescing
+
+        Returns:
+            List of response dicts (success, response, error, site, rpc,
+            status; "cached"/"coalesced" when shared), in the same order
+            as calls
+
+        Example:
+            results = await client.call_batch([
+                ("200", "GMV LATEST VM", ["ICN100001"]),
+                ("500", "GMV LATEST VM", ["ICN100001"]),
+                ("200", "ORQQAL LIST", ["ICN100001"]),
+            ])
+        """
+        if not calls:
+            return []
+
+        expires_at = self._expires_at(deadline)
+
+        if use_cache and vista_response_cache.enabled:
+            results = await self._fetch_batch_shared(calls, expires_at)
+        else:
+            results = await self._fetch_batch(calls, expires_at)
+
+        successful = sum(1 for r in results if r.get("success"))
+        sites = len({site for site, _, _ in calls})
+        logger.info(f"RPC batch completed: {successful}/{len(calls)} calls succeeded across {sites} sites")
+
+        return results
+
+    @staticmethod
+    def _site_params(site: str, params: List[Any], since: Optional[Dict[str, str]]) -> List[Any]:
+        """RPC parameters for one site, with its "since" appended for a delta refresh."""
+        if since and since.get(site):
+            return list(params) + [since[site]]
+        return params
 
     async def call_rpc_multi_site(
         self,
         sites: List[str],
         rpc_name: str,
-        params: List[Any]
+        params: List[Any],
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+        since: Optional[Dict[str, str]] = None
     ) -> Dict[str, Dict[str, Any]]:
         """
         Call an RPC at multiple sites in parallel.
@@ -240,38 +674,26 @@ class VistaClient:
             sites: List of site station numbers (sta3n)
             rpc_name: RPC name (e.g., "ORWPT PTINQ")
             params: RPC parameters
+            deadline: Seconds for the whole call (defaults to VISTA_DEADLINE; 0 disables)
+            use_cache: Use the shared response cache and request coalescing
+            since: Optional delta refresh (site -> FileMan date/time); those
+                sites return only records entered after it. The list RPCs
+                (GMV LATEST VM, ORWPS COVER, ORQQAL LIST, ORQQPL LIST)
+                take it as their last parameter.
 
         Returns:
-            Dictionary mapping site -> response dict
-            Example: {"200": {"success": True, ...}, "500": {...}}
+            Dictionary mapping site -> response dict (partial results if the
+            deadline passed; see each result's "status")
+            Example: {"200": {"success": True, "status": "ok", ...}, "500": {...}}
         """
-        import asyncio
-
         logger.info(f"Calling {rpc_name} at {len(sites)} sites: {sites}")
 
-        # Create tasks for all sites
-        tasks = [
-            self.call_rpc(site, rpc_name, params)
-            for site in sites
-        ]
-
-        # Execute in parallel
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Build result dictionary
-        result_dict = {}
-        for site, result in zip(sites, results):
-            if isinstance(result, Exception):
-                logger.error(f"Exception calling {rpc_name} at site {site}: {result}")
-                result_dict[site] = {
-                    "success": False,
-                    "response": None,
-                    "error": str(result),
-                    "site": site,
-                    "rpc": rpc_name
-                }
-            else:
-                result_dict[site] = result
+        results = await self.call_batch(
+            [(site, rpc_name, self._site_params(site, params, since)) for site in sites],
+            deadline=deadline,
+            use_cache=use_cache
+        )
+        result_dict = dict(zip(sites, results))
 
         # Log summary
         successful = sum(1 for r in result_dict.values() if r.get("success"))
@@ -279,9 +701,54 @@ class VistaClient:
 
         return result_dict
 
+    async def iter_rpc_multi_site(
+        self,
+        sites: List[str],
+        rpc_name: str,
+        params: List[Any],
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+        since: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Call an RPC at multiple sites in parallel, yielding each site's
+        result as soon as it arrives (fastest site first).
+
+        Same caching, coalescing and deadline behavior as
+        call_rpc_multi_site(); used to stream realtime refreshes. Calls
+        still running when the consumer stops iterating are cancelled.
+
+        Args:
+            sites: List of site station numbers (sta3n)
+            rpc_name: RPC name (e.g., "GMV LATEST VM")
+            params: RPC parameters
+            deadline: Seconds for the whole call (defaults to VISTA_DEADLINE; 0 disables)
+            use_cache: Use the shared response cache and request coalescing
+            since: Optional delta refresh (site -> FileMan date/time)
+
+        Yields:
+            (site, response dict) in completion order
+        """
+        expires_at = self._expires_at(deadline)
+        fetch = self._fetch_batch_shared if use_cache and vista_response_cache.enabled else self._fetch_batch
+
+        async def call_site(site: str) -> Tuple[str, Dict[str, Any]]:
+            results = await fetch([(site, rpc_name, self._site_params(site, params, since))], expires_at)
+            return site, results[0]
+
+        tasks = [asyncio.ensure_future(call_site(site)) for site in sites]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Close every site's connection pool"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
 
 
 # Singleton instance for easy import
@@ -299,3 +766,9 @@ def get_vista_client() -> VistaClient:
     if _vista_client_instance is None:
         _vista_client_instance = VistaClient()
     return _vista_client_instance
+
+
+async def close_vista_client() -> None:
+    """Close the singleton client's connection pools (application shutdown)."""
+    if _vista_client_instance is not None:
+        await _vista_client_instance.close()
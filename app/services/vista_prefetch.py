@@ -0,0 +1,169 @@
+# ---------------------------------------------------------------------
+# app/services/vista_prefetch.py
+# ---------------------------------------------------------------------
+# Background VistA Prefetch (optional, VISTA_PREFETCH_ENABLED)
+#  - When a patient is selected (POST /api/patient/set-context, or a
+#    CCOW context change picked up by GET /api/patient/current), the
+#    patient's high-value domains (VISTA_PREFETCH_DOMAINS, default
+#    allergies and vitals) are fetched from that domain's target sites
+#    into the shared response cache (app/services/vista_response_cache.py)
+#  - A realtime refresh then finds the data cached, or joins the
+#    prefetch if it is still in flight (single-flight)
+#  - Low priority: a global semaphore caps prefetch RPCs in flight
+#    across all users (VISTA_PREFETCH_CONCURRENCY); interactive
+#    refreshes are not counted against it
+#  - A patient is not prefetched again while its previous prefetch is
+#    running or its results are still within the cache TTL. The patient
+#    routes schedule only when the session's patient changes, not on
+#    every page load
+# ---------------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.vista_client import get_vista_client
+from app.services.vista_response_cache import vista_response_cache
+from config import VISTA_PREFETCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# RPC used by each domain's realtime refresh (must match the routes so
+# prefetched entries share their cache keys)
+DOMAIN_RPCS = {
+    "allergies": "ORQQAL LIST",
+    "vitals": "GMV LATEST VM",
+    "medications": "ORWPS COVER",
+    "problems": "ORQQPL LIST",
+}
+
+# Bound on remembered patients (oldest forgotten first)
+MAX_RECENT_PATIENTS = 1000
+
+
+class VistaPrefetcher:
+    """
+    Schedules background cache warm-up for newly selected patients.
+
+    schedule() is called from request handlers on the event loop and
+    returns immediately; fetches run as background tasks.
+    """
+
+    def __init__(self, domains: List[str], max_concurrency: int = 4, enabled: bool = False):
+        unknown = [domain for domain in domains if domain not in DOMAIN_RPCS]
+        if unknown:
+            logger.warning(f"Ignoring unknown VistA prefetch domains: {unknown}")
+        self.domains = [domain for domain in domains if domain in DOMAIN_RPCS]
+        self.max_concurrency = max(1, max_concurrency)
+        self.enabled = enabled
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._recent: Dict[str, float] = {}  # icn -> monotonic time of last completed prefetch
+
+        # Counters for monitoring
+        self.scheduled = 0
+        self.skipped = 0
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether prefetch is on and has somewhere to put its results."""
+        return self.enabled and bool(self.domains) and vista_response_cache.enabled
+
+    def _is_fresh(self, icn: str) -> bool:
+        finished_at = self._recent.get(icn)
+        return finished_at is not None and time.monotonic() - finished_at < vista_response_cache.ttl_seconds
+
+    def schedule(self, icn: str) -> bool:
+        """
+        Start a background prefetch for a patient.
+
+        Args:
+            icn: Patient ICN
+
+        Returns:
+            True if a prefetch was started, False if prefetch is off or
+            the patient is already being (or was recently) prefetched
+        """
+        if not icn or not self.active:
+            return False
+
+        if icn in self._tasks or self._is_fresh(icn):
+            self.skipped += 1
+            return False
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.scheduled += 1
+        task = asyncio.get_running_loop().create_task(self._prefetch(icn), name=f"vista-prefetch-{icn}")
+        self._tasks[icn] = task
+        task.add_done_callback(lambda _: self._tasks.pop(icn, None))
+        return True
+
+    async def _fetch(self, site: str, rpc_name: str, icn: str) -> None:
+        """Fetch one RPC into the shared cache within the concurrency budget."""
+        async with self._semaphore:
+            self.calls += 1
+            results = await get_vista_client().call_batch([(site, rpc_name, [icn])])
+        if not results[0].get("success"):
+            self.failures += 1
+
+    async def _prefetch(self, icn: str) -> None:
+        started = time.monotonic()
+        try:
+            client = get_vista_client()
+            calls = [
+                (site, DOMAIN_RPCS[domain])
+                for domain in self.domains
+                for site in client.get_target_sites(icn, domain=domain)
+            ]
+            await asyncio.gather(*[self._fetch(site, rpc_name, icn) for site, rpc_name in calls])
+            logger.info(f"VistA prefetch for {icn}: {len(calls)} calls in {time.monotonic() - started:.2f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"VistA prefetch for {icn} failed: {e}")
+            return
+
+        self._recent.pop(icn, None)
+        self._recent[icn] = time.monotonic()
+        while len(self._recent) > MAX_RECENT_PATIENTS:
+            self._recent.pop(next(iter(self._recent)))
+
+    async def stop(self) -> None:
+        """Cancel prefetches still running (application shutdown)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return prefetch counters for monitoring/debugging."""
+        return {
+            "enabled": self.active,
+            "domains": self.domains,
+            "max_concurrency": self.max_concurrency,
+            "in_progress": len(self._tasks),
+            "scheduled": self.scheduled,
+            "skipped": self.skipped,
+            "calls": self.calls,
+            "failures": self.failures,
+        }
+
+
+# Process-wide prefetcher (the concurrency budget is per worker)
+vista_prefetcher = VistaPrefetcher(
+    domains=VISTA_PREFETCH_CONFIG["domains"],
+    max_concurrency=VISTA_PREFETCH_CONFIG["max_concurrency"],
+    enabled=VISTA_PREFETCH_CONFIG["enabled"],
+)
+
+
+def get_vista_prefetch_stats() -> Dict[str, Any]:
+    """Return background VistA prefetch statistics for monitoring/debugging."""
+    return vista_prefetcher.stats()
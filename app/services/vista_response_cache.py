@@ -0,0 +1,214 @@
+# ---------------------------------------------------------------------
+# app/services/vista_response_cache.py
+# ---------------------------------------------------------------------
+# Shared VistA RPC Response Cache (server-side, all users)
+#  - Successful RPC results are cached per (site, rpc, params) for a
+#    short TTL; params start with the patient ICN, so clinicians opening
+#    the same patient reuse each other's refresh
+#  - Concurrent misses for the same key are coalesced into one broker
+#    request (single-flight); followers await the leader's result
+#  - In-process LRU by default. Set VISTA_CACHE_REDIS_URL (requires the
+#    redis package) to share entries across workers; single-flight is
+#    always per process
+#  - Used by VistaClient.call_batch() / call_rpc_multi_site(). The
+#    per-user VistaSessionCache still records what each user refreshed.
+# ---------------------------------------------------------------------
+
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import VISTA_CACHE_CONFIG
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "medz1:vista:"
+
+
+def response_cache_key(site: str, rpc_name: str, params: List[Any]) -> str:
+    """Cache key for one RPC call, e.g. '200|GMV LATEST VM|["ICN100001"]'."""
+    return f"{site}|{rpc_name}|{json.dumps(params, separators=(',', ':'), default=str)}"
+
+
+class VistaResponseCache:
+    """
+    TTL cache of RPC results plus a registry of in-flight requests.
+
+    Memory entries are guarded by a lock; in-flight futures belong to the
+    event loop that created them and are only shared within that loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl_seconds: float = 60.0,
+        enabled: bool = True,
+        redis_url: str = ""
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+        self._redis = None
+        if redis_url:
+            if redis_asyncio is None:
+                logger.warning("VISTA_CACHE_REDIS_URL is set but the redis package is not installed; using in-process cache")
+            else:
+                self._redis = redis_asyncio.from_url(redis_url)
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    # -----------------------------------------------------------------
+    # Cached results
+    # -----------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None."""
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"VistA cache read failed: {e}")
+                raw = None
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(raw)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            result, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    async def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result for ttl_seconds."""
+        self.stores += 1
+
+        if self._redis is not None:
+            try:
+                await self._redis.set(REDIS_KEY_PREFIX + key, json.dumps(result), ex=max(1, math.ceil(self.ttl_seconds)))
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"VistA cache write failed: {e}")
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (result, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+
+    # -----------------------------------------------------------------
+    # Single-flight
+    # -----------------------------------------------------------------
+
+    def claim(self, key: str) -> Tuple[asyncio.Future, bool]:
+        """
+        Join or start the in-flight request for a key.
+
+        Returns:
+            (future, is_leader). The leader must fetch the result and call
+            finish(); followers await the future.
+        """
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and in_flight[0] is loop and not in_flight[1].done():
+            self.coalesced += 1
+            return in_flight[1], False
+
+        future = loop.create_future()
+        self._in_flight[key] = (loop, future)
+        return future, True
+
+    def finish(self, key: str, future: asyncio.Future, result: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None) -> None:
+        """Resolve a leader's future (result or error) and unregister it."""
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+                # Followers retrieve it; don't warn if there are none
+                future.exception()
+            else:
+                future.set_result(result)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and in_flight[1] is future:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring/debugging."""
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend,
+            "ttl_seconds": self.ttl_seconds,
+            "entries": entries,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "errors": self.errors,
+        }
+
+
+# Process-wide cache instance
+vista_response_cache = VistaResponseCache(
+    max_entries=VISTA_CACHE_CONFIG["max_entries"],
+    ttl_seconds=VISTA_CACHE_CONFIG["ttl_seconds"],
+    enabled=VISTA_CACHE_CONFIG["enabled"],
+    redis_url=VISTA_CACHE_CONFIG["redis_url"],
+)
+
+
+def get_vista_cache_stats() -> Dict[str, Any]:
+    """Return shared VistA response cache statistics for monitoring/debugging."""
+    return vista_response_cache.stats()
@@ -417,3 +417,179 @@ function openProblemDetail(problemId, icn) {
         }, 100);
     }
 }
+
+// ============================================
+// Detail Prefetch
+// ============================================
+// List containers marked data-prefetch-url (a batch details endpoint) hold
+// rows marked data-prefetch-id. Rows that scroll into view are fetched in
+// one batched request, which warms the server-side detail cache so opening
+// a detail modal or expanding a row is a cache hit.
+
+const PREFETCH_BATCH_SIZE = 50;
+const PREFETCH_DELAY_MS = 300;
+const prefetchedDetails = new Set();
+const pendingPrefetch = new Map();  // url -> Set of ids
+let prefetchTimer = null;
+
+function flushDetailPrefetch() {
+    prefetchTimer = null;
+    pendingPrefetch.forEach((ids, url) => {
+        const batch = Array.from(ids);
+        for (let i = 0; i < batch.length; i += PREFETCH_BATCH_SIZE) {
+            const chunk = batch.slice(i, i + PREFETCH_BATCH_SIZE);
+            fetch(`${url}?ids=${chunk.map(encodeURIComponent).join(',')}`)
+                .catch(err => console.warn('Detail prefetch failed:', err));
+        }
+    });
+    pendingPrefetch.clear();
+}
+
+const detailPrefetchObserver = ('IntersectionObserver' in window)
+    ? new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (!entry.isIntersecting) return;
+            detailPrefetchObserver.unobserve(entry.target);
+
+            const container = entry.target.closest('[data-prefetch-url]');
+            const id = entry.target.dataset.prefetchId;
+            if (!container || !id) return;
+
+            const url = container.dataset.prefetchUrl;
+            const key = `${url}|${id}`;
+            if (prefetchedDetails.has(key)) return;
+            prefetchedDetails.add(key);
+
+            if (!pendingPrefetch.has(url)) pendingPrefetch.set(url, new Set());
+            pendingPrefetch.get(url).add(id);
+        });
+
+        if (pendingPrefetch.size && !prefetchTimer) {
+            prefetchTimer = setTimeout(flushDetailPrefetch, PREFETCH_DELAY_MS);
+        }
+    }, { rootMargin: '200px' })
+    : null;
+
+function observeDetailPrefetch(root) {
+    if (!detailPrefetchObserver || !root.querySelectorAll) return;
+    root.querySelectorAll('[data-prefetch-url] [data-prefetch-id]').forEach(row => {
+        detailPrefetchObserver.observe(row);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', () => observeDetailPrefetch(document));
+document.body.addEventListener('htmx:afterSwap', (e) => observeDetailPrefetch(e.detail.target));
+
+
+// ============================================
+// Live Task Updates
+// ============================================
+// Task views marked data-task-events (an SSE endpoint) subscribe to task
+// changes for the patient. Any create/edit/complete/delete by any user
+// dispatches the existing taskUpdated event, which task widgets and lists
+// already refresh on. The browser reconnects automatically.
+
+const TASK_EVENTS_DEBOUNCE_MS = 300;
+let taskEventSource = null;
+let taskEventTimer = null;
+
+function connectTaskEvents() {
+    const el = document.querySelector('[data-task-events]');
+    if (!el || !window.EventSource) return;
+
+    const url = el.dataset.taskEvents;
+    if (taskEventSource && taskEventSource.url.endsWith(url)) return;
+    if (taskEventSource) taskEventSource.close();
+
+    taskEventSource = new EventSource(url);
+    taskEventSource.addEventListener('tasks-changed', () => {
+        // Debounce: our own edits also refresh directly, and bursts should cost one request
+        clearTimeout(taskEventTimer);
+        taskEventTimer = setTimeout(() => {
+            document.body.dispatchEvent(new CustomEvent('taskUpdated', { bubbles: true }));
+        }, TASK_EVENTS_DEBOUNCE_MS);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', connectTaskEvents);
+window.addEventListener('beforeunload', () => {
+    if (taskEventSource) taskEventSource.close();
+});
+
+
+// ============================================
+// Progressive VistA Refresh
+// ============================================
+// Refresh VistA buttons marked data-vista-stream open the .../stream
+// variant of their realtime endpoint (Server-Sent Events) instead of
+// waiting for every site. PostgreSQL history renders first, then each
+// site's rows are merged in as that site answers, with per-site status
+// badges. Each "swap" event's top-level elements replace the page
+// elements with the same id. After "done" the button's regular request
+// runs once more with the stream's handoff token, so the server reuses
+// the merged site results instead of calling VistA again, and records
+// the session cache; it also serves as the fallback if the stream fails.
+
+function vistaStreamUrl(btn) {
+    const url = btn.getAttribute('hx-get') || btn.getAttribute('hx-post');
+    const [path, query] = url.split('?');
+    return `${path}/stream${query ? '?' + query : ''}`;
+}
+
+function swapVistaFragments(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html;
+    Array.from(template.content.children).forEach(el => {
+        const current = el.id && document.getElementById(el.id);
+        if (!current) return;
+        el.removeAttribute('hx-swap-oob');
+        current.replaceWith(el);
+        htmx.process(el);
+        observeDetailPrefetch(el);
+    });
+}
+
+function streamVistaRefresh(btn) {
+    const indicator = document.querySelector(btn.getAttribute('hx-indicator'));
+    const source = new EventSource(vistaStreamUrl(btn));
+    btn.classList.add('htmx-request');
+    if (indicator) indicator.classList.add('htmx-request');
+
+    let finished = false;
+    const finish = (e) => {
+        if (finished) return;
+        finished = true;
+        source.close();
+        btn.classList.remove('htmx-request');
+        if (indicator) indicator.classList.remove('htmx-request');
+        const handoff = e && e.data && JSON.parse(e.data).handoff;
+        if (handoff) btn.dataset.vistaHandoff = handoff;
+        btn.dataset.vistaSettle = 'true';
+        htmx.trigger(btn, 'click');
+    };
+
+    source.addEventListener('swap', (e) => swapVistaFragments(JSON.parse(e.data).html));
+    source.addEventListener('done', finish);
+    // Stream unavailable or dropped: fall back to the regular request
+    source.onerror = finish;
+}
+
+document.body.addEventListener('htmx:beforeRequest', (e) => {
+    const btn = e.detail.elt;
+    if (!btn.hasAttribute || !btn.hasAttribute('data-vista-stream') || !window.EventSource) return;
+    if (btn.dataset.vistaSettle) {
+        delete btn.dataset.vistaSettle;
+        return;
+    }
+    e.preventDefault();
+    streamVistaRefresh(btn);
+});
+
+// Settle request after a completed stream: pass the handoff token along
+document.body.addEventListener('htmx:configRequest', (e) => {
+    const btn = e.detail.elt;
+    if (!btn.dataset || !btn.dataset.vistaHandoff) return;
+    const sep = e.detail.path.includes('?') ? '&' : '?';
+    e.detail.path += `${sep}handoff=${encodeURIComponent(btn.dataset.vistaHandoff)}`;
+    delete btn.dataset.vistaHandoff;
+});
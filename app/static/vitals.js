@@ -9,7 +9,7 @@ let weightChart = null;
 let painChart = null;
 
 /**
- * Initialize all charts when page loads
+ * Initialize all charts when page loads (and again when the time period changes)
  */
 function initializeCharts() {
     console.log('Initializing vitals charts...');
@@ -24,8 +24,10 @@ function initializeCharts() {
         return;
     }
 
+    const start = getChartWindowStart();
+
     // Fetch and create Blood Pressure chart
-    fetchVitalsForChart(patientICN, 'BLOOD PRESSURE', 50)
+    fetchVitalsForChart(patientICN, 'BLOOD PRESSURE', 'chart-bp', start)
         .then(vitals => {
             if (vitals.length > 0) {
                 createBPChart(vitals);
@@ -39,7 +41,7 @@ function initializeCharts() {
         });
 
     // Fetch and create Weight chart
-    fetchVitalsForChart(patientICN, 'WEIGHT', 50)
+    fetchVitalsForChart(patientICN, 'WEIGHT', 'chart-weight', start)
         .then(vitals => {
             if (vitals.length > 0) {
                 createWeightChart(vitals);
@@ -53,7 +55,7 @@ function initializeCharts() {
         });
 
     // Fetch and create Pain Score chart
-    fetchVitalsForChart(patientICN, 'PAIN', 50)
+    fetchVitalsForChart(patientICN, 'PAIN', 'chart-pain', start)
         .then(vitals => {
             if (vitals.length > 0) {
                 createPainChart(vitals);
@@ -68,24 +70,56 @@ function initializeCharts() {
 }
 
 /**
- * Fetch vital signs data for charting
+ * Get the start of the selected chart time period
+ * @returns {string|null} ISO date (YYYY-MM-DD), or null for all time
+ */
+function getChartWindowStart() {
+    const select = document.getElementById('vitals-chart-range');
+    const days = select ? parseInt(select.value, 10) : NaN;
+    if (!days) {
+        return null;
+    }
+    const start = new Date(Date.now() - days * 24 * 60 * 60 * 1000);
+    return start.toISOString().slice(0, 10);
+}
+
+/**
+ * Fetch a downsampled vital sign series for charting.
+ * The server returns about one point per pixel of chart width, so the full
+ * history can be charted however many readings the patient has.
  * @param {string} icn - Patient ICN
  * @param {string} vitalType - Vital type name (e.g., "BLOOD PRESSURE")
- * @param {number} limit - Number of records to fetch
- * @returns {Promise<Array>} Array of vital sign records
+ * @param {string} canvasId - Canvas element ID (sets the point budget)
+ * @param {string|null} start - Optional window start (YYYY-MM-DD)
+ * @returns {Promise<Array>} Array of vital sign records, oldest first
  */
-async function fetchVitalsForChart(icn, vitalType, limit = 50) {
-    const response = await fetch(`/api/patient/${icn}/vitals?vital_type=${encodeURIComponent(vitalType)}&limit=${limit}`);
+async function fetchVitalsForChart(icn, vitalType, canvasId, start = null) {
+    const canvas = document.getElementById(canvasId);
+    const width = Math.min(Math.max(Math.round((canvas && canvas.clientWidth) || 600), 10), 4000);
+
+    let url = `/api/patient/${icn}/vitals/${encodeURIComponent(vitalType)}/trend?width=${width}`;
+    if (start) {
+        url += `&start=${start}`;
+    }
+
+    const response = await fetch(url);
 
     if (!response.ok) {
         throw new Error(`API returned ${response.status}`);
     }
 
     const data = await response.json();
-    // Sort by date ascending (oldest first) for proper chart rendering
-    return data.vitals.sort((a, b) => {
-        return new Date(a.taken_datetime) - new Date(b.taken_datetime);
-    });
+
+    // Columnar payload -> one record per point (timestamps are epoch ms of
+    // naive database datetimes; format them back without a "Z" so they are
+    // displayed as recorded)
+    const series = data.series;
+    return data.t.map((t, i) => ({
+        taken_datetime: new Date(t).toISOString().slice(0, 19),
+        systolic: series.systolic ? series.systolic[i] : null,
+        diastolic: series.diastolic ? series.diastolic[i] : null,
+        numeric_value: series.value ? series.value[i] : null
+    }));
 }
 
 /**
@@ -494,6 +528,12 @@ document.addEventListener('DOMContentLoaded', () => {
         console.log('View toggle button initialized');
     }
 
+    // Refetch charts at the new zoom level when the time period changes
+    const rangeSelect = document.getElementById('vitals-chart-range');
+    if (rangeSelect) {
+        rangeSelect.addEventListener('change', initializeCharts);
+    }
+
     // Don't initialize charts on page load - wait for user to click "View Charts"
     // This improves initial page load performance
 });
@@ -0,0 +1,119 @@
+# ---------------------------------------------------------------------
+# app/tests/test_conditional_get.py
+# ---------------------------------------------------------------------
+# Unit tests for conditional GET (ETag / 304) handling
+# Tests path resolution, If-None-Match comparison, and that a matching
+# tag short-circuits the route (serving-data versions and task stamps
+# are patched, no database required)
+# ---------------------------------------------------------------------
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.middleware.conditional as conditional
+from app.middleware.conditional import (
+    ConditionalGetMiddleware,
+    build_etag,
+    etag_matches,
+    resolve_resource,
+)
+
+
+class TestResolveResource:
+    """Test which paths are eligible for ETags"""
+
+    def test_api_paths(self):
+        assert resolve_resource("/api/patient/ICN100001/vitals") == ("vitals", "ICN100001")
+        assert resolve_resource("/api/patient/ICN100001/labs/Glucose/trend") == ("labs", "ICN100001")
+        assert resolve_resource("/api/patient/ICN100001/history/recent") == ("history", "ICN100001")
+
+    def test_widget_paths(self):
+        assert resolve_resource("/api/patient/dashboard/widget/tasks/ICN100001") == ("tasks", "ICN100001")
+        assert resolve_resource("/api/dashboard/widget/demographics/ICN100001") == ("demographics", "ICN100001")
+
+    def test_non_data_paths(self):
+        assert resolve_resource("/api/patient/search") is None
+        assert resolve_resource("/api/patient/current") is None
+        assert resolve_resource("/api/patient/tasks/quick-create-modal") is None
+        assert resolve_resource("/api/patient/tasks/12/edit-modal") is None
+        assert resolve_resource("/api/patient/ICN100001/tasks/events") is None
+        assert resolve_resource("/patient/ICN100001/vitals/realtime") is None
+        assert resolve_resource("/api/patient/dashboard/widget/unknown/ICN100001") is None
+
+
+class TestEtagMatches:
+    """Test If-None-Match comparison"""
+
+    def test_weak_and_list_matching(self):
+        etag = build_etag(["vitals", "ICN100001", 3])
+        assert etag_matches(etag, etag)
+        assert etag_matches(etag[2:], etag)
+        assert etag_matches(f'W/"other", {etag}', etag)
+        assert etag_matches("*", etag)
+
+    def test_mismatch(self):
+        etag = build_etag(["vitals", "ICN100001", 3])
+        assert not etag_matches(None, etag)
+        assert not etag_matches(build_etag(["vitals", "ICN100001", 4]), etag)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """App with one vitals and one tasks route, counting route executions"""
+    versions = {"vitals": 1}
+    stamp = {"value": "0:"}
+    calls = []
+
+    monkeypatch.setattr(conditional.query_cache, "get_versions", lambda: dict(versions))
+    monkeypatch.setattr(conditional.query_cache, "last_loaded_at", lambda domains: None)
+    monkeypatch.setattr(conditional, "get_task_write_stamp", lambda icn: stamp["value"])
+
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware, max_age_seconds=3600)
+
+    @app.get("/api/patient/{icn}/vitals")
+    def vitals(icn: str):
+        calls.append("vitals")
+        return {"icn": icn}
+
+    @app.get("/api/patient/{icn}/tasks")
+    def tasks(icn: str):
+        calls.append("tasks")
+        return {"icn": icn}
+
+    test_client = TestClient(app)
+    test_client.versions = versions
+    test_client.stamp = stamp
+    test_client.calls = calls
+    return test_client
+
+
+class TestMiddleware:
+    """Test 304 short-circuit and invalidation"""
+
+    def test_matching_tag_skips_route(self, client):
+        first = client.get("/api/patient/ICN100001/vitals")
+        etag = first.headers["etag"]
+        second = client.get("/api/patient/ICN100001/vitals", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert client.calls == ["vitals"]
+
+    def test_version_bump_changes_tag(self, client):
+        etag = client.get("/api/patient/ICN100001/vitals").headers["etag"]
+        client.versions["vitals"] = 2
+        response = client.get("/api/patient/ICN100001/vitals", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_task_write_changes_tag(self, client):
+        etag = client.get("/api/patient/ICN100001/tasks").headers["etag"]
+        client.stamp["value"] = "1:2026-01-19T14:05:11+00:00"
+        response = client.get("/api/patient/ICN100001/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_unversioned_domain_not_tagged(self, client):
+        client.versions.clear()
+        response = client.get("/api/patient/ICN100001/vitals")
+        assert response.status_code == 200
+        assert "etag" not in response.headers
@@ -0,0 +1,150 @@
+# ---------------------------------------------------------------------
+# app/tests/test_db_routing.py
+# ---------------------------------------------------------------------
+# Unit tests for primary / read-replica routing
+# Tests replica selection, lag and error fallback, and that writes never
+# reach the replica (fake engines, no database required)
+# ---------------------------------------------------------------------
+
+import pytest
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from app.db.engines import ReadReplicaRouter
+
+
+class FakeResult:
+    def __init__(self, row):
+        self._row = row
+
+    def fetchone(self):
+        return self._row
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+        self.closed = False
+
+    def execute(self, statement, *args, **kwargs):
+        sql = str(statement)
+        self.engine.executed.append(sql)
+        if "pg_is_in_recovery" in sql:
+            return FakeResult((self.engine.in_recovery, self.engine.lag))
+        if self.engine.fail_with is not None:
+            raise self.engine.fail_with
+        return FakeResult((self.engine.name,))
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeEngine:
+    def __init__(self, name, lag=0.0, in_recovery=True):
+        self.name = name
+        self.lag = lag
+        self.in_recovery = in_recovery
+        self.fail_with = None
+        self.connect_error = None
+        self.executed = []
+
+    def connect(self):
+        if self.connect_error is not None:
+            raise self.connect_error
+        return FakeConnection(self)
+
+    def begin(self):
+        return FakeConnection(self)
+
+
+def operational_error():
+    return OperationalError("SELECT 1", {}, Exception("server closed the connection unexpectedly"))
+
+
+@pytest.fixture
+def engines():
+    return FakeEngine("primary"), FakeEngine("replica")
+
+
+def read(router):
+    with router.connect() as conn:
+        return conn.execute("SELECT 1").fetchone()[0]
+
+
+class TestRouting:
+    """Test where reads and writes go"""
+
+    def test_no_replica_reads_primary(self, engines):
+        primary, _ = engines
+        router = ReadReplicaRouter(primary)
+        assert read(router) == "primary"
+
+    def test_healthy_replica_serves_reads(self, engines):
+        primary, replica = engines
+        router = ReadReplicaRouter(primary, replica)
+        assert read(router) == "replica"
+        assert router.stats()["replica_reads"] == 1
+
+    def test_writes_always_use_primary(self, engines):
+        primary, replica = engines
+        router = ReadReplicaRouter(primary, replica)
+        with router.begin() as conn:
+            conn.execute("UPDATE clinical.patient_tasks SET status = 'COMPLETED'")
+        assert replica.executed == []
+        assert primary.executed == ["UPDATE clinical.patient_tasks SET status = 'COMPLETED'"]
+
+    def test_independent_instance_is_usable(self, engines):
+        primary, replica = engines
+        replica.in_recovery = False
+        replica.lag = None
+        router = ReadReplicaRouter(primary, replica)
+        assert read(router) == "replica"
+
+
+class TestFallback:
+    """Test lag and error fallback to the primary"""
+
+    def test_lagging_replica_falls_back(self, engines):
+        primary, replica = engines
+        replica.lag = 120.0
+        router = ReadReplicaRouter(primary, replica, max_lag_seconds=30)
+        assert read(router) == "primary"
+        assert router.stats()["last_lag_seconds"] == 120.0
+
+    def test_lag_is_rechecked_after_interval(self, engines):
+        primary, replica = engines
+        router = ReadReplicaRouter(primary, replica, lag_check_seconds=60)
+        read(router)
+        read(router)
+        lag_checks = [sql for sql in replica.executed if "pg_is_in_recovery" in sql]
+        assert len(lag_checks) == 1
+
+    def test_unreachable_replica_falls_back_and_backs_off(self, engines):
+        primary, replica = engines
+        replica.connect_error = operational_error()
+        router = ReadReplicaRouter(primary, replica, retry_seconds=60)
+        assert read(router) == "primary"
+        replica.connect_error = None
+        assert read(router) == "primary"  # still backing off
+        assert router.stats()["replica_down"] is True
+
+    def test_statement_error_reruns_on_primary(self, engines):
+        primary, replica = engines
+        router = ReadReplicaRouter(primary, replica)
+        read(router)  # lag check passes
+        replica.fail_with = operational_error()
+        assert read(router) == "primary"
+        assert router.stats()["fallbacks"] == 1
+
+    def test_sql_errors_are_not_retried(self, engines):
+        primary, replica = engines
+        router = ReadReplicaRouter(primary, replica)
+        replica.fail_with = ProgrammingError("SELECT nope", {}, Exception("syntax error"))
+        with pytest.raises(ProgrammingError):
+            read(router)
+        assert "SELECT 1" not in primary.executed
@@ -0,0 +1,138 @@
+# ---------------------------------------------------------------------
+# app/tests/test_downsample.py
+# ---------------------------------------------------------------------
+# Unit tests for server-side trend chart downsampling
+# Tests LTTB and min/max point selection, multi-series unions, the
+# columnar payload shape, and zoom window parsing (the trend query is a
+# stand-in applying the same window filter, no database required)
+# ---------------------------------------------------------------------
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.routes.vitals as vitals_routes
+from app.services.downsample import (
+    build_trend_payload,
+    lttb_indices,
+    minmax_indices,
+    parse_window_bound,
+)
+
+
+class TestLttb:
+    """Test Largest-Triangle-Three-Buckets selection"""
+
+    def test_keeps_endpoints_and_point_budget(self):
+        x = np.arange(10_000, dtype=np.float64)
+        y = np.sin(x / 100.0)
+        idx = lttb_indices(x, y, 500)
+        assert len(idx) == 500
+        assert idx[0] == 0 and idx[-1] == 9_999
+        assert np.all(np.diff(idx) > 0)
+
+    def test_short_series_unchanged(self):
+        x = np.arange(5, dtype=np.float64)
+        assert lttb_indices(x, x, 100).tolist() == [0, 1, 2, 3, 4]
+
+    def test_keeps_isolated_spike(self):
+        x = np.arange(1_000, dtype=np.float64)
+        y = np.zeros(1_000)
+        y[437] = 50.0
+        assert 437 in lttb_indices(x, y, 50)
+
+
+class TestMinMax:
+    """Test min/max bucketing"""
+
+    def test_keeps_spike_and_trough(self):
+        x = np.arange(1_000, dtype=np.float64)
+        y = np.full(1_000, 80.0)
+        y[123] = 200.0
+        y[877] = 30.0
+        idx = minmax_indices(x, y, 20)
+        assert 123 in idx and 877 in idx
+        assert idx[0] == 0 and idx[-1] == 999
+        assert len(idx) <= 2 * 20 + 2
+
+
+class TestBuildTrendPayload:
+    """Test columnar payload construction"""
+
+    def test_payload_shape(self):
+        t = [1_700_000_000_000 + i * 60_000 for i in range(3)]
+        payload = build_trend_payload(t, {"value": [1.0, None, 3.0]}, width=600)
+        assert payload["t"] == t
+        assert payload["series"] == {"value": [1.0, None, 3.0]}
+        assert payload["total_points"] == 3
+        assert payload["returned_points"] == 3
+        assert payload["method"] == "lttb"
+
+    def test_downsamples_to_width(self):
+        n = 5_000
+        t = [float(i * 3_600_000) for i in range(n)]
+        values = list(np.random.default_rng(1).normal(120, 10, n))
+        payload = build_trend_payload(t, {"value": values}, width=200)
+        assert payload["total_points"] == n
+        assert payload["returned_points"] == len(payload["t"]) == 200
+        assert all(isinstance(v, int) for v in payload["t"])
+
+    def test_series_share_timestamps(self):
+        n = 2_000
+        t = [float(i) for i in range(n)]
+        systolic = [120.0] * n
+        diastolic = [80.0] * n
+        systolic[500] = 220.0
+        diastolic[1500] = 40.0
+        payload = build_trend_payload(t, {"systolic": systolic, "diastolic": diastolic}, width=50, method="minmax")
+        assert len(payload["series"]["systolic"]) == len(payload["series"]["diastolic"]) == len(payload["t"])
+        assert 220.0 in payload["series"]["systolic"]
+        assert 40.0 in payload["series"]["diastolic"]
+
+    def test_empty_series(self):
+        payload = build_trend_payload([], {"value": []}, width=600)
+        assert payload["t"] == []
+        assert payload["returned_points"] == 0
+
+
+class TestParseWindowBound:
+    """Test zoom window parsing"""
+
+    def test_date_and_datetime(self):
+        assert parse_window_bound("2024-01-15") == datetime(2024, 1, 15)
+        assert parse_window_bound("2024-01-15T08:30:00Z") == datetime(2024, 1, 15, 8, 30)
+        assert parse_window_bound(None) is None
+
+    def test_date_only_end_is_end_of_day(self):
+        assert parse_window_bound("2024-03-31", end=True) == datetime(2024, 3, 31, 23, 59, 59, 999999)
+        assert parse_window_bound("2024-03-31T08:30:00", end=True) == datetime(2024, 3, 31, 8, 30)
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            parse_window_bound("last-year")
+        with pytest.raises(ValueError):
+            parse_window_bound("last-year", end=True)
+
+
+def test_trend_window_keeps_readings_on_end_date(monkeypatch):
+    readings = [datetime(2024, 3, 30, 9, 0), datetime(2024, 3, 31, 14, 0), datetime(2024, 4, 1, 9, 0)]
+
+    def trend_points(icn, vital_type, start=None, end=None):
+        # Same filter as get_vital_trend_points: taken_datetime >= :start AND <= :end
+        kept = [r for r in readings if (start is None or r >= start) and (end is None or r <= end)]
+        return {
+            "t": [r.timestamp() * 1000 for r in kept], "numeric_value": [72.0] * len(kept),
+            "systolic": [None] * len(kept), "diastolic": [None] * len(kept), "unit": "/min",
+        }
+
+    monkeypatch.setattr(vitals_routes, "get_vital_trend_points", trend_points)
+    app = FastAPI()
+    app.include_router(vitals_routes.router)
+
+    response = TestClient(app).get("/api/patient/ICN100001/vitals/PULSE/trend?start=2024-03-31&end=2024-03-31")
+
+    assert response.status_code == 200
+    assert response.json()["t"] == [datetime(2024, 3, 31, 14, 0).timestamp() * 1000]
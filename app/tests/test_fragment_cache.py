@@ -0,0 +1,115 @@
+# ---------------------------------------------------------------------
+# app/tests/test_fragment_cache.py
+# ---------------------------------------------------------------------
+# Unit tests for the rendered widget fragment cache
+# Tests LRU/memory bounds, TTL expiry, version-keyed hits, and that
+# error renders are not cached (serving-data versions are patched and
+# templates come from a temp directory, no database required)
+# ---------------------------------------------------------------------
+
+import asyncio
+
+import pytest
+from fastapi.templating import Jinja2Templates
+from starlette.requests import Request
+
+import app.services.fragment_cache as fragment_cache_module
+from app.services.fragment_cache import FragmentCache, cached_fragment, precompile_templates
+
+
+class TestFragmentCache:
+    """Test LRU, size and TTL bounds"""
+
+    def test_lru_eviction(self):
+        cache = FragmentCache(max_entries=2)
+        cache.put(("a",), b"A")
+        cache.put(("b",), b"B")
+        cache.get(("a",))
+        cache.put(("c",), b"C")
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == b"A"
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_bound(self):
+        cache = FragmentCache(max_bytes=10)
+        cache.put(("a",), b"x" * 6)
+        cache.put(("b",), b"y" * 6)
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] == 6
+
+    def test_ttl_expiry(self):
+        cache = FragmentCache(ttl_seconds=0)
+        cache.put(("a",), b"A")
+        assert cache.get(("a",)) is None
+        assert cache.stats()["expirations"] == 1
+
+
+@pytest.fixture
+def widget(tmp_path, monkeypatch):
+    """A cached widget handler rendering a temp template, counting renders"""
+    (tmp_path / "widget.html").write_text("<div>{{ icn }} {{ count }}</div>")
+    templates = Jinja2Templates(directory=str(tmp_path))
+
+    cache = FragmentCache()
+    versions = {"vitals": 1}
+    monkeypatch.setattr(fragment_cache_module, "fragment_cache", cache)
+    monkeypatch.setattr(fragment_cache_module.query_cache, "get_versions", lambda: dict(versions))
+
+    state = {"renders": 0, "error": False}
+
+    @cached_fragment(templates, "widget.html", "vitals")
+    async def get_widget(request: Request, icn: str):
+        state["renders"] += 1
+        return templates.TemplateResponse(
+            "widget.html",
+            {"request": request, "icn": icn, "count": state["renders"], "error": state["error"]},
+        )
+
+    def call(icn="ICN100001"):
+        request = Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": []})
+        return asyncio.run(get_widget(request=request, icn=icn))
+
+    call.state = state
+    call.versions = versions
+    call.cache = cache
+    call.templates = templates
+    return call
+
+
+class TestCachedFragment:
+    """Test decorator hits, invalidation and error handling"""
+
+    def test_second_request_served_from_memory(self, widget):
+        first = widget()
+        second = widget()
+        assert widget.state["renders"] == 1
+        assert second.body == first.body
+        assert widget.cache.stats()["hits"] == 1
+
+    def test_patients_cached_separately(self, widget):
+        widget("ICN100001")
+        widget("ICN100002")
+        assert widget.state["renders"] == 2
+
+    def test_version_bump_rerenders(self, widget):
+        widget()
+        widget.versions["vitals"] = 2
+        assert b"2" in widget().body
+        assert widget.state["renders"] == 2
+
+    def test_error_render_not_cached(self, widget):
+        widget.state["error"] = True
+        widget()
+        widget()
+        assert widget.state["renders"] == 2
+
+    def test_unversioned_domain_bypasses(self, widget):
+        widget.versions.clear()
+        widget()
+        widget()
+        assert widget.state["renders"] == 2
+        assert widget.cache.stats()["bypasses"] == 2
+
+    def test_precompile_registered_templates(self, widget, monkeypatch):
+        monkeypatch.setattr(fragment_cache_module, "_registered_templates", [(widget.templates, "widget.html")])
+        assert precompile_templates() == 1
@@ -0,0 +1,108 @@
+# ---------------------------------------------------------------------
+# app/tests/test_lab_trend_buckets.py
+# ---------------------------------------------------------------------
+# Unit tests for bucketed lab trends (app/db/labs.py
+# get_lab_trend_buckets), used by the labs widget
+# Tests the per-test bucket and latest-value shape built from the single
+# aggregate query (the connection is a stand-in returning named columns)
+# ---------------------------------------------------------------------
+
+import pytest
+
+import app.db.labs as labs_db
+
+# Bypass the read-through query cache (no serving-data versions here)
+get_lab_trend_buckets = labs_db.get_lab_trend_buckets.uncached
+
+COLUMNS = (
+    "lab_test_name", "bucket_start", "result_count", "min_value", "max_value", "mean_value",
+    "last_value", "last_datetime", "last_abnormal", "abnormal_count", "unit", "ref_range_low", "ref_range_high",
+)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def keys(self):
+        return COLUMNS
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeEngine:
+    """Returns canned rows (oldest bucket first per test) and records queries"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.queries.append(params)
+        return FakeResult(self.rows)
+
+
+def row(**values):
+    defaults = dict(zip(COLUMNS, (None,) * len(COLUMNS)))
+    defaults.update(values)
+    return tuple(defaults[column] for column in COLUMNS)
+
+
+GLUCOSE = dict(lab_test_name="Glucose", unit="mg/dL", ref_range_low=70.0, ref_range_high=99.0)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine([
+        row(bucket_start="2024-11-26 00:00:00", result_count=2, min_value=95.0, max_value=140.0, mean_value=117.5,
+            last_value=140.0, last_datetime="2024-12-01 08:00:00", last_abnormal=True, abnormal_count=1, **GLUCOSE),
+        row(bucket_start="2024-12-03 00:00:00", result_count=1, min_value=98.0, max_value=98.0, mean_value=98.0,
+            last_value=98.0, last_datetime="2024-12-05 07:30:00", last_abnormal=False, abnormal_count=0, **GLUCOSE),
+        row(lab_test_name="Hemoglobin", bucket_start="2024-12-03 00:00:00", result_count=1, min_value=13.1,
+            max_value=13.1, mean_value=13.1, last_value=13.1, last_datetime="2024-12-04 10:00:00",
+            last_abnormal=None, abnormal_count=0, unit="g/dL"),
+    ])
+    monkeypatch.setattr(labs_db, "engine", fake)
+    return fake
+
+
+class TestLabTrendBuckets:
+    """Test the bucket and latest-value shape"""
+
+    def test_buckets_per_test(self, engine):
+        trends = get_lab_trend_buckets("ICN100001", ("Glucose", "Hemoglobin"), bucket_days=7, days=90)
+
+        assert list(trends) == ["Glucose", "Hemoglobin"]
+        glucose = trends["Glucose"]
+        assert (glucose["unit"], glucose["ref_range_low"], glucose["ref_range_high"]) == ("mg/dL", 70.0, 99.0)
+        assert glucose["buckets"][0] == {
+            "bucket_start": "2024-11-26 00:00:00", "count": 2, "min": 95.0, "max": 140.0,
+            "mean": 117.5, "last": 140.0, "abnormal_count": 1,
+        }
+        assert [b["bucket_start"] for b in glucose["buckets"]] == ["2024-11-26 00:00:00", "2024-12-03 00:00:00"]
+        assert engine.queries[0]["test_names"] == ["Glucose", "Hemoglobin"]
+        assert engine.queries[0]["days"] == 90
+
+    def test_latest_value_and_count(self, engine):
+        trends = get_lab_trend_buckets("ICN100001", ("Glucose", "Hemoglobin"))
+
+        assert trends["Glucose"]["count"] == 3
+        assert trends["Glucose"]["latest"] == {
+            "value": 98.0, "collection_datetime": "2024-12-05 07:30:00", "is_abnormal": False,
+        }
+        assert trends["Hemoglobin"]["latest"]["is_abnormal"] is False
+        assert "days" not in engine.queries[0]
+
+    def test_no_tests_runs_no_sql(self, engine):
+        assert get_lab_trend_buckets("ICN100001", ()) == {}
+        assert engine.queries == []
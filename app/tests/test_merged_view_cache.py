@@ -0,0 +1,90 @@
+# ---------------------------------------------------------------------
+# app/tests/test_merged_view_cache.py
+# ---------------------------------------------------------------------
+# Unit tests for the merged real-time view cache
+# Tests that repeat views reuse the merge, and that a serving-data
+# version bump or new VistA responses merge again (serving-data
+# versions are patched, no database required)
+# ---------------------------------------------------------------------
+
+import pytest
+
+import app.services.merged_view_cache as merged_view_cache_module
+from app.services.merged_view_cache import MergedViewCache, vista_responses_digest
+from app.services.realtime_overlay import merge_vitals_data
+
+VISTA_RESPONSES = {"200": "PULSE^75^/min^3241217.0915^NURSE,JANE"}
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    versions = {"vitals": 1}
+    monkeypatch.setattr(merged_view_cache_module.query_cache, "get_versions", lambda: dict(versions))
+    return versions
+
+
+class Loader:
+    """Counts PostgreSQL loads"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return [{"vital_type": "TEMPERATURE", "taken_datetime": "2024-12-16 09:00:00", "location_name": "Clinic"}]
+
+
+def view(cache, loader, vista_responses=VISTA_RESPONSES, variant=(500,)):
+    return cache.get_or_merge(
+        "ICN100001", "vitals", ("vitals",), vista_responses,
+        load_pg=loader, merge=merge_vitals_data, variant=variant
+    )
+
+
+class TestMergedViewCache:
+    """Test memoized merges"""
+
+    def test_repeat_view_reuses_merge(self, versions):
+        cache, loader = MergedViewCache(), Loader()
+        first, stats = view(cache, loader)
+        second, _ = view(cache, loader)
+
+        assert loader.calls == 1
+        assert [v["vital_type"] for v in second] == ["PULSE", "TEMPERATURE"]
+        assert stats["total_merged"] == 2
+        assert second is not first  # callers get their own list
+        assert cache.stats()["hits"] == 1
+
+    def test_version_bump_or_new_vista_data_merges_again(self, versions):
+        cache, loader = MergedViewCache(), Loader()
+        view(cache, loader)
+
+        versions["vitals"] = 2
+        view(cache, loader)
+        view(cache, loader, vista_responses={"200": "PULSE^80^/min^3241217.1015^NURSE,JANE"})
+        view(cache, loader, variant=(100,))
+
+        assert loader.calls == 4
+
+    def test_bypass_without_versions(self, monkeypatch):
+        monkeypatch.setattr(merged_view_cache_module.query_cache, "get_versions", lambda: None)
+        cache, loader = MergedViewCache(), Loader()
+        view(cache, loader)
+        view(cache, loader)
+
+        assert loader.calls == 2
+        assert cache.stats()["bypasses"] == 2
+
+    def test_lru_eviction(self, versions):
+        cache, loader = MergedViewCache(max_entries=1), Loader()
+        view(cache, loader, variant=(1,))
+        view(cache, loader, variant=(2,))
+        view(cache, loader, variant=(1,))
+
+        assert loader.calls == 3
+        assert cache.stats()["evictions"] == 2
+
+
+def test_digest_ignores_site_order():
+    assert vista_responses_digest({"200": "a", "500": "b"}) == vista_responses_digest({"500": "b", "200": "a"})
+    assert vista_responses_digest({"200": "ab"}) != vista_responses_digest({"200": "a", "b": ""})
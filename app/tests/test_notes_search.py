@@ -0,0 +1,88 @@
+# ---------------------------------------------------------------------
+# app/tests/test_notes_search.py
+# ---------------------------------------------------------------------
+# Unit tests for clinical notes full-text search (app/db/notes.py)
+# Tests that ts_headline snippets are HTML-escaped with only highlight
+# marker pairs turned into <mark> tags, and that blank queries return
+# before any SQL runs (the database is a stand-in)
+# ---------------------------------------------------------------------
+
+import pytest
+
+import app.db.notes as notes_db
+from app.db.notes import _highlight_snippet, search_notes
+
+START, STOP = "\x02", "\x03"
+
+
+class FakeEngine:
+    """Returns canned search rows and records executed queries"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.queries.append((str(query), params))
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeEngine()
+    monkeypatch.setattr(notes_db, "engine", fake)
+    return fake
+
+
+class TestHighlightSnippet:
+    """Test the HTML boundary for ts_headline output"""
+
+    def test_note_markup_is_escaped(self):
+        raw = f"<script>alert(1)</script> BP & {START}chest pain{STOP}"
+        assert _highlight_snippet(raw) == (
+            "&lt;script&gt;alert(1)&lt;/script&gt; BP &amp; <mark>chest pain</mark>"
+        )
+
+    def test_only_marker_pairs_become_mark(self):
+        raw = f"{START}chf{STOP} stray {START}start, <mark>literal</mark> and stop{STOP}{STOP}"
+        assert _highlight_snippet(raw) == (
+            "<mark>chf</mark> stray <mark>start, &lt;mark&gt;literal&lt;/mark&gt; and stop</mark>"
+        )
+        assert _highlight_snippet(f"open {START}only") == "open only"
+        assert _highlight_snippet(f"close{STOP} only") == "close only"
+
+    def test_empty(self):
+        assert _highlight_snippet(None) is None
+        assert _highlight_snippet("") is None
+
+
+class TestSearchNotes:
+    """Test search_notes result mapping and early returns"""
+
+    @pytest.mark.parametrize("query_text", ["", "   ", None])
+    def test_blank_query_runs_no_sql(self, engine, query_text):
+        assert search_notes("ICN100001", query_text) == []
+        assert engine.queries == []
+
+    def test_snippets_are_escaped(self, engine):
+        engine.rows = [(
+            7, "Progress Note", "Progress Notes", "2024-12-17 09:30:00", "COMPLETED",
+            "DOE,JANE", "Facility", 0.5, f"<b>x</b> {START}echo{STOP}",
+        )]
+
+        notes = search_notes("ICN100001", "  echo ")
+
+        assert notes[0]["snippet_html"] == "&lt;b&gt;x&lt;/b&gt; <mark>echo</mark>"
+        assert engine.queries[0][1]["query_text"] == "echo"
@@ -0,0 +1,108 @@
+# ---------------------------------------------------------------------
+# app/tests/test_pagination.py
+# ---------------------------------------------------------------------
+# Unit tests for keyset (cursor) pagination helpers
+# Tests cursor encoding round-trip, malformed cursors, page trimming, and
+# notes page numbers on cursor pages (the database is a stand-in)
+# ---------------------------------------------------------------------
+
+import pytest
+import app.db.notes as notes_db
+from app.db.pagination import encode_cursor, decode_cursor, build_page
+
+
+class TestCursorEncoding:
+    """Test cursor encode/decode round-trip"""
+
+    def test_round_trip(self):
+        cursor = encode_cursor("2024-12-17 09:30:00", 1234)
+        assert decode_cursor(cursor) == ["2024-12-17 09:30:00", 1234]
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor("2024-12-17 09:30:00+00:00", 99999)
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_three_part_cursor(self):
+        cursor = encode_cursor("HIGH", "2025-01-01T10:00:00+00:00", 7)
+        assert decode_cursor(cursor, size=3) == ["HIGH", "2025-01-01T10:00:00+00:00", 7]
+
+    @pytest.mark.parametrize("cursor", [None, "", "not-a-cursor", encode_cursor("only-one")])
+    def test_invalid_cursor_returns_none(self, cursor):
+        assert decode_cursor(cursor) is None
+
+    def test_null_key_value_rejected(self):
+        assert decode_cursor(encode_cursor(None, 5)) is None
+
+
+class TestBuildPage:
+    """Test trimming limit+1 result sets into pages"""
+
+    def make_rows(self, count):
+        return [
+            {"note_id": i, "reference_datetime": f"2024-12-{31 - i:02d} 08:00:00"}
+            for i in range(1, count + 1)
+        ]
+
+    def test_last_page_has_no_cursor(self):
+        rows = self.make_rows(3)
+        page, next_cursor = build_page(rows, 5, "reference_datetime", "note_id")
+        assert page == rows
+        assert next_cursor is None
+
+    def test_exact_page_has_no_cursor(self):
+        rows = self.make_rows(5)
+        page, next_cursor = build_page(rows, 5, "reference_datetime", "note_id")
+        assert len(page) == 5
+        assert next_cursor is None
+
+    def test_extra_row_produces_cursor_from_last_page_row(self):
+        rows = self.make_rows(6)
+        page, next_cursor = build_page(rows, 5, "reference_datetime", "note_id")
+        assert len(page) == 5
+        assert decode_cursor(next_cursor) == ["2024-12-26 08:00:00", 5]
+
+
+class FakeNotesEngine:
+    """Returns note rows newest first, honoring the keyset condition and LIMIT"""
+
+    def __init__(self, count):
+        self.rows = [
+            (i, i, "Progress Note", "Progress Notes", None, f"2024-12-{31 - i:02d} 09:00:00", None,
+             "COMPLETED", "DOE,JANE", None, "Facility", "508", "", 0, 0, "recent")
+            for i in range(1, count + 1)
+        ]
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        rows = self.rows
+        if "cursor_id" in params:
+            rows = [r for r in rows if r[0] > params["cursor_id"]]
+        self.result = rows[:params["limit"]]
+        return self
+
+    def fetchall(self):
+        return self.result
+
+
+class TestNotesCursorPages:
+    """Test that notes pages walked by cursor report their page number"""
+
+    def test_page_number_follows_cursor(self, monkeypatch):
+        monkeypatch.setattr(notes_db, "engine", FakeNotesEngine(5))
+        monkeypatch.setattr(notes_db, "_count_notes", lambda clause, params: 5)
+
+        pages = [notes_db.get_all_notes("ICN100001", limit=2)["pagination"]]
+        while pages[-1]["next_cursor"]:
+            pages.append(notes_db.get_all_notes("ICN100001", limit=2, cursor=pages[-1]["next_cursor"])["pagination"])
+
+        assert [p["current_page"] for p in pages] == [1, 2, 3]
+        assert [p["has_prev"] for p in pages] == [False, True, True]
+        assert pages[0]["total_pages"] == 3
@@ -0,0 +1,121 @@
+# ---------------------------------------------------------------------
+# app/tests/test_partitioned_load.py
+# ---------------------------------------------------------------------
+# Unit tests for the partition-aware ETL load helper
+# Tests hash partition discovery from catalog partition bounds, index
+# definitions copied to the replacement partition, and that the swap
+# transaction only changes catalogs (SQL is recorded, no database)
+# ---------------------------------------------------------------------
+
+from etl.partitioned_load import _swap_partition, get_hash_partitions, partition_index_sql
+
+INDEX_DEFS = [
+    ("CREATE UNIQUE INDEX patient_vitals_pkey ON ONLY clinical.patient_vitals USING btree (vital_id, patient_key)",),
+    ("CREATE INDEX idx_patient_vitals_abnormal ON ONLY clinical.patient_vitals "
+     "USING btree (patient_key, taken_datetime DESC) WHERE (abnormal_flag IS NOT NULL)",),
+]
+
+
+class FakeConnection:
+    """Returns canned pg_inherits rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, statement, params=None):
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+
+class TestGetHashPartitions:
+    """Test partition bound parsing"""
+
+    def test_parses_and_orders_by_remainder(self):
+        conn = FakeConnection([
+            ("clinical.patient_labs_p1", "FOR VALUES WITH (modulus 8, remainder 1)"),
+            ("clinical.patient_labs_p0", "FOR VALUES WITH (modulus 8, remainder 0)"),
+        ])
+        assert get_hash_partitions(conn, "clinical.patient_labs") == [
+            ("clinical.patient_labs_p0", 8, 0),
+            ("clinical.patient_labs_p1", 8, 1),
+        ]
+
+    def test_unpartitioned_table(self):
+        assert get_hash_partitions(FakeConnection([]), "clinical.patient_labs") == []
+
+    def test_ignores_non_hash_partitions(self):
+        conn = FakeConnection([
+            ("clinical.patient_labs_2024", "FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')"),
+        ])
+        assert get_hash_partitions(conn, "clinical.patient_labs") == []
+
+
+class RecordingEngine:
+    """engine.begin() stand-in; records each transaction's SQL in order"""
+
+    def __init__(self):
+        self.transactions = []
+
+    def begin(self):
+        self.transactions.append([])
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.transactions[-1].append(sql)
+        self.rows = INDEX_DEFS if "pg_get_indexdef" in sql else []
+        return self
+
+    rowcount = 3
+
+    def fetchall(self):
+        return self.rows
+
+    def scalar(self):
+        return 16384
+
+
+class TestPartitionSwap:
+    """Test that index builds and bound validation happen before the locked swap"""
+
+    def test_index_definitions_target_partition(self):
+        conn = RecordingEngine().begin()
+        assert partition_index_sql(conn, "clinical.patient_vitals", "clinical.patient_vitals_p3_new") == [
+            "CREATE UNIQUE INDEX ON clinical.patient_vitals_p3_new USING btree (vital_id, patient_key)",
+            "CREATE INDEX ON clinical.patient_vitals_p3_new USING btree (patient_key, taken_datetime DESC) "
+            "WHERE (abnormal_flag IS NOT NULL)",
+        ]
+
+    def test_swap_only_changes_catalogs(self):
+        engine = RecordingEngine()
+        rows = _swap_partition(
+            engine, "clinical.patient_vitals", "clinical.patient_vitals_staging",
+            "clinical.patient_vitals_p3", 8, 3, "taken_datetime"
+        )
+        build, swap = engine.transactions
+
+        def position(statements, prefix):
+            return next(i for i, sql in enumerate(statements) if sql.startswith(prefix))
+
+        assert rows == 3
+        assert position(build, "INSERT INTO") < position(build, "CREATE UNIQUE INDEX ON") < position(build, "ALTER TABLE")
+        assert build[-1] == (
+            "ALTER TABLE clinical.patient_vitals_p3_new ADD CONSTRAINT patient_vitals_p3_bound_check "
+            "CHECK (satisfies_hash_partition('16384'::oid, 8, 3, patient_key))"
+        )
+        assert swap == [
+            "ALTER TABLE clinical.patient_vitals DETACH PARTITION clinical.patient_vitals_p3",
+            "ALTER TABLE clinical.patient_vitals ATTACH PARTITION clinical.patient_vitals_p3_new "
+            "FOR VALUES WITH (MODULUS 8, REMAINDER 3)",
+            "ALTER TABLE clinical.patient_vitals_p3_new DROP CONSTRAINT patient_vitals_p3_bound_check",
+            "DROP TABLE clinical.patient_vitals_p3",
+            "ALTER TABLE clinical.patient_vitals_p3_new RENAME TO patient_vitals_p3",
+        ]
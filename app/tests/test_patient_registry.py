@@ -0,0 +1,116 @@
+# ---------------------------------------------------------------------
+# app/tests/test_patient_registry.py
+# ---------------------------------------------------------------------
+# Unit tests for the indexed patient registry (VistA site selection)
+# Tests last_seen parsing, load-time facility ranking, batch lookups and
+# mtime-driven reloads (registry files are written to a temp directory)
+# ---------------------------------------------------------------------
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.patient_registry import PatientRegistry, UNKNOWN_LAST_SEEN, parse_last_seen
+
+REGISTRY = {
+    "patients": [
+        {
+            "icn": "ICN100001",
+            "treating_facilities": [
+                {"sta3n": "630", "dfn": "630001", "last_seen": "T-90"},
+                {"sta3n": "200", "dfn": "100001", "last_seen": "T-7"},
+                {"sta3n": "402", "dfn": "402001", "last_seen": "2020-01-15"},
+                {"sta3n": "500", "dfn": "500001", "last_seen": "T-30"},
+            ]
+        },
+        {
+            "icn": "ICN100013",
+            "treating_facilities": [{"sta3n": "630", "dfn": "630013", "last_seen": "T-0"}]
+        },
+    ]
+}
+
+
+class TestParseLastSeen:
+    """Test T-notation and date parsing"""
+
+    def test_t_notation(self):
+        now = datetime(2025, 1, 31, 12, 0)
+        assert parse_last_seen("T-0", now) == now
+        assert parse_last_seen("T-7", now) == now - timedelta(days=7)
+        assert parse_last_seen("T-365").date() == (datetime.now() - timedelta(days=365)).date()
+
+    def test_iso_date(self):
+        assert parse_last_seen("2024-01-15") == datetime(2024, 1, 15)
+
+    def test_unparseable(self):
+        assert parse_last_seen("T-invalid") == UNKNOWN_LAST_SEEN
+        assert parse_last_seen("INVALID") == UNKNOWN_LAST_SEEN
+        assert parse_last_seen("") == UNKNOWN_LAST_SEEN
+        assert parse_last_seen(None) == UNKNOWN_LAST_SEEN
+
+
+class TestLookups:
+    """Test ICN index and pre-ranked facilities"""
+
+    def test_ranked_at_load(self):
+        registry = PatientRegistry(registry=REGISTRY)
+        assert registry.get_ranked_sites("ICN100001") == ("200", "500", "630", "402")
+        facilities = registry.get_treating_facilities("ICN100001")
+        assert [fac["last_seen"] for fac in facilities] == ["T-7", "T-30", "T-90", "2020-01-15"]
+
+    def test_unknown_patient(self):
+        registry = PatientRegistry(registry=REGISTRY)
+        assert registry.get_ranked_sites("ICN999999") == ()
+        assert registry.get_treating_facilities("ICN999999") == []
+        assert registry.stats()["misses"] == 1
+
+    def test_batch(self):
+        registry = PatientRegistry(registry=REGISTRY)
+        assert registry.get_ranked_sites_many(["ICN100013", "ICN999999"]) == {
+            "ICN100013": ("630",),
+            "ICN999999": (),
+        }
+
+
+def write_registry(path, patients):
+    path.write_text(json.dumps({"patients": patients}))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("condition not met in time")
+        time.sleep(0.01)
+
+
+class TestReload:
+    """Test loading from file and mtime-driven reloads"""
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        path = tmp_path / "patient_registry.json"
+        write_registry(path, REGISTRY["patients"][:1])
+        registry = PatientRegistry(path=path, reload_check_seconds=0.01)
+        assert "ICN100013" not in registry
+
+        write_registry(path, REGISTRY["patients"])
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        time.sleep(0.02)
+
+        registry.get_ranked_sites("ICN100001")  # Starts the background reload
+        wait_for(lambda: registry.stats()["reloads"] == 2)
+        assert registry.get_ranked_sites("ICN100013") == ("630",)
+
+    def test_bad_file_keeps_previous_index(self, tmp_path):
+        path = tmp_path / "patient_registry.json"
+        write_registry(path, REGISTRY["patients"])
+        registry = PatientRegistry(path=path, reload_check_seconds=0)
+
+        path.write_text("{not json")
+        assert registry.reload() is False
+        assert len(registry) == 2
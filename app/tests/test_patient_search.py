@@ -0,0 +1,128 @@
+# ---------------------------------------------------------------------
+# app/tests/test_patient_search.py
+# ---------------------------------------------------------------------
+# Unit tests for the in-memory patient typeahead index
+# Tests normalization, prefix matching, ranking, and S1234 lookups
+# (index is built from literal rows, no database required), and that the
+# PostgreSQL fallback's name keys normalize like the index keys (the SQL
+# expressions are evaluated in SQLite with regexp_replace/btrim added)
+# ---------------------------------------------------------------------
+
+import re
+import sqlite3
+
+import pytest
+import app.db.patient_search as patient_search
+from app.db.patient_search import PatientPrefixIndex, normalize_name
+
+
+ROWS = [
+    # icn, name_display, dob, age, sex, ssn_last4, station, name_last, name_first
+    ("ICN100001", "DOOREE, Adam", "1980-01-02", 45, "M", "6789", "508", "DOOREE", "Adam"),
+    ("ICN100002", "SMITH, John", "1955-03-04", 70, "M", "1234", "516", "SMITH", "John"),
+    ("ICN100003", "SMITHERS, Jane", "1960-05-06", 65, "F", "4321", "552", "SMITHERS", "Jane"),
+    ("ICN100004", "O'BRIEN, Kate", "1971-07-08", 54, "F", "1111", "688", "O'BRIEN", "Kate"),
+]
+
+
+@pytest.fixture
+def index():
+    idx = PatientPrefixIndex()
+    idx.build(ROWS, version=1)
+    return idx
+
+
+class TestNormalization:
+    """Test query/name normalization"""
+
+    def test_lowercase_and_punctuation(self):
+        assert normalize_name("SMITH,  John") == "smith john"
+        assert normalize_name("O'Brien") == "o brien"
+
+    def test_empty(self):
+        assert normalize_name(None) == ""
+        assert normalize_name("  ,, ") == ""
+
+
+class TestPrefixIndex:
+    """Test prefix search and ranking"""
+
+    def test_last_name_prefix(self, index):
+        results = index.search("smi")
+        assert [p["icn"] for p in results] == ["ICN100002", "ICN100003"]
+
+    def test_exact_last_name_ranks_first(self, index):
+        results = index.search("smithers")
+        assert results[0]["icn"] == "ICN100003"
+
+    def test_last_first_with_comma(self, index):
+        results = index.search("Smith, Jo")
+        assert [p["icn"] for p in results] == ["ICN100002"]
+
+    def test_first_last_order(self, index):
+        results = index.search("jane smi")
+        assert [p["icn"] for p in results] == ["ICN100003"]
+
+    def test_icn_prefix(self, index):
+        results = index.search("ICN10000")
+        assert len(results) == 4
+
+    def test_initial_last4(self, index):
+        results = index.search("S4321")
+        assert [p["icn"] for p in results] == ["ICN100003"]
+
+    def test_punctuated_name(self, index):
+        results = index.search("o'bri")
+        assert [p["icn"] for p in results] == ["ICN100004"]
+
+    def test_limit(self, index):
+        assert len(index.search("icn", limit=2)) == 2
+
+    def test_results_are_copies(self, index):
+        index.search("doo")[0]["name_display"] = "changed"
+        assert index.search("doo")[0]["name_display"] == "DOOREE, Adam"
+
+    def test_version_tracking(self, index):
+        assert index.is_current(1)
+        assert not index.is_current(2)
+
+
+@pytest.fixture
+def sql_names():
+    """SQLite table of ROWS names with the PostgreSQL functions the key expressions use"""
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("regexp_replace", 4, lambda value, pattern, repl, flags: re.sub(pattern, repl, value))
+    conn.create_function("btrim", 1, lambda value: value.strip(" "))
+    conn.execute("CREATE TABLE patient_demographics (icn TEXT, name_last TEXT, name_first TEXT)")
+    conn.executemany("INSERT INTO patient_demographics VALUES (?, ?, ?)", [(r[0], r[7], r[8]) for r in ROWS])
+    conn.execute("INSERT INTO patient_demographics VALUES ('ICN100005', 'SMITH-JONES', NULL)")
+    yield conn
+    conn.close()
+
+
+class TestSqlNameKeys:
+    """Test that SQL mode matches punctuated names like the index does"""
+
+    def keys(self, conn, expression, where="1 = 1", params=()):
+        return [row[0] for row in conn.execute(
+            f"SELECT {expression} FROM patient_demographics WHERE {where} ORDER BY icn", params
+        )]
+
+    def test_keys_match_index_normalization(self, sql_names):
+        assert self.keys(sql_names, patient_search._NAME_KEY_SQL) == [
+            "dooree adam", "smith john", "smithers jane", "o brien kate", "smith jones"
+        ]
+        assert self.keys(sql_names, patient_search._NAME_KEY_REVERSED_SQL)[3] == "kate o brien"
+
+    def test_punctuated_query_exact_and_prefix(self, sql_names):
+        exact = self.keys(sql_names, "icn", f"{patient_search._LAST_NAME_KEY_SQL} = ?", (normalize_name("O'Brien"),))
+        prefix = self.keys(sql_names, "icn", f"{patient_search._NAME_KEY_SQL} LIKE ?", (normalize_name("Smith-Jones") + "%",))
+        assert exact == ["ICN100004"]
+        assert prefix == ["ICN100005"]
+
+    def test_index_ddl_uses_query_expressions(self):
+        from pathlib import Path
+        ddl = (Path(__file__).resolve().parents[2] / "db" / "ddl" / "patient_demographics.sql").read_text()
+        assert f"({patient_search._NAME_KEY_SQL} text_pattern_ops)" in ddl
+        assert f"({patient_search._NAME_KEY_REVERSED_SQL} text_pattern_ops)" in ddl
+        assert f"USING GIN ({patient_search._NAME_KEY_SQL} gin_trgm_ops)" in ddl
@@ -0,0 +1,83 @@
+# ---------------------------------------------------------------------
+# app/tests/test_patient_summary.py
+# ---------------------------------------------------------------------
+# Unit tests for the precomputed patient summary
+# Tests row-to-counts mapping, summary SQL generation, and fallback
+# to live aggregates when the summary is not built
+# ---------------------------------------------------------------------
+
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from app.db import patient_summary
+from app.db.patient_summary import map_summary_domain, get_summary_counts
+from etl.patient_summary import SUMMARY_DOMAINS, build_refresh_statements
+
+
+class TestMapSummaryDomain:
+    """Test summary rows are shaped like the live count queries"""
+
+    def test_missing_row_is_all_zero(self):
+        assert map_summary_domain(None, "allergies") == {
+            "total": 0, "drug": 0, "food": 0, "environmental": 0, "severe": 0,
+        }
+        assert map_summary_domain(None, "labs") == {}
+        assert not any(map_summary_domain(None, "problems").values())
+
+    def test_lab_panels_sorted_by_count(self):
+        row = {"lab_panel_counts": {"CBC": 4, "BMP": 12, "Individual Tests": 7}}
+        assert list(map_summary_domain(row, "labs")) == ["BMP", "Individual Tests", "CBC"]
+
+    def test_family_history_last_recorded_isoformat(self):
+        row = {"family_history_total": 2, "family_history_last_recorded": datetime(2024, 5, 1, 9, 30)}
+        counts = map_summary_domain(row, "family_history")
+        assert counts["total"] == 2
+        assert counts["last_recorded_datetime"] == "2024-05-01T09:30:00"
+
+    def test_completed_today_only_counts_on_summary_date(self):
+        today = date(2025, 3, 10)
+        row = {"task_todo": 3, "task_completed_today": 2, "task_summary_date": today, "today": today}
+        assert map_summary_domain(row, "tasks")["completed_today_count"] == 2
+
+        row["today"] = today + timedelta(days=1)
+        summary = map_summary_domain(row, "tasks")
+        assert summary["completed_today_count"] == 0
+        assert summary["todo_count"] == 3
+
+
+class TestGetSummaryCounts:
+    """Test fallback behaviour"""
+
+    def test_not_built_returns_none(self):
+        with patch.object(patient_summary.query_cache, "get_versions", return_value={"labs": 3}):
+            assert get_summary_counts("ICN100001", "labs") is None
+
+    def test_lookup_error_returns_none(self):
+        versions = {"patient_summary_flags": 1}
+        with patch.object(patient_summary.query_cache, "get_versions", return_value=versions), \
+             patch.object(patient_summary, "_fetch_summary_row", side_effect=RuntimeError("no table")):
+            assert get_summary_counts("ICN100001", "flags") is None
+
+    def test_built_domain_uses_summary_row(self):
+        versions = {"patient_summary_flags": 1}
+        row = {"flag_total": 2, "flag_national": 1, "flag_local": 1, "flag_overdue": 0}
+        with patch.object(patient_summary.query_cache, "get_versions", return_value=versions), \
+             patch.object(patient_summary, "_fetch_summary_row", return_value=row):
+            assert get_summary_counts("ICN100001", "flags") == {
+                "total": 2, "national": 1, "local": 1, "overdue": 0,
+            }
+
+
+class TestRefreshStatements:
+    """Test ETL refresh SQL only touches the refreshed domain"""
+
+    def test_every_domain_maps(self):
+        for domain in SUMMARY_DOMAINS:
+            map_summary_domain({}, domain)
+
+    def test_refresh_only_touches_domain_columns(self):
+        reset_sql, upsert_sql = build_refresh_statements("allergies")
+        assert "allergy_total = 0" in reset_sql
+        assert "flag_total" not in reset_sql
+        assert "ON CONFLICT (patient_key)" in upsert_sql
+        assert "allergy_severe = EXCLUDED.allergy_severe" in upsert_sql
@@ -0,0 +1,183 @@
+# ---------------------------------------------------------------------
+# app/tests/test_query_cache.py
+# ---------------------------------------------------------------------
+# Unit tests for the read-through query result cache
+# Tests LRU/memory bounds, version invalidation, bypass behavior, and
+# per-row batched lookups
+# (serving-data version lookup is patched, no database required)
+# ---------------------------------------------------------------------
+
+import threading
+
+import pytest
+from app.db.query_cache import QueryResultCache, cached_lookup, cached_query
+import app.db.query_cache as query_cache_module
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh cache instance wired into the decorator, with patched versions"""
+    test_cache = QueryResultCache(max_entries=3, max_bytes=1024 * 1024, version_check_seconds=0)
+    versions = {"vitals": 1, "patient": 1}
+    monkeypatch.setattr(test_cache, "_load_versions", lambda: dict(versions))
+    monkeypatch.setattr(query_cache_module, "query_cache", test_cache)
+    test_cache.test_versions = versions
+    return test_cache
+
+
+def make_counted_query(domain="vitals"):
+    """Build a decorated query function that counts real executions"""
+    calls = []
+
+    @cached_query(domain)
+    def fetch(icn: str):
+        calls.append(icn)
+        return [{"icn": icn, "value": len(calls)}]
+
+    return fetch, calls
+
+
+class TestReadThrough:
+    """Test cache hits and result isolation"""
+
+    def test_second_call_is_served_from_cache(self, cache):
+        fetch, calls = make_counted_query()
+        first = fetch("ICN100001")
+        second = fetch("ICN100001")
+        assert first == second
+        assert calls == ["ICN100001"]
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_args_are_part_of_key(self, cache):
+        fetch, calls = make_counted_query()
+        fetch("ICN100001")
+        fetch("ICN100002")
+        assert calls == ["ICN100001", "ICN100002"]
+
+    def test_caller_mutation_does_not_leak(self, cache):
+        fetch, _ = make_counted_query()
+        result = fetch("ICN100001")
+        result[0]["source"] = "vista"
+        result.append({"extra": True})
+        cached = fetch("ICN100001")
+        assert cached == [{"icn": "ICN100001", "value": 1}]
+
+    def test_empty_results_not_cached(self, cache):
+        calls = []
+
+        @cached_query("vitals")
+        def fetch_empty(icn: str):
+            calls.append(icn)
+            return []
+
+        fetch_empty("ICN100001")
+        fetch_empty("ICN100001")
+        assert len(calls) == 2
+
+
+class TestVersionInvalidation:
+    """Test invalidation when an ETL load bumps a domain version"""
+
+    def test_version_bump_invalidates_domain(self, cache):
+        fetch, calls = make_counted_query("vitals")
+        fetch("ICN100001")
+        cache.test_versions["vitals"] = 2
+        fetch("ICN100001")
+        assert len(calls) == 2
+
+    def test_other_domain_bump_keeps_entries(self, cache):
+        fetch, calls = make_counted_query("vitals")
+        fetch("ICN100001")
+        cache.test_versions["patient"] = 2
+        fetch("ICN100001")
+        assert len(calls) == 1
+
+    def test_versions_unavailable_bypasses_cache(self, cache, monkeypatch):
+        monkeypatch.setattr(cache, "_load_versions", lambda: None)
+        fetch, calls = make_counted_query()
+        fetch("ICN100001")
+        fetch("ICN100001")
+        assert len(calls) == 2
+        assert cache.bypasses == 2
+
+    def test_bypass_count_is_thread_safe(self, cache):
+        threads = [threading.Thread(target=lambda: [cache.record_bypass() for _ in range(5000)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert cache.stats()["bypasses"] == 40000
+
+
+class TestBounds:
+    """Test LRU entry and memory bounds"""
+
+    def test_lru_eviction(self, cache):
+        fetch, calls = make_counted_query()
+        for icn in ["A", "B", "C"]:
+            fetch(icn)
+        fetch("A")          # A becomes most recently used
+        fetch("D")          # evicts B
+        assert cache.stats()["entries"] == 3
+        assert cache.evictions == 1
+        fetch("A")
+        fetch("B")
+        assert calls == ["A", "B", "C", "D", "B"]
+
+    def test_memory_bound(self, cache):
+        cache.max_bytes = 1500
+        calls = []
+
+        @cached_query("vitals")
+        def fetch_large(icn: str):
+            calls.append(icn)
+            return ["x" * 800]
+
+        fetch_large("A")
+        fetch_large("B")
+        assert cache.stats()["bytes"] <= 1500
+        assert cache.stats()["entries"] == 1
+
+
+class TestCachedLookup:
+    """Test per-row caching of batched point lookups"""
+
+    @pytest.fixture
+    def lookup(self, cache):
+        cache.max_entries = 100
+        calls = []
+
+        @cached_lookup("problems")
+        def get_details(icn, ids):
+            calls.append(list(ids))
+            return {i: {"id": i} for i in ids if i != 404}
+
+        return get_details, calls
+
+    def test_prefetched_rows_are_cache_hits(self, lookup):
+        get_details, calls = lookup
+        assert set(get_details("ICN1", [1, 2, 3])) == {1, 2, 3}
+        assert get_details("ICN1", [2]) == {2: {"id": 2}}
+        assert calls == [[1, 2, 3]]
+
+    def test_only_missing_ids_are_queried(self, lookup):
+        get_details, calls = lookup
+        get_details("ICN1", [1, 2])
+        result = get_details("ICN1", [2, 3, 3])
+        assert set(result) == {2, 3}
+        assert calls == [[1, 2], [3]]
+
+    def test_unknown_ids_omitted_and_patient_scoped(self, lookup):
+        get_details, calls = lookup
+        assert get_details("ICN1", [404]) == {}
+        get_details("ICN1", [1])
+        get_details("ICN2", [1])
+        assert calls == [[404], [1], [1]]
+
+    def test_version_bump_invalidates_rows(self, cache, lookup):
+        get_details, calls = lookup
+        get_details("ICN1", [1])
+        cache.test_versions["problems"] = 2
+        get_details("ICN1", [1])
+        assert calls == [[1], [1]]
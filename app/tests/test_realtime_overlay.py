@@ -9,9 +9,16 @@ import pytest
 from datetime import datetime
 from app.services.realtime_overlay import (
     parse_fileman_datetime,
+    fileman_to_iso,
+    fileman_date_to_iso,
+    split_caret_records,
     parse_vista_vitals,
     create_canonical_key,
     merge_vitals_data,
+    overlay_merge,
+    datetime_to_fileman,
+    append_vista_delta,
+    append_vista_deltas,
 )
 
 
@@ -368,3 +375,79 @@ class TestMergeVitalsData:
         assert stats["pg_count"] == 2
         assert stats["vista_count"] == 3
         assert stats["duplicates_removed"] == 1
+
+
+class TestBulkParsing:
+    """Test caret splitting and cached FileMan conversions"""
+
+    def test_split_drops_malformed_lines(self):
+        response = "A^1^2\nno caret here\nB^1\nC^3^4\n"
+        assert split_caret_records(response, 3, "test") == [["A", "1", "2"], ["C", "3", "4"]]
+
+    def test_split_error_response(self):
+        assert split_caret_records("-1^Patient not found", 3, "test") == []
+        assert split_caret_records("", 3, "test") == []
+
+    def test_cached_conversions(self):
+        assert fileman_to_iso("3241217.0930") == "2024-12-17 09:30:00"
+        assert fileman_to_iso("3241217.0930") == "2024-12-17 09:30:00"
+        assert fileman_to_iso("invalid") is None
+        assert fileman_date_to_iso("3241217") == "2024-12-17"
+        assert fileman_date_to_iso("") is None
+        assert fileman_to_iso.cache_info().hits >= 1
+
+
+class TestOverlayMerge:
+    """Test the generic linear merge"""
+
+    @staticmethod
+    def merge(pg, vista):
+        stats = {"duplicates_removed": 0}
+        merged = overlay_merge(pg, vista, lambda r: r["key"], "date", stats)
+        return merged, stats
+
+    def test_ties_keep_vista_first(self):
+        pg = [{"key": "a", "date": "2024-12-17", "src": "pg"}]
+        vista = [{"key": "b", "date": "2024-12-17", "src": "vista"}]
+        merged, _ = self.merge(pg, vista)
+        assert [r["src"] for r in merged] == ["vista", "pg"]
+
+    def test_unsorted_streams_are_sorted(self):
+        pg = [{"key": "p1", "date": "2024-01-01"}, {"key": "p2", "date": "2024-03-01"}]
+        vista = [{"key": "v1", "date": "2024-02-01"}, {"key": "v2", "date": None}, {"key": "v3", "date": "2024-04-01"}]
+        merged, _ = self.merge(pg, vista)
+        assert [r["key"] for r in merged] == ["v3", "p2", "v1", "p1", "v2"]
+
+    def test_duplicates_prefer_vista(self):
+        pg = [{"key": "a", "date": "2024-12-17", "src": "pg"}, {"key": "b", "date": "2024-12-16", "src": "pg"}]
+        vista = [{"key": "a", "date": "2024-12-17", "src": "vista"}]
+        merged, stats = self.merge(pg, vista)
+        assert [(r["key"], r["src"]) for r in merged] == [("a", "vista"), ("b", "pg")]
+        assert stats["duplicates_removed"] == 1
+
+
+class TestDeltaRefresh:
+    """Test adding delta ("since") responses to cached responses"""
+
+    CACHED = "PULSE^72^/min^3241217.0800^NURSE,JANE\nTEMP^98.6^F^3241216.0900^NURSE,JANE"
+
+    def test_datetime_to_fileman_round_trip(self):
+        assert datetime_to_fileman(datetime(2024, 12, 17, 9, 30)) == "3241217.0930"
+        assert parse_fileman_datetime(datetime_to_fileman(datetime(2025, 1, 5, 0, 5))) == datetime(2025, 1, 5, 0, 5)
+
+    def test_delta_lines_first_overlap_removed(self):
+        delta = "PULSE^80^/min^3241217.1000^NURSE,JANE\nPULSE^72^/min^3241217.0800^NURSE,JANE"
+        assert append_vista_delta(self.CACHED, delta).split("\n") == [
+            "PULSE^80^/min^3241217.1000^NURSE,JANE",
+            "PULSE^72^/min^3241217.0800^NURSE,JANE",
+            "TEMP^98.6^F^3241216.0900^NURSE,JANE",
+        ]
+
+    def test_empty_or_error_delta_keeps_cache(self):
+        assert append_vista_delta(self.CACHED, "") == self.CACHED
+        assert append_vista_delta(self.CACHED, "-1^Patient not found") == self.CACHED
+        assert append_vista_delta(None, "PULSE^80^/min^3241217.1000^NURSE,JANE") == "PULSE^80^/min^3241217.1000^NURSE,JANE"
+
+    def test_only_delta_sites_are_combined(self):
+        results = append_vista_deltas({"200": "", "500": "full"}, {"200": self.CACHED, "500": "old"}, {"200": "3241217.0755"})
+        assert results == {"200": self.CACHED, "500": "full"}
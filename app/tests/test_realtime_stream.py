@@ -0,0 +1,141 @@
+# ---------------------------------------------------------------------
+# app/tests/test_realtime_stream.py
+# ---------------------------------------------------------------------
+# Unit tests for progressive VistA refresh (app/services/realtime_stream.py)
+# Tests per-site badge states, the swap/done event sequence and the
+# handoff of finished results to the follow-up request (VistA client and
+# templates are stand-ins, no broker or database required)
+# ---------------------------------------------------------------------
+
+import asyncio
+import json
+
+from fastapi.templating import Jinja2Templates
+
+import app.services.realtime_stream as realtime_stream
+from app.services.realtime_stream import RefreshHandoff, iter_refresh_events, site_state
+
+
+class TestSiteState:
+    """Test badge state for RPC results"""
+
+    def test_success(self):
+        assert site_state({"success": True, "status": "ok"}) == "ok"
+        assert site_state({"success": True, "status": "ok", "cached": True}) == "cached"
+
+    def test_failures(self):
+        assert site_state({"success": False, "status": "timeout"}) == "timeout"
+        assert site_state({"success": False, "status": "circuit_open"}) == "circuit_open"
+        assert site_state({"success": False, "status": "ok", "error": "RPC error"}) == "error"
+        assert site_state({"success": False}) == "error"
+
+
+class FakeClient:
+    """Yields canned results in the given order"""
+
+    def __init__(self, results):
+        self.results = results
+
+    async def iter_rpc_multi_site(self, sites, rpc_name, params, since=None):
+        for site, result in self.results:
+            yield site, result
+
+
+class FakeRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def make_templates(tmp_path):
+    (tmp_path / "partials").mkdir()
+    (tmp_path / "area.html").write_text('<div id="area">{{ rows|join(",") }}</div>')
+    (tmp_path / "partials" / "vista_site_status.html").write_text(
+        '<span id="status">{% for e in site_status %}{{ e.site }}={{ e.state }};{% endfor %}</span>'
+    )
+    return Jinja2Templates(directory=str(tmp_path))
+
+
+def build_context(vista_results):
+    return {"rows": ["pg"] + [vista_results[site].upper() for site in sorted(vista_results)]}
+
+
+def collect_events(tmp_path, monkeypatch, results):
+    monkeypatch.setattr(realtime_stream, "get_vista_client", lambda: FakeClient(results))
+
+    async def run():
+        return [
+            message async for message in iter_refresh_events(
+                FakeRequest(), make_templates(tmp_path), "area.html",
+                ["200", "500"], "GMV LATEST VM", ["ICN100001"], build_context
+            )
+        ]
+
+    events = []
+    for message in asyncio.run(run()):
+        event_line, data_line = message.strip().split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+class TestIterRefreshEvents:
+    """Test the progressive event sequence"""
+
+    def test_postgres_first_then_each_site(self, tmp_path, monkeypatch):
+        events = collect_events(tmp_path, monkeypatch, [
+            ("500", {"success": True, "status": "ok", "response": "v500"}),
+            ("200", {"success": False, "status": "timeout", "error": "Request timed out"}),
+        ])
+
+        assert [name for name, _ in events] == ["swap", "swap", "swap", "done"]
+        assert events[0][1]["html"] == '<div id="area">pg</div><span id="status">200=pending;500=pending;</span>'
+        assert events[1][1]["html"] == '<div id="area">pg,V500</div><span id="status">200=pending;500=ok;</span>'
+        assert events[2][1]["html"] == '<div id="area">pg,V500</div><span id="status">200=timeout;500=ok;</span>'
+        done = events[3][1]
+        assert (done["sites"], done["successful"]) == (2, 1)
+
+        # The follow-up request gets the merged results instead of calling VistA
+        handed_off = realtime_stream.refresh_handoff.take(done["handoff"], "GMV LATEST VM", ["ICN100001"])
+        assert handed_off["vista_results"] == {"500": "v500"}
+        assert handed_off["refreshed_at"]
+
+    def test_render_error_still_sends_done(self, tmp_path, monkeypatch):
+        events = collect_events(tmp_path, monkeypatch, [
+            ("500", {"success": True, "status": "ok", "response": None}),
+        ])
+
+        # The merge fails mid-stream; the browser falls back on "done"
+        assert [name for name, _ in events] == ["swap", "done"]
+        assert events[-1][1]["handoff"] is None
+
+
+class TestRefreshHandoff:
+    """Test one-time handoff tokens"""
+
+    def test_token_works_once(self):
+        handoff = RefreshHandoff()
+        token = handoff.put("ORQQAL LIST", ["ICN100001"], {"vista_results": {"200": "x"}})
+
+        assert handoff.take(token, "ORQQAL LIST", ["ICN100001"]) == {"vista_results": {"200": "x"}}
+        assert handoff.take(token, "ORQQAL LIST", ["ICN100001"]) is None
+        assert handoff.stats() == {"pending": 0, "handoffs": 1, "used": 1}
+
+    def test_missing_mismatched_or_expired(self):
+        handoff = RefreshHandoff()
+        assert handoff.take(None, "ORQQAL LIST", ["ICN100001"]) is None
+        assert handoff.take("unknown", "ORQQAL LIST", ["ICN100001"]) is None
+
+        token = handoff.put("ORQQAL LIST", ["ICN100001"], {"vista_results": {}})
+        assert handoff.take(token, "ORQQAL LIST", ["ICN100002"]) is None
+
+        expired = RefreshHandoff(ttl_seconds=-1)
+        token = expired.put("ORQQAL LIST", ["ICN100001"], {"vista_results": {}})
+        assert expired.take(token, "ORQQAL LIST", ["ICN100001"]) is None
+
+    def test_bounded(self):
+        handoff = RefreshHandoff(max_entries=2)
+        first = handoff.put("GMV LATEST VM", ["ICN100001"], {})
+        handoff.put("GMV LATEST VM", ["ICN100001"], {})
+        handoff.put("GMV LATEST VM", ["ICN100001"], {})
+
+        assert handoff.stats()["pending"] == 2
+        assert handoff.take(first, "GMV LATEST VM", ["ICN100001"]) is None
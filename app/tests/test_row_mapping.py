@@ -0,0 +1,86 @@
+# ---------------------------------------------------------------------
+# app/tests/test_row_mapping.py
+# ---------------------------------------------------------------------
+# Unit tests for column-name-driven row mapping and the orjson response
+# Tests dict shape, per-column converters, SQL cast helpers, and JSON
+# rendering of driver types (Decimal, datetime)
+# ---------------------------------------------------------------------
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from app.db.row_mapping import RowMapper, sql_float, sql_text
+from app.utils.json_response import FastJSONResponse, render_json
+
+
+class FakeResult:
+    """Minimal stand-in for a SQLAlchemy CursorResult"""
+
+    def __init__(self, keys, rows):
+        self._keys = keys
+        self._rows = list(rows)
+
+    def keys(self):
+        return self._keys
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def partitions(self, size):
+        for i in range(0, len(self._rows), size):
+            yield self._rows[i:i + size]
+
+
+class TestRowMapper:
+    """Test RowMapper"""
+
+    def test_maps_by_column_name(self):
+        result = FakeResult(("vital_id", "vital_abbr"), [(1, "BP"), (2, "T")])
+        assert RowMapper().map_rows(result) == [
+            {"vital_id": 1, "vital_abbr": "BP"},
+            {"vital_id": 2, "vital_abbr": "T"},
+        ]
+
+    def test_converters_skip_nulls(self):
+        mapper = RowMapper({"bmi": float})
+        result = FakeResult(("vital_id", "bmi"), [(1, Decimal("27.40")), (2, None)])
+        rows = mapper.map_rows(result)
+        assert rows[0]["bmi"] == 27.4 and isinstance(rows[0]["bmi"], float)
+        assert rows[1]["bmi"] is None
+
+    def test_iter_rows_is_lazy(self):
+        result = FakeResult(("vital_id",), [(i,) for i in range(5)])
+        rows = RowMapper().iter_rows(result, batch_size=2)
+        assert next(rows) == {"vital_id": 0}
+        assert [row["vital_id"] for row in rows] == [1, 2, 3, 4]
+
+    def test_map_one(self):
+        assert RowMapper().map_one(FakeResult(("a",), [])) is None
+        assert RowMapper().map_one(FakeResult(("a",), [(5,)])) == {"a": 5}
+
+
+class TestSqlCasts:
+    """Test SQL cast helpers keep the unqualified column name"""
+
+    def test_text_cast(self):
+        assert sql_text("v.taken_datetime") == "v.taken_datetime::text AS taken_datetime"
+
+    def test_float_cast_with_alias(self):
+        assert sql_float("numeric_value", "value") == "numeric_value::float8 AS value"
+
+
+class TestFastJSONResponse:
+    """Test orjson rendering"""
+
+    def test_renders_driver_types(self):
+        body = render_json({"value": Decimal("1.50"), "when": datetime(2025, 1, 2, 3, 4, 5), 7: "x"})
+        assert json.loads(body) == {"value": 1.5, "when": "2025-01-02T03:04:05", "7": "x"}
+
+    def test_response_media_type(self):
+        response = FastJSONResponse({"ok": True})
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == {"ok": True}
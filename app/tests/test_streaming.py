@@ -0,0 +1,67 @@
+# ---------------------------------------------------------------------
+# app/tests/test_streaming.py
+# ---------------------------------------------------------------------
+# Unit tests for streamed template rendering
+# Tests chunk coalescing, lazy consumption of a row generator, and that
+# the vitals page ORDER BY matches the page's sort options
+# ---------------------------------------------------------------------
+
+from fastapi.templating import Jinja2Templates
+
+from app.db.vitals import _vitals_page_order
+from app.utils.streaming import iter_template_chunks
+
+
+def make_templates(tmp_path):
+    (tmp_path / "table.html").write_text(
+        "<h1>{{ title }}</h1><table>{% for row in rows %}<tr><td>{{ row }}</td></tr>{% endfor %}</table>"
+    )
+    return Jinja2Templates(directory=str(tmp_path))
+
+
+class TestIterTemplateChunks:
+    """Test incremental rendering"""
+
+    def test_output_matches_full_render(self, tmp_path):
+        templates = make_templates(tmp_path)
+        context = {"title": "Vitals", "rows": range(1000)}
+        streamed = b"".join(iter_template_chunks(templates, "table.html", context, 256, 1024))
+        expected = templates.get_template("table.html").render(context).encode("utf-8")
+        assert streamed == expected
+
+    def test_chrome_sent_before_rows_consumed(self, tmp_path):
+        templates = make_templates(tmp_path)
+        consumed = []
+
+        def rows():
+            for i in range(10_000):
+                consumed.append(i)
+                yield i
+
+        chunks = iter_template_chunks(templates, "table.html", {"title": "Vitals", "rows": rows()}, 64, 1024)
+        first = next(chunks)
+        assert first.startswith(b"<h1>Vitals</h1>")
+        assert len(consumed) < 100
+
+    def test_row_error_ends_document(self, tmp_path):
+        templates = make_templates(tmp_path)
+
+        def rows():
+            yield 1
+            raise RuntimeError("cursor lost")
+
+        output = b"".join(iter_template_chunks(templates, "table.html", {"title": "x", "rows": rows()}))
+        assert output.endswith(b"<tr><td>1</td></tr>")
+
+
+class TestVitalsPageOrder:
+    """Test SQL sort options for the streamed vitals page"""
+
+    def test_datetime(self):
+        assert _vitals_page_order("taken_datetime", "desc") == "v.taken_datetime DESC"
+        assert _vitals_page_order("taken_datetime", "asc") == "v.taken_datetime ASC"
+
+    def test_data_source_variants(self):
+        cerner = _vitals_page_order("data_source", "cerner")
+        assert "WHEN 'CDWWork2' THEN 1" in cerner
+        assert cerner.endswith("v.taken_datetime DESC")
@@ -0,0 +1,85 @@
+# ---------------------------------------------------------------------
+# app/tests/test_task_events.py
+# ---------------------------------------------------------------------
+# Unit tests for live task updates (app/services/task_events.py)
+# Tests SSE formatting, NOTIFY payload parsing, and per-patient fan-out
+# (the listener thread is not started, no database required)
+# ---------------------------------------------------------------------
+
+import asyncio
+
+import pytest
+
+from app.services.task_events import (
+    SUBSCRIBER_QUEUE_SIZE,
+    TaskEventHub,
+    format_sse,
+    parse_notification,
+)
+
+
+def test_format_sse():
+    message = format_sse("tasks-changed", {"patient_key": "ICN100001", "op": "INSERT"})
+    assert message == 'event: tasks-changed\ndata: {"patient_key":"ICN100001","op":"INSERT"}\n\n'
+
+
+class TestParseNotification:
+    """Test NOTIFY payload parsing"""
+
+    def test_valid_payload(self):
+        event = parse_notification('{"patient_key": "ICN100001", "task_id": 7, "op": "UPDATE"}')
+        assert event == {"patient_key": "ICN100001", "task_id": 7, "op": "UPDATE"}
+
+    def test_malformed_payloads(self):
+        assert parse_notification("not json") is None
+        assert parse_notification("[1, 2]") is None
+        assert parse_notification('{"task_id": 7}') is None
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    """Hub with the listener thread disabled"""
+    task_hub = TaskEventHub()
+    monkeypatch.setattr(task_hub, "start", lambda: None)
+    return task_hub
+
+
+class TestTaskEventHub:
+    """Test subscribe/deliver/unsubscribe"""
+
+    def test_delivers_to_matching_patient_only(self, hub):
+        async def scenario():
+            mine = hub.subscribe("ICN100001")
+            other = hub.subscribe("ICN100002")
+            hub.deliver({"patient_key": "ICN100001", "op": "INSERT"})
+            return mine.qsize(), other.qsize()
+
+        assert asyncio.run(scenario()) == (1, 0)
+
+    def test_dispatch_hands_off_to_loop(self, hub):
+        async def scenario():
+            queue = hub.subscribe("ICN100001")
+            hub.dispatch('{"patient_key": "ICN100001", "op": "DELETE"}')
+            return await asyncio.wait_for(queue.get(), timeout=1)
+
+        assert asyncio.run(scenario())["op"] == "DELETE"
+        assert hub.notifications == 1
+
+    def test_full_queue_drops(self, hub):
+        async def scenario():
+            queue = hub.subscribe("ICN100001")
+            for _ in range(SUBSCRIBER_QUEUE_SIZE + 3):
+                hub.deliver({"patient_key": "ICN100001"})
+            return queue.qsize()
+
+        assert asyncio.run(scenario()) == SUBSCRIBER_QUEUE_SIZE
+        assert hub.dropped == 3
+
+    def test_unsubscribe(self, hub):
+        async def scenario():
+            queue = hub.subscribe("ICN100001")
+            hub.unsubscribe("ICN100001", queue)
+            hub.unsubscribe("ICN100001", queue)
+            return hub.subscriber_count()
+
+        assert asyncio.run(scenario()) == 0
@@ -2,20 +2,29 @@
 # app/tests/test_vista_client.py
 # ---------------------------------------------------------------------
 # Unit Tests for VistA Client Site Selection Logic
-# Tests intelligent site selection, T-notation parsing, domain limits
+# Tests intelligent site selection, domain limits,
+# batched RPC calls, deadlines, circuit breakers and hedging (against an
+# in-process httpx transport)
 # ---------------------------------------------------------------------
 
+import asyncio
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import json
 
+import httpx
+
+from app.services.patient_registry import PatientRegistry
 from app.services.vista_client import (
     VistaClient,
     DOMAIN_SITE_LIMITS,
+    MAX_BATCH_CALLS,
     MAX_SITES_ABSOLUTE,
+    SiteHealth,
 )
+from app.services.vista_response_cache import vista_response_cache
 
 
 @pytest.fixture
@@ -83,84 +92,7 @@ def mock_patient_registry():
 @pytest.fixture
 def vista_client(mock_patient_registry):
     """Create VistaClient with mocked patient registry"""
-    with patch.object(VistaClient, '_load_patient_registry', return_value=mock_patient_registry):
-        client = VistaClient()
-        return client
-
-
-class TestTNotationParsing:
-    """Test T-notation date parsing (_parse_t_notation)"""
-
-    def test_parse_t_zero_today(self, vista_client):
-        """Test T-0 parses to today"""
-        result = vista_client._parse_t_notation("T-0")
-        expected = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        actual = result.replace(hour=0, minute=0, second=0, microsecond=0)
-        assert actual == expected
-
-    def test_parse_t_seven_days_ago(self, vista_client):
-        """Test T-7 parses to 7 days ago"""
-        result = vista_client._parse_t_notation("T-7")
-        expected = datetime.now() - timedelta(days=7)
-        # Compare dates only (ignore time)
-        assert result.date() == expected.date()
-
-    def test_parse_t_thirty_days_ago(self, vista_client):
-        """Test T-30 parses to 30 days ago"""
-        result = vista_client._parse_t_notation("T-30")
-        expected = datetime.now() - timedelta(days=30)
-        assert result.date() == expected.date()
-
-    def test_parse_t_365_days_ago(self, vista_client):
-        """Test T-365 parses to 1 year ago"""
-        result = vista_client._parse_t_notation("T-365")
-        expected = datetime.now() - timedelta(days=365)
-        assert result.date() == expected.date()
-
-    def test_parse_invalid_t_notation(self, vista_client):
-        """Test invalid T-notation returns very old date"""
-        result = vista_client._parse_t_notation("T-invalid")
-        assert result == datetime(1900, 1, 1)
-
-    def test_parse_missing_t_notation(self, vista_client):
-        """Test missing T-notation returns very old date"""
-        result = vista_client._parse_t_notation("")
-        assert result == datetime(1900, 1, 1)
-
-    def test_parse_none_t_notation(self, vista_client):
-        """Test None T-notation returns very old date"""
-        result = vista_client._parse_t_notation(None)
-        assert result == datetime(1900, 1, 1)
-
-    def test_parse_iso_date_string(self, vista_client):
-        """Test ISO date string parsing"""
-        result = vista_client._parse_t_notation("2024-01-15")
-        assert result.year == 2024
-        assert result.month == 1
-        assert result.day == 15
-
-
-class TestGetTreatingFacilities:
-    """Test _get_patient_treating_facilities helper"""
-
-    def test_get_treating_facilities_existing_patient(self, vista_client):
-        """Test getting treating facilities for existing patient"""
-        facilities = vista_client._get_patient_treating_facilities("ICN100001")
-        assert len(facilities) == 5
-        assert facilities[0]["sta3n"] == "200"
-        assert facilities[0]["last_seen"] == "T-7"
-
-    def test_get_treating_facilities_single_site_patient(self, vista_client):
-        """Test patient with single treating facility"""
-        facilities = vista_client._get_patient_treating_facilities("ICN100013")
-        assert len(facilities) == 1
-        assert facilities[0]["sta3n"] == "630"
-        assert facilities[0]["last_seen"] == "T-0"
-
-    def test_get_treating_facilities_nonexistent_patient(self, vista_client):
-        """Test non-existent patient returns empty list"""
-        facilities = vista_client._get_patient_treating_facilities("ICN999999")
-        assert facilities == []
+    return VistaClient(registry=PatientRegistry(registry=mock_patient_registry))
 
 
 class TestSiteSelectionBasic:
@@ -328,32 +260,35 @@ class TestMaxSitesOverride:
 class TestEdgeCases:
     """Test edge cases and error handling"""
 
-    def test_no_treating_facilities_empty_list(self, vista_client):
+    @staticmethod
+    def client_for(facilities):
+        registry = PatientRegistry(registry={"patients": [{"icn": "ICN_TEST", "treating_facilities": facilities}]})
+        return VistaClient(registry=registry)
+
+    def test_no_treating_facilities_empty_list(self):
         """Test patient with no treating facilities"""
-        with patch.object(vista_client, '_get_patient_treating_facilities', return_value=[]):
-            sites = vista_client.get_target_sites("ICN000000", "default")
-            assert sites == []
+        sites = self.client_for([]).get_target_sites("ICN_TEST", "default")
+        assert sites == []
 
-    def test_treating_facility_missing_last_seen(self, vista_client):
+    def test_treating_facility_missing_last_seen(self):
         """Test facility with missing last_seen field"""
-        # Mock treating facilities with missing last_seen
-        with patch.object(vista_client, '_get_patient_treating_facilities', return_value=[
+        client = self.client_for([
             {"sta3n": "200", "dfn": "100001"},  # Missing last_seen
             {"sta3n": "500", "dfn": "500001", "last_seen": "T-7"}
-        ]):
-            sites = vista_client.get_target_sites("ICN_TEST", "default")
-            # Site with last_seen should come first
-            assert sites == ["500", "200"]
+        ])
+        sites = client.get_target_sites("ICN_TEST", "default")
+        # Site with last_seen should come first
+        assert sites == ["500", "200"]
 
-    def test_treating_facility_invalid_last_seen(self, vista_client):
+    def test_treating_facility_invalid_last_seen(self):
         """Test facility with invalid last_seen value"""
-        with patch.object(vista_client, '_get_patient_treating_facilities', return_value=[
+        client = self.client_for([
             {"sta3n": "200", "dfn": "100001", "last_seen": "INVALID"},
             {"sta3n": "500", "dfn": "500001", "last_seen": "T-7"}
-        ]):
-            sites = vista_client.get_target_sites("ICN_TEST", "default")
-            # Valid T-notation should come first
-            assert sites == ["500", "200"]
+        ])
+        sites = client.get_target_sites("ICN_TEST", "default")
+        # Valid T-notation should come first
+        assert sites == ["500", "200"]
 
     def test_zero_max_sites_returns_empty(self, vista_client):
         """Test max_sites=0 returns empty list"""
@@ -400,3 +335,271 @@ class TestDomainSiteLimitsConfiguration:
         for domain, limit in DOMAIN_SITE_LIMITS.items():
             if domain != "allergies":
                 assert allergies_limit >= limit
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start each test with an empty shared response cache"""
+    vista_response_cache.clear()
+    yield
+    vista_response_cache.clear()
+
+
+@pytest.fixture
+def make_client(mock_patient_registry):
+    """Build a VistaClient whose requests go to an in-process handler; returns (client, requests)"""
+    def factory(handler):
+        requests = []
+
+        async def recording_handler(request):
+            requests.append(request)
+            response = handler(request)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        client = VistaClient(
+            transport=httpx.MockTransport(recording_handler),
+            registry=PatientRegistry(registry=mock_patient_registry)
+        )
+        return client, requests
+
+    return factory
+
+
+def batch_handler(request):
+    """Broker stand-in: every call succeeds, response is 'site:rpc'"""
+    calls = json.loads(request.content)["calls"]
+    return httpx.Response(200, json={"results": [
+        {"success": True, "response": f"{c['site']}:{c['name']}", "error": None, "site": c["site"], "rpc": c["name"]}
+        for c in calls
+    ]})
+
+
+class TestBatchCalls:
+    """Test batched RPC calls (call_batch / call_rpc_multi_site)"""
+
+    def test_one_request_per_site(self, make_client):
+        """Test each site's calls go out as a single /rpc/batch request, order preserved"""
+        client, requests = make_client(batch_handler)
+        calls = [
+            ("200", "GMV LATEST VM", ["ICN100001"]),
+            ("500", "GMV LATEST VM", ["ICN100001"]),
+            ("200", "ORQQAL LIST", ["ICN100001"]),
+            ("500", "ORQQAL LIST", ["ICN100001"]),
+        ]
+
+        results = asyncio.run(client.call_batch(calls))
+
+        assert len(requests) == 2
+        assert all(r.url.path == "/rpc/batch" for r in requests)
+        assert [r["response"] for r in results] == ["200:GMV LATEST VM", "500:GMV LATEST VM", "200:ORQQAL LIST", "500:ORQQAL LIST"]
+        assert {r["status"] for r in results} == {"ok"}
+
+    def test_multi_site_results_by_site(self, make_client):
+        """Test call_rpc_multi_site maps results back to sites"""
+        client, _ = make_client(batch_handler)
+
+        results = asyncio.run(client.call_rpc_multi_site(["200", "500", "630"], "GMV LATEST VM", ["ICN100001"]))
+
+        assert list(results) == ["200", "500", "630"]
+        assert results["500"]["response"] == "500:GMV LATEST VM"
+
+    def test_since_appended_per_site(self, make_client):
+        """Test a delta refresh adds "since" only for the sites given one"""
+        client, requests = make_client(batch_handler)
+
+        asyncio.run(client.call_rpc_multi_site(["200", "500"], "GMV LATEST VM", ["ICN100001"], since={"200": "3241217.0930"}))
+
+        params = {c["site"]: c["params"] for r in requests for c in json.loads(r.content)["calls"]}
+        assert params == {"200": ["ICN100001", "3241217.0930"], "500": ["ICN100001"]}
+
+    def test_iter_multi_site_yields_fastest_first(self, make_client):
+        """Test iter_rpc_multi_site yields each site as it answers"""
+        delays = {"200": 0.2, "500": 0.0, "630": 0.1}
+
+        async def handler(request):
+            await asyncio.sleep(delays[json.loads(request.content)["calls"][0]["site"]])
+            return batch_handler(request)
+
+        client, _ = make_client(handler)
+
+        async def collect():
+            return [site async for site, _ in client.iter_rpc_multi_site(["200", "500", "630"], "GMV LATEST VM", ["ICN100001"])]
+
+        assert asyncio.run(collect()) == ["500", "630", "200"]
+
+    def test_large_batch_is_split(self, make_client):
+        """Test a site's calls over MAX_BATCH_CALLS are split, order preserved"""
+        client, requests = make_client(batch_handler)
+        calls = [("200", f"RPC {i}", ["ICN100001"]) for i in range(MAX_BATCH_CALLS + 5)]
+
+        results = asyncio.run(client.call_batch(calls))
+
+        assert len(requests) == 2
+        assert [r["rpc"] for r in results] == [rpc for _, rpc, _ in calls]
+
+    def test_falls_back_without_batch_endpoint(self, make_client):
+        """Test per-call requests when the broker has no /rpc/batch"""
+        def handler(request):
+            if request.url.path == "/rpc/batch":
+                return httpx.Response(404, json={"detail": "Not Found"})
+            body = json.loads(request.content)
+            site = request.url.params["site"]
+            return httpx.Response(200, json={"success": True, "response": "ok", "error": None, "site": site, "rpc": body["name"]})
+
+        client, requests = make_client(handler)
+
+        results = asyncio.run(client.call_batch([("200", "ORQQAL LIST", ["ICN100001"]), ("500", "ORQQAL LIST", ["ICN100001"])]))
+
+        assert sorted(r.url.path for r in requests) == ["/rpc/batch", "/rpc/batch", "/rpc/execute", "/rpc/execute"]
+        assert [r["site"] for r in results] == ["200", "500"]
+
+    def test_batch_error_fails_every_call(self, make_client):
+        """Test a failed batch request reports an error for each of its calls"""
+        client, _ = make_client(lambda request: httpx.Response(503, text="unavailable"))
+
+        results = asyncio.run(client.call_batch([("200", "ORQQAL LIST", []), ("200", "GMV LATEST VM", [])]))
+
+        assert [r["success"] for r in results] == [False, False]
+        assert [r["status"] for r in results] == ["error", "error"]
+        assert "HTTP 503" in results[0]["error"]
+
+
+class TestResilience:
+    """Test deadline, circuit breaker and hedging"""
+
+    def test_deadline_returns_partial_results(self, make_client):
+        """Test a slow site times out without delaying the others"""
+        async def handler(request):
+            if json.loads(request.content)["calls"][0]["site"] == "500":
+                await asyncio.sleep(5)
+            return batch_handler(request)
+
+        client, _ = make_client(handler)
+
+        started = datetime.now()
+        results = asyncio.run(client.call_rpc_multi_site(["200", "500"], "GMV LATEST VM", ["ICN100001"], deadline=0.2))
+
+        assert (datetime.now() - started).total_seconds() < 2
+        assert results["200"]["status"] == "ok"
+        assert results["500"]["status"] == "timeout"
+        assert results["500"]["success"] is False
+
+    def test_circuit_opens_after_failures(self, make_client):
+        """Test a failing site is skipped once its breaker opens"""
+        client, requests = make_client(lambda request: httpx.Response(503, text="down"))
+        threshold = client.site_health("200").failure_threshold
+
+        for _ in range(threshold):
+            asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", []))
+        result = asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", []))
+
+        assert len(requests) == threshold
+        assert result["200"]["status"] == "circuit_open"
+        assert client.get_site_status()["200"]["state"] == "open"
+
+    def test_half_open_trial_closes_circuit(self, make_client):
+        """Test a successful trial request after reset_seconds closes the breaker"""
+        client, _ = make_client(batch_handler)
+        health = client.site_health("200")
+        for _ in range(health.failure_threshold):
+            health.record_failure()
+        health.opened_at -= health.reset_seconds
+
+        assert health.state == "half_open"
+        result = asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", []))
+
+        assert result["200"]["status"] == "ok"
+        assert health.state == "closed"
+
+    def test_hedged_request_wins(self, make_client):
+        """Test a duplicate request is sent when the first is slower than the site's p90"""
+        calls = {"count": 0}
+
+        async def handler(request):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                await asyncio.sleep(5)
+            return batch_handler(request)
+
+        client, requests = make_client(handler)
+        client.hedge_enabled = True
+        health = client.site_health("200")
+        health.latencies.extend([0.01] * 10)
+
+        result = asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", [], deadline=2))
+
+        assert result["200"]["status"] == "ok"
+        assert len(requests) == 2
+        assert health.hedged == 1
+
+
+class TestSharedCache:
+    """Test the shared response cache and request coalescing"""
+
+    def test_second_call_served_from_cache(self, make_client):
+        """Test a repeated call within the TTL makes no broker request"""
+        client, requests = make_client(batch_handler)
+
+        asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", ["ICN100001"]))
+        result = asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", ["ICN100001"]))
+
+        assert len(requests) == 1
+        assert result["200"]["cached"] is True
+        assert result["200"]["response"] == "200:GMV LATEST VM"
+
+    def test_failures_not_cached(self, make_client):
+        """Test failed calls are retried on the next refresh"""
+        client, requests = make_client(lambda request: httpx.Response(503, text="down"))
+
+        asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", ["ICN100001"]))
+        asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", ["ICN100001"]))
+
+        assert len(requests) == 2
+
+    def test_concurrent_calls_coalesced(self, make_client):
+        """Test simultaneous refreshes of the same patient share one request"""
+        async def handler(request):
+            await asyncio.sleep(0.05)
+            return batch_handler(request)
+
+        client, requests = make_client(handler)
+
+        async def two_users():
+            return await asyncio.gather(
+                client.call_rpc_multi_site(["200", "500"], "GMV LATEST VM", ["ICN100001"]),
+                client.call_rpc_multi_site(["200", "500"], "GMV LATEST VM", ["ICN100001"]),
+            )
+
+        first, second = asyncio.run(two_users())
+
+        assert len(requests) == 2  # One per site, not per user
+        assert second["500"]["coalesced"] is True
+        assert second["500"]["response"] == first["500"]["response"]
+
+    def test_cache_bypass(self, make_client):
+        """Test use_cache=False always calls the broker"""
+        client, requests = make_client(batch_handler)
+
+        asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", ["ICN100001"], use_cache=False))
+        asyncio.run(client.call_rpc_multi_site(["200"], "GMV LATEST VM", ["ICN100001"], use_cache=False))
+
+        assert len(requests) == 2
+
+
+class TestSiteHealth:
+    """Test latency-based timeouts"""
+
+    def test_timeout_uses_configured_value_until_samples(self):
+        health = SiteHealth("200")
+        assert health.timeout(30.0) == 30.0
+        assert health.hedge_delay() is None
+
+    def test_adaptive_timeout(self):
+        health = SiteHealth("200")
+        for latency in [1.0] * 9 + [2.0]:
+            health.record_success(latency)
+        assert health.timeout(30.0) == 6.0
+        assert health.timeout(4.0) == 4.0
+        assert health.hedge_delay() == 2.0
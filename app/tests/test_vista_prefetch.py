@@ -0,0 +1,134 @@
+# ---------------------------------------------------------------------
+# app/tests/test_vista_prefetch.py
+# ---------------------------------------------------------------------
+# Unit tests for background VistA prefetch (app/services/vista_prefetch.py)
+# Tests which calls are made, the global concurrency budget, and that
+# repeat selections of the same patient are skipped (the VistA client is
+# a stand-in, no broker required), and that the patient routes schedule
+# only when the session's patient changes
+# ---------------------------------------------------------------------
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.sessions import SessionMiddleware
+
+import app.routes.patient as patient_routes
+import app.services.vista_prefetch as vista_prefetch
+from app.services.vista_prefetch import VistaPrefetcher
+
+
+class FakeClient:
+    """Two sites per domain; records calls and peak concurrency"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    def get_target_sites(self, icn, domain):
+        return ["200", "500"]
+
+    async def call_batch(self, calls):
+        self.calls.extend(calls)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return [{"success": True, "status": "ok"} for _ in calls]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(vista_prefetch, "get_vista_client", lambda: fake)
+    return fake
+
+
+async def drain(prefetcher):
+    while prefetcher._tasks:
+        await asyncio.gather(*list(prefetcher._tasks.values()))
+
+
+class TestVistaPrefetcher:
+    """Test scheduling, budget and de-duplication"""
+
+    def test_fetches_each_domain_at_each_site(self, client):
+        prefetcher = VistaPrefetcher(["allergies", "vitals"], max_concurrency=4, enabled=True)
+
+        async def scenario():
+            assert prefetcher.schedule("ICN100001")
+            await drain(prefetcher)
+
+        asyncio.run(scenario())
+        assert sorted(client.calls) == [
+            ("200", "GMV LATEST VM", ["ICN100001"]),
+            ("200", "ORQQAL LIST", ["ICN100001"]),
+            ("500", "GMV LATEST VM", ["ICN100001"]),
+            ("500", "ORQQAL LIST", ["ICN100001"]),
+        ]
+
+    def test_concurrency_budget_shared_across_patients(self, client):
+        prefetcher = VistaPrefetcher(["allergies", "vitals"], max_concurrency=2, enabled=True)
+
+        async def scenario():
+            for icn in ("ICN100001", "ICN100002", "ICN100003"):
+                prefetcher.schedule(icn)
+            await drain(prefetcher)
+
+        asyncio.run(scenario())
+        assert len(client.calls) == 12
+        assert client.peak == 2
+
+    def test_repeat_selection_skipped(self, client):
+        prefetcher = VistaPrefetcher(["vitals"], enabled=True)
+
+        async def scenario():
+            first = prefetcher.schedule("ICN100001")
+            while_running = prefetcher.schedule("ICN100001")
+            await drain(prefetcher)
+            after = prefetcher.schedule("ICN100001")
+            return first, while_running, after
+
+        assert asyncio.run(scenario()) == (True, False, False)
+        assert prefetcher.stats()["skipped"] == 2
+
+    def test_disabled_and_unknown_domains(self, client):
+        assert VistaPrefetcher(["vitals"], enabled=False).schedule("ICN100001") is False
+        prefetcher = VistaPrefetcher(["labs", "vitals"], enabled=True)
+        assert prefetcher.domains == ["vitals"]
+
+
+@pytest.fixture
+def patient_app(monkeypatch):
+    """Patient API with CCOW, demographics and rendering stubbed; records scheduled ICNs"""
+    context = {"icn": "ICN100001"}
+    scheduled = []
+
+    monkeypatch.setattr(patient_routes.ccow_client, "get_active_patient", lambda request: context["icn"])
+    monkeypatch.setattr(patient_routes, "get_patient_demographics", lambda icn: {"icn": icn})
+    monkeypatch.setattr(patient_routes.templates, "TemplateResponse", lambda name, ctx: HTMLResponse(""))
+    monkeypatch.setattr(patient_routes.vista_prefetcher, "schedule", lambda icn: scheduled.append(icn) or True)
+
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key="test")
+    app.include_router(patient_routes.router)
+    return TestClient(app), context, scheduled
+
+
+class TestPrefetchOnContextChange:
+    """Test that page loads do not prefetch the same patient again"""
+
+    def test_same_patient_scheduled_once(self, patient_app):
+        client, context, scheduled = patient_app
+        client.get("/api/patient/current")
+        client.get("/api/patient/current")
+        assert scheduled == ["ICN100001"]
+
+        context["icn"] = "ICN100002"  # Changed by another CCOW application
+        client.get("/api/patient/current")
+        assert scheduled == ["ICN100001", "ICN100002"]
@@ -0,0 +1,60 @@
+# ---------------------------------------------------------------------
+# app/tests/test_vista_response_cache.py
+# ---------------------------------------------------------------------
+# Unit tests for the shared VistA RPC response cache
+# Tests keys, TTL expiry, LRU bounds and single-flight registration
+# (in-process backend only)
+# ---------------------------------------------------------------------
+
+import asyncio
+
+from app.services.vista_response_cache import VistaResponseCache, response_cache_key
+
+RESULT = {"success": True, "response": "PULSE^72", "error": None, "site": "200", "rpc": "GMV LATEST VM"}
+
+
+def test_key_includes_site_rpc_and_params():
+    assert response_cache_key("200", "GMV LATEST VM", ["ICN100001"]) == '200|GMV LATEST VM|["ICN100001"]'
+    assert response_cache_key("200", "GMV LATEST VM", ["ICN100001"]) != response_cache_key("500", "GMV LATEST VM", ["ICN100001"])
+
+
+def test_ttl_expiry():
+    cache = VistaResponseCache(ttl_seconds=0)
+
+    async def scenario():
+        await cache.set("k", RESULT)
+        return await cache.get("k")
+
+    assert asyncio.run(scenario()) is None
+    assert cache.expirations == 1
+
+
+def test_lru_eviction():
+    cache = VistaResponseCache(max_entries=2)
+
+    async def scenario():
+        await cache.set("a", RESULT)
+        await cache.set("b", RESULT)
+        await cache.get("a")
+        await cache.set("c", RESULT)
+        return [await cache.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+    assert cache.evictions == 1
+    assert cache.stats()["hit_rate"] == 0.75
+
+
+def test_claim_and_finish():
+    cache = VistaResponseCache()
+
+    async def scenario():
+        leader_future, leader = cache.claim("k")
+        follower_future, follower = cache.claim("k")
+        cache.finish("k", leader_future, result=RESULT)
+        _, next_leader = cache.claim("k")
+        return leader, follower, follower_future is leader_future, await follower_future, next_leader
+
+    leader, follower, same, result, next_leader = asyncio.run(scenario())
+    assert (leader, follower, same, next_leader) == (True, False, True, True)
+    assert result == RESULT
+    assert cache.coalesced == 1
@@ -0,0 +1,41 @@
+# ---------------------------------------------------------------------
+# app/utils/json_response.py
+# ---------------------------------------------------------------------
+# orjson-backed JSON response for the /api/patient/* routers
+#  - Set as default_response_class on each API router, so rendering
+#    goes through orjson instead of json.dumps
+#  - High-volume endpoints (vitals, labs lists) return a
+#    FastJSONResponse directly, which also skips FastAPI's
+#    jsonable_encoder pass over already JSON-ready dicts
+#  - Falls back to the standard JSONResponse behaviour if orjson is
+#    not installed
+# ---------------------------------------------------------------------
+
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _orjson_default(value: Any) -> Any:
+    """Encode types orjson does not handle natively (Decimal, models, ...)."""
+    return jsonable_encoder(value)
+
+
+def render_json(content: Any) -> bytes:
+    """Serialize content to JSON bytes (orjson when available)."""
+    if orjson is None:
+        return JSONResponse(jsonable_encoder(content)).body
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
@@ -0,0 +1,95 @@
+# ---------------------------------------------------------------------
+# app/utils/streaming.py
+# ---------------------------------------------------------------------
+# Streamed Template Rendering for large clinical tables
+#  - Renders with Jinja's template.generate() behind a StreamingResponse,
+#    so the page chrome (header, filters, table head) is sent before the
+#    table rows are produced
+#  - Pass a row generator (e.g., a server-side cursor from
+#    app/db/vitals.stream_vitals_page) as the context value the template
+#    loops over; rows are then fetched, rendered and sent in batches and
+#    never held in memory all at once
+#  - Starlette runs the (blocking) generator in its threadpool
+# ---------------------------------------------------------------------
+# Usage:
+#   return stream_template(
+#       templates,
+#       "patient_vitals.html",
+#       get_base_context(request, vitals=stream_vitals_page(icn), ...)
+#   )
+#
+# Templates must iterate a streamed value only once and must not call
+# |length on it (pass counts/totals separately).
+# ---------------------------------------------------------------------
+
+import logging
+from typing import Any, Dict, Iterator
+
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+
+logger = logging.getLogger(__name__)
+
+# Flush the first chunk early so the browser can start on the page chrome,
+# then send larger chunks to keep per-write overhead low
+FIRST_CHUNK_BYTES = 4 * 1024
+CHUNK_BYTES = 32 * 1024
+
+
+def iter_template_chunks(
+    templates: Jinja2Templates,
+    template_name: str,
+    context: Dict[str, Any],
+    first_chunk_bytes: int = FIRST_CHUNK_BYTES,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Render a template incrementally, yielding UTF-8 chunks.
+
+    Jinja yields many small strings (one per text block/expression), so
+    output is coalesced to first_chunk_bytes for the first write and
+    chunk_bytes after that.
+    """
+    template = templates.get_template(template_name)
+
+    buffer = []
+    size = 0
+    limit = first_chunk_bytes
+    try:
+        for piece in template.generate(context):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= limit:
+                yield "".join(buffer).encode("utf-8")
+                buffer, size, limit = [], 0, chunk_bytes
+    except Exception as e:
+        # The status line is already sent; end the document with what rendered
+        logger.error(f"Error streaming template {template_name}: {e}")
+
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def stream_template(
+    templates: Jinja2Templates,
+    template_name: str,
+    context: Dict[str, Any],
+    status_code: int = 200,
+) -> StreamingResponse:
+    """
+    Streamed equivalent of templates.TemplateResponse().
+
+    Args:
+        templates: Route module's Jinja2Templates instance
+        template_name: Template to render
+        context: Template context (must include "request")
+        status_code: HTTP status code
+
+    Returns:
+        StreamingResponse with media type text/html
+    """
+    return StreamingResponse(
+        iter_template_chunks(templates, template_name, context),
+        status_code=status_code,
+        media_type="text/html; charset=utf-8",
+    )
@@ -196,6 +196,26 @@ VISTA_RPC_LATENCY_ENABLED = _get_bool("VISTA_RPC_LATENCY_ENABLED", default=True)
 VISTA_RPC_LATENCY_MIN = float(os.getenv("VISTA_RPC_LATENCY_MIN", "1.0"))  # seconds
 VISTA_RPC_LATENCY_MAX = float(os.getenv("VISTA_RPC_LATENCY_MAX", "3.0"))  # seconds
 
+# Client resilience (app/services/vista_client.py)
+VISTA_DEADLINE = float(os.getenv("VISTA_DEADLINE", "8.0"))  # seconds per multi-site call (0 = none)
+VISTA_MAX_CONNECTIONS_PER_SITE = int(os.getenv("VISTA_MAX_CONNECTIONS_PER_SITE", "10"))
+VISTA_HTTP2 = _get_bool("VISTA_HTTP2", default=True)  # Used when the h2 package is installed
+VISTA_BREAKER_FAILURES = int(os.getenv("VISTA_BREAKER_FAILURES", "3"))  # consecutive failures to open
+VISTA_BREAKER_RESET_SECONDS = float(os.getenv("VISTA_BREAKER_RESET_SECONDS", "30"))
+VISTA_HEDGE_ENABLED = _get_bool("VISTA_HEDGE_ENABLED", default=False)
+
+# Progressive realtime refresh: stream each site's rows as they arrive
+# (app/services/realtime_stream.py); when disabled the Refresh VistA
+# buttons fall back to waiting for every site
+VISTA_STREAMING_ENABLED = _get_bool("VISTA_STREAMING_ENABLED", default=True)
+
+# Delta realtime refresh: sites already in the session's VistA cache are
+# asked only for records entered since their last refresh (less the
+# lookback, which covers clock skew and late entries); the deltas are
+# added to the cached responses. Expired caches refresh in full.
+VISTA_DELTA_REFRESH_ENABLED = _get_bool("VISTA_DELTA_REFRESH_ENABLED", default=True)
+VISTA_DELTA_LOOKBACK_MINUTES = float(os.getenv("VISTA_DELTA_LOOKBACK_MINUTES", "5"))
+
 VISTA_CONFIG = {
     "enabled": VISTA_ENABLED,
     "service_url": VISTA_SERVICE_URL,
@@ -203,6 +223,72 @@ VISTA_CONFIG = {
     "rpc_latency_enabled": VISTA_RPC_LATENCY_ENABLED,
     "rpc_latency_min": VISTA_RPC_LATENCY_MIN,
     "rpc_latency_max": VISTA_RPC_LATENCY_MAX,
+    "deadline": VISTA_DEADLINE,
+    "max_connections_per_site": VISTA_MAX_CONNECTIONS_PER_SITE,
+    "http2": VISTA_HTTP2,
+    "breaker_failure_threshold": VISTA_BREAKER_FAILURES,
+    "breaker_reset_seconds": VISTA_BREAKER_RESET_SECONDS,
+    "hedge_enabled": VISTA_HEDGE_ENABLED,
+    "streaming": VISTA_STREAMING_ENABLED,
+    "delta_refresh": VISTA_DELTA_REFRESH_ENABLED,
+    "delta_lookback_minutes": VISTA_DELTA_LOOKBACK_MINUTES,
+}
+
+# Shared VistA RPC response cache (app/services/vista_response_cache.py)
+# Successful results are shared by all users for ttl_seconds, and
+# concurrent refreshes of the same (site, rpc, patient) make one request
+VISTA_CACHE_ENABLED = _get_bool("VISTA_CACHE_ENABLED", default=True)
+VISTA_CACHE_TTL_SECONDS = float(os.getenv("VISTA_CACHE_TTL_SECONDS", "60"))
+VISTA_CACHE_MAX_ENTRIES = int(os.getenv("VISTA_CACHE_MAX_ENTRIES", "5000"))
+VISTA_CACHE_REDIS_URL = os.getenv("VISTA_CACHE_REDIS_URL", "")  # Optional shared store (redis package)
+
+VISTA_CACHE_CONFIG = {
+    "enabled": VISTA_CACHE_ENABLED,
+    "ttl_seconds": VISTA_CACHE_TTL_SECONDS,
+    "max_entries": VISTA_CACHE_MAX_ENTRIES,
+    "redis_url": VISTA_CACHE_REDIS_URL,
+}
+
+# Background VistA prefetch on patient selection (app/services/vista_prefetch.py)
+# Selecting a patient warms the shared response cache for these domains,
+# with at most max_concurrency prefetch RPCs in flight across all users.
+# Entries live for VISTA_CACHE_TTL_SECONDS, so raise that if clinicians
+# usually take longer to open a domain page.
+VISTA_PREFETCH_ENABLED = _get_bool("VISTA_PREFETCH_ENABLED", default=False)
+VISTA_PREFETCH_DOMAINS = [
+    domain.strip() for domain in os.getenv("VISTA_PREFETCH_DOMAINS", "allergies,vitals").split(",") if domain.strip()
+]
+VISTA_PREFETCH_CONCURRENCY = int(os.getenv("VISTA_PREFETCH_CONCURRENCY", "4"))
+
+VISTA_PREFETCH_CONFIG = {
+    "enabled": VISTA_PREFETCH_ENABLED,
+    "domains": VISTA_PREFETCH_DOMAINS,
+    "max_concurrency": VISTA_PREFETCH_CONCURRENCY,
+}
+
+# Patient registry used for VistA site selection (app/services/patient_registry.py)
+# Indexed by ICN with treating facilities pre-ranked by last_seen; the
+# file is re-read in the background when its mtime changes (checked at
+# most every reload_check_seconds, 0 = never)
+PATIENT_REGISTRY_PATH = _expand_path(
+    "PATIENT_REGISTRY_PATH", str(PROJECT_ROOT / "mock" / "shared" / "patient_registry.json")
+)
+PATIENT_REGISTRY_RELOAD_CHECK_SECONDS = float(os.getenv("PATIENT_REGISTRY_RELOAD_CHECK_SECONDS", "5"))
+
+PATIENT_REGISTRY_CONFIG = {
+    "path": PATIENT_REGISTRY_PATH,
+    "reload_check_seconds": PATIENT_REGISTRY_RELOAD_CHECK_SECONDS,
+}
+
+# Memoized PostgreSQL + VistA merged views (app/services/merged_view_cache.py)
+# While a patient's VistaSessionCache entry is warm, page views and AI
+# tools reuse the merged list until the serving data or VistA data changes
+MERGED_VIEW_CACHE_ENABLED = _get_bool("MERGED_VIEW_CACHE_ENABLED", default=True)
+MERGED_VIEW_CACHE_MAX_ENTRIES = int(os.getenv("MERGED_VIEW_CACHE_MAX_ENTRIES", "500"))
+
+MERGED_VIEW_CACHE_CONFIG = {
+    "enabled": MERGED_VIEW_CACHE_ENABLED,
+    "max_entries": MERGED_VIEW_CACHE_MAX_ENTRIES,
 }
 
 
@@ -231,6 +317,95 @@ POSTGRES_CONFIG = {
     "url": DATABASE_URL,
 }
 
+# Optional read replica (app/db/engines.py). Read-only query functions
+# use it when set; writes and read-after-write paths (auth, tasks) always
+# use the primary. Unset POSTGRES_REPLICA_HOST = everything on primary.
+POSTGRES_REPLICA_HOST = os.getenv("POSTGRES_REPLICA_HOST", "")
+POSTGRES_REPLICA_PORT = int(os.getenv("POSTGRES_REPLICA_PORT", str(POSTGRES_PORT)))
+
+DATABASE_REPLICA_URL = (
+    f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@"
+    f"{POSTGRES_REPLICA_HOST}:{POSTGRES_REPLICA_PORT}/{POSTGRES_DB}"
+    if POSTGRES_REPLICA_HOST else ""
+)
+
+DATABASE_ROUTING_CONFIG = {
+    "replica_url": DATABASE_REPLICA_URL,
+    "replica_max_lag_seconds": float(os.getenv("POSTGRES_REPLICA_MAX_LAG_SECONDS", "30")),
+    "replica_lag_check_seconds": float(os.getenv("POSTGRES_REPLICA_LAG_CHECK_SECONDS", "5")),
+    "replica_retry_seconds": float(os.getenv("POSTGRES_REPLICA_RETRY_SECONDS", "30")),
+    "replica_connect_timeout": int(os.getenv("POSTGRES_REPLICA_CONNECT_TIMEOUT", "2")),
+}
+
+
+# -----------------------------------------------------------
+# Query Result Cache configuration (app/db/query_cache.py)
+# -----------------------------------------------------------
+
+# Historical (T-1) PostgreSQL results only change when an ETL load
+# bumps clinical.serving_data_version, so they can be held in memory
+QUERY_CACHE_ENABLED = _get_bool("QUERY_CACHE_ENABLED", default=True)
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "2000"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+QUERY_CACHE_VERSION_CHECK_SECONDS = float(os.getenv("QUERY_CACHE_VERSION_CHECK_SECONDS", "30"))
+
+QUERY_CACHE_CONFIG = {
+    "enabled": QUERY_CACHE_ENABLED,
+    "max_entries": QUERY_CACHE_MAX_ENTRIES,
+    "max_bytes": QUERY_CACHE_MAX_BYTES,
+    "version_check_seconds": QUERY_CACHE_VERSION_CHECK_SECONDS,
+}
+
+# In-memory patient typeahead index (app/db/patient_search.py)
+# Rebuilt when the "patient" serving data version changes; above the
+# max size, searches use the PostgreSQL trigram/prefix indexes instead
+PATIENT_SEARCH_INDEX_ENABLED = _get_bool("PATIENT_SEARCH_INDEX_ENABLED", default=True)
+PATIENT_SEARCH_INDEX_MAX_PATIENTS = int(os.getenv("PATIENT_SEARCH_INDEX_MAX_PATIENTS", "500000"))
+
+PATIENT_SEARCH_CONFIG = {
+    "index_enabled": PATIENT_SEARCH_INDEX_ENABLED,
+    "index_max_patients": PATIENT_SEARCH_INDEX_MAX_PATIENTS,
+}
+
+# Rendered dashboard widget cache (app/services/fragment_cache.py)
+# Widget HTML is keyed by the serving data version of the widget's
+# domains; the TTL bounds date-relative content between ETL loads
+FRAGMENT_CACHE_ENABLED = _get_bool("FRAGMENT_CACHE_ENABLED", default=True)
+FRAGMENT_CACHE_MAX_ENTRIES = int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "1000"))
+FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("FRAGMENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32 MB
+FRAGMENT_CACHE_TTL_SECONDS = float(os.getenv("FRAGMENT_CACHE_TTL_SECONDS", "300"))
+
+FRAGMENT_CACHE_CONFIG = {
+    "enabled": FRAGMENT_CACHE_ENABLED,
+    "max_entries": FRAGMENT_CACHE_MAX_ENTRIES,
+    "max_bytes": FRAGMENT_CACHE_MAX_BYTES,
+    "ttl_seconds": FRAGMENT_CACHE_TTL_SECONDS,
+}
+
+# Conditional GET (ETag / 304) for patient JSON APIs and dashboard widgets
+# (app/middleware/conditional.py). Tags are derived from serving data
+# versions and task write stamps; they also roll over every
+# max_age_seconds so date-relative content ("recent", "today") and
+# transient error states are never pinned in the browser for long
+HTTP_CACHE_ENABLED = _get_bool("HTTP_CACHE_ENABLED", default=True)
+HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "300"))
+
+HTTP_CACHE_CONFIG = {
+    "enabled": HTTP_CACHE_ENABLED,
+    "max_age_seconds": HTTP_CACHE_MAX_AGE_SECONDS,
+}
+
+# Live task updates pushed over SSE (app/services/task_events.py)
+# Browsers keep one EventSource per patient page; a comment line is sent
+# every heartbeat_seconds so proxies do not close idle streams
+TASK_EVENTS_ENABLED = _get_bool("TASK_EVENTS_ENABLED", default=True)
+TASK_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("TASK_EVENTS_HEARTBEAT_SECONDS", "15"))
+
+TASK_EVENTS_CONFIG = {
+    "enabled": TASK_EVENTS_ENABLED,
+    "heartbeat_seconds": TASK_EVENTS_HEARTBEAT_SECONDS,
+}
+
 
 # -----------------------------------------------------------
 # Authentication and Session Management configuration
@@ -346,6 +521,8 @@ if __name__ != "__main__":
     print(f"    MinIO endpoint: {MINIO_ENDPOINT}, bucket: {MINIO_BUCKET_NAME}")
     print(f"         USE_MINIO: {USE_MINIO}")
     print(f"        PostgreSQL: {POSTGRES_HOST}:{POSTGRES_PORT} / DB: {POSTGRES_DB}")
+    if POSTGRES_REPLICA_HOST:
+        print(f"   PostgreSQL read: {POSTGRES_REPLICA_HOST}:{POSTGRES_REPLICA_PORT} (replica)")
     print(f"      CCOW enabled: {CCOW_ENABLED}, URL: {CCOW_URL}")
     print(f"     Vista enabled: {VISTA_ENABLED}, URL: {VISTA_SERVICE_URL}")
     print(f"   Session timeout: {SESSION_TIMEOUT_MINUTES} minutes")
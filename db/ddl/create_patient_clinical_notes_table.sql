@@ -2,17 +2,20 @@
 -- Purpose: Serving database table for patient clinical notes
 -- Source: Gold layer Parquet files (clinical_notes/*.parquet)
 -- Created: 2026-01-02
+-- Partitioning: HASH (patient_key), 8 partitions; loaded per partition by
+--               etl/partitioned_load.py. Primary/unique keys include
+--               patient_key, as PostgreSQL requires for partitioned tables.
 
 -- Create clinical schema if it doesn't exist
 CREATE SCHEMA IF NOT EXISTS clinical;
 
 -- Drop table if exists (development only)
-DROP TABLE IF EXISTS clinical.patient_clinical_notes;
+DROP TABLE IF EXISTS clinical.patient_clinical_notes CASCADE;
 
 CREATE TABLE clinical.patient_clinical_notes (
-    note_id                     SERIAL PRIMARY KEY,
+    note_id                     SERIAL,
     patient_key                 VARCHAR(50) NOT NULL,       -- ICN
-    tiu_document_sid            BIGINT NOT NULL UNIQUE,     -- Source TIUDocumentSID
+    tiu_document_sid            BIGINT NOT NULL,            -- Source TIUDocumentSID
     document_definition_sid     INTEGER NOT NULL,           -- Note type definition ID
     document_title              VARCHAR(200) NOT NULL,      -- e.g., "GEN MED PROGRESS NOTE"
     document_class              VARCHAR(50) NOT NULL,       -- "Progress Notes", "Consults", etc.
@@ -34,8 +37,22 @@ CREATE TABLE clinical.patient_clinical_notes (
     text_preview                VARCHAR(500),               -- First 200 characters
     tiu_document_ien            VARCHAR(50),                -- TIU IEN (VistA identifier)
     source_system               VARCHAR(50),                -- "CDWWork" or "CDWWork2"
-    last_updated                TIMESTAMP DEFAULT NOW()
-);
+    search_vector               TSVECTOR,                   -- Weighted full-text vector (populated by ETL load)
+    last_updated                TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (note_id, patient_key),
+    UNIQUE (tiu_document_sid, patient_key)
+) PARTITION BY HASH (patient_key);
+
+-- Hash partitions on patient_key (modulus must match the partition count;
+-- etl/partitioned_load.py reads the bounds from the catalog)
+DO $$
+BEGIN
+    FOR r IN 0..7 LOOP
+        EXECUTE format(
+            'CREATE TABLE clinical.patient_clinical_notes_p%s PARTITION OF clinical.patient_clinical_notes '
+            'FOR VALUES WITH (MODULUS 8, REMAINDER %s)', r, r);
+    END LOOP;
+END $$;
 
 -- Indexes for performance
 
@@ -65,10 +82,18 @@ CREATE INDEX idx_clinical_notes_facility
 CREATE INDEX idx_clinical_notes_recent
     ON clinical.patient_clinical_notes (patient_key, document_class, reference_datetime DESC);
 
--- Full text search (for future use)
--- Note: Full text search index will be added in Phase 2
--- CREATE INDEX idx_clinical_notes_text
---     ON clinical.patient_clinical_notes USING GIN (to_tsvector('english', document_text));
+-- BRIN indexes for date-range scans across patients (rows are loaded in
+-- reference_datetime order within each partition, so ranges stay narrow)
+CREATE INDEX idx_clinical_notes_reference_brin
+    ON clinical.patient_clinical_notes USING BRIN (reference_datetime) WITH (pages_per_range = 32);
+
+CREATE INDEX idx_clinical_notes_entry_brin
+    ON clinical.patient_clinical_notes USING BRIN (entry_datetime) WITH (pages_per_range = 32);
+
+-- Full text search over note titles and narrative text
+-- search_vector is populated by etl/load_clinical_notes.py after each load
+CREATE INDEX idx_clinical_notes_search
+    ON clinical.patient_clinical_notes USING GIN (search_vector);
 
 -- Comments
 COMMENT ON TABLE clinical.patient_clinical_notes IS 'Patient clinical notes from Gold layer';
@@ -83,6 +108,7 @@ COMMENT ON COLUMN clinical.patient_clinical_notes.document_text IS 'Full narrati
 COMMENT ON COLUMN clinical.patient_clinical_notes.text_preview IS 'First 200 characters of note text for dashboard and list views';
 COMMENT ON COLUMN clinical.patient_clinical_notes.vha_standard_title IS 'VHA enterprise-wide standardized title';
 COMMENT ON COLUMN clinical.patient_clinical_notes.facility_name IS 'VA medical center or clinic name';
+COMMENT ON COLUMN clinical.patient_clinical_notes.search_vector IS 'English tsvector: document_title (A), vha_standard_title/document_class (B), document_text (C)';
 
 -- Grant permissions
 GRANT SELECT ON clinical.patient_clinical_notes TO PUBLIC;
@@ -2,17 +2,20 @@
 -- Purpose: Serving database table for patient laboratory results
 -- Source: Gold layer Parquet files (labs/*.parquet)
 -- Updated: 2025-12-24 - Moved to clinical schema
+-- Partitioning: HASH (patient_key), 8 partitions; loaded per partition by
+--               etl/partitioned_load.py. Primary/unique keys include
+--               patient_key, as PostgreSQL requires for partitioned tables.
 
 -- Create clinical schema if it doesn't exist
 CREATE SCHEMA IF NOT EXISTS clinical;
 
 -- Drop table if exists (development only)
-DROP TABLE IF EXISTS clinical.patient_labs;
+DROP TABLE IF EXISTS clinical.patient_labs CASCADE;
 
 CREATE TABLE clinical.patient_labs (
-    lab_id                      SERIAL PRIMARY KEY,
+    lab_id                      SERIAL,
     patient_key                 VARCHAR(50) NOT NULL,       -- ICN
-    lab_chem_sid                BIGINT NOT NULL UNIQUE,     -- Source LabChemSID
+    lab_chem_sid                BIGINT NOT NULL,            -- Source LabChemSID
     lab_test_sid                INTEGER NOT NULL,           -- Test definition ID
     lab_test_name               VARCHAR(200) NOT NULL,      -- e.g., "Sodium"
     lab_test_code               VARCHAR(50),                -- e.g., "NA"
@@ -38,8 +41,21 @@ CREATE TABLE clinical.patient_labs (
     performing_lab_sid          INTEGER,                    -- Lab that performed test
     ordering_provider_sid       INTEGER,                    -- Provider who ordered
     vista_package               VARCHAR(10),                -- "CH" for Chemistry
-    last_updated                TIMESTAMP DEFAULT NOW()
-);
+    last_updated                TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (lab_id, patient_key),
+    UNIQUE (lab_chem_sid, patient_key)
+) PARTITION BY HASH (patient_key);
+
+-- Hash partitions on patient_key (modulus must match the partition count;
+-- etl/partitioned_load.py reads the bounds from the catalog)
+DO $$
+BEGIN
+    FOR r IN 0..7 LOOP
+        EXECUTE format(
+            'CREATE TABLE clinical.patient_labs_p%s PARTITION OF clinical.patient_labs '
+            'FOR VALUES WITH (MODULUS 8, REMAINDER %s)', r, r);
+    END LOOP;
+END $$;
 
 -- Indexes for performance
 CREATE INDEX idx_patient_labs_patient_date
@@ -61,6 +77,14 @@ CREATE INDEX idx_patient_labs_abnormal
 CREATE INDEX idx_patient_labs_recent
     ON clinical.patient_labs (patient_key, panel_name, collection_datetime DESC);
 
+-- BRIN indexes for date-range scans across patients (rows are loaded in
+-- collection_datetime order within each partition, so ranges stay narrow)
+CREATE INDEX idx_patient_labs_collection_brin
+    ON clinical.patient_labs USING BRIN (collection_datetime) WITH (pages_per_range = 32);
+
+CREATE INDEX idx_patient_labs_result_brin
+    ON clinical.patient_labs USING BRIN (result_datetime) WITH (pages_per_range = 32);
+
 -- Index for location type filtering
 CREATE INDEX idx_patient_labs_location_type
     ON clinical.patient_labs (collection_location_type);
@@ -0,0 +1,146 @@
+-- Create table: patient_summary
+-- Purpose: Precomputed per-patient counts for dashboard widgets and badges
+-- Source: Built by etl/patient_summary.py at the end of each domain load;
+--         task columns are maintained incrementally by a trigger on
+--         clinical.patient_tasks (the only writeable clinical table)
+-- Usage: app/db/patient_summary.py - one primary-key lookup replaces the
+--        per-view aggregate queries (get_lab_counts, get_encounter_counts, ...)
+-- Note: "recent_2y" columns are relative to the load time (T-1 data)
+
+-- Create clinical schema if it doesn't exist
+CREATE SCHEMA IF NOT EXISTS clinical;
+
+-- Drop table if exists (development only)
+DROP TABLE IF EXISTS clinical.patient_summary CASCADE;
+
+CREATE TABLE clinical.patient_summary (
+    patient_key                     VARCHAR(50) PRIMARY KEY,    -- ICN
+
+    -- Labs (get_lab_counts): {"BMP": 12, "Individual Tests": 3, ...}
+    lab_panel_counts                JSONB NOT NULL DEFAULT '{}',
+
+    -- Encounters (get_encounter_counts)
+    encounter_total                 INTEGER NOT NULL DEFAULT 0,
+    encounter_active_admissions     INTEGER NOT NULL DEFAULT 0,
+    encounter_recent                INTEGER NOT NULL DEFAULT 0,
+    encounter_extended_stays        INTEGER NOT NULL DEFAULT 0,
+    encounter_facility_count        INTEGER NOT NULL DEFAULT 0,
+
+    -- Immunizations (get_immunization_counts)
+    immunization_total              INTEGER NOT NULL DEFAULT 0,
+    immunization_annual             INTEGER NOT NULL DEFAULT 0,
+    immunization_covid              INTEGER NOT NULL DEFAULT 0,
+    immunization_incomplete         INTEGER NOT NULL DEFAULT 0,
+    immunization_with_reactions     INTEGER NOT NULL DEFAULT 0,
+    immunization_recent_2y          INTEGER NOT NULL DEFAULT 0,
+
+    -- Family history (get_family_history_counts)
+    family_history_total            INTEGER NOT NULL DEFAULT 0,
+    family_history_active           INTEGER NOT NULL DEFAULT 0,
+    family_history_first_degree     INTEGER NOT NULL DEFAULT 0,
+    family_history_first_degree_high_risk INTEGER NOT NULL DEFAULT 0,
+    family_history_distinct_conditions INTEGER NOT NULL DEFAULT 0,
+    family_history_recent_2y        INTEGER NOT NULL DEFAULT 0,
+    family_history_last_recorded    TIMESTAMP,
+
+    -- Allergies, active only (get_allergy_count)
+    allergy_total                   INTEGER NOT NULL DEFAULT 0,
+    allergy_drug                    INTEGER NOT NULL DEFAULT 0,
+    allergy_food                    INTEGER NOT NULL DEFAULT 0,
+    allergy_environmental           INTEGER NOT NULL DEFAULT 0,
+    allergy_severe                  INTEGER NOT NULL DEFAULT 0,
+
+    -- Patient record flags, active only (get_flag_count)
+    flag_total                      INTEGER NOT NULL DEFAULT 0,
+    flag_national                   INTEGER NOT NULL DEFAULT 0,
+    flag_local                      INTEGER NOT NULL DEFAULT 0,
+    flag_overdue                    INTEGER NOT NULL DEFAULT 0,
+
+    -- Tasks (get_task_summary) - trigger maintained
+    task_todo                       INTEGER NOT NULL DEFAULT 0,
+    task_in_progress                INTEGER NOT NULL DEFAULT 0,
+    task_ai_generated_active        INTEGER NOT NULL DEFAULT 0,
+    task_completed_today            INTEGER NOT NULL DEFAULT 0,
+    task_summary_date               DATE,                       -- Day task_completed_today refers to
+
+    -- Chronic conditions (get_chronic_conditions_summary)
+    has_chf                         BOOLEAN NOT NULL DEFAULT FALSE,
+    has_cad                         BOOLEAN NOT NULL DEFAULT FALSE,
+    has_afib                        BOOLEAN NOT NULL DEFAULT FALSE,
+    has_hypertension                BOOLEAN NOT NULL DEFAULT FALSE,
+    has_copd                        BOOLEAN NOT NULL DEFAULT FALSE,
+    has_asthma                      BOOLEAN NOT NULL DEFAULT FALSE,
+    has_diabetes                    BOOLEAN NOT NULL DEFAULT FALSE,
+    has_hyperlipidemia              BOOLEAN NOT NULL DEFAULT FALSE,
+    has_ckd                         BOOLEAN NOT NULL DEFAULT FALSE,
+    has_depression                  BOOLEAN NOT NULL DEFAULT FALSE,
+    has_ptsd                        BOOLEAN NOT NULL DEFAULT FALSE,
+    has_anxiety                     BOOLEAN NOT NULL DEFAULT FALSE,
+    has_cancer                      BOOLEAN NOT NULL DEFAULT FALSE,
+    has_osteoarthritis              BOOLEAN NOT NULL DEFAULT FALSE,
+    has_back_pain                   BOOLEAN NOT NULL DEFAULT FALSE,
+
+    summary_updated_at              TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- A fresh table has no built domains: clear the markers the app checks
+-- (re-run python -m etl.patient_summary to rebuild)
+DELETE FROM clinical.serving_data_version WHERE domain LIKE 'patient\_summary\_%';
+
+-- ---------------------------------------------------------------------
+-- Incremental maintenance of task columns
+-- ---------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION clinical.refresh_patient_task_summary(p_patient_key VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO clinical.patient_summary (
+        patient_key, task_todo, task_in_progress, task_ai_generated_active,
+        task_completed_today, task_summary_date, summary_updated_at
+    )
+    SELECT
+        p_patient_key,
+        COUNT(*) FILTER (WHERE status = 'TODO'),
+        COUNT(*) FILTER (WHERE status = 'IN_PROGRESS'),
+        COUNT(*) FILTER (WHERE is_ai_generated = TRUE AND status != 'COMPLETED'),
+        COUNT(*) FILTER (WHERE status = 'COMPLETED' AND completed_at::DATE = CURRENT_DATE),
+        CURRENT_DATE,
+        NOW()
+    FROM clinical.patient_tasks
+    WHERE patient_key = p_patient_key
+    ON CONFLICT (patient_key) DO UPDATE SET
+        task_todo = EXCLUDED.task_todo,
+        task_in_progress = EXCLUDED.task_in_progress,
+        task_ai_generated_active = EXCLUDED.task_ai_generated_active,
+        task_completed_today = EXCLUDED.task_completed_today,
+        task_summary_date = EXCLUDED.task_summary_date,
+        summary_updated_at = EXCLUDED.summary_updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION clinical.patient_tasks_summary_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM clinical.refresh_patient_task_summary(OLD.patient_key);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND (TG_OP = 'INSERT' OR NEW.patient_key IS DISTINCT FROM OLD.patient_key) THEN
+        PERFORM clinical.refresh_patient_task_summary(NEW.patient_key);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_patient_tasks_summary ON clinical.patient_tasks;
+CREATE TRIGGER trg_patient_tasks_summary
+    AFTER INSERT OR UPDATE OR DELETE ON clinical.patient_tasks
+    FOR EACH ROW EXECUTE FUNCTION clinical.patient_tasks_summary_trigger();
+
+-- Comments
+COMMENT ON TABLE clinical.patient_summary IS 'Precomputed per-patient widget counts (ETL-built, task columns trigger-maintained)';
+COMMENT ON COLUMN clinical.patient_summary.lab_panel_counts IS 'Lab result counts by panel name (NULL panel as "Individual Tests")';
+COMMENT ON COLUMN clinical.patient_summary.task_completed_today IS 'Tasks completed on task_summary_date; treat as 0 when that is not today';
+COMMENT ON COLUMN clinical.patient_summary.summary_updated_at IS 'Last time any column for this patient was refreshed';
+
+-- Grant permissions
+GRANT SELECT ON clinical.patient_summary TO PUBLIC;
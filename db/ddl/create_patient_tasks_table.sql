@@ -9,8 +9,10 @@
 -- Drop existing objects (for clean recreate during development)
 DROP TRIGGER IF EXISTS trg_patient_tasks_completed_at ON clinical.patient_tasks;
 DROP TRIGGER IF EXISTS trg_patient_tasks_updated_at ON clinical.patient_tasks;
+DROP TRIGGER IF EXISTS trg_patient_tasks_notify ON clinical.patient_tasks;
 DROP FUNCTION IF EXISTS set_patient_tasks_completed_at();
 DROP FUNCTION IF EXISTS update_patient_tasks_updated_at();
+DROP FUNCTION IF EXISTS notify_patient_tasks_changed();
 DROP TABLE IF EXISTS clinical.patient_tasks;
 
 -- ============================================================================
@@ -109,6 +111,41 @@ BEFORE UPDATE ON clinical.patient_tasks
 FOR EACH ROW
 EXECUTE FUNCTION set_patient_tasks_completed_at();
 
+-- ============================================================================
+-- Trigger: Live task updates (LISTEN/NOTIFY)
+-- ============================================================================
+-- Notifies channel patient_tasks on every insert/update/delete. PostgreSQL
+-- delivers the notification only when the transaction commits. The app
+-- (app/services/task_events.py) pushes it to browsers viewing the patient.
+
+CREATE OR REPLACE FUNCTION notify_patient_tasks_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    row_data clinical.patient_tasks%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+
+    PERFORM pg_notify(
+        'patient_tasks',
+        json_build_object(
+            'patient_key', row_data.patient_key,
+            'task_id', row_data.task_id,
+            'op', lower(TG_OP)
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_patient_tasks_notify
+AFTER INSERT OR UPDATE OR DELETE ON clinical.patient_tasks
+FOR EACH ROW
+EXECUTE FUNCTION notify_patient_tasks_changed();
+
 -- ============================================================================
 -- Table Comments (Documentation)
 -- ============================================================================
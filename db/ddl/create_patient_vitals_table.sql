@@ -1,17 +1,20 @@
 -- Create table: patient_vitals
 -- Purpose: Serving database table for patient vital signs
 -- Source: Gold layer Parquet files (patient_vitals/*.parquet)
+-- Partitioning: HASH (patient_key), 8 partitions; loaded per partition by
+--               etl/partitioned_load.py. Primary/unique keys include
+--               patient_key, as PostgreSQL requires for partitioned tables.
 
 -- Create clinical schema if it doesn't exist
 CREATE SCHEMA IF NOT EXISTS clinical;
 
 -- Drop table if exists (development only)
-DROP TABLE IF EXISTS clinical.patient_vitals;
+DROP TABLE IF EXISTS clinical.patient_vitals CASCADE;
 
 CREATE TABLE clinical.patient_vitals (
-    vital_id                SERIAL PRIMARY KEY,
+    vital_id                SERIAL,
     patient_key             VARCHAR(50) NOT NULL,       -- ICN
-    vital_sign_id           BIGINT NOT NULL UNIQUE,     -- Source VitalSignSID
+    vital_sign_id           BIGINT NOT NULL,            -- Source VitalSignSID
     vital_type              VARCHAR(100) NOT NULL,      -- e.g., "BLOOD PRESSURE"
     vital_abbr              VARCHAR(10) NOT NULL,       -- e.g., "BP"
     taken_datetime          TIMESTAMP NOT NULL,         -- When vital was taken
@@ -30,8 +33,21 @@ CREATE TABLE clinical.patient_vitals (
     abnormal_flag           VARCHAR(20),                -- 'CRITICAL', 'HIGH', 'LOW', 'NORMAL'
     bmi                     DECIMAL(5,2),               -- Calculated BMI (if WT and HT available)
     data_source             VARCHAR(20),                -- Track origin: CDWWork, CDWWork2, CALCULATED
-    last_updated            TIMESTAMP DEFAULT NOW()
-);
+    last_updated            TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (vital_id, patient_key),
+    UNIQUE (vital_sign_id, patient_key)
+) PARTITION BY HASH (patient_key);
+
+-- Hash partitions on patient_key (modulus must match the partition count;
+-- etl/partitioned_load.py reads the bounds from the catalog)
+DO $$
+BEGIN
+    FOR r IN 0..7 LOOP
+        EXECUTE format(
+            'CREATE TABLE clinical.patient_vitals_p%s PARTITION OF clinical.patient_vitals '
+            'FOR VALUES WITH (MODULUS 8, REMAINDER %s)', r, r);
+    END LOOP;
+END $$;
 
 -- Indexes for performance
 CREATE INDEX idx_patient_vitals_patient_date
@@ -49,6 +65,11 @@ CREATE INDEX idx_patient_vitals_abnormal
     ON clinical.patient_vitals (abnormal_flag, taken_datetime DESC)
     WHERE abnormal_flag IN ('CRITICAL', 'HIGH');
 
+-- BRIN index for date-range scans across patients (rows are loaded in
+-- taken_datetime order within each partition, so ranges stay narrow)
+CREATE INDEX idx_patient_vitals_taken_brin
+    ON clinical.patient_vitals USING BRIN (taken_datetime) WITH (pages_per_range = 32);
+
 -- Index for location type filtering
 CREATE INDEX idx_patient_vitals_location_type
     ON clinical.patient_vitals (location_type);
@@ -0,0 +1,27 @@
+-- Create table: serving_data_version
+-- Purpose: Per-domain load version for the PostgreSQL serving database
+-- Source: Bumped by each etl/load_*.py script after a successful load
+-- Usage: app/db/query_cache.py keys cached query results by these versions,
+--        so historical (T-1) data is served from memory until the next load
+
+-- Create clinical schema if it doesn't exist
+CREATE SCHEMA IF NOT EXISTS clinical;
+
+-- Drop table if exists (development only)
+DROP TABLE IF EXISTS clinical.serving_data_version;
+
+CREATE TABLE clinical.serving_data_version (
+    domain                  VARCHAR(50) PRIMARY KEY,    -- e.g., "vitals", "patient", "medications"
+    version                 BIGINT NOT NULL DEFAULT 1,  -- Incremented on every load
+    row_count               INTEGER,                    -- Rows loaded by the last run (informational)
+    loaded_at               TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Comments
+COMMENT ON TABLE clinical.serving_data_version IS 'Per-domain ETL load version used to invalidate app-side query caches';
+COMMENT ON COLUMN clinical.serving_data_version.domain IS 'Serving domain name (matches the domain passed to bump_serving_data_version)';
+COMMENT ON COLUMN clinical.serving_data_version.version IS 'Monotonic load counter; any change invalidates cached results for the domain';
+COMMENT ON COLUMN clinical.serving_data_version.loaded_at IS 'Timestamp of the most recent load for the domain';
+
+-- Grant permissions
+GRANT SELECT ON clinical.serving_data_version TO PUBLIC;
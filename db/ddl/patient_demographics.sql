@@ -10,6 +10,7 @@
 --   v3.0 (2025-12-14): Added marital_status, religion, service_connected_percent,
 --                       deceased_flag, death_date (Demographics full page - Phase 2)
 --   v4.0 (2025-12-24): Moved to clinical schema for better organization
+--   v5.0: Added trigram/prefix indexes for patient search typeahead
 -- ---------------------------------------------------------------------
 
 -- Create clinical schema if it doesn't exist
@@ -72,6 +73,17 @@ CREATE INDEX idx_patient_ssn_last4 ON clinical.patient_demographics(ssn_last4);
 CREATE INDEX idx_patient_station ON clinical.patient_demographics(primary_station);
 CREATE INDEX idx_patient_dob ON clinical.patient_demographics(dob);
 
+-- Patient search (typeahead) indexes - see app/db/patient_search.py
+-- Expressions must match the queries exactly to be used by the planner
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_patient_name_key_prefix ON clinical.patient_demographics
+    (btrim(regexp_replace(lower(name_last || ' ' || coalesce(name_first, '')), '[^a-z0-9]+', ' ', 'g')) text_pattern_ops);
+CREATE INDEX idx_patient_name_key_reversed_prefix ON clinical.patient_demographics
+    (btrim(regexp_replace(lower(coalesce(name_first, '') || ' ' || name_last), '[^a-z0-9]+', ' ', 'g')) text_pattern_ops);
+CREATE INDEX idx_patient_name_key_trgm ON clinical.patient_demographics
+    USING GIN (btrim(regexp_replace(lower(name_last || ' ' || coalesce(name_first, '')), '[^a-z0-9]+', ' ', 'g')) gin_trgm_ops);
+CREATE INDEX idx_patient_icn_prefix ON clinical.patient_demographics(icn varchar_pattern_ops);
+
 -- Add comments for documentation
 COMMENT ON TABLE clinical.patient_demographics IS 'Patient demographics from Gold layer - optimized for UI queries';
 COMMENT ON COLUMN clinical.patient_demographics.patient_key IS 'Internal unique identifier (currently same as ICN)';
@@ -5,7 +5,7 @@
 #  - Read Gold: clinical_notes_final.parquet
 #  - Transform to match PostgreSQL schema
 #  - Load into patient_clinical_notes table
-#  - Use truncate/load for now (upsert in future phases)
+#  - Stage, then rebuild and swap each hash partition (etl/partitioned_load.py)
 # ---------------------------------------------------------------------
 # To run this script from the project root folder:
 #  $ cd med-z1
@@ -17,6 +17,8 @@ import logging
 from sqlalchemy import create_engine, text
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.partitioned_load import load_partitioned_table
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +54,7 @@ def load_clinical_notes_to_postgresql():
     #   reference_datetime, entry_datetime, days_since_note, note_age_category,
     #   author_sid, author_name, cosigner_sid, cosigner_name, visit_sid,
     #   sta3n, facility_name, document_text, text_length, text_preview,
-    #   tiu_document_ien, source_system, last_updated
+    #   tiu_document_ien, source_system, search_vector (Step 4), last_updated
     df_pg = df.select([
         pl.col("patient_key"),
         pl.col("tiu_document_sid"),
@@ -98,41 +100,39 @@ def load_clinical_notes_to_postgresql():
     engine = create_engine(conn_str)
 
     # ==================================================================
-    # Step 4: Truncate existing data (for now)
+    # Step 4: Load data into PostgreSQL (partition by partition)
     # ==================================================================
-    logger.info("Step 4: Truncating existing patient_clinical_notes table...")
-
-    with engine.connect() as conn:
-        conn.execute(text("TRUNCATE TABLE clinical.patient_clinical_notes;"))
-        conn.commit()
-
-    logger.info("  - Table truncated")
-
-    # ==================================================================
-    # Step 5: Load data into PostgreSQL
-    # ==================================================================
-    logger.info("Step 5: Loading data into PostgreSQL...")
+    logger.info("Step 4: Loading data into PostgreSQL...")
 
     # Convert Polars DataFrame to Pandas for SQLAlchemy compatibility
     df_pandas = df_pg.to_pandas()
 
-    # Write to PostgreSQL
-    df_pandas.to_sql(
-        "patient_clinical_notes",
+    # Full-text search vectors are built once in staging, before the
+    # partition swap. Titles rank above class, which ranks above narrative text
+    search_vector_sql = """
+        UPDATE {table}
+        SET search_vector =
+            setweight(to_tsvector('english', coalesce(document_title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(vha_standard_title, '') || ' ' || coalesce(document_class, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(document_text, '')), 'C');
+    """
+
+    # Stage once, then rebuild and swap each patient_key hash partition,
+    # writing rows in reference_datetime order for the BRIN index
+    loaded = load_partitioned_table(
         engine,
-        schema="clinical",
-        if_exists="append",
-        index=False,
-        method="multi",  # Bulk insert for performance
-        chunksize=1000
+        df_pandas,
+        "clinical.patient_clinical_notes",
+        order_by="reference_datetime",
+        staging_sql=[search_vector_sql]
     )
 
-    logger.info(f"  - Loaded {len(df_pandas)} clinical notes into patient_clinical_notes table")
+    logger.info(f"  - Loaded {loaded} clinical notes (with search vectors) into patient_clinical_notes table")
 
     # ==================================================================
-    # Step 6: Verify data
+    # Step 5: Verify data
     # ==================================================================
-    logger.info("Step 6: Verifying data...")
+    logger.info("Step 5: Verifying data...")
 
     with engine.connect() as conn:
         result = conn.execute(text("SELECT COUNT(*) FROM clinical.patient_clinical_notes;"))
@@ -172,6 +172,9 @@ def load_clinical_notes_to_postgresql():
         for row in result:
             logger.info(f"    {row[0]}: {row[1]}")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "clinical_notes", row_count=count)
+
     logger.info("=" * 70)
     logger.info("PostgreSQL load complete")
     logger.info("=" * 70)
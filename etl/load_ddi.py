@@ -19,6 +19,7 @@ from sqlalchemy import create_engine, text
 
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
 
 logging.basicConfig(
     level=logging.INFO,
@@ -126,6 +127,9 @@ def load_ddi_to_postgresql():
             for row in result:
                 logger.info(f"    {row[0]} + {row[1]}")
 
+        # Invalidate app-side query caches for this domain
+        bump_serving_data_version(engine, "ddi", row_count=count)
+
         logger.info("=" * 70)
         logger.info(f"✓ PostgreSQL load complete: {count} DDI rows loaded")
         logger.info("=" * 70)
@@ -17,6 +17,8 @@ import logging
 from sqlalchemy import create_engine, text
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.patient_summary import refresh_patient_summary
 
 logger = logging.getLogger(__name__)
 
@@ -183,6 +185,10 @@ def load_encounters_to_postgresql():
         for row in result:
             logger.info(f"    {row}")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "encounters", row_count=count)
+    refresh_patient_summary(engine, "encounters")
+
     logger.info("=" * 70)
     logger.info(f"PostgreSQL load complete: {count} encounters loaded")
     logger.info(f"  - Active admissions: {active_count}")
@@ -19,6 +19,8 @@ from sqlalchemy import create_engine, text
 
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.patient_summary import refresh_patient_summary
 
 # Configure logging
 logging.basicConfig(
@@ -184,6 +186,10 @@ def load_family_history_to_postgresql():
             for row in result:
                 logger.info(f"    {row[0]}: {row[1]} - {row[2]} ({row[3]}, {row[4]})")
 
+        # Invalidate app-side query caches for this domain
+        bump_serving_data_version(engine, "family_history", row_count=count)
+        refresh_patient_summary(engine, "family_history")
+
         logger.info("=" * 70)
         logger.info(f"PostgreSQL load complete: {count} family-history records loaded")
         logger.info("=" * 70)
@@ -17,6 +17,8 @@ import logging
 from sqlalchemy import create_engine, text
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.patient_summary import refresh_patient_summary
 
 # Configure logging
 logging.basicConfig(
@@ -199,6 +201,10 @@ def load_immunizations_to_postgresql():
             for row in result:
                 logger.info(f"    {row[0]}: {row[1][:40]}... on {row[2]} ({row[3]}, {row[4]})")
 
+        # Invalidate app-side query caches for this domain
+        bump_serving_data_version(engine, "immunizations", row_count=count)
+        refresh_patient_summary(engine, "immunizations")
+
         logger.info("=" * 70)
         logger.info(f"✓ PostgreSQL load complete: {count} immunizations loaded")
         logger.info("=" * 70)
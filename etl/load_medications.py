@@ -17,6 +17,7 @@ import logging
 from sqlalchemy import create_engine, text
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -195,6 +196,9 @@ def load_medications_outpatient_to_postgresql():
         for row in result:
             logger.info(f"    {row}")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "medications_outpatient", row_count=count)
+
     logger.info("=" * 70)
     logger.info(f"PostgreSQL load complete: {count} outpatient prescriptions loaded")
     logger.info("=" * 70)
@@ -365,6 +369,9 @@ def load_medications_inpatient_to_postgresql():
         for row in result:
             logger.info(f"    {row}")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "medications_inpatient", row_count=count)
+
     logger.info("=" * 70)
     logger.info(f"PostgreSQL load complete: {count} inpatient administrations loaded")
     logger.info("=" * 70)
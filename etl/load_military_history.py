@@ -14,6 +14,7 @@ from sqlalchemy import create_engine, text
 import logging
 from config import DATABASE_URL  # PostgreSQL connection string
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +73,9 @@ def load_military_history_to_postgres():
         logger.info(f"Summary: {result[1]} service connected, {result[2]} Agent Orange, "
                    f"{result[3]} POW, {result[4]} Gulf War, {result[5]} Camp Lejeune")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "military_history", row_count=result[0])
+
 
 if __name__ == "__main__":
     logging.basicConfig(
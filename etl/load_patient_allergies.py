@@ -17,6 +17,8 @@ from sqlalchemy import create_engine, text
 import logging
 from config import DATABASE_URL  # PostgreSQL connection string
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.patient_summary import refresh_patient_summary
 
 logger = logging.getLogger(__name__)
 
@@ -167,6 +169,10 @@ def load_patient_allergies_to_postgres():
     else:
         logger.warning("No reactions to load to patient_allergy_reactions table")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "allergies", row_count=len(df))
+    refresh_patient_summary(engine, "allergies")
+
 
 if __name__ == "__main__":
     logging.basicConfig(
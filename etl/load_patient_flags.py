@@ -17,6 +17,8 @@ from sqlalchemy import create_engine, text
 import logging
 from config import DATABASE_URL  # PostgreSQL connection string
 from lake.minio_client import MinIOClient, build_gold_path, build_silver_path
+from etl.serving_version import bump_serving_data_version
+from etl.patient_summary import refresh_patient_summary
 
 logger = logging.getLogger(__name__)
 
@@ -328,6 +330,10 @@ def load_patient_flags_to_postgres():
         for row in result:
             logger.info(f"    - {row[0]}: {row[1]}")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "flags", row_count=flags_count)
+    refresh_patient_summary(engine, "flags")
+
     logger.info("=" * 70)
     logger.info("Patient Flags Load Complete")
     logger.info("=" * 70)
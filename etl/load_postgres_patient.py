@@ -15,9 +15,24 @@ from sqlalchemy import create_engine, text
 import logging
 from config import DATABASE_URL  # PostgreSQL connection string
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
 
 logger = logging.getLogger(__name__)
 
+# to_sql(if_exists="replace") recreates the table without the DDL indexes,
+# so the search indexes used by app/db/patient_search.py are rebuilt here
+PATIENT_SEARCH_INDEX_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS idx_patient_name_key_prefix ON clinical.patient_demographics
+       (btrim(regexp_replace(lower(name_last || ' ' || coalesce(name_first, '')), '[^a-z0-9]+', ' ', 'g')) text_pattern_ops)""",
+    """CREATE INDEX IF NOT EXISTS idx_patient_name_key_reversed_prefix ON clinical.patient_demographics
+       (btrim(regexp_replace(lower(coalesce(name_first, '') || ' ' || name_last), '[^a-z0-9]+', ' ', 'g')) text_pattern_ops)""",
+    """CREATE INDEX IF NOT EXISTS idx_patient_name_key_trgm ON clinical.patient_demographics
+       USING GIN (btrim(regexp_replace(lower(name_last || ' ' || coalesce(name_first, '')), '[^a-z0-9]+', ' ', 'g')) gin_trgm_ops)""",
+    "CREATE INDEX IF NOT EXISTS idx_patient_icn_prefix ON clinical.patient_demographics (icn varchar_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_patient_ssn_last4 ON clinical.patient_demographics (ssn_last4)",
+]
+
 
 def load_patient_demographics_to_postgres():
     """Load Gold patient demographics from MinIO to PostgreSQL."""
@@ -54,11 +69,20 @@ def load_patient_demographics_to_postgres():
 
     logger.info(f"Loaded {len(df)} patients to PostgreSQL")
 
+    # Rebuild patient search indexes
+    with engine.begin() as conn:
+        for statement in PATIENT_SEARCH_INDEX_SQL:
+            conn.execute(text(statement))
+    logger.info("Rebuilt patient search indexes")
+
     # Verify
     with engine.connect() as conn:
         result = conn.execute(text("SELECT COUNT(*) FROM clinical.patient_demographics")).fetchone()
         logger.info(f"Verification: {result[0]} rows in patient_demographics table")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "patient", row_count=result[0])
+
 
 if __name__ == "__main__":
     logging.basicConfig(
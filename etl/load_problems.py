@@ -17,6 +17,8 @@ import logging
 from sqlalchemy import create_engine, text
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.patient_summary import refresh_patient_summary
 
 # Configure logging
 logging.basicConfig(
@@ -322,6 +324,10 @@ def load_problems_to_postgresql():
             for row in result:
                 logger.info(f"    {row[0]}: {row[1]} - {row[2][:50]}... ({row[3]}, {row[4]}, {row[5]})")
 
+        # Invalidate app-side query caches for this domain
+        bump_serving_data_version(engine, "problems", row_count=count)
+        refresh_patient_summary(engine, "problems")
+
         logger.info("=" * 70)
         logger.info(f"✓ PostgreSQL load complete: {count} problem records loaded")
         logger.info("=" * 70)
@@ -5,7 +5,7 @@
 #  - Read Gold: vitals_final.parquet
 #  - Transform to match PostgreSQL schema
 #  - Load into patient_vitals table
-#  - Use upsert (ON CONFLICT) to handle re-runs
+#  - Stage, then rebuild and swap each hash partition (etl/partitioned_load.py)
 # ---------------------------------------------------------------------
 # To run this script from the project root folder:
 #  $ cd med-z1
@@ -17,6 +17,8 @@ import logging
 from sqlalchemy import create_engine, text
 from config import POSTGRES_CONFIG
 from lake.minio_client import MinIOClient, build_gold_path
+from etl.serving_version import bump_serving_data_version
+from etl.partitioned_load import load_partitioned_table
 
 logger = logging.getLogger(__name__)
 
@@ -118,41 +120,28 @@ def load_vitals_to_postgresql():
     engine = create_engine(conn_str)
 
     # ==================================================================
-    # Step 4: Truncate existing data (for now)
+    # Step 4: Load data into PostgreSQL (partition by partition)
     # ==================================================================
-    logger.info("Step 4: Truncating existing patient_vitals table...")
-
-    with engine.connect() as conn:
-        conn.execute(text("TRUNCATE TABLE clinical.patient_vitals;"))
-        conn.commit()
-
-    logger.info("  - Table truncated")
-
-    # ==================================================================
-    # Step 5: Load data into PostgreSQL
-    # ==================================================================
-    logger.info("Step 5: Loading data into PostgreSQL...")
+    logger.info("Step 4: Loading data into PostgreSQL...")
 
     # Convert Polars DataFrame to Pandas for SQLAlchemy compatibility
     df_pandas = df_pg.to_pandas()
 
-    # Write to PostgreSQL
-    df_pandas.to_sql(
-        "patient_vitals",
+    # Stage once, then rebuild and swap each patient_key hash partition,
+    # writing rows in taken_datetime order for the BRIN index
+    loaded = load_partitioned_table(
         engine,
-        schema="clinical",
-        if_exists="append",
-        index=False,
-        method="multi",  # Bulk insert for performance
-        chunksize=1000
+        df_pandas,
+        "clinical.patient_vitals",
+        order_by="taken_datetime"
     )
 
-    logger.info(f"  - Loaded {len(df_pandas)} vitals into patient_vitals table")
+    logger.info(f"  - Loaded {loaded} vitals into patient_vitals table")
 
     # ==================================================================
-    # Step 6: Verify data
+    # Step 5: Verify data
     # ==================================================================
-    logger.info("Step 6: Verifying data...")
+    logger.info("Step 5: Verifying data...")
 
     with engine.connect() as conn:
         result = conn.execute(text("SELECT COUNT(*) FROM clinical.patient_vitals;"))
@@ -169,6 +158,9 @@ def load_vitals_to_postgresql():
         for row in result:
             logger.info(f"    {row}")
 
+    # Invalidate app-side query caches for this domain
+    bump_serving_data_version(engine, "vitals", row_count=count)
+
     logger.info("=" * 70)
     logger.info(f"PostgreSQL load complete: {count} vitals loaded")
     logger.info("=" * 70)
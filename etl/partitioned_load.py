@@ -0,0 +1,225 @@
+# ---------------------------------------------------------------------
+# partitioned_load.py
+# ---------------------------------------------------------------------
+# Partition-aware load helper for the large clinical fact tables
+# (patient_vitals, patient_labs, patient_clinical_notes)
+#  - The tables are hash-partitioned on patient_key (see DDL), so every
+#    per-patient query touches one partition and each partition's
+#    B-tree indexes are 1/N of the table
+#  - Rows are bulk-loaded once into an UNLOGGED staging table, then each
+#    partition is rebuilt as a standalone table (rows ordered by the
+#    datetime column so the BRIN indexes stay tight) and swapped in with
+#    DETACH / ATTACH. Partitions are loaded and swapped independently
+#  - The replacement gets the parent's indexes and a CHECK matching its
+#    hash bound before the swap, so ATTACH adopts those indexes and
+#    skips its validation scan: the parent's ACCESS EXCLUSIVE lock is
+#    held only for catalog updates, and readers wait only for that
+#  - Tables still created with the older non-partitioned DDL are
+#    replaced from staging in a single transaction instead
+# ---------------------------------------------------------------------
+
+import logging
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# pg_get_expr(relpartbound) for hash partitions:
+#   FOR VALUES WITH (modulus 8, remainder 3)
+_HASH_BOUND = re.compile(r"modulus\s+(\d+),\s*remainder\s+(\d+)", re.IGNORECASE)
+
+# pg_get_indexdef() of a partitioned index:
+#   CREATE [UNIQUE] INDEX name ON ONLY schema.table USING btree (...) [WHERE ...]
+_INDEX_DEF = re.compile(r"^CREATE (UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ (USING .*)$", re.IGNORECASE | re.DOTALL)
+
+
+def get_hash_partitions(conn: Connection, table: str) -> List[Tuple[str, int, int]]:
+    """
+    List the hash partitions of a table.
+
+    Args:
+        conn: Open SQLAlchemy connection
+        table: Schema-qualified parent table (e.g., "clinical.patient_vitals")
+
+    Returns:
+        [(schema.partition_name, modulus, remainder), ...] ordered by
+        remainder; empty if the table is not hash-partitioned
+    """
+    rows = conn.execute(text("""
+        SELECT n.nspname || '.' || c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": table}).fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = _HASH_BOUND.search(bound or "")
+        if match:
+            partitions.append((name, int(match.group(1)), int(match.group(2))))
+    return sorted(partitions, key=lambda p: p[2])
+
+
+def partition_index_sql(conn: Connection, table: str, partition: str) -> List[str]:
+    """
+    Build CREATE INDEX statements giving a standalone table the parent's indexes.
+
+    ATTACH PARTITION adopts an existing equivalent index instead of
+    building one while it holds the parent's lock.
+
+    Args:
+        conn: Open SQLAlchemy connection
+        table: Schema-qualified partitioned parent table
+        partition: Schema-qualified table that will be attached
+
+    Returns:
+        One statement per parent index (names are generated by PostgreSQL)
+    """
+    rows = conn.execute(text("""
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = CAST(:table AS regclass)
+        ORDER BY i.indexrelid
+    """), {"table": table}).fetchall()
+
+    statements = []
+    for (indexdef,) in rows:
+        match = _INDEX_DEF.match(indexdef or "")
+        if not match:
+            logger.warning(f"  - Skipping unrecognized index definition on {table}: {indexdef}")
+            continue
+        statements.append(f"CREATE {match.group(1) or ''}INDEX ON {partition} {match.group(2)}")
+    return statements
+
+
+def _swap_partition(
+    engine: Engine,
+    table: str,
+    staging: str,
+    partition: str,
+    modulus: int,
+    remainder: int,
+    order_by: Optional[str]
+) -> int:
+    """Rebuild one hash partition from staging and swap it in. Returns row count."""
+    schema, partition_name = partition.split(".", 1)
+    new_partition = f"{partition}_new"
+    order_clause = f"ORDER BY {order_by}" if order_by else ""
+
+    bound_check = f"{partition_name}_bound_check"
+
+    # Build the replacement outside the swap transaction (no parent locks):
+    # rows, the parent's indexes, and a CHECK identical to the partition
+    # constraint (parent oid as a literal, as PostgreSQL writes it)
+    with engine.begin() as conn:
+        parent_oid = conn.execute(text("SELECT CAST(CAST(:table AS regclass) AS oid)"), {"table": table}).scalar()
+        conn.execute(text(f"DROP TABLE IF EXISTS {new_partition}"))
+        conn.execute(text(
+            f"CREATE TABLE {new_partition} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        rows = conn.execute(text(f"""
+            INSERT INTO {new_partition}
+            SELECT * FROM {staging}
+            WHERE satisfies_hash_partition(CAST('{table}' AS regclass)::oid, :modulus, :remainder, patient_key)
+            {order_clause}
+        """), {"modulus": modulus, "remainder": remainder}).rowcount
+        for statement in partition_index_sql(conn, table, new_partition):
+            conn.execute(text(statement))
+        conn.execute(text(
+            f"ALTER TABLE {new_partition} ADD CONSTRAINT {bound_check} "
+            f"CHECK (satisfies_hash_partition('{int(parent_oid)}'::oid, {modulus}, {remainder}, patient_key))"
+        ))
+
+    # Swap: catalog changes only (ATTACH adopts the indexes and trusts the CHECK)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+        conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {new_partition} "
+            f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+        ))
+        conn.execute(text(f"ALTER TABLE {new_partition} DROP CONSTRAINT {bound_check}"))
+        conn.execute(text(f"DROP TABLE {partition}"))
+        conn.execute(text(f"ALTER TABLE {new_partition} RENAME TO {partition_name}"))
+
+    return rows
+
+
+def load_partitioned_table(
+    engine: Engine,
+    df: pd.DataFrame,
+    table: str,
+    order_by: Optional[str] = None,
+    staging_sql: Sequence[str] = (),
+    remainders: Optional[Iterable[int]] = None,
+    chunksize: int = 1000
+) -> int:
+    """
+    Replace the contents of a (hash-partitioned) clinical table.
+
+    Args:
+        engine: SQLAlchemy engine connected to the serving database
+        df: Rows to load (columns named as in the table)
+        table: Schema-qualified table (e.g., "clinical.patient_labs")
+        order_by: Physical row order within each partition, normally the
+                  BRIN-indexed datetime column
+        staging_sql: Statements run against the staging table before the
+                     swap; "{table}" is replaced with its name (e.g., to
+                     compute derived columns once, before partitioning)
+        remainders: Only rebuild these partitions (default: all)
+        chunksize: Bulk insert batch size for the staging load
+
+    Returns:
+        Number of rows loaded into the swapped partitions (or the table)
+    """
+    schema, name = table.split(".", 1)
+    staging = f"{schema}.{name}_staging"
+
+    # Step 1: bulk load into an UNLOGGED staging copy of the table
+    with engine.begin() as conn:
+        partitions = get_hash_partitions(conn, table)
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+        conn.execute(text(f"CREATE UNLOGGED TABLE {staging} (LIKE {table} INCLUDING DEFAULTS)"))
+
+    df.to_sql(
+        f"{name}_staging",
+        engine,
+        schema=schema,
+        if_exists="append",
+        index=False,
+        method="multi",  # Bulk insert for performance
+        chunksize=chunksize
+    )
+    logger.info(f"  - Staged {len(df)} rows in {staging}")
+
+    if staging_sql:
+        with engine.begin() as conn:
+            for statement in staging_sql:
+                conn.execute(text(statement.format(table=staging)))
+
+    # Step 2: swap data in, one partition at a time
+    try:
+        if not partitions:
+            logger.info(f"  - {table} is not partitioned; replacing contents in one transaction")
+            order_clause = f"ORDER BY {order_by}" if order_by else ""
+            with engine.begin() as conn:
+                conn.execute(text(f"TRUNCATE TABLE {table}"))
+                return conn.execute(text(f"INSERT INTO {table} SELECT * FROM {staging} {order_clause}")).rowcount
+
+        wanted = set(remainders) if remainders is not None else None
+        total = 0
+        for partition, modulus, remainder in partitions:
+            if wanted is not None and remainder not in wanted:
+                continue
+            rows = _swap_partition(engine, table, staging, partition, modulus, remainder, order_by)
+            logger.info(f"  - Swapped partition {partition} ({rows} rows)")
+            total += rows
+        return total
+
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
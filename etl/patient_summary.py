@@ -0,0 +1,285 @@
+# ---------------------------------------------------------------------
+# patient_summary.py
+# ---------------------------------------------------------------------
+# Per-patient summary (widget counts) builder for the PostgreSQL load step
+#  - Each etl/load_*.py script that feeds a dashboard count calls
+#    refresh_patient_summary() for its domain after the table reload;
+#    only that domain's columns of clinical.patient_summary are rebuilt
+#  - A successful refresh bumps the "patient_summary_<domain>" serving
+#    version; the app only trusts a domain's columns once that exists
+#  - Task columns are also kept current by a trigger on
+#    clinical.patient_tasks (see DDL); the "tasks" domain here is only
+#    needed for the initial build
+#  - Run standalone to rebuild every domain:
+#      python -m etl.patient_summary
+# ---------------------------------------------------------------------
+# Table DDL: db/ddl/create_patient_summary_table.sql
+# ---------------------------------------------------------------------
+
+import logging
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from config import POSTGRES_CONFIG
+from etl.serving_version import bump_serving_data_version
+
+logger = logging.getLogger(__name__)
+
+# Domain -> (summary columns with reset value, aggregate SELECT producing
+# patient_key followed by the same columns in order)
+SUMMARY_DOMAINS: Dict[str, Tuple[List[Tuple[str, str]], str]] = {
+    "labs": (
+        [("lab_panel_counts", "'{}'::jsonb")],
+        """
+        SELECT patient_key, jsonb_object_agg(panel_category, panel_count)
+        FROM (
+            SELECT
+                patient_key,
+                COALESCE(panel_name, 'Individual Tests') AS panel_category,
+                COUNT(*) AS panel_count
+            FROM clinical.patient_labs
+            GROUP BY patient_key, panel_category
+        ) panels
+        GROUP BY patient_key
+        """,
+    ),
+    "encounters": (
+        [
+            ("encounter_total", "0"),
+            ("encounter_active_admissions", "0"),
+            ("encounter_recent", "0"),
+            ("encounter_extended_stays", "0"),
+            ("encounter_facility_count", "0"),
+        ],
+        """
+        SELECT
+            patient_key,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE is_active = TRUE),
+            COUNT(*) FILTER (WHERE is_recent = TRUE),
+            COUNT(*) FILTER (WHERE is_extended_stay = TRUE),
+            COUNT(DISTINCT sta3n)
+        FROM clinical.patient_encounters
+        GROUP BY patient_key
+        """,
+    ),
+    "immunizations": (
+        [
+            ("immunization_total", "0"),
+            ("immunization_annual", "0"),
+            ("immunization_covid", "0"),
+            ("immunization_incomplete", "0"),
+            ("immunization_with_reactions", "0"),
+            ("immunization_recent_2y", "0"),
+        ],
+        """
+        SELECT
+            patient_key,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE is_annual_vaccine = TRUE),
+            COUNT(*) FILTER (WHERE is_covid_vaccine = TRUE),
+            COUNT(*) FILTER (WHERE is_series_complete = FALSE),
+            COUNT(*) FILTER (WHERE has_adverse_reaction = TRUE),
+            COUNT(*) FILTER (WHERE administered_datetime >= NOW() - INTERVAL '2 years')
+        FROM clinical.patient_immunizations
+        GROUP BY patient_key
+        """,
+    ),
+    "family_history": (
+        [
+            ("family_history_total", "0"),
+            ("family_history_active", "0"),
+            ("family_history_first_degree", "0"),
+            ("family_history_first_degree_high_risk", "0"),
+            ("family_history_distinct_conditions", "0"),
+            ("family_history_recent_2y", "0"),
+            ("family_history_last_recorded", "NULL"),
+        ],
+        """
+        SELECT
+            patient_icn,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE is_active = TRUE),
+            COUNT(*) FILTER (WHERE first_degree_relative_flag = TRUE),
+            COUNT(*) FILTER (WHERE first_degree_relative_flag = TRUE
+                               AND COALESCE(hereditary_risk_flag, FALSE) = TRUE),
+            COUNT(DISTINCT condition_name),
+            COUNT(*) FILTER (WHERE recorded_datetime >= NOW() - INTERVAL '2 years'),
+            MAX(recorded_datetime)
+        FROM clinical.patient_family_history
+        WHERE patient_icn IS NOT NULL
+        GROUP BY patient_icn
+        """,
+    ),
+    "allergies": (
+        [
+            ("allergy_total", "0"),
+            ("allergy_drug", "0"),
+            ("allergy_food", "0"),
+            ("allergy_environmental", "0"),
+            ("allergy_severe", "0"),
+        ],
+        """
+        SELECT
+            patient_key,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE allergen_type = 'DRUG'),
+            COUNT(*) FILTER (WHERE allergen_type = 'FOOD'),
+            COUNT(*) FILTER (WHERE allergen_type = 'ENVIRONMENTAL'),
+            COUNT(*) FILTER (WHERE severity = 'SEVERE')
+        FROM clinical.patient_allergies
+        WHERE is_active = true
+        GROUP BY patient_key
+        """,
+    ),
+    "flags": (
+        [
+            ("flag_total", "0"),
+            ("flag_national", "0"),
+            ("flag_local", "0"),
+            ("flag_overdue", "0"),
+        ],
+        """
+        SELECT
+            patient_key,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE flag_category = 'I'),
+            COUNT(*) FILTER (WHERE flag_category = 'II'),
+            COUNT(*) FILTER (WHERE review_status = 'OVERDUE')
+        FROM clinical.patient_flags
+        WHERE is_active = true
+        GROUP BY patient_key
+        """,
+    ),
+    "tasks": (
+        [
+            ("task_todo", "0"),
+            ("task_in_progress", "0"),
+            ("task_ai_generated_active", "0"),
+            ("task_completed_today", "0"),
+            ("task_summary_date", "CURRENT_DATE"),
+        ],
+        """
+        SELECT
+            patient_key,
+            COUNT(*) FILTER (WHERE status = 'TODO'),
+            COUNT(*) FILTER (WHERE status = 'IN_PROGRESS'),
+            COUNT(*) FILTER (WHERE is_ai_generated = TRUE AND status != 'COMPLETED'),
+            COUNT(*) FILTER (WHERE status = 'COMPLETED' AND completed_at::DATE = CURRENT_DATE),
+            CURRENT_DATE
+        FROM clinical.patient_tasks
+        GROUP BY patient_key
+        """,
+    ),
+    "problems": (
+        [(f"has_{condition}", "FALSE") for condition in (
+            "chf", "cad", "afib", "hypertension", "copd", "asthma", "diabetes",
+            "hyperlipidemia", "ckd", "depression", "ptsd", "anxiety", "cancer",
+            "osteoarthritis", "back_pain",
+        )],
+        """
+        SELECT
+            patient_key,
+            COALESCE(BOOL_OR(has_chf), FALSE),
+            COALESCE(BOOL_OR(has_cad), FALSE),
+            COALESCE(BOOL_OR(has_afib), FALSE),
+            COALESCE(BOOL_OR(has_hypertension), FALSE),
+            COALESCE(BOOL_OR(has_copd), FALSE),
+            COALESCE(BOOL_OR(has_asthma), FALSE),
+            COALESCE(BOOL_OR(has_diabetes), FALSE),
+            COALESCE(BOOL_OR(has_hyperlipidemia), FALSE),
+            COALESCE(BOOL_OR(has_ckd), FALSE),
+            COALESCE(BOOL_OR(has_depression), FALSE),
+            COALESCE(BOOL_OR(has_ptsd), FALSE),
+            COALESCE(BOOL_OR(has_anxiety), FALSE),
+            COALESCE(BOOL_OR(has_cancer), FALSE),
+            COALESCE(BOOL_OR(has_osteoarthritis), FALSE),
+            COALESCE(BOOL_OR(has_back_pain), FALSE)
+        FROM clinical.patient_problems
+        GROUP BY patient_key
+        """,
+    ),
+}
+
+
+def summary_version_domain(domain: str) -> str:
+    """Serving-data version domain marking a summary domain as built."""
+    return f"patient_summary_{domain}"
+
+
+def build_refresh_statements(domain: str) -> List[str]:
+    """
+    Build the SQL that rebuilds one domain's columns of patient_summary.
+
+    The domain's columns are first reset for every patient (so patients
+    who no longer have rows drop to zero), then upserted from the
+    aggregate. Other domains' columns are left untouched.
+    """
+    columns, select_sql = SUMMARY_DOMAINS[domain]
+    names = [name for name, _ in columns]
+
+    reset_sql = (
+        "UPDATE clinical.patient_summary SET "
+        + ", ".join(f"{name} = {default}" for name, default in columns)
+        + ", summary_updated_at = NOW()"
+    )
+    upsert_sql = (
+        f"INSERT INTO clinical.patient_summary (patient_key, {', '.join(names)}) "
+        f"{select_sql} "
+        "ON CONFLICT (patient_key) DO UPDATE SET "
+        + ", ".join(f"{name} = EXCLUDED.{name}" for name in names)
+        + ", summary_updated_at = NOW()"
+    )
+    return [reset_sql, upsert_sql]
+
+
+def refresh_patient_summary(engine: Engine, domain: str) -> Optional[int]:
+    """
+    Rebuild one domain's columns of clinical.patient_summary after a load.
+
+    Args:
+        engine: SQLAlchemy engine connected to the serving database
+        domain: Summary domain (key of SUMMARY_DOMAINS, e.g. "labs")
+
+    Returns:
+        Number of patients with data for the domain, or None on failure
+    """
+    if domain not in SUMMARY_DOMAINS:
+        logger.warning(f"  - Unknown patient summary domain '{domain}'")
+        return None
+
+    reset_sql, upsert_sql = build_refresh_statements(domain)
+
+    try:
+        # One transaction: readers never see the reset without the upsert
+        with engine.begin() as conn:
+            conn.execute(text(reset_sql))
+            patients = conn.execute(text(upsert_sql)).rowcount
+
+        logger.info(f"  - Patient summary '{domain}' columns refreshed for {patients} patients")
+        bump_serving_data_version(engine, summary_version_domain(domain), row_count=patients)
+        return patients
+
+    except Exception as e:
+        # App falls back to live aggregates when summary rows are missing
+        logger.warning(f"  - Could not refresh patient summary for '{domain}': {e}")
+        return None
+
+
+def refresh_all_patient_summaries(engine: Engine) -> None:
+    """Rebuild every domain of clinical.patient_summary."""
+    for domain in SUMMARY_DOMAINS:
+        refresh_patient_summary(engine, domain)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    conn_str = (
+        f"postgresql://{POSTGRES_CONFIG['user']}:{POSTGRES_CONFIG['password']}"
+        f"@{POSTGRES_CONFIG['host']}:{POSTGRES_CONFIG['port']}/{POSTGRES_CONFIG['database']}"
+    )
+    refresh_all_patient_summaries(create_engine(conn_str))
@@ -0,0 +1,58 @@
+# ---------------------------------------------------------------------
+# serving_version.py
+# ---------------------------------------------------------------------
+# Serving-data version helper for the PostgreSQL load step
+#  - Each etl/load_*.py script calls bump_serving_data_version() once
+#    its table has been reloaded
+#  - The app query cache (app/db/query_cache.py) keys cached results
+#    by these versions, so a bump invalidates that domain's cache
+# ---------------------------------------------------------------------
+# Table DDL: db/ddl/create_serving_data_version_table.sql
+# ---------------------------------------------------------------------
+
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def bump_serving_data_version(
+    engine: Engine,
+    domain: str,
+    row_count: Optional[int] = None
+) -> Optional[int]:
+    """
+    Increment the serving-data version for a domain after a load.
+
+    Args:
+        engine: SQLAlchemy engine connected to the serving database
+        domain: Serving domain name (e.g., "vitals", "patient")
+        row_count: Optional number of rows loaded (informational)
+
+    Returns:
+        The new version number, or None if the bump failed
+    """
+    query = text("""
+        INSERT INTO clinical.serving_data_version (domain, version, row_count, loaded_at)
+        VALUES (:domain, 1, :row_count, NOW())
+        ON CONFLICT (domain) DO UPDATE
+        SET version = clinical.serving_data_version.version + 1,
+            row_count = EXCLUDED.row_count,
+            loaded_at = EXCLUDED.loaded_at
+        RETURNING version
+    """)
+
+    try:
+        with engine.begin() as conn:
+            version = conn.execute(query, {"domain": domain, "row_count": row_count}).scalar()
+
+        logger.info(f"  - Serving data version for '{domain}' bumped to {version}")
+        return version
+
+    except Exception as e:
+        # A missing version table must not fail an otherwise good load;
+        # app caches fall back to bypass mode when versions are unavailable
+        logger.warning(f"  - Could not bump serving data version for '{domain}': {e}")
+        return None
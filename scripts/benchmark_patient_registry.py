@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark VistA site selection against a large patient registry
+
+Compares, for a synthesized registry of --patients patients:
+  - legacy: linear scan of the registry's patient list for the ICN,
+    then T-notation parsing and a sort of its treating facilities
+  - current: app.services.patient_registry.PatientRegistry lookup
+    (ICN index with facilities ranked at load time)
+
+Lookups target patients spread across the registry. Index build time
+(paid once per load or reload) is reported separately.
+
+Usage:
+    python scripts/benchmark_patient_registry.py [--patients 1000000] [--lookups 20]
+"""
+
+import argparse
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.patient_registry import PatientRegistry  # noqa: E402
+
+SITES = ("200", "500", "630", "402", "405")
+
+
+def make_registry(count):
+    """Synthesize registry JSON with 1-5 treating facilities per patient."""
+    patients = []
+    for i in range(count):
+        patients.append({
+            "icn": f"ICN{i:07d}",
+            "treating_facilities": [
+                {"sta3n": site, "dfn": f"{site}{i}", "last_seen": f"T-{(i * 7 + j * 31) % 400}"}
+                for j, site in enumerate(SITES[:1 + i % len(SITES)])
+            ],
+        })
+    return {"patients": patients}
+
+
+def legacy_parse(t_notation):
+    if not t_notation or not t_notation.startswith("T-"):
+        try:
+            return datetime.fromisoformat(t_notation)
+        except (TypeError, ValueError):
+            return datetime(1900, 1, 1)
+    try:
+        return datetime.now() - timedelta(days=int(t_notation.split("-")[1]))
+    except (IndexError, ValueError):
+        return datetime(1900, 1, 1)
+
+
+def legacy_sites(registry, icn, limit=3):
+    facilities = []
+    for patient in registry.get("patients", []):
+        if patient.get("icn") == icn:
+            facilities = patient.get("treating_facilities", [])
+            break
+    ranked = sorted(facilities, key=lambda x: legacy_parse(x.get("last_seen", "T-999")), reverse=True)
+    return [fac["sta3n"] for fac in ranked[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=20)
+    args = parser.parse_args()
+
+    data = make_registry(args.patients)
+    started = time.perf_counter()
+    registry = PatientRegistry(registry=data, reload_check_seconds=0)
+    build_s = time.perf_counter() - started
+
+    step = max(1, args.patients // args.lookups)
+    icns = [f"ICN{i:07d}" for i in range(0, args.patients, step)][:args.lookups]
+    for icn in icns:
+        assert legacy_sites(data, icn) == list(registry.get_ranked_sites(icn)[:3]), icn
+
+    def legacy():
+        for icn in icns:
+            legacy_sites(data, icn)
+
+    def current():
+        for icn in icns:
+            registry.get_ranked_sites(icn)[:3]
+
+    legacy_s = min(timeit.repeat(legacy, number=1, repeat=3)) / len(icns)
+    current_s = min(timeit.repeat(current, number=100, repeat=3)) / (100 * len(icns))
+    print(f"registry {args.patients:>8} patients   index build {build_s:6.2f} s")
+    print(f"  legacy   {legacy_s * 1e6:12.1f} us/lookup")
+    print(f"  current  {current_s * 1e6:12.1f} us/lookup   speedup {legacy_s / current_s:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
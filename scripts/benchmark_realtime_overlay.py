@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark VistA response parsing + PostgreSQL overlay merge for vitals
+
+Compares, for a 10,000-line GMV LATEST VM response merged with 10,000
+PostgreSQL rows (a quarter of them duplicates):
+  - legacy: per-line split and length check, FileMan datetime parsed and
+    reformatted for every line, canonical key via datetime.fromisoformat,
+    then a full sort of the merged list
+  - current: app.services.realtime_overlay.merge_vitals_data (one-pass
+    caret split, memoized FileMan conversions and vital measures,
+    string-slice canonical key, linear merge of the pre-sorted streams),
+    with the conversion caches cleared before every run (cold) and
+    kept (warm, a repeat refresh)
+
+No broker or database is needed; responses and rows are synthesized.
+
+Usage:
+    python scripts/benchmark_realtime_overlay.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services import realtime_overlay  # noqa: E402
+from app.services.realtime_overlay import (  # noqa: E402
+    _compute_abnormal_flag,
+    _extract_diastolic,
+    _extract_numeric_value,
+    _extract_systolic,
+    _get_vital_abbr,
+    merge_vitals_data,
+    parse_fileman_datetime,
+)
+
+VITAL_READINGS = (
+    ("BLOOD PRESSURE", "128/82", "mmHg"),
+    ("TEMPERATURE", "98.6", "F"),
+    ("PULSE", "72", "/min"),
+    ("RESPIRATION", "16", "/min"),
+    ("PULSE OXIMETRY", "97", "%"),
+    ("WEIGHT", "185", "lb"),
+)
+
+SITES = ("200", "500", "630")
+
+
+def to_fileman(dt):
+    return f"{dt.year - 1700}{dt.month:02d}{dt.day:02d}.{dt.hour:02d}{dt.minute:02d}"
+
+
+def make_vista_responses(count):
+    """Synthesize GMV LATEST VM responses (newest first), split across sites."""
+    base = datetime(2025, 1, 1, 8, 0, 0)
+    lines = {site: [] for site in SITES}
+    for i in range(count):
+        vital_type, value, units = VITAL_READINGS[i % len(VITAL_READINGS)]
+        taken = base - timedelta(hours=i // len(VITAL_READINGS))
+        lines[SITES[i % len(SITES)]].append(f"{vital_type}^{value}^{units}^{to_fileman(taken)}^NURSE,JANE")
+    return {site: "\n".join(site_lines) for site, site_lines in lines.items()}
+
+
+def make_pg_rows(count):
+    """Synthesize PostgreSQL vitals (ORDER BY taken_datetime DESC); the newest quarter overlap VistA."""
+    base = datetime(2025, 1, 1, 8, 0, 0)
+    overlap = count // 4
+    rows = []
+    for i in range(count):
+        vital_type, value, _ = VITAL_READINGS[i % len(VITAL_READINGS)]
+        taken = base - timedelta(hours=i // len(VITAL_READINGS))
+        if i >= overlap:
+            taken -= timedelta(days=365)
+        site = SITES[i % len(SITES)]
+        rows.append({
+            "vital_type": vital_type,
+            "taken_datetime": taken.strftime("%Y-%m-%d %H:%M:%S"),
+            "result_value": value,
+            "location_name": f"VistA Site {site}",
+            "data_source": "CDWWork",
+        })
+    return rows
+
+
+def legacy_parse_vitals(vista_response, site_sta3n):
+    vitals = []
+    if not vista_response or vista_response.startswith("-1^"):
+        return vitals
+    for line in vista_response.strip().split("\n"):
+        if not line or "^" not in line:
+            continue
+        parts = line.split("^")
+        if len(parts) != 5:
+            continue
+        vital_type, value, units, fileman_datetime, entered_by = parts
+        taken_dt = parse_fileman_datetime(fileman_datetime)
+        if not taken_dt:
+            continue
+        vital_abbr = _get_vital_abbr(vital_type)
+        numeric_value = _extract_numeric_value(value, vital_type)
+        systolic = _extract_systolic(value, vital_type)
+        diastolic = _extract_diastolic(value, vital_type)
+        vitals.append({
+            "vital_type": vital_type,
+            "vital_abbr": vital_abbr,
+            "taken_datetime": taken_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "entered_datetime": taken_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "result_value": value,
+            "numeric_value": numeric_value,
+            "systolic": systolic,
+            "diastolic": diastolic,
+            "unit_of_measure": units,
+            "location_name": f"VistA Site {site_sta3n}",
+            "entered_by": entered_by,
+            "abnormal_flag": _compute_abnormal_flag(vital_abbr, numeric_value, systolic, diastolic),
+            "source": "vista",
+            "source_site": site_sta3n,
+        })
+    return vitals
+
+
+def legacy_key(vital):
+    taken_str = vital.get("taken_datetime", "")
+    try:
+        taken_key = datetime.fromisoformat(taken_str.replace(" ", "T")).strftime("%Y%m%d%H")
+    except (ValueError, AttributeError):
+        taken_key = taken_str[:13] if taken_str else "UNKNOWN"
+    location = vital.get("location_name") or vital.get("source_site") or "UNKNOWN"
+    return f"{vital.get('vital_type', '').upper()}|{taken_key}|{location}"
+
+
+def legacy_merge(pg_vitals, vista_by_site):
+    merged = []
+    seen_keys = set()
+    vista_vitals = []
+    for site, response in vista_by_site.items():
+        vista_vitals.extend(legacy_parse_vitals(response, site))
+    for vital in vista_vitals + pg_vitals:
+        key = legacy_key(vital)
+        if key not in seen_keys:
+            merged.append(vital)
+            seen_keys.add(key)
+    merged.sort(key=lambda v: v.get("taken_datetime") or "", reverse=True)
+    return merged
+
+
+def clear_caches():
+    realtime_overlay.fileman_to_iso.cache_clear()
+    realtime_overlay.fileman_date_to_iso.cache_clear()
+    realtime_overlay._vital_measures.cache_clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    realtime_overlay.logger.disabled = True
+    vista_by_site = make_vista_responses(args.rows)
+    pg_rows = make_pg_rows(args.rows)
+
+    legacy_count = len(legacy_merge([dict(row) for row in pg_rows], vista_by_site))
+    current_count = len(merge_vitals_data([dict(row) for row in pg_rows], vista_by_site, "ICN100001")[0])
+    assert legacy_count == current_count, (legacy_count, current_count)
+
+    def legacy():
+        return legacy_merge([dict(row) for row in pg_rows], vista_by_site)
+
+    def current_cold():
+        clear_caches()
+        return merge_vitals_data([dict(row) for row in pg_rows], vista_by_site, "ICN100001")
+
+    def current_warm():
+        return merge_vitals_data([dict(row) for row in pg_rows], vista_by_site, "ICN100001")
+
+    legacy_s = min(timeit.repeat(legacy, number=args.repeat, repeat=3)) / args.repeat
+    print(f"vitals   {args.rows:>6} VistA lines + {args.rows} PG rows -> {current_count} merged")
+    print(f"  legacy        {legacy_s * 1000:8.2f} ms")
+    for label, func in (("current cold", current_cold), ("current warm", current_warm)):
+        current_s = min(timeit.repeat(func, number=args.repeat, repeat=3)) / args.repeat
+        print(f"  {label:<13} {current_s * 1000:8.2f} ms   speedup {legacy_s / current_s:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
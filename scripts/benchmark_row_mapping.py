@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark row mapping + JSON serialization for vitals and labs payloads
+
+Compares, for a 500-row result set:
+  - legacy: positional tuple -> dict loop with per-field str()/float(),
+    then FastAPI's jsonable_encoder + JSONResponse rendering
+  - current: SQL-cast rows (str/float from PostgreSQL) mapped by
+    app.db.row_mapping.RowMapper, rendered by FastJSONResponse (orjson)
+
+No database is needed; rows are synthesized with the driver's types.
+
+Usage:
+    python scripts/benchmark_row_mapping.py [--rows 500] [--repeat 200]
+"""
+
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.db.row_mapping import RowMapper  # noqa: E402
+from app.utils.json_response import FastJSONResponse  # noqa: E402
+
+VITAL_KEYS = (
+    "vital_id", "patient_key", "vital_sign_id", "vital_type", "vital_abbr",
+    "taken_datetime", "entered_datetime", "result_value", "numeric_value",
+    "systolic", "diastolic", "metric_value", "unit_of_measure", "qualifiers",
+    "location_id", "location_name", "location_type", "entered_by",
+    "abnormal_flag", "bmi", "data_source",
+)
+
+LAB_KEYS = (
+    "lab_id", "patient_key", "lab_chem_sid", "lab_test_sid", "lab_test_name",
+    "lab_test_code", "loinc_code", "panel_name", "accession_number",
+    "result_value", "result_numeric", "result_unit", "abnormal_flag",
+    "is_abnormal", "is_critical", "ref_range_text", "ref_range_low",
+    "ref_range_high", "collection_datetime", "result_datetime", "location_id",
+    "collection_location", "collection_location_type", "specimen_type",
+    "sta3n", "vista_package", "last_updated",
+)
+
+
+def make_vital_rows(count, sql_cast):
+    """Synthesize vitals rows as psycopg2 returns them (raw or SQL-cast)."""
+    base = datetime(2025, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(count):
+        taken = base - timedelta(hours=i * 6)
+        numeric = Decimal("98.60")
+        metric = Decimal("37.00")
+        bmi = Decimal("27.40")
+        rows.append((
+            i, "ICN100001", 5, "TEMPERATURE", "T",
+            str(taken) if sql_cast else taken,
+            str(taken + timedelta(minutes=5)) if sql_cast else taken + timedelta(minutes=5),
+            "98.6", float(numeric) if sql_cast else numeric, None, None,
+            float(metric) if sql_cast else metric, "F", {"method": "ORAL"},
+            101, "PRIMARY CARE", "CLINIC", "NURSE,JANE", None,
+            float(bmi) if sql_cast else bmi, "CDWWork",
+        ))
+    return rows
+
+
+def make_lab_rows(count, sql_cast):
+    """Synthesize lab rows as psycopg2 returns them (raw or SQL-cast)."""
+    base = datetime(2025, 1, 1, 7, 30, 0)
+    rows = []
+    for i in range(count):
+        collected = base - timedelta(days=i)
+        value = Decimal("5.400000")
+        low = Decimal("3.500000")
+        high = Decimal("5.100000")
+
+        def ts(v):
+            return str(v) if sql_cast else v
+
+        def num(v):
+            return float(v) if sql_cast else v
+
+        rows.append((
+            i, "ICN100001", 9000 + i, 42, "Potassium", "K", "2823-3", "BMP",
+            f"CH {i}", "5.4", num(value), "mmol/L", "H", True, False,
+            "3.5 - 5.1", num(low), num(high), ts(collected),
+            ts(collected + timedelta(hours=2)), 7, "LAB", "LABORATORY",
+            "SERUM", "508", "LR", ts(collected + timedelta(days=1)),
+        ))
+    return rows
+
+
+def legacy_vitals(rows):
+    vitals = []
+    for row in rows:
+        vitals.append({
+            "vital_id": row[0],
+            "patient_key": row[1],
+            "vital_sign_id": row[2],
+            "vital_type": row[3],
+            "vital_abbr": row[4],
+            "taken_datetime": str(row[5]) if row[5] else None,
+            "entered_datetime": str(row[6]) if row[6] else None,
+            "result_value": row[7],
+            "numeric_value": float(row[8]) if row[8] is not None else None,
+            "systolic": row[9],
+            "diastolic": row[10],
+            "metric_value": float(row[11]) if row[11] is not None else None,
+            "unit_of_measure": row[12],
+            "qualifiers": row[13],
+            "location_id": row[14],
+            "location_name": row[15],
+            "location_type": row[16],
+            "entered_by": row[17],
+            "abnormal_flag": row[18],
+            "bmi": float(row[19]) if row[19] is not None else None,
+            "data_source": row[20],
+        })
+    return vitals
+
+
+def legacy_labs(rows):
+    labs = []
+    for row in rows:
+        labs.append({
+            "lab_id": row[0],
+            "patient_key": row[1],
+            "lab_chem_sid": row[2],
+            "lab_test_sid": row[3],
+            "lab_test_name": row[4],
+            "lab_test_code": row[5],
+            "loinc_code": row[6],
+            "panel_name": row[7],
+            "accession_number": row[8],
+            "result_value": row[9],
+            "result_numeric": float(row[10]) if row[10] is not None else None,
+            "result_unit": row[11],
+            "abnormal_flag": row[12],
+            "is_abnormal": row[13],
+            "is_critical": row[14],
+            "ref_range_text": row[15],
+            "ref_range_low": float(row[16]) if row[16] is not None else None,
+            "ref_range_high": float(row[17]) if row[17] is not None else None,
+            "collection_datetime": str(row[18]) if row[18] else None,
+            "result_datetime": str(row[19]) if row[19] else None,
+            "location_id": row[20],
+            "collection_location": row[21],
+            "collection_location_type": row[22],
+            "specimen_type": row[23],
+            "sta3n": row[24],
+            "vista_package": row[25],
+            "last_updated": str(row[26]) if row[26] else None,
+        })
+    return labs
+
+
+def run(name, legacy_map, keys, raw_rows, cast_rows, repeat):
+    mapper = RowMapper()
+
+    def legacy():
+        payload = {"patient_icn": "ICN100001", "count": len(raw_rows), name: legacy_map(raw_rows)}
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def current():
+        payload = {"patient_icn": "ICN100001", "count": len(cast_rows), name: mapper.map_all(keys, cast_rows)}
+        return FastJSONResponse(payload).body
+
+    legacy_s = min(timeit.repeat(legacy, number=repeat, repeat=3)) / repeat
+    current_s = min(timeit.repeat(current, number=repeat, repeat=3)) / repeat
+    print(f"{name:<8} {len(raw_rows):>5} rows   legacy {legacy_s * 1000:8.3f} ms   "
+          f"current {current_s * 1000:8.3f} ms   speedup {legacy_s / current_s:5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    run("vitals", legacy_vitals, VITAL_KEYS,
+        make_vital_rows(args.rows, sql_cast=False), make_vital_rows(args.rows, sql_cast=True), args.repeat)
+    run("labs", legacy_labs, LAB_KEYS,
+        make_lab_rows(args.rows, sql_cast=False), make_lab_rows(args.rows, sql_cast=True), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,10 +22,12 @@ class AllergiesListHandler(RPCHandler):
     Returns patient allergy data in VistA format.
 
     RPC Signature:
-        ORQQAL LIST(ICN)
+        ORQQAL LIST(ICN[, SINCE])
 
     Parameters:
         params[0]: ICN (Integrated Care Number)
+        params[1]: Optional FileMan date/time; only allergies with a
+            reaction recorded after it are returned (empty string if none)
 
     Returns:
         Multi-line VistA-formatted string (one line per allergy):
@@ -63,12 +65,14 @@ class AllergiesListHandler(RPCHandler):
         if not icn or not isinstance(icn, str):
             raise ValueError(f"Invalid ICN parameter: {icn}")
 
+        self.get_since_param(params)
+
     def execute(self, params: List[Any], context: Dict[str, Any]) -> str:
         """
         Execute get allergy list RPC.
 
         Args:
-            params: RPC parameters [ICN]
+            params: RPC parameters [ICN] or [ICN, SINCE]
             context: Request context containing:
                 - data_loader: DataLoader instance for this site
                 - site_sta3n: Station number
@@ -83,6 +87,7 @@ class AllergiesListHandler(RPCHandler):
         self.validate_params(params)
 
         icn = params[0]
+        since = self.get_since_param(params)
 
         data_loader = context.get("data_loader")
         site_sta3n = context.get("site_sta3n", "UNKNOWN")
@@ -99,28 +104,37 @@ class AllergiesListHandler(RPCHandler):
             logger.warning(f"[Site {site_sta3n}] Patient {icn} not found in registry")
             return format_rpc_error(f"Patient {icn} not registered at site {site_sta3n}")
 
-        # Load allergies data for this site
-        allergies_data = data_loader.load_allergies()
-        if not allergies_data:
+        # Get allergies for this patient (by DFN, newest first)
+        dfn = patient.get("dfn")
+        matching_allergies = data_loader.get_patient_records("allergies", dfn)
+        if matching_allergies is None:
             logger.warning(f"[Site {site_sta3n}] No allergies data file found")
             return format_rpc_error(f"No allergies data available at site {site_sta3n}")
 
-        # Get allergies for this patient (by DFN)
-        dfn = patient.get("dfn")
-        all_allergies = allergies_data.get("allergies", [])
-
-        # Filter allergies for this patient
-        matching_allergies = [a for a in all_allergies if a.get("dfn") == dfn]
+        if since:
+            # Delta refresh: only allergies with a reaction recorded after "since"
+            new_allergies = data_loader.get_patient_records_since("allergies", dfn, since)
+            logger.info(f"[Site {site_sta3n}] Returning {len(new_allergies)} allergies since {since} for patient {icn}")
+            return self._format_allergies(new_allergies, site_sta3n)
 
         if not matching_allergies:
             logger.info(f"[Site {site_sta3n}] No allergies found for patient {icn} (DFN: {dfn})")
             # Return empty response (not an error - patient has no known allergies)
             return ""
 
-        # Format allergies in VistA format (one per line)
+        response = data_loader.memoize_response(
+            "allergies", (self.rpc_name, dfn), lambda: self._format_allergies(matching_allergies, site_sta3n)
+        )
+
+        logger.info(f"[Site {site_sta3n}] Returning {len(matching_allergies)} allergies for patient {icn}")
+        return response
+
+    @staticmethod
+    def _format_allergies(allergies: List[Dict[str, Any]], site_sta3n: str) -> str:
+        """Format allergies in VistA format (one per line)."""
         # Format: AllergenName^Severity^ReactionDateTime^Reactions^AllergyType^OriginatingSite^EnteredBy
         allergy_lines = []
-        for allergy in matching_allergies:
+        for allergy in allergies:
             allergen_name = allergy.get("allergen_name", "")
             severity = allergy.get("severity", "")
             reaction_datetime = allergy.get("reaction_datetime", "")
@@ -133,10 +147,7 @@ class AllergiesListHandler(RPCHandler):
             allergy_lines.append(line)
 
         # Join with newlines (VistA multi-line response)
-        response = "\n".join(allergy_lines)
-
-        logger.info(f"[Site {site_sta3n}] Returning {len(allergy_lines)} allergies for patient {icn}")
-        return response
+        return "\n".join(allergy_lines)
 
 
 # Export handlers
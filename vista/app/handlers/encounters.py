@@ -106,27 +106,30 @@ class AdmissionsHandler(RPCHandler):
             logger.warning(f"[Site {site_sta3n}] Patient {icn} not found in registry")
             return format_rpc_error(f"Patient {icn} not registered at site {site_sta3n}")
 
-        # Load encounters data for this site
-        encounters_data = data_loader.load_encounters()
-        if not encounters_data:
+        # Get encounters for this patient (by DFN, newest admission first)
+        dfn = patient.get("dfn")
+        matching_encounters = data_loader.get_patient_records("encounters", dfn)
+        if matching_encounters is None:
             logger.warning(f"[Site {site_sta3n}] No encounters data file found")
             return format_rpc_error(f"No encounters data available at site {site_sta3n}")
 
-        # Get encounters for this patient (by DFN)
-        dfn = patient.get("dfn")
-        all_encounters = encounters_data.get("encounters", [])
-
-        # Filter encounters for this patient
-        matching_encounters = [e for e in all_encounters if e.get("dfn") == dfn]
-
         if not matching_encounters:
             logger.info(f"[Site {site_sta3n}] No encounters found for patient {icn} (DFN: {dfn})")
             return format_rpc_error(f"No encounters found for patient")
 
-        # Format encounters in VistA format (one per line)
+        response = data_loader.memoize_response(
+            "encounters", (self.rpc_name, dfn), lambda: self._format_encounters(matching_encounters)
+        )
+
+        logger.info(f"[Site {site_sta3n}] Returning {len(matching_encounters)} encounters for patient {icn}")
+        return response
+
+    @staticmethod
+    def _format_encounters(encounters: List[Dict[str, Any]]) -> str:
+        """Format encounters in VistA format (one per line)."""
         # Format: InpatientID^AdmitDateTime^AdmitLocation^Status^DischargeDateTime^DischargeLocation^LOS^DiagnosisCode^AdmitProvider
         encounter_lines = []
-        for enc in matching_encounters:
+        for enc in encounters:
             inpatient_id = enc.get("inpatient_id", "")
             admit_datetime = enc.get("admit_datetime", "")
             admit_location = enc.get("admit_location", "")
@@ -141,10 +144,7 @@ class AdmissionsHandler(RPCHandler):
             encounter_lines.append(line)
 
         # Join with newlines (VistA multi-line response)
-        response = "\n".join(encounter_lines)
-
-        logger.info(f"[Site {site_sta3n}] Returning {len(encounter_lines)} encounters for patient {icn}")
-        return response
+        return "\n".join(encounter_lines)
 
 
 # Export handlers
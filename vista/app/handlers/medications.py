@@ -22,10 +22,12 @@ class MedicationsCoverHandler(RPCHandler):
     Returns active outpatient prescriptions for a patient in VistA format.
 
     RPC Signature:
-        ORWPS COVER(ICN)
+        ORWPS COVER(ICN[, SINCE])
 
     Parameters:
         params[0]: ICN (Integrated Care Number)
+        params[1]: Optional FileMan date/time; only active prescriptions
+            issued after it are returned (empty string if none)
 
     Returns:
         Multi-line VistA-formatted string (one line per medication):
@@ -63,12 +65,14 @@ class MedicationsCoverHandler(RPCHandler):
         if not icn or not isinstance(icn, str):
             raise ValueError(f"Invalid ICN parameter: {icn}")
 
+        self.get_since_param(params)
+
     def execute(self, params: List[Any], context: Dict[str, Any]) -> str:
         """
         Execute get active medications RPC (cover sheet).
 
         Args:
-            params: RPC parameters [ICN]
+            params: RPC parameters [ICN] or [ICN, SINCE]
             context: Request context containing:
                 - data_loader: DataLoader instance for this site
                 - site_sta3n: Station number
@@ -83,6 +87,7 @@ class MedicationsCoverHandler(RPCHandler):
         self.validate_params(params)
 
         icn = params[0]
+        since = self.get_since_param(params)
         data_loader = context.get("data_loader")
         site_sta3n = context.get("site_sta3n", "UNKNOWN")
 
@@ -99,42 +104,49 @@ class MedicationsCoverHandler(RPCHandler):
             # For medications, return empty string if patient not found (not an error)
             return ""
 
-        # Load medications data for this site
-        medications_data = data_loader.load_medications()
-        if not medications_data:
+        # Get medications for this patient (by DFN, newest first), status=ACTIVE only
+        dfn = patient.get("dfn")
+        all_medications = data_loader.get_patient_records("medications", dfn)
+        if all_medications is None:
             logger.warning(f"[Site {site_sta3n}] No medications data file found")
             return ""
 
-        # Get medications for this patient (by DFN)
-        dfn = patient.get("dfn")
-        all_medications = medications_data.get("medications", [])
+        if since:
+            # Delta refresh: only active prescriptions issued after "since"
+            new_medications = [
+                m for m in data_loader.get_patient_records_since("medications", dfn, since)
+                if m.get("status") == "ACTIVE"
+            ]
+            logger.info(f"[Site {site_sta3n}] Returning {len(new_medications)} active medications since {since} for patient {icn}")
+            return self._format_medications(new_medications)
 
-        # Filter medications for this patient and status=ACTIVE
-        patient_medications = [
-            m for m in all_medications
-            if m.get("dfn") == dfn and m.get("status") == "ACTIVE"
-        ]
+        patient_medications = [m for m in all_medications if m.get("status") == "ACTIVE"]
 
         if not patient_medications:
             logger.info(f"[Site {site_sta3n}] No active medications found for patient {icn} (DFN: {dfn})")
             return ""
 
-        # Format medications in VistA format (one per line)
+        response = data_loader.memoize_response(
+            "medications", (self.rpc_name, dfn), lambda: self._format_medications(patient_medications)
+        )
+
+        logger.info(f"[Site {site_sta3n}] Returning {len(patient_medications)} active medications for patient {icn}")
+        return response
+
+    @staticmethod
+    def _format_medications(medications: List[Dict[str, Any]]) -> str:
+        """Format medications in VistA format (one per line)."""
         # Format: RX_NUMBER^DRUG_NAME^STATUS^QUANTITY/DAYS_SUPPLY^REFILLS_REMAINING^ISSUE_DATE^EXPIRATION_DATE
         med_lines = []
-        for med in patient_medications:
+        for med in medications:
             rx_number = med.get("rx_number", "")
             drug_name = med.get("drug_name", "")
             status = med.get("status", "ACTIVE")
             quantity = med.get("quantity", "")
             days_supply = med.get("days_supply", "")
             refills_remaining = med.get("refills_remaining", "")
-            issue_date = med.get("issue_date", "")  # T-notation or FileMan
-            expiration_date = med.get("expiration_date", "")  # T-notation or FileMan
-
-            # Convert T-notation dates to FileMan format
-            issue_date_fm = data_loader.parse_t_notation_to_fileman(issue_date)
-            expiration_date_fm = data_loader.parse_t_notation_to_fileman(expiration_date)
+            issue_date_fm = med.get("issue_date", "")  # FileMan (converted at load)
+            expiration_date_fm = med.get("expiration_date", "")  # FileMan (converted at load)
 
             # Build caret-delimited line
             # QUANTITY/DAYS_SUPPLY format (e.g., "60/90")
@@ -144,10 +156,7 @@ class MedicationsCoverHandler(RPCHandler):
             med_lines.append(line)
 
         # Join with newlines (VistA multi-line response)
-        response = "\n".join(med_lines)
-
-        logger.info(f"[Site {site_sta3n}] Returning {len(med_lines)} active medications for patient {icn}")
-        return response
+        return "\n".join(med_lines)
 
 
 # Export handlers
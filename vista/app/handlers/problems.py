@@ -23,10 +23,12 @@ class ProblemsListHandler(RPCHandler):
     was updated today (T-0).
 
     RPC Signature:
-        ORQQPL LIST(ICN)
+        ORQQPL LIST(ICN[, SINCE])
 
     Parameters:
         params[0]: ICN (Integrated Care Number)
+        params[1]: Optional FileMan date/time; only problems entered,
+            modified or with onset after it are returned (empty string if none)
 
     Returns:
         Multi-line VistA-formatted string (one line per problem):
@@ -67,12 +69,14 @@ class ProblemsListHandler(RPCHandler):
         if not icn or not isinstance(icn, str):
             raise ValueError(f"Invalid ICN parameter: {icn}")
 
+        self.get_since_param(params)
+
     def execute(self, params: List[Any], context: Dict[str, Any]) -> str:
         """
         Execute get patient problem list RPC.
 
         Args:
-            params: RPC parameters [ICN]
+            params: RPC parameters [ICN] or [ICN, SINCE]
             context: Request context containing:
                 - data_loader: DataLoader instance for this site
                 - site_sta3n: Station number
@@ -87,6 +91,7 @@ class ProblemsListHandler(RPCHandler):
         self.validate_params(params)
 
         icn = params[0]
+        since = self.get_since_param(params)
         data_loader = context.get("data_loader")
         site_sta3n = context.get("site_sta3n", "UNKNOWN")
 
@@ -103,51 +108,51 @@ class ProblemsListHandler(RPCHandler):
             # For problems, return empty string if patient not found (not an error)
             return ""
 
-        # Load problems data for this site
-        problems_data = data_loader.load_problems()
-        if not problems_data:
+        # Get problems for this patient (by DFN, all statuses - Active, Inactive, Resolved)
+        dfn = patient.get("dfn")
+        patient_problems = data_loader.get_patient_records("problems", dfn)
+        if patient_problems is None:
             logger.warning(f"[Site {site_sta3n}] No problems data file found")
             return ""
 
-        # Get problems for this patient (by DFN)
-        dfn = patient.get("dfn")
-        all_problems = problems_data.get("problems", [])
-
-        # Filter problems for this patient (all statuses - Active, Inactive, Resolved)
-        patient_problems = [
-            p for p in all_problems
-            if p.get("dfn") == dfn
-        ]
+        if since:
+            # Delta refresh: only problems entered, modified or with onset after "since"
+            new_problems = data_loader.get_patient_records_since("problems", dfn, since)
+            logger.info(f"[Site {site_sta3n}] Returning {len(new_problems)} problems since {since} for patient {icn}")
+            return self._format_problems(new_problems)
 
         if not patient_problems:
             logger.info(f"[Site {site_sta3n}] No problems found for patient {icn} (DFN: {dfn})")
             return ""
 
-        # Format problems in VistA format (one per line)
+        response = data_loader.memoize_response(
+            "problems", (self.rpc_name, dfn), lambda: self._format_problems(patient_problems)
+        )
+
+        logger.info(f"[Site {site_sta3n}] Returning {len(patient_problems)} problems for patient {icn}")
+        return response
+
+    @staticmethod
+    def _format_problems(problems: List[Dict[str, Any]]) -> str:
+        """Format problems in VistA format (one per line)."""
         # Format: PROBLEM_IEN^PROBLEM_TEXT^ICD10_CODE^STATUS^ONSET_DATE^SERVICE_CONNECTED^SNOMED_CODE^UPDATED_TODAY
         problem_lines = []
-        for problem in patient_problems:
+        for problem in problems:
             problem_ien = problem.get("problem_ien", "")
             problem_text = problem.get("problem_text", "")
             icd10_code = problem.get("icd10_code", "")
             status = problem.get("problem_status", "Active")
-            onset_date = problem.get("onset_date", "")  # T-notation or FileMan
+            onset_date_fm = problem.get("onset_date", "")  # FileMan (converted at load)
             service_connected = "1" if problem.get("service_connected", False) else "0"
             snomed_code = problem.get("snomed_code", "")
             updated_today = "1" if problem.get("updated_today", False) else "0"
 
-            # Convert T-notation date to FileMan format
-            onset_date_fm = data_loader.parse_t_notation_to_fileman(onset_date)
-
             # Build caret-delimited line
             line = f"{problem_ien}^{problem_text}^{icd10_code}^{status}^{onset_date_fm}^{service_connected}^{snomed_code}^{updated_today}"
             problem_lines.append(line)
 
         # Join with newlines (VistA multi-line response)
-        response = "\n".join(problem_lines)
-
-        logger.info(f"[Site {site_sta3n}] Returning {len(problem_lines)} problems for patient {icn}")
-        return response
+        return "\n".join(problem_lines)
 
 
 # Export handlers
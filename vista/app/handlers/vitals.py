@@ -22,10 +22,12 @@ class LatestVitalsHandler(RPCHandler):
     Returns most recent vital signs for a patient in VistA format.
 
     RPC Signature:
-        GMV LATEST VM(ICN)
+        GMV LATEST VM(ICN[, SINCE])
 
     Parameters:
         params[0]: ICN (Integrated Care Number)
+        params[1]: Optional FileMan date/time; only vitals taken after it
+            are returned (empty string if none)
 
     Returns:
         Multi-line VistA-formatted string (one line per vital):
@@ -64,12 +66,14 @@ class LatestVitalsHandler(RPCHandler):
         if not icn or not isinstance(icn, str):
             raise ValueError(f"Invalid ICN parameter: {icn}")
 
+        self.get_since_param(params)
+
     def execute(self, params: List[Any], context: Dict[str, Any]) -> str:
         """
         Execute get latest vitals RPC.
 
         Args:
-            params: RPC parameters [ICN]
+            params: RPC parameters [ICN] or [ICN, SINCE]
             context: Request context containing:
                 - data_loader: DataLoader instance for this site
                 - site_sta3n: Station number
@@ -84,6 +88,7 @@ class LatestVitalsHandler(RPCHandler):
         self.validate_params(params)
 
         icn = params[0]
+        since = self.get_since_param(params)
         data_loader = context.get("data_loader")
         site_sta3n = context.get("site_sta3n", "UNKNOWN")
 
@@ -99,27 +104,36 @@ class LatestVitalsHandler(RPCHandler):
             logger.warning(f"[Site {site_sta3n}] Patient {icn} not found in registry")
             return format_rpc_error(f"Patient {icn} not found at site {site_sta3n}")
 
-        # Load vitals data for this site
-        vitals_data = data_loader.load_vitals()
-        if not vitals_data:
+        # Get vitals for this patient (by DFN, newest first)
+        dfn = patient.get("dfn")
+        matching_vitals = data_loader.get_patient_records("vitals", dfn)
+        if matching_vitals is None:
             logger.warning(f"[Site {site_sta3n}] No vitals data file found")
             return format_rpc_error(f"No vitals data available at site {site_sta3n}")
 
-        # Get vitals for this patient (by DFN)
-        dfn = patient.get("dfn")
-        patient_vitals = vitals_data.get("vitals", [])
-
-        # Filter vitals for this patient
-        matching_vitals = [v for v in patient_vitals if v.get("dfn") == dfn]
+        if since:
+            # Delta refresh: only vitals taken after "since"
+            new_vitals = data_loader.get_patient_records_since("vitals", dfn, since)
+            logger.info(f"[Site {site_sta3n}] Returning {len(new_vitals)} vitals since {since} for patient {icn}")
+            return self._format_vitals(new_vitals)
 
         if not matching_vitals:
             logger.info(f"[Site {site_sta3n}] No vitals found for patient {icn} (DFN: {dfn})")
             return format_rpc_error(f"No vitals found for patient")
 
-        # Format vitals in VistA format (one per line)
+        response = data_loader.memoize_response(
+            "vitals", (self.rpc_name, dfn), lambda: self._format_vitals(matching_vitals)
+        )
+
+        logger.info(f"[Site {site_sta3n}] Returning {len(matching_vitals)} vitals for patient {icn}")
+        return response
+
+    @staticmethod
+    def _format_vitals(vitals: List[Dict[str, Any]]) -> str:
+        """Format vitals in VistA format (one per line)."""
         # Format: TYPE^VALUE^UNITS^DATE_TIME^ENTERED_BY
         vital_lines = []
-        for vital in matching_vitals:
+        for vital in vitals:
             vital_type = vital.get("type", "UNKNOWN")
             value = vital.get("value", "")
             units = vital.get("units", "")
@@ -130,10 +144,7 @@ class LatestVitalsHandler(RPCHandler):
             vital_lines.append(line)
 
         # Join with newlines (VistA multi-line response)
-        response = "\n".join(vital_lines)
-
-        logger.info(f"[Site {site_sta3n}] Returning {len(vital_lines)} vitals for patient {icn}")
-        return response
+        return "\n".join(vital_lines)
 
 
 # Export handlers
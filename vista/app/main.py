@@ -102,6 +102,9 @@ SITES = load_sites_config()
 # Each site gets its own DataLoader and RPCRegistry
 site_registries: Dict[str, Dict[str, Any]] = {}
 
+# Maximum RPCs per /rpc/batch request
+MAX_BATCH_CALLS = 50
+
 
 # Request/Response Models
 class RPCRequest(BaseModel):
@@ -119,6 +122,23 @@ class RPCResponse(BaseModel):
     rpc: str = Field(..., description="RPC name executed")
 
 
+class BatchRPCCall(BaseModel):
+    """One RPC in a batch request"""
+    site: str = Field(..., description="Site station number (e.g., '200')")
+    name: str = Field(..., description="RPC name (e.g., 'GMV LATEST VM')")
+    params: List[Any] = Field(default_factory=list, description="RPC parameters")
+
+
+class BatchRPCRequest(BaseModel):
+    """Batch RPC request model"""
+    calls: List[BatchRPCCall] = Field(..., description="RPCs to execute (any mix of sites)")
+
+
+class BatchRPCResponse(BaseModel):
+    """Batch RPC response model (results in request order)"""
+    results: List[RPCResponse] = Field(..., description="One RPCResponse per call")
+
+
 class SiteInfo(BaseModel):
     """Site information model"""
     sta3n: str = Field(..., description="Station number")
@@ -139,8 +159,9 @@ def initialize_site(sta3n: str) -> Dict[str, Any]:
     """
     logger.info(f"Initializing site {sta3n}...")
 
-    # Create DataLoader for this site
+    # Create DataLoader for this site and index its clinical data files
     data_loader = DataLoader(site_sta3n=sta3n)
+    data_loader.preload()
 
     # Create RPC Registry
     registry = RPCRegistry()
@@ -192,6 +213,7 @@ async def root():
         "sites": len(site_registries),
         "endpoints": {
             "rpc_execute": "POST /rpc/execute?site={sta3n}",
+            "rpc_batch": "POST /rpc/batch",
             "sites": "GET /sites",
             "health": "GET /health",
             "docs": "GET /docs"
@@ -267,6 +289,81 @@ async def execute_rpc(
             detail=f"Site {site} not found. Available sites: {list(site_registries.keys())}"
         )
 
+    return await execute_site_rpc(site, request.name, request.params)
+
+
+@app.post("/rpc/batch", response_model=BatchRPCResponse)
+async def execute_rpc_batch(request: BatchRPCRequest):
+    """
+    Execute several RPCs (any mix of sites) concurrently in one request.
+
+    Each call is executed exactly as POST /rpc/execute would execute it,
+    including simulated latency, so a batch takes as long as its slowest
+    call. Per-call failures (including unknown sites) are reported in that
+    call's result; the batch itself only fails if the request is invalid.
+
+    Args:
+        request: Batch request containing the calls to execute
+
+    Returns:
+        BatchRPCResponse with one RPCResponse per call, in request order
+
+    Example:
+        POST /rpc/batch
+        {
+            "calls": [
+                {"site": "200", "name": "GMV LATEST VM", "params": ["ICN100001"]},
+                {"site": "500", "name": "GMV LATEST VM", "params": ["ICN100001"]},
+                {"site": "200", "name": "ORQQAL LIST", "params": ["ICN100001"]}
+            ]
+        }
+
+        Response:
+        {
+            "results": [
+                {"success": true, "response": "...", "error": null, "site": "200", "rpc": "GMV LATEST VM"},
+                ...
+            ]
+        }
+    """
+    if len(request.calls) > MAX_BATCH_CALLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch of {len(request.calls)} calls exceeds maximum of {MAX_BATCH_CALLS}"
+        )
+
+    results = await asyncio.gather(*[
+        execute_site_rpc(call.site, call.name, call.params)
+        for call in request.calls
+    ])
+
+    successful = sum(1 for result in results if result.success)
+    logger.info(f"RPC batch executed: {successful}/{len(results)} calls succeeded")
+
+    return BatchRPCResponse(results=results)
+
+
+async def execute_site_rpc(site: str, rpc_name: str, params: List[Any]) -> RPCResponse:
+    """
+    Execute one RPC at a site (shared by /rpc/execute and /rpc/batch).
+
+    Args:
+        site: Site station number
+        rpc_name: RPC name
+        params: RPC parameters
+
+    Returns:
+        RPCResponse (success=False with an error message on failure)
+    """
+    if site not in site_registries:
+        return RPCResponse(
+            success=False,
+            response=None,
+            error=f"Site {site} not found. Available sites: {list(site_registries.keys())}",
+            site=site,
+            rpc=rpc_name
+        )
+
     site_data = site_registries[site]
     registry = site_data["registry"]
     data_loader = site_data["data_loader"]
@@ -275,7 +372,7 @@ async def execute_rpc(
     context = {
         "data_loader": data_loader,
         "site_sta3n": site,
-        "request_id": f"{site}:{request.name}"
+        "request_id": f"{site}:{rpc_name}"
     }
 
     try:
@@ -284,46 +381,46 @@ async def execute_rpc(
             latency_min = VISTA_CONFIG.get("rpc_latency_min", 1.0)
             latency_max = VISTA_CONFIG.get("rpc_latency_max", 3.0)
             delay = random.uniform(latency_min, latency_max)
-            logger.debug(f"Simulating {delay:.2f}s latency for {site}:{request.name}")
+            logger.debug(f"Simulating {delay:.2f}s latency for {site}:{rpc_name}")
             await asyncio.sleep(delay)
 
         # Execute RPC via registry
         response = registry.dispatch(
-            rpc_name=request.name,
-            params=request.params,
+            rpc_name=rpc_name,
+            params=params,
             context=context
         )
 
-        logger.info(f"RPC executed successfully: {site}:{request.name}")
+        logger.info(f"RPC executed successfully: {site}:{rpc_name}")
 
         return RPCResponse(
             success=True,
             response=response,
             error=None,
             site=site,
-            rpc=request.name
+            rpc=rpc_name
         )
 
     except RPCExecutionError as e:
-        logger.error(f"RPC execution error: {site}:{request.name} - {e.message}")
+        logger.error(f"RPC execution error: {site}:{rpc_name} - {e.message}")
 
         return RPCResponse(
             success=False,
             response=None,
             error=e.message,
             site=site,
-            rpc=request.name
+            rpc=rpc_name
         )
 
     except Exception as e:
-        logger.error(f"Unexpected error executing RPC: {site}:{request.name} - {e}", exc_info=True)
+        logger.error(f"Unexpected error executing RPC: {site}:{rpc_name} - {e}", exc_info=True)
 
         return RPCResponse(
             success=False,
             response=None,
             error=f"Internal server error: {str(e)}",
             site=site,
-            rpc=request.name
+            rpc=rpc_name
         )
 
 
@@ -3,16 +3,60 @@
 # ---------------------------------------------------------------------
 # Patient Registry Data Loader
 # Provides ICN→DFN resolution for VistA site simulation
+# Clinical data files are loaded once per site into per-DFN indexes
+# (newest first) and reloaded when a file changes or the day rolls over
 # ---------------------------------------------------------------------
 
 import json
 import logging
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from datetime import date, datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Clinical data files: domain -> (T-notation date fields converted to
+# FileMan, field each patient's records are sorted on, newest first).
+# The domain is also the file name and the top-level list key.
+CLINICAL_DOMAINS = {
+    "vitals": (("date_time",), "date_time"),
+    "encounters": (("admit_datetime", "discharge_datetime"), "admit_datetime"),
+    "allergies": (("reaction_datetime",), "reaction_datetime"),
+    "medications": (("issue_date", "expiration_date"), "issue_date"),
+    "problems": (("onset_date", "entered_date", "modified_date"), "onset_date"),
+}
+
+# Delta ("since") queries: fields recording when a record was entered or
+# last changed; a record is newer than "since" if any of them is. When
+# the only field is the domain's sort field, scans stop at the first
+# older record.
+DELTA_FIELDS = {
+    "vitals": ("date_time",),
+    "allergies": ("reaction_datetime",),
+    "medications": ("issue_date",),
+    "problems": ("modified_date", "entered_date", "onset_date"),
+}
+
+
+def fileman_value(value: Any) -> Optional[float]:
+    """FileMan date/time as a number that orders chronologically (None if invalid)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _DomainIndex:
+    """One loaded clinical data file, indexed by DFN."""
+
+    def __init__(self, data: Dict[str, Any], by_dfn: Dict[str, List[Dict[str, Any]]], mtime_ns: int, day: date):
+        self.data = data
+        self.by_dfn = by_dfn
+        self.mtime_ns = mtime_ns
+        self.day = day
+        self.responses: Dict[Tuple, str] = {}
+
 
 class DataLoader:
     """
@@ -53,6 +97,16 @@ class DataLoader:
         # Build ICN→DFN lookup for this site
         self.icn_to_dfn = self._build_icn_dfn_map()
 
+        # ICN → registry record (first record wins, as with a linear scan)
+        self.patients_by_icn: Dict[str, Dict[str, Any]] = {}
+        for patient in self.registry.get("patients", []):
+            if patient.get("icn"):
+                self.patients_by_icn.setdefault(patient["icn"], patient)
+
+        # Clinical data indexes, built on first use (see preload())
+        self._indexes: Dict[str, _DomainIndex] = {}
+        self._index_lock = threading.Lock()
+
         logger.info(
             f"Initialized for site {site_sta3n}: "
             f"{len(self.icn_to_dfn)} patients registered"
@@ -133,13 +187,7 @@ class DataLoader:
         Returns:
             Patient dictionary or None if not found
         """
-        patients = self.registry.get("patients", [])
-
-        for patient in patients:
-            if patient.get("icn") == icn:
-                return patient
-
-        return None
+        return self.patients_by_icn.get(icn)
 
     def get_registered_patients(self) -> List[str]:
         """
@@ -266,245 +314,208 @@ class DataLoader:
             logger.warning(f"Failed to parse T-notation '{t_notation}': {e}")
             return t_notation  # Return as-is if parsing fails
 
-    def load_vitals(self) -> Optional[Dict[str, Any]]:
-        """
-        Load vitals data for this site from JSON file.
+    # -----------------------------------------------------------------
+    # Clinical data (per-DFN indexes)
+    # -----------------------------------------------------------------
 
-        Supports both FileMan format and T-notation for date_time fields.
-        T-notation dates are automatically converted to today's equivalent FileMan format.
+    def _domain_path(self, domain: str) -> Path:
+        """Path to a clinical data file: vista/app/data/sites/{sta3n}/{domain}.json"""
+        vista_root = Path(__file__).parent.parent
+        return vista_root / "data" / "sites" / self.site_sta3n / f"{domain}.json"
 
-        Returns:
-            Dictionary with vitals data, or None if file not found
+    def _build_index(self, domain: str, path: Path, mtime_ns: int, day: date) -> Optional[_DomainIndex]:
+        """Read, convert and index one clinical data file."""
+        date_fields, sort_field = CLINICAL_DOMAINS[domain]
 
-        File location: vista/app/data/sites/{sta3n}/vitals.json
-        """
         try:
-            # Construct path to vitals data file
-            # Assume structure: vista/app/data/sites/{sta3n}/vitals.json
-            vista_root = Path(__file__).parent.parent
-            vitals_path = vista_root / "data" / "sites" / self.site_sta3n / "vitals.json"
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in {domain} data file: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading {domain} data: {e}")
+            return None
 
-            if not vitals_path.exists():
-                logger.warning(f"Vitals data file not found: {vitals_path}")
-                return None
+        records = data.get(domain, [])
 
-            with open(vitals_path, 'r') as f:
-                vitals_data = json.load(f)
+        # Convert T-notation dates to FileMan format (relative to `day`)
+        for record in records:
+            for field in date_fields:
+                value = record.get(field)
+                if value and isinstance(value, str):
+                    record[field] = self.parse_t_notation_to_fileman(value)
 
-            # Convert T-notation dates to FileMan format
-            vitals_list = vitals_data.get("vitals", [])
-            for vital in vitals_list:
-                if "date_time" in vital:
-                    original = vital["date_time"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    vital["date_time"] = converted
+        # Group by DFN, newest first (FileMan strings sort chronologically;
+        # the sort is stable, so same-time records keep file order)
+        by_dfn: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_dfn.setdefault(record.get("dfn"), []).append(record)
+        for patient_records in by_dfn.values():
+            patient_records.sort(key=lambda r: str(r.get(sort_field) or ""), reverse=True)
 
-            logger.debug(f"Loaded vitals data from {vitals_path}")
-            return vitals_data
+        logger.info(
+            f"Site {self.site_sta3n}: indexed {len(records)} {domain} records "
+            f"for {len(by_dfn)} patients from {path}"
+        )
+        return _DomainIndex(data, by_dfn, mtime_ns, day)
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in vitals data file: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error loading vitals data: {e}")
+    def _get_index(self, domain: str) -> Optional[_DomainIndex]:
+        """
+        Return the index for a domain, (re)building it when the data file
+        changed on disk or the day rolled over (T-notation dates are
+        relative to today).
+        """
+        path = self._domain_path(domain)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            logger.warning(f"{domain.capitalize()} data file not found: {path}")
+            with self._index_lock:
+                self._indexes.pop(domain, None)
             return None
 
-    def load_encounters(self) -> Optional[Dict[str, Any]]:
+        today = date.today()
+        index = self._indexes.get(domain)
+        if index is not None and index.mtime_ns == mtime_ns and index.day == today:
+            return index
+
+        with self._index_lock:
+            index = self._indexes.get(domain)
+            if index is None or index.mtime_ns != mtime_ns or index.day != today:
+                index = self._build_index(domain, path, mtime_ns, today)
+                if index is None:
+                    self._indexes.pop(domain, None)
+                else:
+                    self._indexes[domain] = index
+            return index
+
+    def preload(self) -> None:
+        """Load and index every clinical data file for this site (called at startup)."""
+        for domain in CLINICAL_DOMAINS:
+            self._get_index(domain)
+
+    def get_patient_records(self, domain: str, dfn: str) -> Optional[List[Dict[str, Any]]]:
         """
-        Load encounters data for this site from JSON file.
+        Get one patient's records for a clinical domain, newest first.
 
-        Supports both FileMan format and T-notation for date_time fields.
-        T-notation dates are automatically converted to today's equivalent FileMan format.
+        Args:
+            domain: "vitals", "encounters", "allergies", "medications" or "problems"
+            dfn: Site-specific patient identifier
 
         Returns:
-            Dictionary with encounters data, or None if file not found
-
-        File location: vista/app/data/sites/{sta3n}/encounters.json
+            List of records (empty if the patient has none), or None if the
+            site has no data file for the domain. Records are shared with
+            the index and must not be modified.
         """
-        try:
-            # Construct path to encounters data file
-            # Assume structure: vista/app/data/sites/{sta3n}/encounters.json
-            vista_root = Path(__file__).parent.parent
-            encounters_path = vista_root / "data" / "sites" / self.site_sta3n / "encounters.json"
-
-            if not encounters_path.exists():
-                logger.warning(f"Encounters data file not found: {encounters_path}")
-                return None
-
-            with open(encounters_path, 'r') as f:
-                encounters_data = json.load(f)
-
-            # Convert T-notation dates to FileMan format
-            encounters_list = encounters_data.get("encounters", [])
-            for encounter in encounters_list:
-                # Convert admit_datetime
-                if "admit_datetime" in encounter:
-                    original = encounter["admit_datetime"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    encounter["admit_datetime"] = converted
-
-                # Convert discharge_datetime (may be empty for active admissions)
-                if "discharge_datetime" in encounter and encounter["discharge_datetime"]:
-                    original = encounter["discharge_datetime"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    encounter["discharge_datetime"] = converted
-
-            logger.debug(f"Loaded encounters data from {encounters_path}")
-            return encounters_data
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in encounters data file: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error loading encounters data: {e}")
+        index = self._get_index(domain)
+        if index is None:
             return None
+        return index.by_dfn.get(dfn, [])
 
-    def load_allergies(self) -> Optional[Dict[str, Any]]:
+    def get_patient_records_since(self, domain: str, dfn: str, since: str) -> Optional[List[Dict[str, Any]]]:
         """
-        Load allergies data for this site from JSON file.
+        Get one patient's records entered or changed after a point in time.
 
-        Supports both FileMan format and T-notation for reaction_datetime fields.
-        T-notation dates are automatically converted to today's equivalent FileMan format.
+        Args:
+            domain: "vitals", "allergies", "medications" or "problems"
+            dfn: Site-specific patient identifier
+            since: FileMan date/time (e.g., "3251219.1430"); a date
+                without a time means the start of that day
 
         Returns:
-            Dictionary with allergies data, or None if file not found
+            Matching records, newest first (empty if none), or None if the
+            site has no data file for the domain
+        """
+        records = self.get_patient_records(domain, dfn)
+        if records is None:
+            return None
+
+        since_value = fileman_value(since)
+        fields = DELTA_FIELDS[domain]
+        sorted_on_field = fields == (CLINICAL_DOMAINS[domain][1],)
+
+        newer = []
+        for record in records:
+            values = [fileman_value(record.get(field)) for field in fields]
+            if any(value is not None and value > since_value for value in values):
+                newer.append(record)
+            elif sorted_on_field:
+                break
+        return newer
 
-        File location: vista/app/data/sites/{sta3n}/allergies.json
+    def memoize_response(self, domain: str, key: Tuple, build: Callable[[], str]) -> str:
         """
-        try:
-            # Construct path to allergies data file
-            # Assume structure: vista/app/data/sites/{sta3n}/allergies.json
-            vista_root = Path(__file__).parent.parent
-            allergies_path = vista_root / "data" / "sites" / self.site_sta3n / "allergies.json"
-
-            if not allergies_path.exists():
-                logger.warning(f"Allergies data file not found: {allergies_path}")
-                return None
-
-            with open(allergies_path, 'r') as f:
-                allergies_data = json.load(f)
-
-            # Convert T-notation dates to FileMan format
-            allergies_list = allergies_data.get("allergies", [])
-            for allergy in allergies_list:
-                # Convert reaction_datetime
-                if "reaction_datetime" in allergy:
-                    original = allergy["reaction_datetime"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    allergy["reaction_datetime"] = converted
-
-            logger.debug(f"Loaded allergies data from {allergies_path}")
-            return allergies_data
+        Return a formatted RPC response, building it at most once per data load.
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in allergies data file: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error loading allergies data: {e}")
-            return None
+        Memoized responses are dropped whenever the domain's index is
+        rebuilt (file change or new day).
 
-    def load_medications(self) -> Optional[Dict[str, Any]]:
+        Args:
+            domain: Clinical domain the response is built from
+            key: Response key, e.g. (rpc_name, dfn)
+            build: Callable producing the response string
         """
-        Load medications data for this site from JSON file.
+        index = self._get_index(domain)
+        if index is None:
+            return build()
 
-        Supports both FileMan format and T-notation for date fields.
-        T-notation dates are automatically converted to today's equivalent FileMan format.
+        response = index.responses.get(key)
+        if response is None:
+            response = build()
+            index.responses[key] = response
+        return response
+
+    def load_vitals(self) -> Optional[Dict[str, Any]]:
+        """
+        Load vitals data for this site (vista/app/data/sites/{sta3n}/vitals.json).
+
+        T-notation date_time values are converted to FileMan format. The file
+        is read once and re-read only when it changes on disk or the day
+        rolls over; the returned dictionary is shared and must not be modified.
 
         Returns:
-            Dictionary with medications data, or None if file not found
+            Dictionary with vitals data, or None if file not found or invalid
+        """
+        index = self._get_index("vitals")
+        return index.data if index else None
 
-        File location: vista/app/data/sites/{sta3n}/medications.json
+    def load_encounters(self) -> Optional[Dict[str, Any]]:
         """
-        try:
-            # Construct path to medications data file
-            # Assume structure: vista/app/data/sites/{sta3n}/medications.json
-            vista_root = Path(__file__).parent.parent
-            medications_path = vista_root / "data" / "sites" / self.site_sta3n / "medications.json"
-
-            if not medications_path.exists():
-                logger.warning(f"Medications data file not found: {medications_path}")
-                return None
-
-            with open(medications_path, 'r') as f:
-                medications_data = json.load(f)
-
-            # Convert T-notation dates to FileMan format
-            medications_list = medications_data.get("medications", [])
-            for medication in medications_list:
-                # Convert issue_date
-                if "issue_date" in medication:
-                    original = medication["issue_date"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    medication["issue_date"] = converted
-
-                # Convert expiration_date
-                if "expiration_date" in medication:
-                    original = medication["expiration_date"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    medication["expiration_date"] = converted
-
-            logger.debug(f"Loaded medications data from {medications_path}")
-            return medications_data
+        Load encounters data for this site (see load_vitals).
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in medications data file: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error loading medications data: {e}")
-            return None
+        Returns:
+            Dictionary with encounters data, or None if file not found or invalid
+        """
+        index = self._get_index("encounters")
+        return index.data if index else None
 
-    def load_problems(self) -> Optional[Dict[str, Any]]:
+    def load_allergies(self) -> Optional[Dict[str, Any]]:
         """
-        Load problems data for this site from JSON file.
+        Load allergies data for this site (see load_vitals).
 
-        Supports both FileMan format and T-notation for date fields.
-        T-notation dates are automatically converted to today's equivalent FileMan format.
+        Returns:
+            Dictionary with allergies data, or None if file not found or invalid
+        """
+        index = self._get_index("allergies")
+        return index.data if index else None
+
+    def load_medications(self) -> Optional[Dict[str, Any]]:
+        """
+        Load medications data for this site (see load_vitals).
 
         Returns:
-            Dictionary with problems data, or None if file not found
+            Dictionary with medications data, or None if file not found or invalid
+        """
+        index = self._get_index("medications")
+        return index.data if index else None
 
-        File location: vista/app/data/sites/{sta3n}/problems.json
+    def load_problems(self) -> Optional[Dict[str, Any]]:
         """
-        try:
-            # Construct path to problems data file
-            # Assume structure: vista/app/data/sites/{sta3n}/problems.json
-            vista_root = Path(__file__).parent.parent
-            problems_path = vista_root / "data" / "sites" / self.site_sta3n / "problems.json"
-
-            if not problems_path.exists():
-                logger.warning(f"Problems data file not found: {problems_path}")
-                return None
-
-            with open(problems_path, 'r') as f:
-                problems_data = json.load(f)
-
-            # Convert T-notation dates to FileMan format
-            problems_list = problems_data.get("problems", [])
-            for problem in problems_list:
-                # Convert onset_date
-                if "onset_date" in problem:
-                    original = problem["onset_date"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    problem["onset_date"] = converted
-
-                # Convert entered_date (optional)
-                if "entered_date" in problem and problem["entered_date"]:
-                    original = problem["entered_date"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    problem["entered_date"] = converted
-
-                # Convert modified_date (optional)
-                if "modified_date" in problem and problem["modified_date"]:
-                    original = problem["modified_date"]
-                    converted = self.parse_t_notation_to_fileman(original)
-                    problem["modified_date"] = converted
-
-            logger.debug(f"Loaded problems data from {problems_path}")
-            return problems_data
+        Load problems data for this site (see load_vitals).
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in problems data file: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error loading problems data: {e}")
-            return None
+        Returns:
+            Dictionary with problems data, or None if file not found or invalid
+        """
+        index = self._get_index("problems")
+        return index.data if index else None
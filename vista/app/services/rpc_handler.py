@@ -73,6 +73,37 @@ class RPCHandler(ABC):
         """
         pass
 
+    @staticmethod
+    def get_since_param(params: List[Any], index: int = 1) -> Optional[str]:
+        """
+        Read the optional delta ("since") parameter of a list RPC.
+
+        With it, the RPC returns only records entered or changed after
+        that point (an empty string if there are none).
+
+        Args:
+            params: RPC parameters
+            index: Position of the parameter
+
+        Returns:
+            FileMan date/time string (e.g., "3251219.1430"), or None if absent or empty
+
+        Raises:
+            ValueError: If the parameter is not a FileMan date/time
+        """
+        if len(params) <= index or params[index] in (None, ""):
+            return None
+
+        since = str(params[index])
+        date_part = since.split(".")[0]
+        if len(date_part) != 7 or not date_part.isdigit():
+            raise ValueError(f"Invalid since parameter (expected FileMan date/time): {since}")
+        try:
+            float(since)
+        except ValueError:
+            raise ValueError(f"Invalid since parameter (expected FileMan date/time): {since}")
+        return since
+
 
 class RPCExecutionError(Exception):
     """Exception raised when RPC execution fails"""
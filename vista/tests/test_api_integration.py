@@ -249,6 +249,44 @@ class TestRPCExecution:
         assert response.status_code == 422
 
 
+class TestBatchExecution:
+    """Test POST /rpc/batch"""
+
+    def test_batch_results_in_request_order(self):
+        """Test batch executes calls across sites and preserves order"""
+        response = client.post(
+            "/rpc/batch",
+            json={
+                "calls": [
+                    {"site": "200", "name": "ORWPT PTINQ", "params": ["ICN100001"]},
+                    {"site": "500", "name": "ORWPT PTINQ", "params": ["ICN100001"]},
+                    {"site": "200", "name": "NONEXISTENT RPC", "params": []},
+                    {"site": "999", "name": "ORWPT PTINQ", "params": ["ICN100001"]},
+                ]
+            }
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [(r["site"], r["rpc"]) for r in results] == [
+            ("200", "ORWPT PTINQ"),
+            ("500", "ORWPT PTINQ"),
+            ("200", "NONEXISTENT RPC"),
+            ("999", "ORWPT PTINQ"),
+        ]
+        assert results[0]["success"] is True
+        assert results[1]["success"] is True
+        assert results[2]["success"] is False
+        assert results[3]["success"] is False
+        assert "not found" in results[3]["error"].lower()
+
+    def test_batch_too_large(self):
+        """Test batch size limit"""
+        calls = [{"site": "200", "name": "ORWPT PTINQ", "params": ["ICN100001"]}] * 51
+        response = client.post("/rpc/batch", json={"calls": calls})
+        assert response.status_code == 400
+
+
 class TestMultiPatientScenarios:
     """Test multiple patients across different sites"""
 
@@ -4,6 +4,8 @@
 # Unit tests for DataLoader service
 # ---------------------------------------------------------------------
 
+import json
+import os
 import pytest
 from pathlib import Path
 from vista.app.services.data_loader import DataLoader
@@ -128,3 +130,64 @@ class TestDataLoader:
         assert dfn_200 == "100001"
         assert dfn_500 == "500001"
         assert dfn_200 != dfn_500  # Different DFNs at different sites
+
+
+class TestClinicalDataIndex:
+    """Test suite for per-DFN clinical data indexes"""
+
+    @pytest.fixture
+    def loader(self, tmp_path, monkeypatch):
+        """DataLoader reading clinical data files from a temp directory"""
+        project_root = Path(__file__).parent.parent.parent
+        registry_path = str(project_root / "mock" / "shared" / "patient_registry.json")
+        loader = DataLoader(site_sta3n="200", registry_path=registry_path)
+        monkeypatch.setattr(loader, "_domain_path", lambda domain: tmp_path / f"{domain}.json")
+        return loader
+
+    def write_vitals(self, loader, vitals):
+        path = loader._domain_path("vitals")
+        path.write_text(json.dumps({"site_sta3n": "200", "vitals": vitals}))
+        return path
+
+    def test_records_grouped_by_dfn_newest_first(self, loader):
+        """Test records are indexed by DFN, sorted newest first, dates converted"""
+        self.write_vitals(loader, [
+            {"dfn": "100001", "type": "PULSE", "date_time": "3240101.0800"},
+            {"dfn": "100002", "type": "PULSE", "date_time": "3240102.0800"},
+            {"dfn": "100001", "type": "TEMPERATURE", "date_time": "T-0.0845"},
+        ])
+
+        records = loader.get_patient_records("vitals", "100001")
+        assert [r["type"] for r in records] == ["TEMPERATURE", "PULSE"]
+        assert not records[0]["date_time"].startswith("T")
+        assert loader.get_patient_records("vitals", "999999") == []
+
+    def test_missing_file(self, loader):
+        """Test missing data file returns None"""
+        assert loader.get_patient_records("vitals", "100001") is None
+        assert loader.load_vitals() is None
+
+    def test_reload_on_file_change(self, loader):
+        """Test index and memoized responses are rebuilt when the file changes"""
+        path = self.write_vitals(loader, [{"dfn": "100001", "type": "PULSE", "date_time": "3240101.0800"}])
+        assert loader.memoize_response("vitals", ("GMV LATEST VM", "100001"), lambda: "first") == "first"
+        assert loader.memoize_response("vitals", ("GMV LATEST VM", "100001"), lambda: "second") == "first"
+
+        self.write_vitals(loader, [{"dfn": "100001", "type": "WEIGHT", "date_time": "3240101.0800"}])
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+
+        assert loader.get_patient_records("vitals", "100001")[0]["type"] == "WEIGHT"
+        assert loader.memoize_response("vitals", ("GMV LATEST VM", "100001"), lambda: "second") == "second"
+
+    def test_records_since(self, loader):
+        """Test delta ("since") queries return only newer records"""
+        self.write_vitals(loader, [
+            {"dfn": "100001", "type": "PULSE", "date_time": "3240101.0800"},
+            {"dfn": "100001", "type": "TEMPERATURE", "date_time": "3240102.0930"},
+            {"dfn": "100001", "type": "WEIGHT", "date_time": "3240102.1015"},
+        ])
+
+        assert [r["type"] for r in loader.get_patient_records_since("vitals", "100001", "3240102.0930")] == ["WEIGHT"]
+        assert [r["type"] for r in loader.get_patient_records_since("vitals", "100001", "3240102")] == ["WEIGHT", "TEMPERATURE"]
+        assert loader.get_patient_records_since("vitals", "100001", "3240103") == []
+        assert loader.get_patient_records_since("vitals", "999999", "3240101") == []
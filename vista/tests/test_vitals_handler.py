@@ -273,3 +273,19 @@ class TestLatestVitalsHandler:
         for line in lines:
             if line:  # Skip empty lines
                 assert line.count("^") == 4  # 5 fields = 4 delimiters
+
+    def test_execute_since_returns_delta(self, handler, context_200):
+        """Test the optional since parameter returns only newer vitals"""
+        full = handler.execute(["ICN100001"], context_200).split("\n")
+        newest = max(line.split("^")[3] for line in full)
+
+        assert handler.execute(["ICN100001", newest], context_200) == ""
+        delta = handler.execute(["ICN100001", "3000101"], context_200)
+        assert delta.split("\n") == full
+
+    def test_validate_params_invalid_since(self, handler):
+        """Test a since parameter that is not a FileMan date/time is rejected"""
+        with pytest.raises(ValueError):
+            handler.validate_params(["ICN100001", "2024-01-01"])
+        handler.validate_params(["ICN100001", ""])
+        handler.validate_params(["ICN100001", "3240101.0930"])